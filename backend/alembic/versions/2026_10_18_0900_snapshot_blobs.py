@@ -0,0 +1,24 @@
+"""
+Add content-addressed snapshot blobs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic revision identifiers
+revision = '2026_10_18_0900'
+down_revision = '2025_05_19_2110'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('snapshot_blobs',
+        sa.Column('digest', sa.VARCHAR(length=64), nullable=False),
+        sa.Column('encoding', sa.VARCHAR(length=32), nullable=False),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.INTEGER(), nullable=False),
+        sa.Column('created_at', sa.DATETIME(), nullable=True),
+        sa.PrimaryKeyConstraint('digest')
+    )
+
+def downgrade() -> None:
+    op.drop_table('snapshot_blobs')
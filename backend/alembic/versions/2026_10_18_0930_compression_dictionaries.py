@@ -0,0 +1,24 @@
+"""
+Add versioned compression dictionaries for snapshot blobs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic revision identifiers
+revision = '2026_10_18_0930'
+down_revision = '2026_10_18_0900'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('compression_dictionaries',
+        sa.Column('version', sa.INTEGER(), nullable=False),
+        sa.Column('algorithm', sa.VARCHAR(length=16), nullable=False),
+        sa.Column('dictionary', sa.LargeBinary(), nullable=False),
+        sa.Column('sample_count', sa.INTEGER(), nullable=False),
+        sa.Column('created_at', sa.DATETIME(), nullable=True),
+        sa.PrimaryKeyConstraint('version')
+    )
+
+def downgrade() -> None:
+    op.drop_table('compression_dictionaries')
@@ -0,0 +1,23 @@
+"""
+Record closed-loop tuning experiment outcomes in tuning_history.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic revision identifiers
+revision = '2026_10_18_1000'
+down_revision = '2026_10_18_0930'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('tuning_history') as batch_op:
+        batch_op.add_column(sa.Column('verdict', sa.VARCHAR(), nullable=True))
+        batch_op.add_column(sa.Column('reverted', sa.BOOLEAN(), nullable=True))
+        batch_op.add_column(sa.Column('effect_sizes', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('tuning_history') as batch_op:
+        batch_op.drop_column('effect_sizes')
+        batch_op.drop_column('reverted')
+        batch_op.drop_column('verdict')
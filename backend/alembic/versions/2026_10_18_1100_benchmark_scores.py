@@ -0,0 +1,19 @@
+"""
+Record micro-benchmark scores of benchmarked tunings in tuning_history.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Alembic revision identifiers
+revision = '2026_10_18_1100'
+down_revision = '2026_10_18_1000'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.batch_alter_table('tuning_history') as batch_op:
+        batch_op.add_column(sa.Column('benchmark_scores', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('tuning_history') as batch_op:
+        batch_op.drop_column('benchmark_scores')
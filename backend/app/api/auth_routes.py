@@ -11,6 +11,7 @@ from app.schemas.user import UserCreate, UserProfileUpdate
 from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
 from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.core.auth import get_current_user, get_optional_user
+from app.core.user_resolver import get_user_resolver
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from pydantic import BaseModel
@@ -218,6 +219,7 @@ async def update_user_profile(
         db.add(current_user)
         await db.commit()
         await db.refresh(current_user)
+        get_user_resolver().invalidate(current_user.username)
         
         return {
             "message": "Profile updated successfully",
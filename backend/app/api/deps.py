@@ -2,13 +2,11 @@ from typing import Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.user_resolver import decode_access_token, get_user_resolver
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -22,25 +20,18 @@ async def get_db() -> Generator:
         yield db
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme),
 ) -> User:
     import logging
     logger = logging.getLogger(__name__)
     
     try:
-        # Log token info for debugging (don't log the full token in production)
-        logger.info(f"Decoding token: {token[:10]}...")
-        
         # Decode the JWT token
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        logger.info(f"Token payload decoded successfully")
+        payload = decode_access_token(token)
         
         # Validate the token data
         token_data = TokenPayload(**payload)
-        logger.info(f"Token subject: {token_data.sub}")
+        logger.debug(f"Token subject: {token_data.sub}")
         
     except JWTError as e:
         logger.error(f"JWT error: {str(e)}")
@@ -56,43 +47,25 @@ async def get_current_user(
         )
     
     try:
-        # Query for the user by username
-        logger.info(f"Looking up user: {token_data.sub}")
-        
-        # Use a completely different approach to avoid ChunkedIteratorResult issues
-        # Create a synchronous session and execute the query
-        from sqlalchemy.orm import Session
-        from app.core.database import sync_engine
-        
-        # Get a synchronous session
-        sync_session = Session(sync_engine)
-        try:
-            # Execute the query synchronously
-            user = sync_session.query(User).filter(User.username == token_data.sub).first()
-            
-            if not user:
-                logger.error(f"User not found: {token_data.sub}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, 
-                    detail=f"User {token_data.sub} not found"
-                )
-                
-            # Create a copy of the user object to return
-            from copy import deepcopy
-            user_copy = deepcopy(user)
-            
-            logger.info(f"User authenticated successfully: {user.username}")
-            return user_copy
-        finally:
-            # Always close the session
-            sync_session.close()
-        
+        # Cached per (subject, token id); misses go through an AsyncSession, never a sync one
+        user = await get_user_resolver().resolve(
+            token_data.sub, payload.get("jti"), payload.get("exp")
+        )
     except Exception as e:
         logger.error(f"Database error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving user: {str(e)}",
         )
+    
+    if not user:
+        logger.error(f"User not found: {token_data.sub}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, 
+            detail=f"User {token_data.sub} not found"
+        )
+    
+    return user
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
@@ -17,6 +17,7 @@ from app.schemas.token import Token
 from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token, SECRET_KEY, ALGORITHM
 from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.core.config import settings
+from app.core.user_resolver import get_user_resolver
 from app.services.system_log_service import LogService
 
 # Define a simple UserProfileCreate if it doesn't exist in your schemas
@@ -545,29 +546,21 @@ async def auth_status(request: Request, db: AsyncSession = Depends(get_db)):
                 is_authenticated = True
                 print(f"🧐 Token validated successfully for user: {username}")
                 
-                # If authenticated, fetch the user data
+                # If authenticated, fetch the user data through the shared async cache
                 if username:
                     try:
-                        # Use sync_engine for user lookup to avoid async issues
-                        from app.core.database import sync_engine
-                        from sqlalchemy.orm import Session
-                        
-                        sync_session = Session(sync_engine)
-                        try:
-                            user = sync_session.query(User).filter(User.username == username).first()
-                            if user:
-                                user_data = {
-                                    "id": str(user.id),
-                                    "username": user.username,
-                                    "email": user.email,
-                                    "operating_system": user.operating_system,
-                                    "os_version": user.os_version,
-                                    "cpu_cores": user.cpu_cores,
-                                    "total_memory": user.total_memory,
-                                    "needs_onboarding": user.needs_onboarding
-                                }
-                        finally:
-                            sync_session.close()
+                        user = await get_user_resolver().resolve(username, payload.get("jti"), payload.get("exp"))
+                        if user:
+                            user_data = {
+                                "id": str(user.id),
+                                "username": user.username,
+                                "email": user.email,
+                                "operating_system": user.operating_system,
+                                "os_version": user.os_version,
+                                "cpu_cores": user.cpu_cores,
+                                "total_memory": user.total_memory,
+                                "needs_onboarding": user.needs_onboarding
+                            }
                     except Exception as user_error:
                         print(f"⚠️ Error fetching user data: {str(user_error)}")
             except Exception as e:
@@ -620,6 +613,8 @@ async def complete_onboarding(
     db.add(current_user)
     await db.commit()
     await db.refresh(current_user)
+    # Cached auth lookups still hold the old onboarding state
+    get_user_resolver().invalidate(current_user.username)
     
     return {"message": "Onboarding completed successfully"}
 
@@ -735,6 +730,8 @@ async def direct_profile_update(
             db.add(user)
             await db.commit()
             await db.refresh(user)
+            # Cached auth lookups still hold the old profile
+            get_user_resolver().invalidate(user.username)
             
             print(f"✅ Profile updated successfully for {username}")
         except Exception as commit_error:
@@ -819,6 +816,8 @@ async def update_profile(
             db.add(current_user)
             await db.commit()
             await db.refresh(current_user)
+            # Cached auth lookups still hold the old profile
+            get_user_resolver().invalidate(current_user.username)
             print(f"✅ Profile updated successfully for {current_user.username}")
         
         return {
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
 from datetime import datetime
+from typing import List, Optional
 
 from app.api.deps import get_db, get_current_user
 from app.models.user import User
@@ -30,6 +31,20 @@ async def get_current_metrics(
     return metrics
 
 
+@router.get("/tunables")
+async def get_tunable_state(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current kernel tunable state.
+    
+    Returns CPU governors, block device queue settings and vm/net sysctls
+    as read from /proc/sys and /sys.
+    """
+    from app.optimization.tunable_state import get_tunable_state_reader
+    return get_tunable_state_reader().snapshot()
+
+
 @router.get("/recommendations")
 async def get_optimization_recommendations(
     current_user: User = Depends(get_current_user)
@@ -96,7 +111,8 @@ async def get_optimization_recommendations(
             "recommended_value": rec.new_value,
             "confidence": rec.confidence,
             "impact_score": rec.impact_score,
-            "reason": rec.reason
+            "reason": rec.reason,
+            "targets": rec.targets
         }
         for rec in recommendations
     ]
@@ -141,49 +157,34 @@ async def apply_optimization_profile(
         source="tuner"
     )
     
-    # Apply the profile settings
-    tuning_results = []
-    for setting_key, setting_value in profile.settings.items():
-        # Convert profile settings to tuning actions
-        try:
-            result = await tuner.apply_tuning({
-                "parameter": setting_key,
-                "current_value": "current",  # This would be replaced with actual current value
-                "new_value": setting_value,
-                "confidence": 1.0,  # User-selected settings have 100% confidence
-                "impact_score": 0.8,
-                "reason": f"Applied from profile: {profile.name}"
-            }, user_id=current_user.id)
-            
-            # Log each setting application
-            success = True if result and result.get("success") else False
-            log_service.add_tuner_log(
-                action=f"Profile '{profile.name}':",
-                parameter=setting_key,
-                old_value="current",
-                new_value=setting_value,
-                success=success
-            )
-            
-            tuning_results.append(result)
-        except Exception as e:
-            # Log the error
-            log_service.add_log(
-                message=f"Error applying setting {setting_key}: {str(e)}",
-                level="error",
-                source="tuner"
-            )
-            
-            tuning_results.append({
-                "parameter": setting_key,
-                "success": False,
-                "error": str(e)
-            })
+    # Apply only what differs from the current state, as one transaction
+    transaction = await tuner.apply_profile(profile.settings, user_id=current_user.id, name=profile.name)
+    
+    for change in transaction["changes"]:
+        log_service.add_tuner_log(
+            action=f"Profile '{profile.name}':",
+            parameter=change["path"],
+            old_value=change["previous"],
+            new_value=change["value"],
+            success=transaction["status"] == "applied"
+        )
+    if transaction["failed"]:
+        log_service.add_log(
+            message=f"Profile '{profile.name}' {transaction['status']}: " + "; ".join(
+                f"{key}: {error}" for key, error in transaction["failed"].items()
+            ),
+            level="error",
+            source="tuner"
+        )
     
     return {
         "profile_id": profile_id,
         "profile_name": profile.name,
-        "applied_settings": tuning_results
+        "status": transaction["status"],
+        "applied_settings": transaction["changes"],
+        "unchanged_settings": transaction["unchanged"],
+        "ignored_settings": transaction["ignored"],
+        "failed": transaction["failed"]
     }
 
 
@@ -229,12 +230,243 @@ async def apply_recommendation(
             "parameter": selected_recommendation.parameter.value,
             "old_value": selected_recommendation.current_value,
             "new_value": selected_recommendation.new_value,
-            "reason": selected_recommendation.reason
+            "reason": selected_recommendation.reason,
+            "targets": selected_recommendation.targets
         },
         "result": result
     }
 
 
+@router.post("/recommendations/experiment")
+async def experiment_with_recommendation(
+    background_tasks: BackgroundTasks,
+    recommendation_id: int = 0,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a recommendation as a closed-loop experiment.
+    
+    Samples a baseline window, applies the change, samples an equal window
+    afterwards and reverts automatically if it made things measurably worse.
+    Runs in the background; the outcome appears in the tuning history.
+    """
+    tuner = AutoTuner()
+    recommendations = await tuner.get_tuning_recommendations()
+    
+    if recommendation_id < 0 or recommendation_id >= len(recommendations):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recommendation not found"
+        )
+    
+    selected_recommendation = recommendations[recommendation_id]
+    background_tasks.add_task(tuner.run_experiment, selected_recommendation, user_id=current_user.id)
+    
+    return {
+        "status": "started",
+        "recommendation": {
+            "parameter": selected_recommendation.parameter.value,
+            "old_value": selected_recommendation.current_value,
+            "new_value": selected_recommendation.new_value,
+            "reason": selected_recommendation.reason
+        }
+    }
+
+
+@router.get("/placements")
+async def get_process_placements(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get active process placements.
+    
+    Returns the CPU affinity and cgroup weight changes in force, each with
+    the value it replaced.
+    """
+    from app.optimization.process_placement import get_placement_manager
+    manager = get_placement_manager()
+    return {
+        "placements": manager.get_placements(),
+        "protected_processes": manager.protected
+    }
+
+
+@router.post("/placements")
+async def place_hot_processes(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Place hot processes for the current load.
+    
+    Reserves cores and larger cgroup v2 weights for protected services
+    when hot processes compete with them, or spreads hot processes across
+    NUMA nodes.
+    """
+    from app.optimization.process_placement import get_placement_manager
+    manager = get_placement_manager()
+    metrics_service = await SimplifiedMetricsService.get_instance()
+    cpu_data = await metrics_service.get_cpu_metrics()
+    return await manager.apply(manager.plan(cpu_data), user_id=current_user.id)
+
+
+@router.delete("/placements")
+async def revert_process_placements(
+    placement_id: int = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Revert process placements.
+    
+    Restores the previous affinity and weights of one placement, or of all
+    of them when no placement_id is given.
+    """
+    from app.optimization.process_placement import get_placement_manager
+    manager = get_placement_manager()
+    ids = None if placement_id is None else [placement_id]
+    return await manager.revert(ids, user_id=current_user.id)
+
+
+@router.get("/daemon")
+async def get_tuning_daemon_status(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the background auto-tuning daemon's status.
+    
+    Returns whether it is running, the parameters still rate limited,
+    pre-emptive changes awaiting their daily peak, the daily cycles it has
+    found and its recent actions.
+    """
+    from app.core.config import settings
+    from app.optimization.tuning_daemon import get_tuning_daemon
+    return {"enabled": settings.AUTO_TUNING_ENABLED, **get_tuning_daemon().get_stats()}
+
+
+@router.post("/recommendations/simulate")
+async def simulate_recommendations(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    profile_id: Optional[UUID] = None,
+    link_speed_mbps: Optional[float] = None,
+    window_seconds: Optional[float] = None,
+    cooldown_seconds: Optional[float] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replay recorded metrics through the recommendation rules.
+    
+    Reports which rules would have fired over the stored raw samples
+    between start and end, when and how often, and how often the given
+    profile's alert thresholds would have been crossed. Nothing is applied.
+    """
+    from app.optimization.tuning_simulator import TuningSimulator, load_trace
+    profile_settings = None
+    if profile_id is not None:
+        query = select(OptimizationProfile).where(
+            OptimizationProfile.id == str(profile_id),
+            OptimizationProfile.user_id == current_user.id
+        )
+        profile = (await db.execute(query)).scalars().first()
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Optimization profile not found"
+            )
+        profile_settings = profile.settings
+    
+    trace = await load_trace(db, start, end, link_speed_mbps)
+    simulator = TuningSimulator(
+        profile_settings=profile_settings,
+        window_seconds=window_seconds,
+        cooldown_seconds=cooldown_seconds
+    )
+    return simulator.run(trace)
+
+
+@router.post("/benchmarks")
+async def run_benchmarks(
+    workloads: Optional[List[str]] = Query(None),
+    block_size: Optional[int] = Query(None, ge=512, le=16 * 1024 * 1024),
+    sync: Optional[str] = None,
+    repeats: Optional[int] = Query(None, ge=1, le=20),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Run the built-in micro-benchmarks.
+    
+    Measures a CPU loop, memory copy bandwidth, file I/O on a temporary
+    file (with the given block size and sync mode) and loopback TCP
+    throughput and latency, each repeated to give a mean and spread.
+    """
+    from app.optimization.benchmarks import BenchmarkSuite
+    try:
+        suite = BenchmarkSuite(workloads, _file_io_options(block_size, sync))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await suite.run(repeats)
+
+
+@router.post("/recommendations/benchmark")
+async def benchmark_recommendation(
+    background_tasks: BackgroundTasks,
+    recommendation_id: int = 0,
+    workloads: Optional[List[str]] = Query(None),
+    block_size: Optional[int] = Query(None, ge=512, le=16 * 1024 * 1024),
+    sync: Optional[str] = None,
+    repeats: Optional[int] = Query(None, ge=1, le=20),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply a recommendation judged by micro-benchmarks.
+    
+    Runs the benchmarks before and after the change and reverts it if any
+    score got significantly worse. Runs in the background; scores and
+    verdict appear in the tuning history.
+    """
+    from app.optimization.benchmarks import BenchmarkSuite
+    options = _file_io_options(block_size, sync)
+    try:
+        BenchmarkSuite(workloads, options)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    tuner = AutoTuner()
+    recommendations = await tuner.get_tuning_recommendations()
+    
+    if recommendation_id < 0 or recommendation_id >= len(recommendations):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recommendation not found"
+        )
+    
+    selected_recommendation = recommendations[recommendation_id]
+    background_tasks.add_task(
+        tuner.run_benchmark, selected_recommendation, user_id=current_user.id,
+        workloads=workloads, options=options, repeats=repeats
+    )
+    
+    return {
+        "status": "started",
+        "workloads": workloads or "all",
+        "recommendation": {
+            "parameter": selected_recommendation.parameter.value,
+            "old_value": selected_recommendation.current_value,
+            "new_value": selected_recommendation.new_value,
+            "reason": selected_recommendation.reason
+        }
+    }
+
+
+def _file_io_options(block_size: Optional[int], sync: Optional[str]) -> dict:
+    file_io = {}
+    if block_size is not None:
+        file_io['block_size'] = block_size
+    if sync is not None:
+        file_io['sync'] = sync
+    return {'file_io': file_io} if file_io else {}
+
+
 @router.get("/patterns")
 async def get_system_patterns(
     current_user: User = Depends(get_current_user)
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 import logging
 
 from app.api.deps import get_current_user, get_db
+from app.core.user_resolver import get_user_resolver
 from app.models.user import User
 
 # Set up logging
@@ -117,6 +118,8 @@ async def update_current_user(
             db.add(current_user)
             await db.commit()
             await db.refresh(current_user)
+            # Cached auth lookups still hold the old profile
+            get_user_resolver().invalidate(current_user.username)
         except Exception as e:
             logger.error(f"Database error during profile update: {str(e)}")
             await db.rollback()
@@ -1,21 +1,29 @@
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import logging
 import uuid
 import socket
+import zlib
 
 import psutil
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_async_db, get_db
 from app.core.security import get_current_user
 from app.schemas.metrics import MetricCreate, MetricResponse, MetricUpdate
 from app.services.metrics_repository import MetricsRepository
 from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+from app.services.storage.metric_archive import export_ndjson_gzip, import_ndjson_gzip
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["metrics"])
 
+ARCHIVE_READ_CHUNK = 64 * 1024
+
 @router.get("/system", response_model=Dict[str, Any])
 async def get_metrics(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """
@@ -153,6 +161,59 @@ async def read_user_metrics(
         logger.error(f"Error retrieving metrics: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve metrics")
 
+@router.get("/export")
+async def export_metrics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    The Meth Snail's Bulk History Export
+
+    Streams system metric history in [start, end) as gzip NDJSON. Rows are
+    read from a server-side cursor and compressed chunk by chunk, so memory
+    use does not depend on the size of the range.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    async def archive_stream():
+        # The session must outlive this handler, so the stream owns it
+        async with AsyncSessionLocal() as session:
+            async for chunk in export_ndjson_gzip(session, start, end):
+                yield chunk
+
+    filename = f"metrics_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.ndjson.gz"
+    return StreamingResponse(
+        archive_stream(),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/import")
+async def import_metrics(
+    archive: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Sir Hawkington's Bulk History Import
+
+    Loads a gzip NDJSON archive produced by /export through the batched
+    writer, e.g. to migrate history between hosts.
+    """
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+
+    async def upload_chunks():
+        while chunk := await archive.read(ARCHIVE_READ_CHUNK):
+            yield chunk
+
+    try:
+        return await import_ndjson_gzip(db, upload_chunks())
+    except (ValueError, zlib.error) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid metrics archive: {str(e)}")
+
 @router.get("/{metric_id}", response_model=MetricResponse)
 async def read_metric(
     metric_id: uuid.UUID,
@@ -2,15 +2,11 @@
 WebSocket authentication utilities for System Rebellion
 """
 from fastapi import WebSocket, status
-from jose import jwt, JWTError
-from app.core.config import settings
+from jose import JWTError
+from app.core.user_resolver import get_user_resolver
 from app.models.user import User
-from sqlalchemy import select # type: ignore
-from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
-from sqlalchemy.engine.result import ScalarResult # type: ignore
-from app.core.database import AsyncSessionLocal # type: ignore
 import logging
-from typing import Optional, cast, TypeVar, Union
+from typing import Optional, TypeVar
 
 logger = logging.getLogger(__name__)
 
@@ -21,41 +17,15 @@ async def get_current_user_from_token(token: str) -> Optional[User]:
     Validate JWT token and return the user
     """
     try:
-        # Decode the JWT token
-        print(f"Decoding WebSocket token: {token[:10]}...")
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        # Resolved through the shared cache, so reconnects with the same token skip the database
+        user = await get_user_resolver().resolve_token(token)
         
-        # Extract the subject (username)
-        username = cast(str, payload.get("sub"))
-        if not username:
-            print("Token missing 'sub' field")
+        if not user:
+            print("Token has no subject or user not found")
             return None
-        print(f"Token subject: {username}")
-
-        # Get user from database
-        async with AsyncSessionLocal() as db:  # type: ignore
-            db_session: AsyncSession = db
-            print(f"Looking up user: {username}")
-            stmt = select(User).where(User.username == username)  # type: ignore
-            result = (await db_session.execute(stmt)).scalars()  # type: ignore
-            user = result.first()  # type: ignore
-                
-            if not user:
-                print(f"User not found: {username}")
-                return None
-                
-        # Create a detached copy of the user object
-        detached_user = User(
-            id=int(user.id),  # Ensure integer type
-            username=cast(str, user.username),  # Use type.cast to ensure proper typing
-            email=str(user.email),
-            is_active=bool(user.is_active)
-        )
         
-        print(f"User authenticated successfully: {detached_user.username}")
-        return detached_user
+        print(f"User authenticated successfully: {user.username}")
+        return user
                 
     except JWTError as e:
         print(f"JWT error in WebSocket: {str(e)}")
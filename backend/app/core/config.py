@@ -1,6 +1,6 @@
 import secrets
 import os
-from typing import List, Union
+from typing import Dict, List, Union
 
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
@@ -41,6 +41,96 @@ class Settings(BaseSettings):
     # JWT settings
     ALGORITHM: str = "HS256"
 
+    # Authenticated user lookups cached per (subject, token id)
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 1024
+
+    # Raw 1 Hz sample storage: "sqlite" keeps rows in system_metrics,
+    # "segments" appends to memory-mapped segment files instead
+    RAW_SAMPLE_BACKEND: str = "sqlite"
+    RAW_SEGMENT_DIR: str = "./data/raw_segments"
+    RAW_SEGMENT_WINDOW_SECONDS: int = 3600
+    RAW_SEGMENT_RETENTION_HOURS: int = 48
+
+    # Dictionary-trained compression of stored snapshot blobs
+    SNAPSHOT_COMPRESSION_ENABLED: bool = False
+    SNAPSHOT_DICTIONARY_SIZE: int = 32 * 1024
+    SNAPSHOT_DICTIONARY_TRAINING_SAMPLES: int = 200
+    SNAPSHOT_DICTIONARY_RETRAIN_INTERVAL: int = 5000
+
+    # Hour-of-week anomaly baselines for registry-managed metric transformers
+    SEASONAL_BASELINE_DIR: str = "./data/seasonal_baselines"
+
+    # Checkpoint of the online multivariate anomaly model
+    ANOMALY_MODEL_PATH: str = "./data/anomaly_model.npz"
+
+    # Closed-loop tuning experiments: equal baseline and observation windows
+    TUNING_EXPERIMENT_WINDOW_SECONDS: float = 300.0
+    TUNING_EXPERIMENT_SAMPLE_INTERVAL: float = 5.0
+    TUNING_EXPERIMENT_SETTLE_SECONDS: float = 30.0
+    TUNING_EXPERIMENT_ALPHA: float = 0.05
+    TUNING_EXPERIMENT_MIN_EFFECT: float = 0.5
+
+    # Cached /proc/sys and /sys tunable snapshot; re-read after our own writes,
+    # when CPUs or block devices change, or at the latest after this TTL
+    TUNABLE_STATE_TTL_SECONDS: float = 30.0
+
+    # Direct sysfs/procfs tuning: TUNING_ROOT relocates /proc and /sys (e.g. a
+    # scratch tree for testing), TUNING_DRY_RUN plans without writing, and
+    # TUNING_HELPER_COMMAND receives permission-denied writes in one batch,
+    # e.g. "sudo -n /usr/bin/python3 -I /usr/local/libexec/system-rebellion/tuning_helper.py"
+    # as installed by scripts/setup_tuning_helper_sudo.sh
+    TUNING_ROOT: str = "/"
+    TUNING_DRY_RUN: bool = False
+    TUNING_HELPER_COMMAND: str = ""
+
+    # Recommendation rules are evaluated on means over this window, need at
+    # least RECOMMENDATION_MIN_SAMPLES, clear only HYSTERESIS points past their
+    # threshold and hold each state change for the cooldown. The endpoint
+    # collects a sample itself only when none is newer than MAX_SAMPLE_AGE.
+    RECOMMENDATION_WINDOW_SECONDS: float = 60.0
+    RECOMMENDATION_MIN_SAMPLES: int = 3
+    RECOMMENDATION_HYSTERESIS: float = 5.0
+    RECOMMENDATION_COOLDOWN_SECONDS: float = 300.0
+    RECOMMENDATION_MAX_SAMPLE_AGE: float = 10.0
+
+    # Micro-benchmarks: runs per measurement and where file_io puts its
+    # temporary file (empty means the system temp directory)
+    BENCHMARK_REPEATS: int = 5
+    BENCHMARK_DIRECTORY: str = ""
+
+    # Background auto-tuning daemon, started with the app when enabled. It
+    # acts on the shared metrics stream every INTERVAL seconds, changes each
+    # parameter at most once per MIN_CHANGE_INTERVAL (RATE_LIMITS overrides
+    # per parameter), only inside MAINTENANCE_WINDOWS when any are given
+    # ("02:00-04:00" or "Sat 01:00-05:00", local time), and applies rules
+    # LEAD_SECONDS ahead of detected daily peaks, holding them PEAK_HOLD_SECONDS.
+    # PARAMETERS limits what it may touch (empty: everything recommended);
+    # its changes are recorded in the history of AUTO_TUNING_USER_ID.
+    AUTO_TUNING_ENABLED: bool = False
+    AUTO_TUNING_INTERVAL_SECONDS: float = 60.0
+    AUTO_TUNING_MIN_CHANGE_INTERVAL: float = 3600.0
+    AUTO_TUNING_RATE_LIMITS: Dict[str, float] = {}
+    AUTO_TUNING_MAINTENANCE_WINDOWS: List[str] = []
+    AUTO_TUNING_LEAD_SECONDS: float = 900.0
+    AUTO_TUNING_PEAK_HOLD_SECONDS: float = 7200.0
+    AUTO_TUNING_PARAMETERS: List[str] = []
+    AUTO_TUNING_USER_ID: str = ""
+
+    # Process placement: processes (by name) that get reserved cores and
+    # higher cgroup v2 weights when hot processes contend with them
+    PLACEMENT_PROTECTED_PROCESSES: List[str] = []
+    PLACEMENT_HOT_PROCESS_PERCENT: float = 80.0
+    PLACEMENT_PROTECTED_CPU_WEIGHT: int = 1000
+    PLACEMENT_PROTECTED_IO_WEIGHT: int = 1000
+
+    @field_validator("PLACEMENT_PROTECTED_PROCESSES", "AUTO_TUNING_MAINTENANCE_WINDOWS",
+                     "AUTO_TUNING_PARAMETERS", mode="before")
+    def split_name_lists(cls, v: Union[str, List[str]]) -> List[str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [name.strip() for name in v.split(",") if name.strip()]
+        return v
+
     class Config:
         case_sensitive = True
 
@@ -10,6 +10,10 @@ Includes:
 - Backpressure Handling: Manages data flow to prevent overwhelming the system
 - Autonomous Error Recovery: Self-healing mechanisms for common errors
 - Metric Transformation: Real-time data processing with NumPy
+- Streaming Statistics: ring buffers with O(1) running statistics
+- Multi-Series Transformation: every tracked series in one vectorised pass
+- Quantile Sketches: mergeable t-digests and time-bucketed percentile rollups
+- Seasonal Baselines: hour-of-week mean/variance used as the anomaly reference
 """
 
 from app.core.resilience.circuit_breaker import (
@@ -35,11 +39,32 @@ from app.core.resilience.error_recovery import (
     error_recovery
 )
 
+from app.core.resilience.streaming_stats import (
+    RingBuffer,
+    StreamingSeries
+)
+
+from app.core.resilience.quantile_sketch import (
+    TDigest,
+    QuantileRollup
+)
+
+from app.core.resilience.seasonal_baseline import (
+    SeasonalBaseline,
+    hour_of_week
+)
+
 from app.core.resilience.metric_transformer import (
     MetricTransformer,
     get_metric_transformer
 )
 
+from app.core.resilience.multi_series_transformer import (
+    MultiSeriesTransformer,
+    extract_series,
+    get_multi_series_transformer
+)
+
 __all__ = [
     'WebSocketCircuitBreaker',
     'get_circuit_breaker',
@@ -55,6 +80,15 @@ __all__ = [
     'ErrorContext',
     'with_error_recovery',
     'error_recovery',
+    'RingBuffer',
+    'StreamingSeries',
+    'TDigest',
+    'QuantileRollup',
+    'SeasonalBaseline',
+    'hour_of_week',
     'MetricTransformer',
-    'get_metric_transformer'
+    'get_metric_transformer',
+    'MultiSeriesTransformer',
+    'extract_series',
+    'get_multi_series_transformer'
 ]
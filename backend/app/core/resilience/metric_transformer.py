@@ -1,9 +1,13 @@
-import numpy as np
 import logging
-from typing import Dict, List, Any, Optional, Callable, Union
-from datetime import datetime, timedelta
+import os
+from typing import Dict, List, Any, Optional
+from datetime import datetime
 import time
-import json
+
+from app.core.config import settings
+from app.core.resilience.quantile_sketch import QuantileRollup
+from app.core.resilience.seasonal_baseline import SeasonalBaseline
+from app.core.resilience.streaming_stats import RingBuffer, StreamingSeries
 
 logger = logging.getLogger(__name__)
 
@@ -14,151 +18,160 @@ class MetricTransformer:
     Transforms raw system metrics into actionable intelligence using NumPy.
     Provides statistical analysis, anomaly detection, and data smoothing.
     
+    History lives in fixed-size ring buffers with running statistics, so each
+    sample costs O(1) regardless of history_size. Per-point history series and
+    percentiles are only recomputed when `include_history=True` is requested.
+    
+    Anomalies are scored against hour-of-week seasonal baselines once a slot
+    has warmed up, falling back to the short-window z-score until then.
+    
     NOW WITH PROPER FIELD MAPPING! 🎩
     """
     
+    METRIC_TYPES = ("cpu", "memory", "disk", "network")
+    
     def __init__(
         self,
         name: str = "default",
         history_size: int = 60,  # Keep 60 data points by default
         smoothing_window: int = 5,  # Smooth over 5 data points
         anomaly_threshold: float = 2.0,  # Z-score threshold for anomalies
-        percentiles: List[float] = [25, 50, 75, 90, 95, 99]
+        percentiles: List[float] = [25, 50, 75, 90, 95, 99],
+        trend_window: int = 10,  # Samples used for the trend slope
+        rollup_bucket_seconds: int = 3600,  # One quantile sketch per hour...
+        rollup_retention_buckets: int = 168,  # ...kept for a week
+        baseline_path: Optional[str] = None,  # Persist seasonal baselines here
+        baseline_min_samples: int = 30  # Samples per hour-of-week slot before it is trusted
     ):
         self.name = name
         self.history_size = history_size
         self.smoothing_window = smoothing_window
         self.anomaly_threshold = anomaly_threshold
         self.percentiles = percentiles
+        self.trend_window = trend_window
+        
+        # One ring-buffered series per metric type
+        self.series: Dict[str, StreamingSeries] = {
+            metric_type: StreamingSeries(
+                capacity=history_size,
+                smoothing_window=smoothing_window,
+                trend_window=trend_window
+            )
+            for metric_type in self.METRIC_TYPES
+        }
         
-        # Initialize history storage for different metric types
-        self.cpu_history = []
-        self.memory_history = []
-        self.disk_history = []
-        self.network_history = []
+        # Bucketed t-digests for percentiles over windows far longer than history_size
+        self.rollups: Dict[str, QuantileRollup] = {
+            metric_type: QuantileRollup(
+                bucket_seconds=rollup_bucket_seconds,
+                retention_buckets=rollup_retention_buckets
+            )
+            for metric_type in self.METRIC_TYPES
+        }
+        
+        # Hour-of-week mean/variance per metric type, kept across restarts
+        self.baseline = SeasonalBaseline(path=baseline_path, min_samples=baseline_min_samples)
         
-        # Timestamps for each data point
-        self.timestamps = []
+        # Timestamps of each transform_system_metrics tick
+        self.timestamps = RingBuffer(history_size)
         
         logger.info(f"Metric Transformer '{name}' initialized with history_size={history_size}")
     
+    @property
+    def cpu_history(self) -> List[float]:
+        return self.series["cpu"].buffer.values().tolist()
+    
+    @property
+    def memory_history(self) -> List[float]:
+        return self.series["memory"].buffer.values().tolist()
+    
+    @property
+    def disk_history(self) -> List[float]:
+        return self.series["disk"].buffer.values().tolist()
+    
+    @property
+    def network_history(self) -> List[float]:
+        return self.series["network"].buffer.values().tolist()
+    
     def _add_to_history(self, metric_type: str, data_point: Any) -> None:
         """Add a data point to the appropriate history"""
-        if metric_type == "cpu":
-            self.cpu_history.append(data_point)
-            if len(self.cpu_history) > self.history_size:
-                self.cpu_history.pop(0)
-        elif metric_type == "memory":
-            self.memory_history.append(data_point)
-            if len(self.memory_history) > self.history_size:
-                self.memory_history.pop(0)
-        elif metric_type == "disk":
-            self.disk_history.append(data_point)
-            if len(self.disk_history) > self.history_size:
-                self.disk_history.pop(0)
-        elif metric_type == "network":
-            self.network_history.append(data_point)
-            if len(self.network_history) > self.history_size:
-                self.network_history.pop(0)
-        
-        # Add timestamp
-        now = datetime.now()
-        self.timestamps.append(now)
-        if len(self.timestamps) > self.history_size:
-            self.timestamps.pop(0)
+        if metric_type in self.series:
+            value = float(data_point or 0.0)
+            self.series[metric_type].push(value)
+            self.rollups[metric_type].add(value)
     
-    def _smooth_data(self, data: List[float]) -> np.ndarray:
-        """Apply smoothing to a data series"""
-        if not data or len(data) < 2:
-            return np.array(data)
-            
-        # Convert to numpy array
-        data_array = np.array(data)
-        
-        # Apply moving average smoothing
-        if len(data_array) >= self.smoothing_window:
-            # Create a rolling window view of the data
-            window_size = min(self.smoothing_window, len(data_array))
-            smoothed = np.convolve(data_array, np.ones(window_size)/window_size, mode='valid')
-            
-            # Pad the beginning to maintain the same length
-            padding = len(data_array) - len(smoothed)
-            if padding > 0:
-                # Use the first smoothed value for padding
-                padding_value = smoothed[0] if len(smoothed) > 0 else data_array[0]
-                smoothed = np.concatenate([np.full(padding, padding_value), smoothed])
-                
-            return smoothed
+    def _transform_series(
+        self,
+        metric_type: str,
+        value: float,
+        include_history: bool = False
+    ) -> Dict[str, Any]:
+        """Push a sample and build the transformed view from running statistics"""
+        now = time.time()
+        value = float(value or 0.0)
+        # Score against the slot's baseline before the sample is folded into it
+        seasonal_z = self.baseline.score(metric_type, value, now)
+        self.baseline.observe(metric_type, value, now)
+        self._add_to_history(metric_type, value)
+        series = self.series[metric_type]
+        
+        if seasonal_z is not None:
+            is_anomaly = abs(seasonal_z) > self.anomaly_threshold
         else:
-            return data_array
-    
-    def _detect_anomalies(self, data: List[float]) -> List[bool]:
-        """
-        Detect anomalies in a data series using Z-score
+            is_anomaly = series.is_anomaly(self.anomaly_threshold)
         
-        Returns:
-            List of booleans indicating whether each point is an anomaly
-        """
-        if not data or len(data) < 4:  # Need some data for meaningful statistics
-            return [False] * len(data)
-            
-        # Convert to numpy array
-        data_array = np.array(data)
-        
-        # Calculate Z-scores
-        mean = np.mean(data_array)
-        std = np.std(data_array)
+        transformed = {
+            "current": value,
+            "smoothed": float(series.smoothed),
+            "ewma": float(series.ewma),
+            "rate_of_change": float(series.rate_of_change),
+            "statistics": series.summary(),
+            "z_score": float(series.zscore()),
+            "trend": series.slope,
+            "seasonal_z_score": seasonal_z,
+            "baseline": self.baseline.baseline(metric_type, now),
+            "is_anomaly": is_anomaly
+        }
         
-        if std == 0:  # Avoid division by zero
-            return [False] * len(data)
-            
-        z_scores = np.abs((data_array - mean) / std)
+        if include_history:
+            transformed.update(self.get_full_analysis(metric_type))
         
-        # Mark points with Z-score above threshold as anomalies
-        return (z_scores > self.anomaly_threshold).tolist()
+        return transformed
     
-    def _calculate_rate_of_change(self, data: List[float]) -> List[float]:
-        """Calculate rate of change between consecutive data points"""
-        if not data or len(data) < 2:
-            return [0.0] * len(data)
-            
-        # Convert to numpy array
-        data_array = np.array(data)
-        
-        # Calculate differences
-        diffs = np.diff(data_array)
-        
-        # Pad with 0 at the beginning to maintain length
-        return np.concatenate([[0.0], diffs]).tolist()
+    def get_full_analysis(self, metric_type: str) -> Dict[str, Any]:
+        """
+        Full-history recomputation for one metric type: history, smoothed
+        history, per-point anomaly flags and rate of change, and percentiles.
+        """
+        if metric_type not in self.series:
+            raise ValueError(f"Unknown metric type: {metric_type}")
+        return self.series[metric_type].full_analysis(self.percentiles, self.anomaly_threshold)
     
-    def _calculate_statistics(self, data: List[float]) -> Dict[str, float]:
-        """Calculate statistical measures for a data series"""
-        if not data:
-            return {
-                "mean": 0.0,
-                "min": 0.0,
-                "max": 0.0,
-                "std_dev": 0.0,
-                "percentiles": {str(p): 0.0 for p in self.percentiles}
-            }
-            
-        # Convert to numpy array
-        data_array = np.array(data)
-        
-        # Calculate statistics
-        stats = {
-            "mean": float(np.mean(data_array)),
-            "min": float(np.min(data_array)),
-            "max": float(np.max(data_array)),
-            "std_dev": float(np.std(data_array)),
-            "percentiles": {
-                str(p): float(np.percentile(data_array, p)) for p in self.percentiles
-            }
-        }
-        
-        return stats
+    def save_baselines(self) -> None:
+        """Flush seasonal baselines to disk (they also autosave periodically)"""
+        self.baseline.save()
+    
+    def get_percentiles(
+        self,
+        metric_type: str,
+        window_seconds: Optional[float] = None,
+        percentiles: Optional[List[float]] = None
+    ) -> Dict[str, float]:
+        """
+        Percentiles over the last `window_seconds` (whole rollup buckets), or
+        over everything retained when no window is given. Answered from merged
+        quantile sketches, so cost doesn't grow with the number of samples.
+        """
+        if metric_type not in self.rollups:
+            raise ValueError(f"Unknown metric type: {metric_type}")
+        start = time.time() - window_seconds if window_seconds is not None else None
+        return self.rollups[metric_type].percentiles(percentiles or self.percentiles, start=start)
     
-    def transform_cpu_metrics(self, raw_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_cpu_metrics(
+        self,
+        raw_metrics: Dict[str, Any],
+        include_history: bool = False
+    ) -> Dict[str, Any]:
         """Transform CPU metrics - NOW WITH PROPER FIELD MAPPING!"""
         # Handle the nested structure from cpu_metrics_transformer
         if 'data' in raw_metrics and isinstance(raw_metrics['data'], dict):
@@ -172,43 +185,19 @@ class MetricTransformer:
         
         logger.debug(f"Extracted CPU percent: {cpu_percent} from metrics: {raw_metrics}")
         
-        # Add to history
-        self._add_to_history("cpu", cpu_percent)
-        
-        # Get CPU history as numpy array
-        cpu_history_array = np.array(self.cpu_history)
-        
-        # Apply transformations
-        smoothed_cpu = self._smooth_data(self.cpu_history)
-        anomalies = self._detect_anomalies(self.cpu_history)
-        rate_of_change = self._calculate_rate_of_change(self.cpu_history)
-        statistics = self._calculate_statistics(self.cpu_history)
-        
-        # Calculate load trend (positive = increasing, negative = decreasing)
-        if len(self.cpu_history) >= 10:
-            recent_trend = np.polyfit(range(len(self.cpu_history[-10:])), self.cpu_history[-10:], 1)[0]
-        else:
-            recent_trend = 0.0
-        
-        # Prepare transformed metrics
-        transformed = {
-            "current": cpu_percent,
-            "smoothed": float(smoothed_cpu[-1]) if len(smoothed_cpu) > 0 else cpu_percent,
-            "history": self.cpu_history,
-            "smoothed_history": smoothed_cpu.tolist(),
-            "anomalies": anomalies,
-            "rate_of_change": rate_of_change,
-            "statistics": statistics,
-            "trend": float(recent_trend),
-            "is_anomaly": anomalies[-1] if anomalies else False
-        }
+        # Push into the ring buffer and read the running statistics
+        transformed = self._transform_series("cpu", cpu_percent, include_history)
         
         # Add the original metrics
         transformed.update(raw_metrics)
         
         return transformed
     
-    def transform_memory_metrics(self, raw_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_memory_metrics(
+        self,
+        raw_metrics: Dict[str, Any],
+        include_history: bool = False
+    ) -> Dict[str, Any]:
         """Transform memory metrics - FIELD MAPPING FIXED!"""
         # Handle the nested structure
         if 'data' in raw_metrics and isinstance(raw_metrics['data'], dict):
@@ -221,40 +210,19 @@ class MetricTransformer:
         
         logger.debug(f"Extracted memory percent: {memory_percent} from metrics: {raw_metrics}")
         
-        # Add to history
-        self._add_to_history("memory", memory_percent)
-        
-        # Apply transformations
-        smoothed_memory = self._smooth_data(self.memory_history)
-        anomalies = self._detect_anomalies(self.memory_history)
-        rate_of_change = self._calculate_rate_of_change(self.memory_history)
-        statistics = self._calculate_statistics(self.memory_history)
-        
-        # Calculate trend
-        if len(self.memory_history) >= 10:
-            recent_trend = np.polyfit(range(len(self.memory_history[-10:])), self.memory_history[-10:], 1)[0]
-        else:
-            recent_trend = 0.0
-        
-        # Prepare transformed metrics
-        transformed = {
-            "current": memory_percent,
-            "smoothed": float(smoothed_memory[-1]) if len(smoothed_memory) > 0 else memory_percent,
-            "history": self.memory_history,
-            "smoothed_history": smoothed_memory.tolist(),
-            "anomalies": anomalies,
-            "rate_of_change": rate_of_change,
-            "statistics": statistics,
-            "trend": float(recent_trend),
-            "is_anomaly": anomalies[-1] if anomalies else False
-        }
+        # Push into the ring buffer and read the running statistics
+        transformed = self._transform_series("memory", memory_percent, include_history)
         
         # Add the original metrics
         transformed.update(raw_metrics)
         
         return transformed
     
-    def transform_disk_metrics(self, raw_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_disk_metrics(
+        self,
+        raw_metrics: Dict[str, Any],
+        include_history: bool = False
+    ) -> Dict[str, Any]:
         """Transform disk metrics - HANDLING PARTITIONS PROPERLY!"""
         # Handle various structures
         if 'data' in raw_metrics and isinstance(raw_metrics['data'], dict):
@@ -276,40 +244,19 @@ class MetricTransformer:
         
         logger.debug(f"Extracted disk percent: {disk_percent} from metrics: {raw_metrics}")
         
-        # Add to history
-        self._add_to_history("disk", disk_percent)
-        
-        # Apply transformations
-        smoothed_disk = self._smooth_data(self.disk_history)
-        anomalies = self._detect_anomalies(self.disk_history)
-        rate_of_change = self._calculate_rate_of_change(self.disk_history)
-        statistics = self._calculate_statistics(self.disk_history)
-        
-        # Calculate trend
-        if len(self.disk_history) >= 10:
-            recent_trend = np.polyfit(range(len(self.disk_history[-10:])), self.disk_history[-10:], 1)[0]
-        else:
-            recent_trend = 0.0
-        
-        # Prepare transformed metrics
-        transformed = {
-            "current": disk_percent,
-            "smoothed": float(smoothed_disk[-1]) if len(smoothed_disk) > 0 else disk_percent,
-            "history": self.disk_history,
-            "smoothed_history": smoothed_disk.tolist(),
-            "anomalies": anomalies,
-            "rate_of_change": rate_of_change,
-            "statistics": statistics,
-            "trend": float(recent_trend),
-            "is_anomaly": anomalies[-1] if anomalies else False
-        }
+        # Push into the ring buffer and read the running statistics
+        transformed = self._transform_series("disk", disk_percent, include_history)
         
         # Add the original metrics
         transformed.update(raw_metrics)
         
         return transformed
     
-    def transform_network_metrics(self, raw_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_network_metrics(
+        self,
+        raw_metrics: Dict[str, Any],
+        include_history: bool = False
+    ) -> Dict[str, Any]:
         """Transform network metrics - PROPER FIELD NAMES!"""
         # Handle the nested structure and field name variations
         if 'data' in raw_metrics and isinstance(raw_metrics['data'], dict):
@@ -326,57 +273,43 @@ class MetricTransformer:
         
         logger.debug(f"Extracted network bandwidth: {network_bandwidth} from metrics: {raw_metrics}")
         
-        # Add to history
-        self._add_to_history("network", network_bandwidth)
+        # Push into the ring buffer and read the running statistics
+        transformed = self._transform_series("network", network_bandwidth, include_history)
         
-        # Apply transformations
-        smoothed_network = self._smooth_data(self.network_history)
-        anomalies = self._detect_anomalies(self.network_history)
-        rate_of_change = self._calculate_rate_of_change(self.network_history)
-        statistics = self._calculate_statistics(self.network_history)
-        
-        # Calculate trend
-        if len(self.network_history) >= 10:
-            recent_trend = np.polyfit(range(len(self.network_history[-10:])), self.network_history[-10:], 1)[0]
-        else:
-            recent_trend = 0.0
-        
-        # Prepare transformed metrics
-        transformed = {
-            "current": network_bandwidth,
-            "smoothed": float(smoothed_network[-1]) if len(smoothed_network) > 0 else network_bandwidth,
-            "history": self.network_history,
-            "smoothed_history": smoothed_network.tolist(),
-            "anomalies": anomalies,
-            "rate_of_change": rate_of_change,
-            "statistics": statistics,
-            "trend": float(recent_trend),
-            "is_anomaly": anomalies[-1] if anomalies else False,
-            # Set a minimum threshold to avoid confusing drops to zero
-            "display_value": max(0.25, network_bandwidth)  # Minimum 0.25 MB/s for display
-        }
+        # Set a minimum threshold to avoid confusing drops to zero
+        transformed["display_value"] = max(0.25, network_bandwidth)  # Minimum 0.25 MB/s for display
         
         # Add the original metrics
         transformed.update(raw_metrics)
         
         return transformed
     
-    def transform_system_metrics(self, raw_metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Transform all system metrics"""
+    def transform_system_metrics(
+        self,
+        raw_metrics: Dict[str, Any],
+        include_history: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Transform all system metrics
+
+        Per-sample cost is constant; pass include_history=True to also get the
+        full-history series and percentiles for every metric type.
+        """
         transformed = {}
+        self.timestamps.append(time.time())
         
         # Transform each metric type
         if 'cpu' in raw_metrics:
-            transformed['cpu'] = self.transform_cpu_metrics(raw_metrics['cpu'])
+            transformed['cpu'] = self.transform_cpu_metrics(raw_metrics['cpu'], include_history)
             
         if 'memory' in raw_metrics:
-            transformed['memory'] = self.transform_memory_metrics(raw_metrics['memory'])
+            transformed['memory'] = self.transform_memory_metrics(raw_metrics['memory'], include_history)
             
         if 'disk' in raw_metrics:
-            transformed['disk'] = self.transform_disk_metrics(raw_metrics['disk'])
+            transformed['disk'] = self.transform_disk_metrics(raw_metrics['disk'], include_history)
             
         if 'network' in raw_metrics:
-            transformed['network'] = self.transform_network_metrics(raw_metrics['network'])
+            transformed['network'] = self.transform_network_metrics(raw_metrics['network'], include_history)
         
         # Add system-wide analysis
         transformed['system_analysis'] = self._analyze_system_state(transformed)
@@ -453,5 +386,7 @@ _metric_transformers = {}
 def get_metric_transformer(name: str = "default", **kwargs) -> MetricTransformer:
     """Get or create a metric transformer by name"""
     if name not in _metric_transformers:
+        if 'baseline_path' not in kwargs and settings.SEASONAL_BASELINE_DIR:
+            kwargs['baseline_path'] = os.path.join(settings.SEASONAL_BASELINE_DIR, f"{name}.npz")
         _metric_transformers[name] = MetricTransformer(name=name, **kwargs)
     return _metric_transformers[name]
\ No newline at end of file
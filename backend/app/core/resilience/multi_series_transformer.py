@@ -0,0 +1,298 @@
+import numpy as np
+import logging
+import warnings
+from typing import Dict, List, Any, Optional, Tuple
+import time
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_FIELDS = ('current', 'smoothed', 'ewma', 'rate_of_change', 'mean', 'std_dev', 'z_score', 'trend')
+
+
+def _section(metrics: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Metric sections arrive either bare or wrapped as {'type': ..., 'data': {...}}"""
+    section = metrics.get(key) or {}
+    if isinstance(section.get('data'), dict):
+        return section['data']
+    return section
+
+
+def extract_series(metrics: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Flatten a system metrics snapshot into named series.
+
+    Returns (gauges, counters): gauges are used as-is, counters are cumulative
+    totals (per-NIC bytes, per-disk bytes) that the transformer turns into rates.
+    """
+    gauges: Dict[str, float] = {}
+    counters: Dict[str, float] = {}
+
+    cpu = _section(metrics, 'cpu')
+    usage = cpu.get('usage_percent', cpu.get('percent', metrics.get('cpu_usage')))
+    if usage is not None:
+        gauges['cpu.total'] = usage
+    for core, value in enumerate(cpu.get('cores') or cpu.get('per_core') or []):
+        gauges[f'cpu.core{core}'] = value
+
+    memory = _section(metrics, 'memory')
+    if memory.get('percent', metrics.get('memory_usage')) is not None:
+        gauges['memory.percent'] = memory.get('percent', metrics.get('memory_usage'))
+
+    disk = _section(metrics, 'disk')
+    if disk.get('percent', metrics.get('disk_usage')) is not None:
+        gauges['disk.percent'] = disk.get('percent', metrics.get('disk_usage'))
+    for key in ('read_rate', 'write_rate'):
+        if disk.get(key) is not None:
+            gauges[f'disk.{key}'] = disk[key]
+    for name, io in (disk.get('io_counters') or {}).items():
+        counters[f'disk.{name}.read_rate'] = io.get('read_bytes', 0)
+        counters[f'disk.{name}.write_rate'] = io.get('write_bytes', 0)
+
+    network = _section(metrics, 'network')
+    for key in ('sent_rate', 'recv_rate'):
+        if network.get(key) is not None:
+            gauges[f'net.{key}'] = network[key]
+    for name, io in (network.get('interface_stats') or {}).items():
+        counters[f'net.{name}.sent_rate'] = io.get('bytes_sent', 0)
+        counters[f'net.{name}.recv_rate'] = io.get('bytes_recv', 0)
+
+    return gauges, counters
+
+
+class MultiSeriesTransformer:
+    """
+    The Stick's Matrix-Shaped Metric Transformer
+
+    Holds every tracked series (totals, per-core CPU, per-NIC and per-disk
+    rates) as columns of one (history_size, n_series) ring-buffered array.
+    Each tick updates running mean/variance for all columns at once and
+    computes smoothing, EWMA, rate of change, z-scores and trend slopes as
+    whole-row NumPy operations, so the per-tick cost does not depend on how
+    many series are tracked beyond NumPy's own throughput.
+
+    Series that appear later (hot-plugged NICs, new disks) get a new column;
+    ticks where a series is missing record NaN and are ignored by its statistics.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        history_size: int = 60,
+        smoothing_window: int = 5,
+        trend_window: int = 10,
+        anomaly_threshold: float = 2.0,
+        ewma_alpha: Optional[float] = None
+    ):
+        self.name = name
+        self.history_size = history_size
+        self.smoothing_window = max(1, min(smoothing_window, history_size))
+        self.trend_window = max(2, min(trend_window, history_size))
+        self.anomaly_threshold = anomaly_threshold
+        self.ewma_alpha = ewma_alpha if ewma_alpha is not None else 2.0 / (self.smoothing_window + 1)
+
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._counter_columns: List[int] = []
+
+        self._history = np.empty((history_size, 0))
+        self._head = 0
+        self._rows = 0
+        self._ticks = 0
+
+        self._count = np.zeros(0)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._ewma = np.full(0, np.nan)
+        self._last_counters = np.full(0, np.nan)
+        self._last_time: Optional[float] = None
+
+        x = np.arange(self.trend_window, dtype=np.float64)
+        self._slope_weights = (x - x.mean()) / np.sum((x - x.mean()) ** 2)
+
+    # Column management
+
+    def _ensure_columns(self, names: List[str], counter: bool = False) -> None:
+        new = [name for name in names if name not in self._index]
+        if not new:
+            return
+        start = len(self.names)
+        for offset, name in enumerate(new):
+            self._index[name] = start + offset
+            self.names.append(name)
+            if counter:
+                self._counter_columns.append(start + offset)
+
+        extra = len(new)
+        self._history = np.concatenate([self._history, np.full((self.history_size, extra), np.nan)], axis=1)
+        self._count = np.concatenate([self._count, np.zeros(extra)])
+        self._mean = np.concatenate([self._mean, np.zeros(extra)])
+        self._m2 = np.concatenate([self._m2, np.zeros(extra)])
+        self._ewma = np.concatenate([self._ewma, np.full(extra, np.nan)])
+        self._last_counters = np.concatenate([self._last_counters, np.full(extra, np.nan)])
+
+    def _row(self, values: Dict[str, float]) -> np.ndarray:
+        row = np.full(len(self.names), np.nan)
+        if values:
+            columns = np.fromiter((self._index[name] for name in values), dtype=np.intp, count=len(values))
+            row[columns] = np.fromiter(values.values(), dtype=np.float64, count=len(values))
+        return row
+
+    def _ordered_rows(self, n: int) -> np.ndarray:
+        """Newest `n` history rows in chronological order"""
+        n = min(n, self._rows)
+        rows = (self._head - n + np.arange(n)) % self.history_size
+        return self._history[rows]
+
+    # Tick
+
+    def push(self, gauges: Dict[str, float], counters: Optional[Dict[str, float]] = None, timestamp: Optional[float] = None) -> None:
+        """Add one tick of gauge values and cumulative counters"""
+        now = time.time() if timestamp is None else timestamp
+        counters = counters or {}
+        self._ensure_columns(list(gauges))
+        self._ensure_columns(list(counters), counter=True)
+
+        row = self._row(gauges)
+
+        # Cumulative counters -> per-second rates, all columns in one subtraction
+        if self._counter_columns:
+            cols = np.asarray(self._counter_columns, dtype=np.intp)
+            current = self._row(counters)[cols]
+            if self._last_time is not None and now > self._last_time:
+                rates = (current - self._last_counters[cols]) / (now - self._last_time)
+                # Counter wrapped or device reset
+                rates[rates < 0] = np.nan
+                row[cols] = rates
+            self._last_counters[cols] = current
+        self._last_time = now
+
+        evicted = self._history[self._head].copy() if self._rows == self.history_size else None
+        self._history[self._head] = row
+        self._head = (self._head + 1) % self.history_size
+        self._rows = min(self._rows + 1, self.history_size)
+        self._ticks += 1
+
+        # All-NaN columns (series absent for the whole window) are expected
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            if evicted is not None:
+                leaving = ~np.isnan(evicted)
+                old_mean = self._mean.copy()
+                remaining = self._count - leaving
+                new_mean = np.where(
+                    leaving & (remaining > 0),
+                    (old_mean * self._count - np.nan_to_num(evicted)) / remaining,
+                    np.where(leaving, 0.0, old_mean)
+                )
+                self._m2 = np.where(leaving, self._m2 - (evicted - old_mean) * (evicted - new_mean), self._m2)
+                self._mean = new_mean
+                self._count = remaining
+
+            arriving = ~np.isnan(row)
+            self._count = self._count + arriving
+            delta = np.where(arriving, row - self._mean, 0.0)
+            self._mean = self._mean + np.where(arriving, delta / np.maximum(self._count, 1), 0.0)
+            self._m2 = self._m2 + np.where(arriving, delta * (row - self._mean), 0.0)
+            self._m2 = np.maximum(self._m2, 0.0)
+
+            # Once per turn of the ring, re-derive moments to shed float drift
+            if self._rows == self.history_size and self._ticks % self.history_size == 0:
+                self._count = np.sum(~np.isnan(self._history), axis=0).astype(np.float64)
+                self._mean = np.where(self._count > 0, np.nanmean(self._history, axis=0), 0.0)
+                self._m2 = np.where(self._count > 0, np.nanvar(self._history, axis=0) * self._count, 0.0)
+
+            self._ewma = np.where(
+                np.isnan(self._ewma), row,
+                np.where(arriving, self._ewma + self.ewma_alpha * (row - self._ewma), self._ewma)
+            )
+
+    def update(self, metrics: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        gauges, counters = extract_series(metrics)
+        self.push(gauges, counters, timestamp)
+
+    # Vectorised views
+
+    def analyze(self) -> Dict[str, np.ndarray]:
+        """All per-series outputs for the latest tick as aligned arrays"""
+        n = len(self.names)
+        if self._rows == 0:
+            arrays = {key: np.zeros(n) for key in ANALYSIS_FIELDS}
+            arrays['is_anomaly'] = np.zeros(n, dtype=bool)
+            return arrays
+
+        recent = self._ordered_rows(max(self.smoothing_window, self.trend_window, 2))
+        current = recent[-1]
+
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            std = np.sqrt(np.where(self._count > 0, self._m2 / np.maximum(self._count, 1), 0.0))
+            z_score = np.where(std > 0, (current - self._mean) / std, 0.0)
+            if len(recent) >= self.smoothing_window:
+                smoothed = np.nanmean(recent[-self.smoothing_window:], axis=0)
+            else:
+                smoothed = current
+            rate_of_change = current - recent[-2] if len(recent) >= 2 else np.zeros(n)
+            if len(recent) >= self.trend_window:
+                trend = self._slope_weights @ recent[-self.trend_window:]
+            else:
+                trend = np.zeros(n)
+
+        is_anomaly = (np.abs(np.nan_to_num(z_score)) > self.anomaly_threshold) & (self._count >= 4)
+        return {
+            'current': current,
+            'smoothed': smoothed,
+            'ewma': self._ewma.copy(),
+            'rate_of_change': rate_of_change,
+            'mean': self._mean.copy(),
+            'std_dev': std,
+            'z_score': z_score,
+            'trend': trend,
+            'is_anomaly': is_anomaly
+        }
+
+    def transform(self, metrics: Dict[str, Any], timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Push a snapshot and return per-series results keyed by series name"""
+        self.update(metrics, timestamp)
+        arrays = self.analyze()
+
+        # One bulk conversion per field instead of per-element float() calls
+        columns = {
+            key: np.where(np.isnan(arrays[key]), None, arrays[key]).tolist()
+            for key in ANALYSIS_FIELDS
+        }
+        columns['is_anomaly'] = arrays['is_anomaly'].tolist()
+        fields = list(columns)
+        series = {
+            name: dict(zip(fields, values))
+            for name, values in zip(self.names, zip(*columns.values()))
+        }
+
+        return {
+            'series': series,
+            'anomalies': [name for column, name in enumerate(self.names) if arrays['is_anomaly'][column]],
+            'timestamp': self._last_time
+        }
+
+    def history(self, name: Optional[str] = None) -> np.ndarray:
+        """Chronological history of one series, or the whole (rows, n_series) matrix"""
+        rows = self._ordered_rows(self._rows)
+        return rows[:, self._index[name]] if name is not None else rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'series': len(self.names),
+            'rows': self._rows,
+            'history_size': self.history_size,
+            'memory_bytes': int(self._history.nbytes)
+        }
+
+
+# Global registry of multi-series transformers
+_multi_series_transformers = {}
+
+def get_multi_series_transformer(name: str = "default", **kwargs) -> MultiSeriesTransformer:
+    """Get or create a multi-series transformer by name"""
+    if name not in _multi_series_transformers:
+        _multi_series_transformers[name] = MultiSeriesTransformer(name=name, **kwargs)
+    return _multi_series_transformers[name]
@@ -0,0 +1,227 @@
+import numpy as np
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Union
+import time
+
+logger = logging.getLogger(__name__)
+
+class TDigest:
+    """
+    Sir Hawkington's Pocket Percentile Ledger
+
+    A merging t-digest: values are buffered and periodically folded into a
+    bounded set of weighted centroids, small near the tails and large in the
+    middle, so p99 stays accurate while memory stays O(compression) however
+    many values are added. Digests merge by pooling centroids, which makes
+    them safe to combine across time buckets and across hosts.
+    """
+
+    def __init__(self, compression: float = 200.0, buffer_size: Optional[int] = None):
+        self.compression = float(compression)
+        self.buffer_size = buffer_size or int(5 * compression)
+
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._buffer_values: List[float] = []
+        self._buffer_weights: List[float] = []
+
+        self.count = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._means)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        value = float(value)
+        if np.isnan(value):
+            return
+        self._buffer_values.append(value)
+        self._buffer_weights.append(weight)
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer_values) >= self.buffer_size:
+            self._flush()
+
+    def update(self, values: Union[Sequence[float], np.ndarray]) -> None:
+        """Add many values at once"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self._buffer_values.extend(values.tolist())
+        self._buffer_weights.extend([1.0] * len(values))
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if len(self._buffer_values) >= self.buffer_size:
+            self._flush()
+
+    def _scale(self, q: np.ndarray) -> np.ndarray:
+        """k1 scale function: clusters are narrow where it is steep (near q=0 and q=1)"""
+        return self.compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+    def _flush(self) -> None:
+        if not self._buffer_values:
+            return
+        means = np.concatenate([self._means, np.asarray(self._buffer_values)])
+        weights = np.concatenate([self._weights, np.asarray(self._buffer_weights)])
+        self._buffer_values = []
+        self._buffer_weights = []
+
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        # Each item joins the cluster of the unit k-interval its left edge falls in
+        k = np.floor(self._scale(q_left) - self._scale(np.zeros(1))[0])
+        starts = np.flatnonzero(np.concatenate([[True], k[1:] != k[:-1]]))
+
+        merged_weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / merged_weights
+        self._weights = merged_weights
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one (in place) and return self"""
+        other._flush()
+        if other.count == 0:
+            return self
+        self._buffer_values.extend(other._means.tolist())
+        self._buffer_weights.extend(other._weights.tolist())
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._flush()
+        return self
+
+    def quantile(self, q: Union[float, Sequence[float]]) -> Union[float, np.ndarray]:
+        """Estimate one or more quantiles (q in [0, 1])"""
+        self._flush()
+        scalar = np.isscalar(q)
+        qs = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            result = np.full(len(qs), np.nan)
+        elif len(self._means) == 1:
+            result = np.full(len(qs), self._means[0])
+        else:
+            centers = np.cumsum(self._weights) - self._weights / 2
+            positions = np.concatenate([[0.0], centers, [self.count]])
+            values = np.concatenate([[self.min], self._means, [self.max]])
+            result = np.interp(np.clip(qs, 0, 1) * self.count, positions, values)
+        return float(result[0]) if scalar else result
+
+    def percentiles(self, percentiles: Sequence[float]) -> Dict[str, float]:
+        values = self.quantile(np.asarray(percentiles, dtype=np.float64) / 100.0)
+        return {str(p): (float(v) if not np.isnan(v) else 0.0) for p, v in zip(percentiles, values)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisable form, e.g. for shipping to another host and merging there"""
+        self._flush()
+        return {
+            'compression': self.compression,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'means': self._means.tolist(),
+            'weights': self._weights.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(compression=data.get('compression', 200.0))
+        digest._means = np.asarray(data.get('means', []), dtype=np.float64)
+        digest._weights = np.asarray(data.get('weights', []), dtype=np.float64)
+        digest.count = float(data.get('count', digest._weights.sum()))
+        if digest.count:
+            digest.min = float(data['min'])
+            digest.max = float(data['max'])
+        return digest
+
+
+class QuantileRollup:
+    """
+    The Meth Snail's Time-Bucketed Percentile Stash
+
+    One t-digest per time bucket for a single series. Percentiles over any
+    range of whole buckets are answered by merging that range's digests, so
+    p50/p95/p99 over hours or days cost bounded memory.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 3600,
+        retention_buckets: int = 168,
+        compression: float = 200.0
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.compression = compression
+        # bucket start (epoch seconds) -> digest, oldest first
+        self.buckets: "OrderedDict[int, TDigest]" = OrderedDict()
+
+    def _bucket_start(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    def _bucket(self, start: int) -> TDigest:
+        digest = self.buckets.get(start)
+        if digest is None:
+            digest = TDigest(self.compression)
+            late = bool(self.buckets) and start < next(reversed(self.buckets))
+            self.buckets[start] = digest
+            if late:
+                # Late bucket for an older window; keep chronological order
+                self.buckets = OrderedDict(sorted(self.buckets.items()))
+            while len(self.buckets) > self.retention_buckets:
+                self.buckets.popitem(last=False)
+        return digest
+
+    def add(self, value: float, timestamp: Optional[float] = None) -> None:
+        start = self._bucket_start(time.time() if timestamp is None else timestamp)
+        self._bucket(start).add(value)
+
+    def sketch(self, start: Optional[float] = None, end: Optional[float] = None) -> TDigest:
+        """Merged digest of every bucket overlapping [start, end)"""
+        merged = TDigest(self.compression)
+        for bucket_start, digest in self.buckets.items():
+            if start is not None and bucket_start + self.bucket_seconds <= start:
+                continue
+            if end is not None and bucket_start >= end:
+                continue
+            merged.merge(digest)
+        return merged
+
+    def percentiles(
+        self,
+        percentiles: Sequence[float] = (50, 95, 99),
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[str, float]:
+        return self.sketch(start, end).percentiles(percentiles)
+
+    def merge(self, other: "QuantileRollup") -> "QuantileRollup":
+        """Merge another rollup bucket-by-bucket (e.g. the same series from another host)"""
+        if other.bucket_seconds != self.bucket_seconds:
+            raise ValueError("Cannot merge rollups with different bucket sizes")
+        for bucket_start, digest in other.buckets.items():
+            self._bucket(bucket_start).merge(digest)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'bucket_seconds': self.bucket_seconds,
+            'buckets': {str(start): digest.to_dict() for start, digest in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> "QuantileRollup":
+        rollup = cls(bucket_seconds=data['bucket_seconds'], **kwargs)
+        for start, digest in sorted(data.get('buckets', {}).items(), key=lambda item: int(item[0])):
+            rollup.buckets[int(start)] = TDigest.from_dict(digest)
+        return rollup
@@ -0,0 +1,206 @@
+import numpy as np
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+import time
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 7 * 24
+
+# Floor on a slot's std as a fraction of its mean (plus an absolute epsilon),
+# so perfectly flat series such as disk % don't turn a 0.1 wiggle into an
+# infinite z-score
+RELATIVE_STD_FLOOR = 1e-2
+MIN_STD = 1e-6
+
+
+def hour_of_week(timestamp: float) -> int:
+    """Local-time slot 0..167, Monday 00:00 being slot 0"""
+    moment = datetime.fromtimestamp(timestamp)
+    return moment.weekday() * 24 + moment.hour
+
+
+class SeasonalBaseline:
+    """
+    Sir Hawkington's Weekly Rhythm Almanac
+
+    Hour-of-week mean and variance per series, held in compact
+    (168, n_series) arrays and updated incrementally. Anomaly scores compare
+    a value with what is normal for that hour of the week, so the nightly
+    backup is expected at 02:00 on a Sunday while a slow drift still moves
+    further from every slot's baseline.
+
+    Each slot is a Welford accumulator whose effective count is capped at
+    `max_weight`, after which it behaves as an exponentially weighted mean so
+    baselines can follow genuine long-term change.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        min_samples: int = 30,
+        max_weight: float = 3600 * 4,
+        save_interval: int = 300
+    ):
+        self.path = path
+        self.min_samples = min_samples
+        self.max_weight = max_weight
+        self.save_interval = save_interval
+
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._count = np.zeros((HOURS_PER_WEEK, 0))
+        self._mean = np.zeros((HOURS_PER_WEEK, 0))
+        self._m2 = np.zeros((HOURS_PER_WEEK, 0))
+        self._updates_since_save = 0
+        # Autosaves are written by a background thread from a copy of the arrays
+        self._save_lock = threading.Lock()
+        self._saver: Optional[threading.Thread] = None
+        self._generation = 0
+        self._written_generation = 0
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def _column(self, name: str) -> int:
+        column = self._index.get(name)
+        if column is None:
+            column = len(self.names)
+            self._index[name] = column
+            self.names.append(name)
+            empty = np.zeros((HOURS_PER_WEEK, 1))
+            self._count = np.hstack([self._count, empty])
+            self._mean = np.hstack([self._mean, empty])
+            self._m2 = np.hstack([self._m2, empty])
+        return column
+
+    def observe(self, name: str, value: float, timestamp: Optional[float] = None) -> None:
+        """Fold one sample into its hour-of-week slot"""
+        value = float(value)
+        if np.isnan(value):
+            return
+        slot = hour_of_week(time.time() if timestamp is None else timestamp)
+        column = self._column(name)
+
+        weight = min(self._count[slot, column] + 1, self.max_weight)
+        delta = value - self._mean[slot, column]
+        self._mean[slot, column] += delta / weight
+        # Scale old spread so the capped count keeps a consistent variance estimate
+        self._m2[slot, column] = self._m2[slot, column] * (weight - 1) / max(self._count[slot, column], 1) \
+            + delta * (value - self._mean[slot, column])
+        self._count[slot, column] = weight
+
+        self._updates_since_save += 1
+        if self.path and self._updates_since_save >= self.save_interval:
+            self._autosave()
+
+    def baseline(self, name: str, timestamp: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Mean, std and sample weight for the series' current slot, or None if unknown"""
+        column = self._index.get(name)
+        if column is None:
+            return None
+        slot = hour_of_week(time.time() if timestamp is None else timestamp)
+        count = self._count[slot, column]
+        if count == 0:
+            return None
+        variance = self._m2[slot, column] / count
+        return {
+            'mean': float(self._mean[slot, column]),
+            'std_dev': float(np.sqrt(max(variance, 0.0))),
+            'samples': float(count),
+            'hour_of_week': slot
+        }
+
+    def score(self, name: str, value: float, timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Z-score of `value` against its hour-of-week baseline.
+
+        None until the slot has `min_samples` observations, so callers can fall
+        back to a short-window score while the baseline warms up.
+        """
+        baseline = self.baseline(name, timestamp)
+        if baseline is None or baseline['samples'] < self.min_samples:
+            return None
+        std = max(baseline['std_dev'], abs(baseline['mean']) * RELATIVE_STD_FLOOR, MIN_STD)
+        return (float(value) - baseline['mean']) / std
+
+    # Persistence
+
+    def _snapshot(self) -> Dict[str, Any]:
+        self._generation += 1
+        self._updates_since_save = 0
+        return {
+            'generation': self._generation,
+            'names': np.asarray(self.names, dtype=str),
+            'count': self._count.copy(),
+            'mean': self._mean.copy(),
+            'm2': self._m2.copy()
+        }
+
+    def _autosave(self) -> None:
+        """Write in the background so the per-sample path never waits on disk"""
+        if self._saver is not None and self._saver.is_alive():
+            return  # Still writing the previous copy; try again on a later sample
+        self._saver = threading.Thread(
+            target=self._write_logged, args=(self._snapshot(),), name='seasonal-baseline-save', daemon=True
+        )
+        self._saver.start()
+
+    def _write_logged(self, state: Dict[str, Any]) -> None:
+        try:
+            self._write(state)
+        except Exception as e:
+            logger.error(f"Failed to save seasonal baselines to {self.path}: {str(e)}")
+
+    def save(self) -> None:
+        """Write the arrays now, e.g. on shutdown"""
+        if not self.path:
+            return
+        self._write(self._snapshot())
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        """Write atomically so a crash mid-write never corrupts the file"""
+        with self._save_lock:
+            # A slow background write must not replace a newer explicit save
+            if state['generation'] < self._written_generation:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+            try:
+                with os.fdopen(fd, 'wb') as handle:
+                    np.savez(handle, names=state['names'], count=state['count'], mean=state['mean'], m2=state['m2'])
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            self._written_generation = state['generation']
+
+    def load(self) -> None:
+        try:
+            with np.load(self.path) as data:
+                names = [str(name) for name in data['names']]
+                if data['count'].shape != (HOURS_PER_WEEK, len(names)):
+                    raise ValueError(f"unexpected shape {data['count'].shape}")
+                self.names = names
+                self._index = {name: i for i, name in enumerate(names)}
+                self._count = data['count'].astype(np.float64)
+                self._mean = data['mean'].astype(np.float64)
+                self._m2 = data['m2'].astype(np.float64)
+            logger.info(f"Loaded seasonal baselines for {len(self.names)} series from {self.path}")
+        except Exception as e:
+            # A bad file only costs warm-up time; never block startup on it
+            logger.warning(f"Ignoring unreadable seasonal baseline file {self.path}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'series': len(self.names),
+            'warm_slots': int(np.sum(self._count >= self.min_samples)),
+            'total_slots': int(self._count.size),
+            'path': self.path
+        }
@@ -0,0 +1,275 @@
+import numpy as np
+import logging
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class RingBuffer:
+    """
+    Fixed-size NumPy ring buffer
+
+    Appends overwrite the oldest value in place, so pushing a sample never
+    allocates or shifts the rest of the history.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # next write position
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def is_full(self) -> bool:
+        return self._count == self.capacity
+
+    def append(self, value) -> Optional[Any]:
+        """Append a value, returning the value it evicted (if the buffer was full)"""
+        evicted = self._data[self._head].item() if self.is_full else None
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        return evicted
+
+    def at(self, offset: int) -> Any:
+        """Value `offset` steps back from the newest (0 = newest)"""
+        if not 0 <= offset < self._count:
+            raise IndexError("RingBuffer offset out of range")
+        return self._data[(self._head - 1 - offset) % self.capacity].item()
+
+    def last(self, n: int) -> np.ndarray:
+        """The newest `n` values in chronological order (a copy)"""
+        n = min(n, self._count)
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n].copy()
+        return np.concatenate((self._data[start:], self._data[:self._head]))
+
+    def values(self) -> np.ndarray:
+        """Whole history in chronological order (a copy)"""
+        return self.last(self._count)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+
+
+class StreamingSeries:
+    """
+    The Meth Snail's Constant-Time Series Tracker
+
+    Keeps a bounded window of samples and updates its statistics on every
+    push in O(1): Welford mean/variance with removal of evicted samples,
+    monotonic-deque min/max, moving average, EWMA, and a least-squares slope
+    over the last `trend_window` samples. `full_analysis` recomputes the
+    per-point series over the whole window when a caller actually needs it.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 60,
+        smoothing_window: int = 5,
+        trend_window: int = 10,
+        ewma_alpha: Optional[float] = None
+    ):
+        self.capacity = capacity
+        self.smoothing_window = max(1, smoothing_window)
+        self.trend_window = max(2, trend_window)
+        self.ewma_alpha = ewma_alpha if ewma_alpha is not None else 2.0 / (self.smoothing_window + 1)
+
+        self.buffer = RingBuffer(capacity)
+        self._pushed = 0
+
+        # Welford state over the window
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Moving-average and EWMA state
+        self._window_sum = 0.0
+        self._ewma: Optional[float] = None
+
+        # (sample index, value) with monotonic values for window min/max
+        self._min_q: deque = deque()
+        self._max_q: deque = deque()
+
+        # Least-squares slope weights for x = 0..trend_window-1
+        x = np.arange(self.trend_window, dtype=np.float64)
+        self._slope_weights = (x - x.mean()) / np.sum((x - x.mean()) ** 2)
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        index = self._pushed
+        self._pushed += 1
+
+        # Sample leaving the moving-average window (must be read before the ring overwrites it)
+        leaving_smoothing = (
+            self.buffer.at(self.smoothing_window - 1)
+            if len(self.buffer) >= self.smoothing_window else None
+        )
+
+        evicted = self.buffer.append(value)
+        n = len(self.buffer)
+
+        if evicted is not None:
+            # Remove the evicted sample from the running moments
+            if n > 1:
+                old_mean = self._mean
+                self._mean = (old_mean * n - evicted) / (n - 1)
+                self._m2 -= (evicted - old_mean) * (evicted - self._mean)
+            else:
+                self._mean, self._m2 = 0.0, 0.0
+
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+        if self._m2 < 0.0:
+            self._m2 = 0.0
+
+        # Every full turn of the ring, re-derive the moments to shed float drift
+        if self.buffer.is_full and self._pushed % self.capacity == 0:
+            window = self.buffer.values()
+            self._mean = float(window.mean())
+            self._m2 = float(((window - self._mean) ** 2).sum())
+
+        self._window_sum += value
+        if leaving_smoothing is not None:
+            self._window_sum -= leaving_smoothing
+
+        self._ewma = value if self._ewma is None else self._ewma + self.ewma_alpha * (value - self._ewma)
+
+        oldest_index = index - n + 1
+        while self._min_q and self._min_q[-1][1] >= value:
+            self._min_q.pop()
+        self._min_q.append((index, value))
+        while self._min_q[0][0] < oldest_index:
+            self._min_q.popleft()
+        while self._max_q and self._max_q[-1][1] <= value:
+            self._max_q.pop()
+        self._max_q.append((index, value))
+        while self._max_q[0][0] < oldest_index:
+            self._max_q.popleft()
+
+    # Incremental statistics
+
+    @property
+    def current(self) -> float:
+        return self.buffer.at(0) if len(self.buffer) else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self._mean if len(self.buffer) else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance over the window (matches np.var)"""
+        n = len(self.buffer)
+        return self._m2 / n if n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def min(self) -> float:
+        return self._min_q[0][1] if self._min_q else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max_q[0][1] if self._max_q else 0.0
+
+    @property
+    def ewma(self) -> float:
+        return self._ewma if self._ewma is not None else 0.0
+
+    @property
+    def smoothed(self) -> float:
+        """Moving average of the last `smoothing_window` samples"""
+        n = len(self.buffer)
+        if n < self.smoothing_window:
+            return self.current
+        return self._window_sum / self.smoothing_window
+
+    @property
+    def rate_of_change(self) -> float:
+        if len(self.buffer) < 2:
+            return 0.0
+        return self.buffer.at(0) - self.buffer.at(1)
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope over the last `trend_window` samples (0 until that many exist)"""
+        if len(self.buffer) < self.trend_window:
+            return 0.0
+        return float(self._slope_weights @ self.buffer.last(self.trend_window))
+
+    def zscore(self, value: Optional[float] = None) -> float:
+        value = self.current if value is None else value
+        std = self.std
+        return (value - self.mean) / std if std > 0 else 0.0
+
+    def is_anomaly(self, threshold: float, min_samples: int = 4) -> bool:
+        if len(self.buffer) < min_samples:
+            return False
+        return abs(self.zscore()) > threshold
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "mean": float(self.mean),
+            "min": float(self.min),
+            "max": float(self.max),
+            "std_dev": self.std,
+            "ewma": float(self.ewma),
+            "count": len(self.buffer)
+        }
+
+    # Full-window recomputation
+
+    def full_analysis(
+        self,
+        percentiles: List[float],
+        anomaly_threshold: float,
+        min_samples: int = 4
+    ) -> Dict[str, Any]:
+        """
+        Per-point series over the whole window: smoothed history, anomaly flags,
+        rate of change, and percentile statistics. O(capacity), so only run on demand.
+        """
+        data = self.buffer.values()
+        n = len(data)
+
+        if n >= self.smoothing_window and n >= 2:
+            kernel = np.ones(self.smoothing_window) / self.smoothing_window
+            smoothed = np.convolve(data, kernel, mode='valid')
+            smoothed = np.concatenate([np.full(n - len(smoothed), smoothed[0]), smoothed])
+        else:
+            smoothed = data
+
+        std = float(np.std(data)) if n else 0.0
+        if n < min_samples or std == 0:
+            anomalies = [False] * n
+        else:
+            anomalies = (np.abs((data - np.mean(data)) / std) > anomaly_threshold).tolist()
+
+        rate_of_change = np.concatenate([[0.0], np.diff(data)]).tolist() if n >= 2 else [0.0] * n
+
+        statistics = self.summary()
+        statistics["percentiles"] = {
+            str(p): (float(np.percentile(data, p)) if n else 0.0) for p in percentiles
+        }
+
+        return {
+            "history": data.tolist(),
+            "smoothed_history": smoothed.tolist(),
+            "anomalies": anomalies,
+            "rate_of_change_history": rate_of_change,
+            "statistics": statistics
+        }
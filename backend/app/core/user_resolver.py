@@ -0,0 +1,192 @@
+"""
+User Resolver
+
+Shared async lookup of the user behind an access token, used by the HTTP auth
+dependency and WebSocket authentication. Lookups go through AsyncSession only
+and are cached for a short TTL keyed by (subject, token id), so repeated
+requests with the same token don't touch the database at all.
+
+Cached entries hold plain column values; every caller gets its own detached
+User built from them, so mutating the returned user never leaks into the
+cache or into another request. Endpoints that change a user must call
+`invalidate` after committing.
+"""
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from jose import jwt
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Decode and verify a JWT, raising JWTError when it is invalid or expired"""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+class UserResolver:
+    """
+    Sir Hawkington's Guest List
+
+    Bounded LRU of user snapshots with per-entry expiry. Concurrent misses for
+    the same key share a single database query.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1024,
+        session_factory: Optional[Callable] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+        self._clock = clock
+
+        # (subject, jti) -> (expires_at, column snapshot)
+        self._cache: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._keys_by_subject: Dict[str, Set[CacheKey]] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        # Bumped on invalidation so a lookup that raced an update is not cached
+        self._generation: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from app.core.database import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    @staticmethod
+    def _snapshot(user: User) -> Dict[str, Any]:
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+    @staticmethod
+    def _materialize(snapshot: Dict[str, Any]) -> User:
+        user = User(**copy.deepcopy(snapshot))
+        # Detached with an identity, so db.add() on it issues an UPDATE rather than an INSERT
+        make_transient_to_detached(user)
+        return user
+
+    def _store(self, key: CacheKey, snapshot: Dict[str, Any], token_expiry: Optional[float]) -> None:
+        expires_at = self._clock() + self.ttl_seconds
+        if token_expiry is not None:
+            # Never serve a token from cache past its own expiry
+            expires_at = min(expires_at, self._clock() + max(0.0, token_expiry - time.time()))
+
+        self._cache[key] = (expires_at, snapshot)
+        self._cache.move_to_end(key)
+        self._keys_by_subject.setdefault(key[0], set()).add(key)
+        while len(self._cache) > self.max_entries:
+            self._evict(next(iter(self._cache)))
+
+    def _evict(self, key: CacheKey) -> None:
+        self._cache.pop(key, None)
+        keys = self._keys_by_subject.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_subject[key[0]]
+
+    async def _load(self, subject: str) -> Optional[Dict[str, Any]]:
+        async with self._sessions() as db:
+            result = await db.execute(select(User).where(User.username == subject))
+            user = result.scalars().first()
+            return self._snapshot(user) if user is not None else None
+
+    async def resolve(
+        self,
+        subject: str,
+        token_id: Optional[str] = None,
+        token_expiry: Optional[float] = None
+    ) -> Optional[User]:
+        """Return a fresh detached User for the subject, or None if it doesn't exist"""
+        key = (subject, token_id or "")
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._materialize(entry[1])
+            self._evict(key)
+
+        self.misses += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            snapshot = await asyncio.shield(inflight)
+            return self._materialize(snapshot) if snapshot is not None else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation.get(subject, 0)
+        try:
+            snapshot = await self._load(subject)
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark retrieved so a lone failure isn't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(snapshot)
+        if snapshot is None:
+            return None
+        if self._generation.get(subject, 0) == generation:
+            self._store(key, snapshot, token_expiry)
+        return self._materialize(snapshot)
+
+    async def resolve_token(self, token: str) -> Optional[User]:
+        """Decode a token and resolve its user; JWTError propagates to the caller"""
+        payload = decode_access_token(token)
+        subject = payload.get("sub")
+        if not subject:
+            return None
+        return await self.resolve(subject, payload.get("jti"), payload.get("exp"))
+
+    def invalidate(self, subject: str) -> None:
+        """Drop every cached token entry for a user, e.g. after a profile update"""
+        self._generation[subject] = self._generation.get(subject, 0) + 1
+        for key in list(self._keys_by_subject.get(subject, ())):
+            self._evict(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._keys_by_subject.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries
+        }
+
+
+# Shared resolver so HTTP and WebSocket auth hit the same cache
+_user_resolver: Optional[UserResolver] = None
+
+def get_user_resolver() -> UserResolver:
+    """Get the process-wide user resolver configured from settings"""
+    global _user_resolver
+    if _user_resolver is None:
+        _user_resolver = UserResolver(
+            ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+            max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES
+        )
+    return _user_resolver
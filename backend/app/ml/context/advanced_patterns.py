@@ -1,64 +1,84 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
-#from sklearn.ensemble import IsolationForest
-#from sklearn.preprocessing import StandardScaler
-#import tensorflow as tf
 from datetime import datetime, timedelta
 import logging
 
+from app.core.config import settings
+from app.ml.context.forecasting import HoltWinters
+from app.ml.context.streaming_anomaly import StreamingPCADetector
+
 logger = logging.getLogger(__name__)
 
 class AdvancedPatternDetector:
     """Advanced pattern detection using multiple ML techniques"""
     
-    def __init__(self):
-        self.scaler = StandardScaler()
-        self.anomaly_detector = IsolationForest(contamination=0.1)
-        self._build_sequence_model()
-        
-    def _build_sequence_model(self):
-        """Build LSTM model for sequence prediction"""
-        self.sequence_model = tf.keras.Sequential([
-            tf.keras.layers.LSTM(64, input_shape=(None, 10)),
-            tf.keras.layers.Dense(32, activation='relu'),
-            tf.keras.layers.Dense(1, activation='sigmoid')
-        ])
-        self.sequence_model.compile(
-            optimizer='adam',
-            loss='binary_crossentropy',
-            metrics=['accuracy']
-        )
+    def __init__(self, checkpoint_path: Optional[str] = None):
+        # One online model scores CPU, memory, disk and network jointly
+        self.anomaly_detector = StreamingPCADetector(path=checkpoint_path)
+    
+    def observe(self, metrics: Dict[str, float]) -> Dict:
+        """Score one joint sample and learn it"""
+        return self.anomaly_detector.update(metrics)
     
     def detect_anomalies(self, data: np.ndarray) -> List[bool]:
-        """Detect anomalous patterns in data"""
-        scaled_data = self.scaler.fit_transform(data)
-        return self.anomaly_detector.fit_predict(scaled_data) == -1
+        """Detect anomalous patterns in data
+        
+        Rows are new samples in feature order (cpu, memory, disk, network);
+        each is scored and then learned, so never pass the same rows twice.
+        """
+        data = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        features = self.anomaly_detector.features
+        return [
+            self.observe(dict(zip(features, row)))['is_anomaly']
+            for row in data
+        ]
     
     def predict_sequence(self, 
                         sequence: np.ndarray,
-                        horizon: int = 5) -> np.ndarray:
-        """Predict future sequence values"""
-        scaled_seq = self.scaler.fit_transform(sequence)
-        predictions = []
-        
-        for _ in range(horizon):
-            pred = self.sequence_model.predict(
-                scaled_seq[-10:].reshape(1, -1, 10)
-            )
-            predictions.append(pred[0, 0])
-            scaled_seq = np.append(scaled_seq, pred)
-            
-        return self.scaler.inverse_transform(
-            np.array(predictions).reshape(-1, 1)
-        )
+                        horizon: int = 5,
+                        season_length: int = 24) -> np.ndarray:
+        """Predict future sequence values with Holt-Winters smoothing"""
+        values = np.asarray(sequence, dtype=np.float64).ravel()
+        if len(values) < 2 * season_length:
+            # Not enough data for a season: plain level + trend smoothing
+            season_length = 1
+        model = HoltWinters(season_length=season_length).fit(values)
+        return model.forecast(horizon).reshape(-1, 1)
 
 class WorkloadPredictor:
-    """Predicts system workload patterns"""
+    """Predicts system workload patterns
+    
+    Each resource series is averaged into fixed buckets (hourly by default)
+    and fed to an incremental Holt-Winters model with a daily season, so
+    observations and predictions cost O(1) instead of refitting on the
+    whole week of history.
     
-    def __init__(self):
-        self.pattern_detector = AdvancedPatternDetector()
+    The model's residuals are those of bucket means, far tighter than the
+    spread of single samples, so raw samples are scored against the bucket
+    forecast using a residual variance of their own.
+    """
+    
+    def __init__(self,
+                 bucket_seconds: int = 3600,
+                 season_length: int = 24,
+                 anomaly_threshold: float = 3.0,
+                 checkpoint_path: Optional[str] = None,
+                 sample_residual_alpha: float = 0.02,
+                 min_residual_samples: int = 30):
+        self.pattern_detector = AdvancedPatternDetector(checkpoint_path)
+        self.bucket_seconds = bucket_seconds
+        self.season_length = season_length
+        self.anomaly_threshold = anomaly_threshold
+        self.sample_residual_alpha = sample_residual_alpha
+        self.min_residual_samples = min_residual_samples
         self._activity_cache: Dict[str, List[Tuple[datetime, str]]] = {}
-        self._resource_cache: Dict[str, List[Tuple[datetime, Dict]]] = {}
+        # user -> resource -> forecaster over bucket means
+        self._forecasters: Dict[str, Dict[str, HoltWinters]] = {}
+        # user -> resource -> [bucket start, sum, count] of the open bucket
+        self._buckets: Dict[str, Dict[str, List[float]]] = {}
+        self._anomalies: Dict[str, Dict[str, bool]] = {}
+        # user -> resource -> [variance, count] of raw samples around the bucket forecast
+        self._sample_residuals: Dict[str, Dict[str, List[float]]] = {}
     
     def add_observation(self, 
                        user_id: str,
@@ -71,61 +91,87 @@ class WorkloadPredictor:
             self._activity_cache[user_id] = []
         self._activity_cache[user_id].append((timestamp, activity))
         
-        # Update resource cache
-        if user_id not in self._resource_cache:
-            self._resource_cache[user_id] = []
-        self._resource_cache[user_id].append((timestamp, resources))
-        
         # Maintain cache size (keep last 7 days)
         week_ago = timestamp - timedelta(days=7)
         self._activity_cache[user_id] = [
             (t, a) for t, a in self._activity_cache[user_id]
             if t > week_ago
         ]
-        self._resource_cache[user_id] = [
-            (t, r) for t, r in self._resource_cache[user_id]
-            if t > week_ago
-        ]
+        
+        joint = self.pattern_detector.observe(resources)
+        
+        forecasters = self._forecasters.setdefault(user_id, {})
+        buckets = self._buckets.setdefault(user_id, {})
+        anomalies = self._anomalies.setdefault(user_id, {})
+        residuals = self._sample_residuals.setdefault(user_id, {})
+        start = int(timestamp.timestamp() // self.bucket_seconds) * self.bucket_seconds
+        
+        for resource, value in resources.items():
+            value = float(value)
+            model = forecasters.get(resource)
+            if model is None:
+                model = forecasters[resource] = HoltWinters(season_length=self.season_length)
+            
+            bucket = buckets.get(resource)
+            if bucket is not None and start > bucket[0]:
+                # Close the finished bucket, stepping over any empty ones in between
+                model.update(bucket[1] / bucket[2])
+                missed = int((start - bucket[0]) // self.bucket_seconds) - 1
+                model.skip(min(missed, 7 * self.season_length))
+                bucket = None
+            if bucket is None:
+                bucket = buckets[resource] = [start, 0.0, 0]
+            # Late observations fold into the open bucket
+            bucket[1] += value
+            bucket[2] += 1
+            
+            z = self._score_sample(model, residuals.setdefault(resource, [0.0, 0]), value)
+            anomalies[resource] = z is not None and abs(z) > self.anomaly_threshold
+        anomalies['joint'] = joint['is_anomaly']
+    
+    def _score_sample(self, model: HoltWinters, residual: List[float], value: float) -> Optional[float]:
+        """Z-score of one raw sample against its bucket's forecast, then learn its error"""
+        if not model.initialised:
+            return None
+        error = value - model.predict_next()
+        variance, count = residual
+        z = error / np.sqrt(variance) if count >= self.min_residual_samples and variance > 0 else None
+        residual[0] = error * error if count == 0 else variance + self.sample_residual_alpha * (error * error - variance)
+        residual[1] = count + 1
+        return z
     
     def predict_workload(self, 
                         user_id: str,
                         future_hours: int = 24) -> Dict:
         """Predict future workload patterns"""
-        if user_id not in self._resource_cache:
+        if user_id not in self._forecasters:
             return {}
-            
-        # Extract resource usage sequences
-        timestamps, resources = zip(*self._resource_cache[user_id])
-        cpu_usage = np.array([r.get('cpu', 0) for r in resources])
-        memory_usage = np.array([r.get('memory', 0) for r in resources])
-        
-        # Detect anomalies
-        cpu_anomalies = self.pattern_detector.detect_anomalies(
-            cpu_usage.reshape(-1, 1)
-        )
-        memory_anomalies = self.pattern_detector.detect_anomalies(
-            memory_usage.reshape(-1, 1)
-        )
         
-        # Predict future usage
-        future_cpu = self.pattern_detector.predict_sequence(
-            cpu_usage.reshape(-1, 1)
-        )
-        future_memory = self.pattern_detector.predict_sequence(
-            memory_usage.reshape(-1, 1)
-        )
+        # The first step is the bucket currently being filled
+        steps = max(1, int(np.ceil(future_hours * 3600 / self.bucket_seconds)))
+        forecasters = self._forecasters[user_id]
+        predictions = {
+            resource: np.maximum(model.forecast(steps), 0.0).tolist()
+            for resource, model in forecasters.items()
+        }
+        anomalies = self._anomalies.get(user_id, {})
         
         # Analyze activity patterns
         activity_patterns = self._analyze_activity_patterns(user_id)
         
         return {
             'current_anomalies': {
-                'cpu': bool(cpu_anomalies[-1]),
-                'memory': bool(memory_anomalies[-1])
+                'cpu': anomalies.get('cpu', False),
+                'memory': anomalies.get('memory', False),
+                'joint': anomalies.get('joint', False)
             },
             'predictions': {
-                'cpu': future_cpu.flatten().tolist(),
-                'memory': future_memory.flatten().tolist()
+                'cpu': predictions.get('cpu', []),
+                'memory': predictions.get('memory', [])
+            },
+            'prediction_interval_seconds': self.bucket_seconds,
+            'prediction_std': {
+                resource: model.residual_std for resource, model in forecasters.items()
             },
             'activity_patterns': activity_patterns
         }
@@ -174,8 +220,10 @@ class WorkloadPredictor:
 class OptimizationPlanner:
     """Plans optimizations based on predictions"""
     
-    def __init__(self):
-        self.workload_predictor = WorkloadPredictor()
+    def __init__(self, checkpoint_path: Optional[str] = None):
+        # Read at construction so settings changed after import still apply; "" disables it
+        checkpoint_path = settings.ANOMALY_MODEL_PATH if checkpoint_path is None else checkpoint_path or None
+        self.workload_predictor = WorkloadPredictor(checkpoint_path=checkpoint_path)
     
     def plan_optimizations(self, 
                           user_id: str,
@@ -214,6 +262,14 @@ class OptimizationPlanner:
                 'action': 'investigate_memory_spike',
                 'priority': 'high'
             })
+            
+        if predictions.get('current_anomalies', {}).get('joint', False):
+            optimizations.append({
+                'type': 'immediate',
+                'resource': 'system',
+                'action': 'investigate_unusual_resource_mix',
+                'priority': 'high'
+            })
         
         # Plan based on activity patterns
         activity_patterns = predictions.get('activity_patterns', {})
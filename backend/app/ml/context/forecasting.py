@@ -0,0 +1,174 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HoltWinters:
+    """Incremental additive Holt-Winters (triple exponential smoothing)
+
+    Level, trend and one seasonal offset per position in the season are
+    updated in O(1) per observation; forecasts are a single vectorised
+    expression, so both run in microseconds. The first full season is
+    buffered to initialise the seasonal offsets; until then forecasts fall
+    back to the running mean.
+    """
+
+    def __init__(self,
+                 season_length: int = 24,
+                 alpha: float = 0.3,
+                 beta: float = 0.05,
+                 gamma: float = 0.2,
+                 residual_alpha: float = 0.1):
+        if season_length < 1:
+            raise ValueError("season_length must be at least 1")
+        self.season_length = season_length
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.residual_alpha = residual_alpha
+
+        self.level = 0.0
+        self.trend = 0.0
+        self.seasonal = np.zeros(season_length)
+        self.position = 0  # Seasonal index of the next observation
+        self.updates = 0
+        self.residual_var = 0.0
+        self._warmup: list = []
+
+    @property
+    def initialised(self) -> bool:
+        return not self._warmup and self.updates >= self.season_length
+
+    @property
+    def residual_std(self) -> float:
+        return float(np.sqrt(self.residual_var))
+
+    def update(self, value: float) -> Optional[float]:
+        """Fold in one observation; returns the one-step forecast error once initialised"""
+        value = float(value)
+        self.updates += 1
+        if self.updates <= self.season_length:
+            self._warmup.append(value)
+            if len(self._warmup) == self.season_length:
+                warmup = np.asarray(self._warmup)
+                self.level = float(warmup.mean())
+                self.seasonal = warmup - self.level
+                self.position = 0
+                self._warmup = []
+            return None
+
+        season = self.seasonal[self.position]
+        error = value - (self.level + self.trend + season)
+        self.residual_var += self.residual_alpha * (error * error - self.residual_var)
+
+        level = self.alpha * (value - season) + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+        self.seasonal[self.position] = self.gamma * (value - level) + (1 - self.gamma) * season
+        self.level = level
+        self.position = (self.position + 1) % self.season_length
+        return error
+
+    def skip(self, steps: int = 1) -> None:
+        """Advance over missing observations without correcting the state"""
+        if not self.initialised:
+            return
+        self.level += self.trend * steps
+        self.position = (self.position + steps) % self.season_length
+
+    def fit(self, values: Sequence[float]) -> "HoltWinters":
+        for value in values:
+            self.update(value)
+        return self
+
+    def forecast(self, horizon: int = 1) -> np.ndarray:
+        """Forecasts for the next `horizon` steps"""
+        if not self.initialised:
+            fallback = float(np.mean(self._warmup)) if self._warmup else self.level
+            return np.full(horizon, fallback)
+        steps = np.arange(1, horizon + 1)
+        return self.level + self.trend * steps + self.seasonal[(self.position + steps - 1) % self.season_length]
+
+    def predict_next(self) -> float:
+        return float(self.forecast(1)[0])
+
+    def score(self, value: float) -> Optional[float]:
+        """Z-score of `value` against the one-step forecast, None until residuals exist"""
+        if not self.initialised or self.residual_var <= 0:
+            return None
+        return (float(value) - self.predict_next()) / self.residual_std
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'season_length': self.season_length,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'gamma': self.gamma,
+            'residual_alpha': self.residual_alpha,
+            'level': self.level,
+            'trend': self.trend,
+            'seasonal': self.seasonal.tolist(),
+            'position': self.position,
+            'updates': self.updates,
+            'residual_var': self.residual_var,
+            'warmup': list(self._warmup)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HoltWinters":
+        model = cls(
+            season_length=data['season_length'],
+            alpha=data['alpha'],
+            beta=data['beta'],
+            gamma=data['gamma'],
+            residual_alpha=data.get('residual_alpha', 0.1)
+        )
+        model.level = data['level']
+        model.trend = data['trend']
+        model.seasonal = np.asarray(data['seasonal'], dtype=np.float64)
+        model.position = data['position']
+        model.updates = data['updates']
+        model.residual_var = data['residual_var']
+        model._warmup = list(data.get('warmup', []))
+        return model
+
+
+def select_parameters(values: Sequence[float],
+                      season_length: int = 24,
+                      alphas: Sequence[float] = (0.1, 0.2, 0.3, 0.5, 0.7),
+                      betas: Sequence[float] = (0.0, 0.01, 0.05, 0.1),
+                      gammas: Sequence[float] = (0.05, 0.1, 0.2, 0.4)) -> Tuple[float, float, float]:
+    """Grid-search smoothing parameters by one-step squared error
+
+    Every grid point is run side by side as one NumPy vector, so the cost
+    is a single pass over `values` regardless of grid size.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2 * season_length:
+        raise ValueError("Need at least two seasons of data to select parameters")
+
+    grid = np.array(np.meshgrid(alphas, betas, gammas, indexing='ij')).reshape(3, -1)
+    alpha, beta, gamma = grid
+    size = grid.shape[1]
+
+    first = values[:season_length]
+    level = np.full(size, first.mean())
+    trend = np.zeros(size)
+    seasonal = np.tile(first - first.mean(), (size, 1))
+    sse = np.zeros(size)
+
+    for t in range(season_length, len(values)):
+        value = values[t]
+        position = t % season_length
+        season = seasonal[:, position]
+        error = value - (level + trend + season)
+        sse += error * error
+
+        new_level = alpha * (value - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[:, position] = gamma * (value - new_level) + (1 - gamma) * season
+        level = new_level
+
+    best = int(np.argmin(sse))
+    return float(alpha[best]), float(beta[best]), float(gamma[best])
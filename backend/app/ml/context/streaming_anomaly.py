@@ -0,0 +1,190 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = ('cpu', 'memory', 'disk', 'network')
+
+
+def chi2_quantile(probability: float, df: int) -> float:
+    """Chi-square quantile via Wilson-Hilferty, avoiding a SciPy dependency"""
+    # Normal quantile from the Abramowitz & Stegun 26.2.23 rational approximation
+    p = min(max(probability, 1e-6), 1 - 1e-6)
+    tail = 1 - p if p > 0.5 else p
+    t = np.sqrt(-2 * np.log(tail))
+    z = t - (2.515517 + 0.802853 * t + 0.010328 * t * t) / (1 + 1.432788 * t + 0.189269 * t * t + 0.001308 * t ** 3)
+    z = z if p > 0.5 else -z
+    return float(df * (1 - 2 / (9 * df) + z * np.sqrt(2 / (9 * df))) ** 3)
+
+
+class StreamingPCADetector:
+    """Robust streaming PCA for joint anomaly detection
+
+    Keeps an exponentially weighted mean and covariance of the feature
+    vector (CPU, memory, disk, network by default) and scores each sample
+    by its squared Mahalanobis distance along the principal axes. That
+    catches combinations that never occur together, such as high CPU with
+    unusually low memory, even when every value is in range on its own.
+
+    Each update is O(features^2); the eigenbasis is refreshed every
+    `refresh_interval` samples. Outlying samples are down-weighted when
+    they are learned so a burst of anomalies does not become the new
+    normal. The model is one mean vector and one covariance matrix, so its
+    size is fixed, and it is checkpointed to an .npz file so restarts keep
+    it. Heavy-tailed features (network by default) are log-scaled first.
+    """
+
+    def __init__(self,
+                 features: Sequence[str] = DEFAULT_FEATURES,
+                 window_size: int = 1000,
+                 warmup: int = 50,
+                 confidence: float = 0.999,
+                 refresh_interval: int = 10,
+                 log_features: Sequence[str] = ('network',),
+                 path: Optional[str] = None,
+                 save_interval: int = 1000):
+        self.features = list(features)
+        self.window_size = window_size
+        self.warmup = warmup
+        self.threshold = chi2_quantile(confidence, len(self.features))
+        self.refresh_interval = refresh_interval
+        self.path = path
+        self.save_interval = save_interval
+
+        self._log_mask = np.array([name in log_features for name in self.features])
+        self._alpha = 2.0 / (window_size + 1)
+        self._reset()
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def _reset(self) -> None:
+        n = len(self.features)
+        self.mean = np.zeros(n)
+        self.covariance = np.zeros((n, n))
+        self.samples = 0
+        self._components = np.eye(n)
+        self._inverse_eigenvalues = np.zeros(n)
+        self._stale = True
+        self._since_save = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.samples >= self.warmup
+
+    def _vector(self, values: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Transformed feature vector and the mask of features actually present"""
+        raw = [values.get(name) for name in self.features]
+        observed = np.array([isinstance(v, (int, float)) and not np.isnan(v) for v in raw])
+        x = np.array([float(v) if ok else 0.0 for v, ok in zip(raw, observed)])
+        x = np.where(self._log_mask, np.log1p(np.maximum(x, 0.0)), x)
+        # Missing features take the running mean: no deviation, so they add nothing to the score
+        return np.where(observed, x, self.mean), observed
+
+    def _refresh(self) -> None:
+        eigenvalues, self._components = np.linalg.eigh(self.covariance)
+        # Floor near-constant directions so tiny noise there can't dominate the score
+        floor = max(1e-4 * float(np.sum(eigenvalues)), 1e-9)
+        self._inverse_eigenvalues = 1.0 / np.maximum(eigenvalues, floor)
+        self._stale = False
+
+    def _distance(self, x: np.ndarray):
+        if self._stale or self.samples % self.refresh_interval == 0:
+            self._refresh()
+        deviation = x - self.mean
+        projected = self._components.T @ deviation
+        distance = float(np.sum(projected * projected * self._inverse_eigenvalues))
+        # Per-feature share of the distance: deviation * (inverse covariance @ deviation)
+        contributions = deviation * (self._components @ (projected * self._inverse_eigenvalues))
+        return distance, contributions
+
+    def score_one(self, values: Dict[str, float]) -> Optional[float]:
+        """Squared Mahalanobis distance of one sample; None during warm-up"""
+        if not self.ready:
+            return None
+        return self._distance(self._vector(values)[0])[0]
+
+    def update(self, values: Dict[str, float]) -> Dict[str, Any]:
+        """Score a sample against the current model, then learn it"""
+        x, observed = self._vector(values)
+        result: Dict[str, Any] = {'score': None, 'threshold': self.threshold, 'is_anomaly': False}
+        weight = 1.0
+
+        if self.ready:
+            distance, contributions = self._distance(x)
+            result['score'] = distance
+            result['is_anomaly'] = distance > self.threshold
+            result['contributions'] = dict(zip(self.features, contributions.tolist()))
+            if distance > self.threshold:
+                weight = self.threshold / distance
+
+        # Plain averaging during warm-up, exponential forgetting afterwards
+        alpha = weight * max(self._alpha, 1.0 / (self.samples + 1))
+        deviation = x - self.mean
+        self.mean = self.mean + alpha * deviation
+        covariance = (1 - alpha) * (self.covariance + alpha * np.outer(deviation, deviation))
+        if not observed.all():
+            # Only the observed block learns; missing features keep their spread
+            unseen = ~np.outer(observed, observed)
+            covariance[unseen] = self.covariance[unseen]
+        self.covariance = covariance
+        self.samples += 1
+        if self.samples == self.warmup:
+            self._stale = True
+
+        self._since_save += 1
+        if self.path and self._since_save >= self.save_interval:
+            self.save()
+        return result
+
+    # Persistence
+
+    def save(self) -> None:
+        """Checkpoint the model atomically"""
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.savez(
+                    handle,
+                    features=np.asarray(self.features, dtype=str),
+                    mean=self.mean,
+                    covariance=self.covariance,
+                    samples=np.array(self.samples)
+                )
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._since_save = 0
+
+    def load(self) -> None:
+        try:
+            with np.load(self.path) as data:
+                if [str(name) for name in data['features']] != self.features:
+                    raise ValueError("checkpoint was written for different features")
+                self.mean = data['mean'].astype(np.float64)
+                self.covariance = data['covariance'].astype(np.float64)
+                self.samples = int(data['samples'])
+            self._stale = True
+            logger.info(f"Loaded anomaly model checkpoint from {self.path} ({self.samples} samples)")
+        except Exception as e:
+            logger.warning(f"Ignoring anomaly model checkpoint {self.path}: {str(e)}")
+            self._reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'features': self.features,
+            'samples': self.samples,
+            'ready': self.ready,
+            'threshold': self.threshold,
+            'model_bytes': int(self.mean.nbytes + self.covariance.nbytes),
+            'path': self.path
+        }
@@ -1,5 +1,7 @@
 from .pattern_analyzer import PatternAnalyzer
 from .pattern_matcher import PatternMatcher
 from .pattern_validator import PatternValidator
+from .similarity_index import SimilarityIndex, StateEncoder
+from .state_index import StateIndex
 
-__all__ = ['PatternAnalyzer', 'PatternMatcher', 'PatternValidator']
\ No newline at end of file
+__all__ = ['PatternAnalyzer', 'PatternMatcher', 'PatternValidator', 'SimilarityIndex', 'StateEncoder', 'StateIndex']
\ No newline at end of file
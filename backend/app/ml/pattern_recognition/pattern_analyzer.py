@@ -2,41 +2,42 @@ from typing import Dict, List, Optional
 import numpy as np
 from datetime import datetime
 
+from .state_index import StateIndex
+
 class PatternAnalyzer:
-    def __init__(self):
-        self.patterns = {}
+    STATE_FIELDS = ('cpu_usage', 'memory_usage', 'disk_usage')
+
+    def __init__(self,
+                 max_patterns: int = 100_000,
+                 max_age_seconds: Optional[float] = 7 * 24 * 3600,
+                 memory_limit_bytes: Optional[int] = None):
+        # Whole-percent states in a bounded table instead of an ever-growing dict
+        self.patterns = StateIndex(
+            dimensions=len(self.STATE_FIELDS),
+            resolution=1.0,
+            max_entries=max_patterns,
+            max_age_seconds=max_age_seconds,
+            memory_limit_bytes=memory_limit_bytes
+        )
         self.threshold = 0.75
         self.min_occurrences = 3
 
     async def analyze_metrics(self, metrics: Dict) -> Optional[Dict]:
         """Analyze system metrics for patterns"""
-        timestamp = datetime.now()
-        pattern_key = self._generate_pattern_key(metrics)
-        
-        if pattern_key in self.patterns:
-            self.patterns[pattern_key]['occurrences'] += 1
-            self.patterns[pattern_key]['last_seen'] = timestamp
-        else:
-            self.patterns[pattern_key] = {
-                'metrics': metrics,
-                'occurrences': 1,
-                'first_seen': timestamp,
-                'last_seen': timestamp
-            }
-
-        return self._evaluate_pattern(pattern_key)
+        timestamp = datetime.now().timestamp()
+        slot = self.patterns.observe(self._state_vector(metrics), timestamp)
+        return self._evaluate_pattern(slot)
 
-    def _generate_pattern_key(self, metrics: Dict) -> str:
-        """Generate unique key for pattern"""
-        return f"{metrics['cpu_usage']:.0f}_{metrics['memory_usage']:.0f}_{metrics['disk_usage']:.0f}"
+    def _state_vector(self, metrics: Dict) -> List[float]:
+        return [metrics[field] for field in self.STATE_FIELDS]
 
-    def _evaluate_pattern(self, pattern_key: str) -> Optional[Dict]:
+    def _evaluate_pattern(self, slot: int) -> Optional[Dict]:
         """Evaluate if pattern is significant"""
-        pattern = self.patterns[pattern_key]
-        if pattern['occurrences'] >= self.min_occurrences:
+        occurrences = int(self.patterns.counts[slot])
+        if occurrences >= self.min_occurrences:
             return {
-                'pattern': pattern['metrics'],
-                'occurrences': pattern['occurrences'],
-                'duration': (pattern['last_seen'] - pattern['first_seen']).total_seconds()
+                'pattern': dict(zip(self.STATE_FIELDS, self.patterns.state(slot).tolist())),
+                'occurrences': occurrences,
+                'duration': float(self.patterns.last_seen[slot] - self.patterns.first_seen[slot])
             }
-        return None
\ No newline at end of file
+        return None
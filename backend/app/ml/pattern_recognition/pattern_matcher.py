@@ -1,41 +1,43 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 import numpy as np
-#from sentence_transformers import SentenceTransformer
+
+from .similarity_index import SimilarityIndex, StateEncoder
 
 class PatternMatcher:
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.pattern_embeddings = {}
-        self.similarity_threshold = 0.8
+    def __init__(self,
+                 similarity_threshold: float = 0.8,
+                 encoder: Optional[StateEncoder] = None,
+                 grid_size: Optional[int] = 8):
+        self.encoder = encoder or StateEncoder()
+        self.similarity_threshold = similarity_threshold
+        # Large pattern sets are searched cell by cell; small ones by one full product
+        self.index = SimilarityIndex(self.encoder, grid_size=grid_size)
+
+    def add_pattern(self, pattern_id: Any, state: Dict, pattern: Optional[Dict] = None):
+        """Store a known pattern under the state it was observed in"""
+        self.index.add(pattern_id, state, pattern if pattern is not None else state)
+
+    def remove_pattern(self, pattern_id: Any):
+        self.index.remove(pattern_id)
 
     async def match_pattern(self, current_state: Dict) -> Optional[Dict]:
         """Match current state against known patterns"""
-        current_embedding = self._generate_embedding(current_state)
-        
-        best_match = None
-        highest_similarity = 0
-
-        for pattern_id, pattern_data in self.pattern_embeddings.items():
-            similarity = self._calculate_similarity(
-                current_embedding, 
-                pattern_data['embedding']
-            )
-            
-            if similarity > highest_similarity and similarity > self.similarity_threshold:
-                highest_similarity = similarity
-                best_match = pattern_data['pattern']
+        matches = self.index.search(current_state, k=1, threshold=self.similarity_threshold)
+        return matches[0][2] if matches else None
 
-        return best_match
+    def top_matches(self, current_state: Dict, k: int = 5) -> List[Dict]:
+        """The k most similar known patterns above the threshold, best first"""
+        return [
+            {'pattern_id': pattern_id, 'similarity': similarity, 'pattern': pattern}
+            for pattern_id, similarity, pattern in self.index.search(
+                current_state, k=k, threshold=self.similarity_threshold
+            )
+        ]
 
     def _generate_embedding(self, state: Dict) -> np.ndarray:
         """Generate embedding for state"""
-        state_str = self._state_to_string(state)
-        return self.model.encode([state_str])[0]
-
-    def _state_to_string(self, state: Dict) -> str:
-        """Convert state to string representation"""
-        return f"CPU:{state['cpu_usage']} MEM:{state['memory_usage']} DISK:{state['disk_usage']}"
+        return self.encoder.encode(state)
 
     def _calculate_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """Calculate similarity between two embeddings"""
-        return np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2))
\ No newline at end of file
+        return float(np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2)))
\ No newline at end of file
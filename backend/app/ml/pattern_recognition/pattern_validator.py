@@ -1,116 +1,145 @@
 from typing import Dict, List, Optional
+from collections import deque
 from datetime import datetime, timedelta
 import numpy as np
 
 class PatternValidator:
+    METRIC_FIELDS = ('cpu_usage', 'memory_usage', 'disk_usage')
+    VARIANCE_KEYS = ('cpu', 'memory', 'disk')
+
     def __init__(self):
         self.validation_window = timedelta(hours=24)
         self.confidence_threshold = 0.85
         self.min_samples = 5
         self.validated_patterns = {}
 
-    async def validate_pattern(self, pattern: Dict, metrics: Dict) -> Dict:
+        # Rolling-window accumulators, one row per pattern: running mean and
+        # sum of squared deviations (Welford with removal) over in-window samples
+        self._capacity = 64
+        self._count = np.zeros(self._capacity)
+        self._mean = np.zeros((self._capacity, len(self.METRIC_FIELDS)))
+        self._m2 = np.zeros((self._capacity, len(self.METRIC_FIELDS)))
+        self._oldest = np.full(self._capacity, np.inf)
+        self._newest = np.zeros(self._capacity)
+        self._row_samples: List[deque] = []
+
+    async def validate_pattern(self, pattern: Dict, metrics: Dict,
+                               timestamp: Optional[datetime] = None) -> Dict:
         """Validate pattern against historical data and current metrics"""
+        return self._validate([pattern], metrics, timestamp)[0]
+
+    async def validate_patterns(self, patterns: List[Dict], metrics: Dict,
+                                timestamp: Optional[datetime] = None) -> List[Dict]:
+        """Validate many candidate patterns against one snapshot in a single pass"""
+        return self._validate(patterns, metrics, timestamp)
+
+    def _validate(self, patterns: List[Dict], metrics: Dict, timestamp: Optional[datetime]) -> List[Dict]:
+        if not patterns:
+            return []
+        now = (timestamp or datetime.now()).timestamp()
+        rows = np.array([self._row(pattern) for pattern in patterns], dtype=np.intp)
+        self._clean_old_samples(rows, now)
+
+        # The same snapshot is a new sample for every candidate; a pattern
+        # listed twice still only gets it once
+        unique_rows = np.unique(rows)
+        values = np.array([float(metrics[field]) for field in self.METRIC_FIELDS])
+        for row in unique_rows.tolist():
+            self._row_samples[row].append((now, values))
+        self._add(unique_rows, values, now)
+
+        confidence, variances, time_span = self._calculate_confidence(rows)
+        validated_at = datetime.fromtimestamp(now)
+        results = []
+        for i, pattern_id in enumerate(self._generate_pattern_id(p) for p in patterns):
+            pattern_data = self.validated_patterns[pattern_id]
+            pattern_data['confidence'] = float(confidence[i])
+            pattern_data['last_validated'] = validated_at
+            variance = dict(zip(self.VARIANCE_KEYS, variances[i].tolist()))
+            variance['total'] = float(variances[i].mean())
+            results.append({
+                'pattern_id': pattern_id,
+                'is_valid': bool(confidence[i] >= self.confidence_threshold),
+                'confidence': float(confidence[i]),
+                'validation_metrics': {
+                    'sample_count': int(self._count[rows[i]]),
+                    'time_span': float(time_span[i]),
+                    'variance': variance
+                }
+            })
+        return results
+
+    def _row(self, pattern: Dict) -> int:
         pattern_id = self._generate_pattern_id(pattern)
-        
-        if pattern_id not in self.validated_patterns:
-            self.validated_patterns[pattern_id] = {
+        pattern_data = self.validated_patterns.get(pattern_id)
+        if pattern_data is None:
+            row = len(self.validated_patterns)
+            if row == self._capacity:
+                self._grow()
+            pattern_data = self.validated_patterns[pattern_id] = {
                 'pattern': pattern,
-                'samples': [],
+                'samples': deque(),
                 'confidence': 0.0,
-                'last_validated': None
-            }
-
-        validation_result = await self._calculate_validation_score(
-            pattern_id, metrics
-        )
-
-        return {
-            'pattern_id': pattern_id,
-            'is_valid': validation_result['confidence'] >= self.confidence_threshold,
-            'confidence': validation_result['confidence'],
-            'validation_metrics': validation_result['metrics']
-        }
-
-    async def _calculate_validation_score(self, pattern_id: str, metrics: Dict) -> Dict:
-        """Calculate validation score for pattern"""
-        pattern_data = self.validated_patterns[pattern_id]
-        
-        # Add new sample
-        pattern_data['samples'].append({
-            'metrics': metrics,
-            'timestamp': datetime.now()
-        })
-
-        # Remove old samples
-        self._clean_old_samples(pattern_data)
-
-        # Calculate confidence
-        if len(pattern_data['samples']) >= self.min_samples:
-            confidence = self._calculate_confidence(pattern_data)
-        else:
-            confidence = 0.0
-
-        pattern_data['confidence'] = confidence
-        pattern_data['last_validated'] = datetime.now()
-
-        return {
-            'confidence': confidence,
-            'metrics': {
-                'sample_count': len(pattern_data['samples']),
-                'time_span': self._get_time_span(pattern_data),
-                'variance': self._calculate_variance(pattern_data)
+                'last_validated': None,
+                'row': row
             }
-        }
+            self._row_samples.append(pattern_data['samples'])
+        return pattern_data['row']
+
+    def _grow(self):
+        extra = self._capacity
+        self._count = np.concatenate([self._count, np.zeros(extra)])
+        self._mean = np.concatenate([self._mean, np.zeros_like(self._mean)])
+        self._m2 = np.concatenate([self._m2, np.zeros_like(self._m2)])
+        self._oldest = np.concatenate([self._oldest, np.full(extra, np.inf)])
+        self._newest = np.concatenate([self._newest, np.zeros(extra)])
+        self._capacity += extra
 
     def _generate_pattern_id(self, pattern: Dict) -> str:
         """Generate unique identifier for pattern"""
         metrics = pattern.get('metrics', {})
         return f"pattern_{hash(frozenset(metrics.items()))}"
 
-    def _clean_old_samples(self, pattern_data: Dict):
-        """Remove samples outside validation window"""
-        cutoff_time = datetime.now() - self.validation_window
-        pattern_data['samples'] = [
-            sample for sample in pattern_data['samples']
-            if sample['timestamp'] > cutoff_time
-        ]
-
-    def _calculate_confidence(self, pattern_data: Dict) -> float:
-        """Calculate confidence score for pattern"""
-        if not pattern_data['samples']:
-            return 0.0
-
-        variances = self._calculate_variance(pattern_data)
-        time_span = self._get_time_span(pattern_data)
-        sample_count = len(pattern_data['samples'])
+    def _add(self, rows: np.ndarray, values: np.ndarray, now: float):
+        self._count[rows] += 1
+        delta = values - self._mean[rows]
+        self._mean[rows] += delta / self._count[rows, None]
+        self._m2[rows] += delta * (values - self._mean[rows])
+        self._oldest[rows] = np.minimum(self._oldest[rows], now)
+        self._newest[rows] = now
+
+    def _remove(self, row: int, values: np.ndarray):
+        count = self._count[row] - 1
+        if count <= 0:
+            self._count[row] = 0
+            self._mean[row] = 0.0
+            self._m2[row] = 0.0
+            return
+        old_mean = self._mean[row].copy()
+        self._mean[row] = (old_mean * self._count[row] - values) / count
+        self._m2[row] = np.maximum(self._m2[row] - (values - old_mean) * (values - self._mean[row]), 0.0)
+        self._count[row] = count
+
+    def _clean_old_samples(self, rows: np.ndarray, now: float):
+        """Expire samples outside validation window; only rows with stale samples are touched"""
+        cutoff_time = now - self.validation_window.total_seconds()
+        for row in np.unique(rows[self._oldest[rows] <= cutoff_time]).tolist():
+            samples = self._row_samples[row]
+            while samples and samples[0][0] <= cutoff_time:
+                self._remove(row, samples.popleft()[1])
+            self._oldest[row] = samples[0][0] if samples else np.inf
+
+    def _calculate_confidence(self, rows: np.ndarray):
+        """Calculate confidence score, variances and time span for every row at once"""
+        count = self._count[rows]
+        variances = np.where(count[:, None] > 0, self._m2[rows] / np.maximum(count, 1)[:, None], 0.0) / 100
+        time_span = np.where(count > 0, self._newest[rows] - self._oldest[rows], 0.0)
 
         # Weighted confidence calculation
         confidence = (
-            (1.0 - variances['total']) * 0.4 +
-            min(time_span / self.validation_window.total_seconds(), 1.0) * 0.3 +
-            min(sample_count / self.min_samples, 1.0) * 0.3
+            (1.0 - variances.mean(axis=1)) * 0.4 +
+            np.minimum(time_span / self.validation_window.total_seconds(), 1.0) * 0.3 +
+            np.minimum(count / self.min_samples, 1.0) * 0.3
         )
-
-        return round(confidence, 3)
-
-    def _calculate_variance(self, pattern_data: Dict) -> Dict:
-        """Calculate variance in pattern metrics"""
-        metrics = [sample['metrics'] for sample in pattern_data['samples']]
-        
-        variances = {
-            'cpu': np.var([m['cpu_usage'] for m in metrics]) / 100,
-            'memory': np.var([m['memory_usage'] for m in metrics]) / 100,
-            'disk': np.var([m['disk_usage'] for m in metrics]) / 100
-        }
-        
-        variances['total'] = sum(variances.values()) / len(variances)
-        return variances
-
-    def _get_time_span(self, pattern_data: Dict) -> float:
-        """Calculate time span of pattern samples"""
-        if not pattern_data['samples']:
-            return 0.0
-            
-        timestamps = [s['timestamp'] for s in pattern_data['samples']]
-        return (max(timestamps) - min(timestamps)).total_seconds()
\ No newline at end of file
+        confidence = np.where(count >= self.min_samples, np.round(confidence, 3), 0.0)
+        return confidence, variances, time_span
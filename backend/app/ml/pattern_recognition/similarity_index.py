@@ -0,0 +1,210 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+
+class StateEncoder:
+    """Numeric embedding of metric states
+
+    Each field is scaled to [0, 1] and mapped to an angle in [0, pi]; the
+    embedding is (cos, sin) of every angle divided by sqrt(n_fields), so it
+    always has unit length. The dot product of two embeddings is then the
+    mean of cos(pi * difference) over the fields: 1 for identical states,
+    falling smoothly as any field drifts apart.
+    """
+
+    DEFAULT_FIELDS = {'cpu_usage': 100.0, 'memory_usage': 100.0, 'disk_usage': 100.0}
+
+    def __init__(self, fields: Optional[Dict[str, float]] = None):
+        self.fields = dict(fields or self.DEFAULT_FIELDS)
+        self.names = list(self.fields)
+        self._scales = np.array(list(self.fields.values()), dtype=np.float64)
+        self.dimensions = 2 * len(self.names)
+
+    def normalise(self, state: Dict[str, float]) -> np.ndarray:
+        values = np.array([float(state.get(name) or 0.0) for name in self.names])
+        return np.clip(values / self._scales, 0.0, 1.0)
+
+    def encode_normalised(self, unit: np.ndarray) -> np.ndarray:
+        angles = np.pi * unit
+        return np.concatenate([np.cos(angles), np.sin(angles)]) / np.sqrt(len(self.names))
+
+    def encode(self, state: Dict[str, float]) -> np.ndarray:
+        return self.encode_normalised(self.normalise(state))
+
+
+
+class _Cell:
+    """Contiguous block of the embeddings that fall in one grid cell"""
+
+    __slots__ = ('matrix', 'rows', 'lower')
+
+    def __init__(self, dimensions: int, lower: np.ndarray):
+        self.matrix = np.zeros((dimensions, 16))
+        self.rows: List[int] = []
+        self.lower = lower
+
+    def append(self, row: int, embedding: np.ndarray) -> int:
+        position = len(self.rows)
+        if position == self.matrix.shape[1]:
+            self.matrix = np.concatenate([self.matrix, np.zeros_like(self.matrix)], axis=1)
+        self.matrix[:, position] = embedding
+        self.rows.append(row)
+        return position
+
+    def pop(self, position: int) -> Optional[int]:
+        """Remove a position by moving the last one into it; returns the moved row"""
+        last = len(self.rows) - 1
+        moved = None
+        if position != last:
+            self.matrix[:, position] = self.matrix[:, last]
+            self.rows[position] = moved = self.rows[last]
+        self.rows.pop()
+        return moved
+
+
+class SimilarityIndex:
+    """Vectorised nearest-pattern search over unit-length embeddings
+
+    Embeddings are the columns of one (dimensions, n) matrix, so a search is
+    a single vector-matrix product followed by an argpartition for the top k.
+
+    With `grid_size` set, embeddings are also grouped into a grid over the
+    normalised fields (`grid_size` cells per field), each cell holding its
+    own contiguous block. Once the index reaches `bucket_min_size`, a search
+    computes an upper bound on the similarity any point in each occupied
+    cell can reach, then scans cells best-bound first and stops as soon as
+    no remaining cell can beat the current k-th result or the threshold.
+    Results are the same as a full scan.
+    """
+
+    def __init__(self,
+                 encoder: Optional[StateEncoder] = None,
+                 initial_capacity: int = 1024,
+                 grid_size: Optional[int] = None,
+                 bucket_min_size: int = 10_000):
+        self.encoder = encoder or StateEncoder()
+        self.embeddings = np.zeros((self.encoder.dimensions, max(1, initial_capacity)))
+        self.ids: List[Any] = []
+        self.payloads: List[Any] = []
+        self._rows: Dict[Any, int] = {}
+
+        self.grid_size = grid_size
+        self.bucket_min_size = bucket_min_size
+        self._cells: Dict[Tuple[int, ...], _Cell] = {}
+        self._row_cells: List[Tuple[int, ...]] = []
+        self._row_positions: List[int] = []
+        self._cell_keys: List[Tuple[int, ...]] = []
+        self._cell_lowers: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell_key(self, unit: np.ndarray) -> Tuple[int, ...]:
+        return tuple(np.minimum((unit * self.grid_size).astype(int), self.grid_size - 1).tolist())
+
+    def add(self, item_id: Any, state: Dict[str, float], payload: Any = None) -> None:
+        """Insert or replace the embedding stored under `item_id`"""
+        if item_id in self._rows:
+            self.remove(item_id)
+        row = len(self.ids)
+        if row == self.embeddings.shape[1]:
+            self.embeddings = np.concatenate([self.embeddings, np.zeros_like(self.embeddings)], axis=1)
+        unit = self.encoder.normalise(state)
+        embedding = self.encoder.encode_normalised(unit)
+        self.embeddings[:, row] = embedding
+        self.ids.append(item_id)
+        self.payloads.append(payload)
+        self._rows[item_id] = row
+
+        if self.grid_size:
+            key = self._cell_key(unit)
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = _Cell(len(embedding), np.asarray(key) / self.grid_size)
+                self._cell_lowers = None
+            self._row_cells.append(key)
+            self._row_positions.append(cell.append(row, embedding))
+
+    def remove(self, item_id: Any) -> None:
+        """Delete by moving the last row into the freed slot"""
+        row = self._rows.pop(item_id)
+        last = len(self.ids) - 1
+
+        if self.grid_size:
+            key = self._row_cells[row]
+            cell = self._cells[key]
+            moved = cell.pop(self._row_positions[row])
+            if moved is not None:
+                self._row_positions[moved] = self._row_positions[row]
+            if not cell.rows:
+                del self._cells[key]
+                self._cell_lowers = None
+            if row != last:
+                # The global last row is renumbered; patch its entry in its cell
+                last_cell = self._cells[self._row_cells[last]]
+                last_cell.rows[self._row_positions[last]] = row
+                self._row_cells[row] = self._row_cells[last]
+                self._row_positions[row] = self._row_positions[last]
+            self._row_cells.pop()
+            self._row_positions.pop()
+
+        if row != last:
+            self.embeddings[:, row] = self.embeddings[:, last]
+            self.ids[row] = self.ids[last]
+            self.payloads[row] = self.payloads[last]
+            self._rows[self.ids[row]] = row
+        self.ids.pop()
+        self.payloads.pop()
+
+    @staticmethod
+    def _top(similarities: np.ndarray, k: int) -> np.ndarray:
+        if k < len(similarities):
+            top = np.argpartition(-similarities, k - 1)[:k]
+        else:
+            top = np.arange(len(similarities))
+        return top[np.argsort(-similarities[top], kind='stable')]
+
+    def _cell_bounds(self, unit: np.ndarray) -> Tuple[List[Tuple[int, ...]], np.ndarray]:
+        """Highest similarity any point of each occupied cell could have with `unit`"""
+        if self._cell_lowers is None:
+            self._cell_keys = list(self._cells)
+            self._cell_lowers = np.array([self._cells[key].lower for key in self._cell_keys])
+        lower = self._cell_lowers
+        gap = np.maximum(0.0, np.maximum(lower - unit, unit - (lower + 1.0 / self.grid_size)))
+        return self._cell_keys, np.mean(np.cos(np.pi * gap), axis=1)
+
+    def _search_cells(self, unit: np.ndarray, query: np.ndarray, k: int, threshold: float):
+        keys, bounds = self._cell_bounds(unit)
+        best_rows = np.zeros(0, dtype=np.intp)
+        best_sims = np.zeros(0)
+        for i in np.argsort(-bounds):
+            bound = bounds[i]
+            if bound <= threshold or (len(best_sims) >= k and bound <= best_sims[-1]):
+                break
+            cell = self._cells[keys[i]]
+            sims = query @ cell.matrix[:, :len(cell.rows)]
+            rows = np.concatenate([best_rows, np.asarray(cell.rows, dtype=np.intp)])
+            sims = np.concatenate([best_sims, sims])
+            top = self._top(sims, k)
+            best_rows, best_sims = rows[top], sims[top]
+        return best_rows, best_sims
+
+    def search(self, state: Dict[str, float], k: int = 1, threshold: float = -1.0) -> List[Tuple[Any, float, Any]]:
+        """Top-k (id, similarity, payload) with similarity above `threshold`, best first"""
+        if not self.ids:
+            return []
+        unit = self.encoder.normalise(state)
+        query = self.encoder.encode_normalised(unit)
+
+        if self.grid_size and len(self.ids) >= self.bucket_min_size:
+            rows, similarities = self._search_cells(unit, query, k, threshold)
+        else:
+            similarities = query @ self.embeddings[:, :len(self.ids)]
+            rows = self._top(similarities, k)
+            similarities = similarities[rows]
+
+        return [
+            (self.ids[row], float(similarity), self.payloads[row])
+            for row, similarity in zip(rows.tolist(), similarities.tolist())
+            if similarity > threshold
+        ]
@@ -0,0 +1,120 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import time
+
+# Bytes held per entry across the NumPy columns plus the key -> slot dict
+_ENTRY_BYTES_ESTIMATE = 150
+
+
+class StateIndex:
+    """Bounded index of quantised system states
+
+    Each observed state vector is rounded to `resolution` and stored once in
+    fixed-size NumPy columns (quantised values, occurrence count, first and
+    last seen), with a dict from the packed integer key to its row. Lookups
+    and updates are O(1). When the table is full, the least recently seen
+    tenth is evicted in one vectorised pass, so eviction stays amortised
+    O(1). Entries older than `max_age_seconds` are dropped in the same pass.
+    """
+
+    KEY_BITS = 16
+
+    def __init__(self,
+                 dimensions: int = 3,
+                 resolution: float = 1.0,
+                 max_entries: int = 100_000,
+                 max_age_seconds: Optional[float] = None,
+                 memory_limit_bytes: Optional[int] = None):
+        if memory_limit_bytes is not None:
+            max_entries = max(1, memory_limit_bytes // _ENTRY_BYTES_ESTIMATE)
+        self.dimensions = dimensions
+        self.resolution = resolution
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+
+        self.states = np.zeros((max_entries, dimensions), dtype=np.int32)
+        self.counts = np.zeros(max_entries, dtype=np.int64)
+        self.first_seen = np.zeros(max_entries)
+        self.last_seen = np.zeros(max_entries)
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = list(range(max_entries - 1, -1, -1))
+        self.evictions = 0
+
+        self._offset = 1 << (self.KEY_BITS - 1)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def quantise(self, vector: Sequence[float]) -> np.ndarray:
+        limit = self._offset - 1
+        return np.clip(np.rint(np.asarray(vector, dtype=np.float64) / self.resolution), -limit, limit).astype(np.int64)
+
+    def _pack(self, quantised: np.ndarray) -> int:
+        key = 0
+        for value in (quantised + self._offset).tolist():
+            key = (key << self.KEY_BITS) | value
+        return key
+
+    def lookup(self, vector: Sequence[float]) -> Optional[int]:
+        """Row of the state containing `vector`, or None if it isn't indexed"""
+        return self._slots.get(self._pack(self.quantise(vector)))
+
+    def observe(self, vector: Sequence[float], timestamp: Optional[float] = None) -> int:
+        """Count one occurrence of the state containing `vector`; returns its row"""
+        now = time.time() if timestamp is None else timestamp
+        quantised = self.quantise(vector)
+        key = self._pack(quantised)
+        slot = self._slots.get(key)
+
+        if slot is None:
+            if not self._free:
+                self._evict(now)
+            slot = self._free.pop()
+            self._slots[key] = slot
+            self.states[slot] = quantised
+            self.counts[slot] = 0
+            self.first_seen[slot] = now
+
+        self.counts[slot] += 1
+        self.last_seen[slot] = now
+        return slot
+
+    def _evict(self, now: float) -> None:
+        """Free the stalest tenth of the table (and anything past max_age)"""
+        used = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+        batch = max(1, len(used) // 10)
+        victims = used[np.argpartition(self.last_seen[used], batch - 1)[:batch]]
+        if self.max_age_seconds is not None:
+            expired = used[self.last_seen[used] < now - self.max_age_seconds]
+            victims = np.union1d(victims, expired)
+        self._release(victims)
+
+    def _release(self, slots: np.ndarray) -> None:
+        for slot in slots.tolist():
+            del self._slots[self._pack(self.states[slot].astype(np.int64))]
+            self.counts[slot] = 0
+            self._free.append(slot)
+        self.evictions += len(slots)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop entries not seen within max_age_seconds; returns how many"""
+        if self.max_age_seconds is None or not self._slots:
+            return 0
+        now = time.time() if now is None else now
+        used = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+        expired = used[self.last_seen[used] < now - self.max_age_seconds]
+        self._release(expired)
+        return len(expired)
+
+    def state(self, slot: int) -> np.ndarray:
+        """Representative (de-quantised) vector of a row"""
+        return self.states[slot] * self.resolution
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._slots),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions,
+            'table_bytes': int(self.states.nbytes + self.counts.nbytes
+                               + self.first_seen.nbytes + self.last_seen.nbytes)
+        }
@@ -6,6 +6,8 @@ from .system import OptimizationProfile
 from .alerts import SystemAlert
 from .metrics import SystemMetrics
 from .tuning_history import TuningHistory
+from .snapshot_blob import SnapshotBlob
+from .compression_dictionary import CompressionDictionary
 
 # Ensure all models are imported and registered
 __all__ = [
@@ -15,5 +17,7 @@ __all__ = [
     'OptimizationProfile', 
     'SystemAlert', 
     'SystemMetrics',
-    'TuningHistory'
+    'TuningHistory',
+    'SnapshotBlob',
+    'CompressionDictionary'
 ]
\ No newline at end of file
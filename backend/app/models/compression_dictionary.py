@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from datetime import datetime
+
+from app.core.base import Base
+
+
+class CompressionDictionary(Base):
+    """
+    Versioned compression dictionaries trained on recent snapshots.
+
+    Old versions are kept so blobs compressed with them stay readable.
+    """
+    __tablename__ = "compression_dictionaries"
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    algorithm = Column(String(16), nullable=False, default="zlib")
+    dictionary = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
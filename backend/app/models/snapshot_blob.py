@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from datetime import datetime
+
+from app.core.base import Base
+
+
+class SnapshotBlob(Base):
+    """
+    Content-addressed storage for static or slow-changing snapshot sections.
+
+    Stored snapshots reference these by digest instead of repeating the same
+    interface lists, partition tables and core counts in every row.
+    """
+    __tablename__ = "snapshot_blobs"
+    digest = Column(String(64), primary_key=True)
+    encoding = Column(String(32), nullable=False, default="json")
+    payload = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
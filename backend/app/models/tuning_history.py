@@ -20,6 +20,12 @@ class TuningHistory(Base):
     metrics_before = Column(JSON, nullable=True)
     metrics_after = Column(JSON, nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Closed-loop experiment outcome; NULL for plain one-shot tunings
+    verdict = Column(String, nullable=True)
+    reverted = Column(Boolean, default=False)
+    effect_sizes = Column(JSON, nullable=True)
+    # Raw micro-benchmark scores before and after, for benchmarked tunings
+    benchmark_scores = Column(JSON, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="tuning_history")
@@ -37,6 +43,10 @@ class TuningHistory(Base):
             "metrics_before": self.metrics_before,
             "metrics_after": self.metrics_after,
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "verdict": self.verdict,
+            "reverted": self.reverted,
+            "effect_sizes": self.effect_sizes,
+            "benchmark_scores": self.benchmark_scores,
             # Don't access the user relationship to avoid greenlet_spawn error
             "username": None
         }
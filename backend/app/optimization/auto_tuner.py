@@ -1,7 +1,6 @@
 import logging
 import psutil
 import json
-import subprocess
 import os
 from enum import Enum
 from dataclasses import dataclass
@@ -9,6 +8,10 @@ from datetime import datetime
 from typing import List, Dict, Optional, Any, Tuple
 from app.optimization.system_permissions import check_required_permissions, get_permission_summary
 from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+from app.optimization.tunable_state import get_tunable_state_reader
+from app.optimization.tuning_backend import get_tuning_backend
+from app.optimization.device_advisor import get_device_advisor
+from app.optimization.rule_engine import get_recommendation_engine
 from app.models.tuning_history import TuningHistory
 from app.core.database import SessionLocal
 
@@ -23,6 +26,9 @@ class TuningParameter(Enum):
     CACHE_PRESSURE = "cache_pressure"
     DISK_READ_AHEAD = "disk_read_ahead"
     NETWORK_BUFFER = "network_buffer"
+    NR_REQUESTS = "nr_requests"
+    TX_QUEUE_LEN = "tx_queue_len"
+    RPS_CPUS = "rps_cpus"
 
 @dataclass
 class TuningAction:
@@ -33,6 +39,8 @@ class TuningAction:
     impact_score: float
     timestamp: datetime
     reason: str
+    # CPUs ('cpuN' / 'packageN'), block devices or interfaces; None means all
+    targets: Optional[List[str]] = None
 
 class AutoTuner:
     def __init__(self):
@@ -41,6 +49,14 @@ class AutoTuner:
         self.active_tunings = {}
         self.permissions = {}
         self._initialized = False
+        # Real kernel values, read from /proc/sys and /sys and cached
+        self.state = get_tunable_state_reader()
+        # Writes tunables directly instead of via per-parameter sudo commands
+        self.backend = get_tuning_backend()
+        # Per-device recommendations from each device's own counters
+        self.advisor = get_device_advisor()
+        # System-wide rules over smoothed metrics, with hysteresis and cooldowns
+        self.engine = get_recommendation_engine()
         # Initialize with default permissions - all set to True to allow full access
         self.permissions = {
             'cpu_governor': True,
@@ -50,7 +66,10 @@ class AutoTuner:
             'swap_tendency': True,
             'cache_pressure': True,
             'memory_pressure': True,
-            'process_priority': True  # Non-negative nice values don't require sudo
+            'process_priority': True,  # Non-negative nice values don't require sudo
+            'nr_requests': True,
+            'tx_queue_len': True,
+            'rps_cpus': True
         }
         # Note: We'll properly initialize in the first get_tuning_recommendations call
         # Can't await in __init__, so we'll do it lazily
@@ -101,12 +120,14 @@ class AutoTuner:
     async def get_metrics(self) -> Dict:
         return await self.get_current_metrics()
 
-    async def apply_tuning(self, data: Dict, user_id: str = None) -> Optional[Dict]:
+    async def apply_tuning(self, data: Dict, user_id: str = None, metrics: Optional[Dict] = None) -> Optional[Dict]:
         """Apply a tuning action
         
         Args:
             data: Dictionary containing tuning parameters
             user_id: ID of the user applying the tuning
+            metrics: A recent sample to record as metrics_before instead of
+                collecting before and after the change (the daemon's case)
             
         Returns:
             Dictionary containing the result of the tuning action
@@ -121,6 +142,7 @@ class AutoTuner:
                     'confidence': data.confidence,
                     'impact_score': data.impact_score,
                     'reason': data.reason,
+                    'targets': data.targets,
                     'success': False,
                     'error': None,
                     'metrics_before': None,
@@ -132,6 +154,7 @@ class AutoTuner:
                     'parameter': data['parameter'],
                     'current_value': data['current_value'],
                     'new_value': data['new_value'],
+                    'targets': data.get('targets'),
                     'success': False,
                     'error': None,
                     'metrics_before': None,
@@ -141,7 +164,7 @@ class AutoTuner:
                 
             # Get metrics before applying the change
             metrics_service = await SimplifiedMetricsService.get_instance()
-            metrics_before = await metrics_service.get_metrics()
+            metrics_before = metrics if metrics is not None else await metrics_service.get_metrics()
             tuning_data['metrics_before'] = metrics_before
             
             # Check if we have permission to modify this parameter
@@ -156,72 +179,40 @@ class AutoTuner:
                     await self._save_tuning_history_to_db(tuning_data, user_id)
                 return tuning_data
             
+            # Fill in the real current value when the caller didn't know it
+            if tuning_data['current_value'] in (None, '', 'current'):
+                tuning_data['current_value'] = self.state.current_value(parameter, tuning_data['targets'])
+            
             # Apply the tuning action based on the parameter
             new_value = tuning_data['new_value']
             
-            if parameter == TuningParameter.CPU_GOVERNOR.value:
-                # Set CPU governor
-                cmd = f"echo {new_value} | sudo tee /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied CPU governor: {new_value}")
-                
-            elif parameter == TuningParameter.NETWORK_BUFFER.value:
-                # Set network buffer size
-                cmd = f"sudo sysctl -w net.core.rmem_max={new_value} net.core.wmem_max={new_value}"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied network buffer: {new_value}")
-                
-            elif parameter == TuningParameter.DISK_READ_AHEAD.value:
-                # Set disk read-ahead buffer
-                cmd = f"sudo blockdev --setra {new_value} /dev/sda"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied disk read-ahead: {new_value}")
-                
-            elif parameter == TuningParameter.IO_SCHEDULER.value:
-                # Set I/O scheduler
-                cmd = f"echo {new_value} | sudo tee /sys/block/sda/queue/scheduler"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied I/O scheduler: {new_value}")
-                
-            elif parameter == TuningParameter.SWAP_TENDENCY.value:
-                # Set swap tendency (vm.swappiness)
-                cmd = f"sudo sysctl -w vm.swappiness={new_value}"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied swap tendency: {new_value}")
-                
-            elif parameter == TuningParameter.CACHE_PRESSURE.value:
-                # Set cache pressure (vm.vfs_cache_pressure)
-                cmd = f"sudo sysctl -w vm.vfs_cache_pressure={new_value}"
-                subprocess.run(cmd, shell=True, check=True)
-                self.logger.info(f"Applied cache pressure: {new_value}")
-                
-            elif parameter == TuningParameter.MEMORY_PRESSURE.value:
-                # This is more complex, as it's not a direct sysctl parameter
-                # For demonstration, we'll adjust the min_free_kbytes
-                if new_value == "high":
-                    value = "65536"  # 64MB
-                elif new_value == "critical":
-                    value = "131072"  # 128MB
-                else:
-                    value = "32768"  # 32MB (normal)
-                metrics_after = await self.get_current_metrics()
-                
-                # Update active tunings
-                self.active_tunings[tuning_data['parameter']] = tuning_data
+            # Writing the value already in force changes nothing; skip it
+            # Backend parameters are checked on every file the backend would write
+            checker = self.backend if self.backend.supports(parameter) else self.state
+            if 'process_id' not in tuning_data and checker.is_noop(parameter, new_value, tuning_data['targets'] or None):
+                self.logger.info(f"Skipping no-op tuning: {parameter} is already {new_value}")
+                tuning_data['success'] = True
+                tuning_data['noop'] = True
+                tuning_data['metrics_after'] = metrics_before
                 self.tuning_history.append(tuning_data)
-                
-                return {
-                    'success': True,
-                    'metrics_before': metrics_before,
-                    'metrics_after': metrics_after,
-                    'action': tuning_data
-                }
-            elif parameter == TuningParameter.PROCESS_PRIORITY.value:
+                return tuning_data
+            
+            if parameter == TuningParameter.PROCESS_PRIORITY.value:
                 # Set process priority (nice value)
                 pid = int(tuning_data.get('process_id', os.getpid()))
-                cmd = f"sudo renice {new_value} -p {pid}"
-                subprocess.run(cmd, shell=True, check=True)
+                os.setpriority(os.PRIO_PROCESS, pid, int(new_value))
                 self.logger.info(f"Applied process priority: {new_value} to PID {pid}")
+                
+            elif parameter in {p.value for p in TuningParameter}:
+                # Write straight to the sysfs/procfs files behind the parameter,
+                # on every discovered CPU, block device or interface unless targets are given
+                result = self.backend.apply({parameter: new_value}, targets={parameter: tuning_data['targets']} if tuning_data.get('targets') else None)
+                tuning_data['writes'] = result.to_dict()
+                if not result.success:
+                    # Don't leave some devices changed and others not
+                    self.backend.revert(result.applied)
+                    raise RuntimeError("; ".join(f"{path}: {error}" for path, error in result.failed.items()))
+                self.logger.info(f"Applied {parameter}: {new_value} ({len(result.applied)} writes)")
             else:
                 tuning_data['error'] = f"Unknown parameter: {parameter}"
                 tuning_data['success'] = False
@@ -235,10 +226,14 @@ class AutoTuner:
             
             # If we got here, the tuning was successful
             tuning_data['success'] = True
+            self.state.invalidate()
+            if 'process_id' not in tuning_data and not tuning_data.get('targets'):
+                # Lets the rule engine put the old value back once its rule clears
+                self.engine.record_applied(parameter, tuning_data['current_value'], new_value)
             
             # Get metrics after applying the change
-            metrics_after = await metrics_service.get_metrics(force_refresh=True)
-            tuning_data['metrics_after'] = metrics_after
+            if metrics is None:
+                tuning_data['metrics_after'] = await metrics_service.get_metrics(force_refresh=True)
             
             # Update active tunings
             self.active_tunings[tuning_data['parameter']] = tuning_data
@@ -269,6 +264,96 @@ class AutoTuner:
                 from app.optimization.auto_tuner_db_helpers import save_tuning_history_to_db
                 await save_tuning_history_to_db(tuning_data, user_id)
             
+            return tuning_data
+            
+    async def apply_profile(self, profile_settings: Dict, user_id: str = None, name: str = None) -> Dict:
+        """Apply a profile's settings as one transaction
+        
+        Only settings that differ from the current kernel state are written,
+        independent resources in parallel, and everything is rolled back if
+        any write fails. Metrics are taken once before and once after.
+        
+        Args:
+            profile_settings: The profile's settings dictionary
+            user_id: ID of the user applying the profile
+            name: Profile name, for the history reason
+            
+        Returns:
+            Transaction summary: status, changes, unchanged, ignored, failed
+        """
+        from app.optimization.profile_compiler import ProfileCompiler
+        compiler = ProfileCompiler(self.backend)
+        plan = compiler.compile(profile_settings)
+        
+        previous = {parameter: self.state.current_value(parameter) for parameter in plan.parameters}
+        metrics_service = await SimplifiedMetricsService.get_instance()
+        metrics_before = await metrics_service.get_metrics() if plan.changes else None
+        transaction = await compiler.apply(plan)
+        metrics_after = await metrics_service.get_metrics(force_refresh=True) if plan.changes else None
+        transaction['metrics_before'] = metrics_before
+        transaction['metrics_after'] = metrics_after
+        
+        # One history record per changed parameter, sharing the metrics window
+        for parameter in plan.parameters:
+            tuning_data = {
+                'parameter': parameter,
+                'current_value': previous[parameter],
+                'new_value': plan.requested[parameter],
+                'reason': f"Applied from profile: {name}" if name else "Applied from profile",
+                'success': transaction['status'] == 'applied',
+                'error': None if transaction['status'] == 'applied' else f"Profile transaction {transaction['status']}",
+                'metrics_before': metrics_before,
+                'metrics_after': metrics_after,
+                'timestamp': datetime.now().isoformat()
+            }
+            if tuning_data['success']:
+                self.active_tunings[parameter] = tuning_data
+            self.tuning_history.append(tuning_data)
+            if user_id:
+                from app.optimization.auto_tuner_db_helpers import save_tuning_history_to_db
+                await save_tuning_history_to_db(tuning_data, user_id)
+        
+        return transaction
+            
+    async def run_experiment(self, data, user_id: str = None, **options) -> Dict:
+        """Apply a tuning as a closed-loop experiment, reverting it on regression
+
+        Args:
+            data: Tuning parameters or a TuningAction, as for apply_tuning
+            user_id: ID of the user; the outcome is stored in TuningHistory
+            options: Overrides for TuningExperiment (window_seconds, alpha, ...)
+
+        Returns:
+            The tuning record with verdict, reverted and effect_sizes
+        """
+        from app.optimization.tuning_experiment import TuningExperiment
+        return await TuningExperiment(self, **options).run(data, user_id=user_id)
+
+    async def run_benchmark(self, data, user_id: str = None, workloads: Optional[List[str]] = None,
+                            options: Optional[Dict[str, Dict[str, Any]]] = None,
+                            repeats: Optional[int] = None, **experiment_options) -> Dict:
+        """Apply a tuning judged by micro-benchmark scores before and after
+
+        Args:
+            data: Tuning parameters or a TuningAction, as for apply_tuning
+            user_id: ID of the user; scores and verdict are stored in TuningHistory
+            workloads: Benchmark workloads to run ('cpu', 'memory', 'file_io', 'tcp'); default all
+            options: Per-workload overrides, e.g. {'file_io': {'block_size': 4096, 'sync': 'fsync'}}
+            repeats: Suite runs on each side of the change
+
+        Returns:
+            The tuning record with verdict, reverted, effect_sizes and benchmark_scores
+        """
+        from app.core.config import settings
+        from app.optimization.benchmarks import BenchmarkSuite
+        from app.optimization.tuning_experiment import TuningExperiment
+        suite = BenchmarkSuite(workloads, options)
+        experiment = TuningExperiment(
+            self, benchmark=suite, samples=settings.BENCHMARK_REPEATS if repeats is None else repeats,
+            **{'sample_interval': 0, **experiment_options}
+        )
+        return await experiment.run(data, user_id=user_id)
+
     async def get_tuning_recommendations(self):
         """Get tuning recommendations based on current metrics"""
         try:
@@ -276,15 +361,13 @@ class AutoTuner:
             if not self._initialized:
                 await self._initialize_system_state()
                 
-            # Get current metrics
-            metrics = await self.get_current_metrics()
-            
-            if not metrics:
-                self.logger.error("Failed to get current metrics")
-                return []
-                
-            # Log the metrics we're using for recommendations
-            self.logger.info(f"Generating recommendations based on metrics")
+            # The engine is fed by every metrics collection; only collect when
+            # nothing recent has come through (e.g. no dashboard is open)
+            if self.engine.needs_sample():
+                metrics = await self.get_current_metrics()
+                if not metrics:
+                    self.logger.error("Failed to get current metrics")
+                    return []
             
             # Current time for all recommendations
             current_time = datetime.now()
@@ -292,139 +375,27 @@ class AutoTuner:
             # List to store recommendations
             recommendations = []
             
-            # Extract metrics with default fallbacks
-            cpu_usage = metrics.get('cpu', {}).get('usage', 0)
-            memory_usage = metrics.get('memory', {}).get('percent', 0)
-            disk_usage = metrics.get('disk', {}).get('percent', 0)
-            network_usage = metrics.get('network', {}).get('usage_percent', 0)
-            process_count = len(metrics.get('processes', []))
-            
-            # Log the extracted metrics
-            self.logger.info(f"Using metrics - CPU: {cpu_usage}%, Memory: {memory_usage}%, Disk: {disk_usage}%, Network: {network_usage}%, Processes: {process_count}")
-            
-            # CPU Governor Recommendations
-            if cpu_usage > 80:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.CPU_GOVERNOR,
-                    current_value='ondemand',
-                    new_value='performance',
-                    confidence=0.85,
-                    impact_score=0.7,
-                    timestamp=current_time,
-                    reason="High CPU usage - switching to performance governor"
-                ))
-            elif cpu_usage < 20:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.CPU_GOVERNOR,
-                    current_value='ondemand',
-                    new_value='powersave',
-                    confidence=0.75,
-                    impact_score=0.5,
-                    timestamp=current_time,
-                    reason="Low CPU usage - switching to powersave governor"
-                ))
-
-            # Memory Management
-            if memory_usage > 75:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.MEMORY_PRESSURE,
-                    current_value='normal',
-                    new_value='aggressive',
-                    confidence=0.80,
-                    impact_score=0.6,
-                    timestamp=current_time,
-                    reason="High memory usage - increasing memory pressure"
-                ))
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.SWAP_TENDENCY,
-                    current_value='60',
-                    new_value='40',
-                    confidence=0.75,
-                    impact_score=0.5,
-                    timestamp=current_time,
-                    reason="High memory usage - adjusting swap tendency"
-                ))
-
-            # I/O Scheduler Recommendations
-            if metrics.get('disk_usage', 0) > 70:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.IO_SCHEDULER,
-                    current_value='cfq',
-                    new_value='deadline',
-                    confidence=0.70,
-                    impact_score=0.6,
-                    timestamp=current_time,
-                    reason="High disk usage - optimizing I/O scheduler"
-                ))
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.DISK_READ_AHEAD,
-                    current_value='256',
-                    new_value='512',
-                    confidence=0.65,
-                    impact_score=0.4,
-                    timestamp=current_time,
-                    reason="High disk usage - increasing read-ahead buffer"
-                ))
-
-            # Process Priority Adjustments
-            if cpu_usage > 60 and process_count > 100:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.PROCESS_PRIORITY,
-                    current_value='0',
-                    new_value='-5',
-                    confidence=0.75,
-                    impact_score=0.5,
-                    timestamp=current_time,
-                    reason="High process count - adjusting process priorities"
-                ))
-
-            # Cache Pressure
-            if memory_usage > 60 and disk_usage > 50:
+            # Per-device, per-interface and per-package recommendations, each
+            # driven by that device's own statistics (CPU governor, I/O
+            # scheduler, read-ahead, queue depth, NIC queues), followed by the
+            # rules over smoothed system-wide signals
+            for advice in self.advisor.recommend() + self.engine.recommendations():
                 recommendations.append(TuningAction(
-                    parameter=TuningParameter.CACHE_PRESSURE,
-                    current_value='100',
-                    new_value='150',
-                    confidence=0.70,
-                    impact_score=0.4,
+                    parameter=TuningParameter(advice['parameter']),
+                    current_value=advice['current_value'],
+                    new_value=advice['new_value'],
+                    confidence=advice['confidence'],
+                    impact_score=advice['impact_score'],
                     timestamp=current_time,
-                    reason="High memory and disk usage - adjusting cache pressure"
+                    reason=advice['reason'],
+                    targets=advice['targets']
                 ))
 
-            # Network Buffer Optimization
-            if network_usage > 70:
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.NETWORK_BUFFER,
-                    current_value='256',
-                    new_value='512',
-                    confidence=0.65,
-                    impact_score=0.4,
-                    timestamp=current_time,
-                    reason="High network usage - increasing network buffer"
-                ))
-
-            # Combined Conditions
-            if (cpu_usage > 70 and 
-                memory_usage > 70 and 
-                disk_usage > 70):
-                # System under heavy load - aggressive optimization
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.PROCESS_PRIORITY,
-                    current_value='0',
-                    new_value='-10',
-                    confidence=0.90,
-                    impact_score=0.8,
-                    timestamp=current_time,
-                    reason="System under heavy load - aggressive process priority adjustment"
-                ))
-                recommendations.append(TuningAction(
-                    parameter=TuningParameter.MEMORY_PRESSURE,
-                    current_value='normal',
-                    new_value='critical',
-                    confidence=0.85,
-                    impact_score=0.7,
-                    timestamp=current_time,
-                    reason="System under heavy load - critical memory pressure"
-                ))
+            # Drop recommendations that would write the value already in force
+            recommendations = [
+                rec for rec in recommendations
+                if str(rec.current_value) != str(rec.new_value)
+            ]
 
             # Sort recommendations by confidence and impact
             recommendations.sort(
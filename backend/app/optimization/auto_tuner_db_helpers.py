@@ -4,6 +4,7 @@ from datetime import datetime
 from sqlalchemy.future import select
 from app.models.tuning_history import TuningHistory
 from app.core.database import SessionLocal, AsyncSessionLocal
+from app.services.storage.snapshot_dedup import get_snapshot_deduplicator
 
 logger = logging.getLogger('WebAutoTuner')
 
@@ -26,6 +27,11 @@ async def save_tuning_history_to_db(tuning_data: Dict, user_id: str) -> None:
             user_id_int = 1
         
         async with AsyncSessionLocal() as db:
+            # Static snapshot sections are stored once as shared blobs
+            deduplicator = get_snapshot_deduplicator()
+            metrics_before = await deduplicator.store(db, tuning_data.get('metrics_before'))
+            metrics_after = await deduplicator.store(db, tuning_data.get('metrics_after'))
+            
             db_tuning = TuningHistory(
                 user_id=user_id_int,
                 parameter=tuning_data['parameter'],
@@ -33,8 +39,12 @@ async def save_tuning_history_to_db(tuning_data: Dict, user_id: str) -> None:
                 new_value=str(tuning_data['new_value']),
                 success=bool(tuning_data.get('success', False)),
                 error=str(tuning_data.get('error', '')) if tuning_data.get('error') else None,
-                metrics_before=tuning_data.get('metrics_before'),
-                metrics_after=tuning_data.get('metrics_after')
+                metrics_before=metrics_before,
+                metrics_after=metrics_after,
+                verdict=tuning_data.get('verdict'),
+                reverted=bool(tuning_data.get('reverted', False)),
+                effect_sizes=tuning_data.get('effect_sizes'),
+                benchmark_scores=tuning_data.get('benchmark_scores')
             )
             db.add(db_tuning)
             await db.commit()
@@ -75,8 +85,14 @@ async def get_tuning_history_from_db(user_id: Optional[str] = None, limit: int =
             result = await db.execute(query)
             tuning_history = result.scalars().all()
             
+            # Expand blob references for every snapshot with a single blob lookup
+            snapshots = await get_snapshot_deduplicator().expand_many(
+                db,
+                [s for record in tuning_history for s in (record.metrics_before, record.metrics_after)]
+            )
+            
             history_dicts = []
-            for record in tuning_history:
+            for index, record in enumerate(tuning_history):
                 try:
                     # Create dictionary directly from record attributes to avoid greenlet_spawn errors
                     history_dict = {
@@ -87,9 +103,13 @@ async def get_tuning_history_from_db(user_id: Optional[str] = None, limit: int =
                         "new_value": record.new_value,
                         "success": record.success,
                         "error": record.error,
-                        "metrics_before": record.metrics_before,
-                        "metrics_after": record.metrics_after,
-                        "timestamp": record.timestamp.isoformat() if record.timestamp else None
+                        "metrics_before": snapshots[2 * index],
+                        "metrics_after": snapshots[2 * index + 1],
+                        "timestamp": record.timestamp.isoformat() if record.timestamp else None,
+                        "verdict": record.verdict,
+                        "reverted": record.reverted,
+                        "effect_sizes": record.effect_sizes,
+                        "benchmark_scores": record.benchmark_scores
                     }
                     history_dicts.append(history_dict)
                 except Exception as e:
@@ -0,0 +1,259 @@
+# core/optimization/benchmarks.py
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.core.config import settings
+
+MIB = 1024 * 1024
+
+# How file_io makes writes durable: not until the end, fsync() after every
+# block, or O_DSYNC so each write() returns only once the data is on disk
+SYNC_MODES = ('none', 'fsync', 'dsync')
+
+
+def cpu_loop(duration: float = 0.5) -> Dict[str, float]:
+    """Integer arithmetic in a tight interpreter loop"""
+    ops, x = 0, 1
+    started = time.perf_counter()
+    deadline = started + duration
+    while True:
+        for _ in range(10000):
+            x = (x * 1103515245 + 12345) & 0x7fffffff
+        ops += 10000
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+    return {'cpu_ops_per_s': ops / (now - started)}
+
+
+def memory_bandwidth(size_mb: int = 64, copies: int = 8) -> Dict[str, float]:
+    """Copy a buffer far larger than the caches; each copy reads and writes it once"""
+    source = np.ones(size_mb * MIB // 8, dtype=np.float64)
+    target = np.empty_like(source)
+    np.copyto(target, source)  # fault the pages in before timing
+    started = time.perf_counter()
+    for _ in range(copies):
+        np.copyto(target, source)
+    elapsed = time.perf_counter() - started
+    return {'memory_copy_mb_per_s': 2 * size_mb * copies / elapsed}
+
+
+def file_io(size_mb: int = 32, block_size: int = 64 * 1024, sync: str = 'none',
+            directory: Optional[str] = None) -> Dict[str, float]:
+    """Sequential write then read of a temporary file in `block_size` blocks"""
+    if sync not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode {sync!r}; expected one of {', '.join(SYNC_MODES)}")
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+    block = os.urandom(block_size)
+    count = max(1, size_mb * MIB // block_size)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    if sync == 'dsync':
+        flags |= os.O_DSYNC
+
+    handle, path = tempfile.mkstemp(prefix='system-rebellion-bench-', dir=directory)
+    os.close(handle)
+    try:
+        fd = os.open(path, flags)
+        latencies = []
+        try:
+            started = time.perf_counter()
+            for _ in range(count):
+                began = time.perf_counter()
+                os.write(fd, block)
+                if sync == 'fsync':
+                    os.fsync(fd)
+                latencies.append(time.perf_counter() - began)
+            # Every mode ends with the whole file on disk, so scores compare
+            os.fsync(fd)
+            write_elapsed = time.perf_counter() - started
+            if hasattr(os, 'posix_fadvise'):
+                # Read back from the device rather than the page cache where we can
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            started = time.perf_counter()
+            while os.read(fd, block_size):
+                pass
+            read_elapsed = time.perf_counter() - started
+        finally:
+            os.close(fd)
+    finally:
+        os.unlink(path)
+
+    written_mb = count * block_size / MIB
+    return {
+        'file_write_mb_per_s': written_mb / write_elapsed,
+        'file_read_mb_per_s': written_mb / read_elapsed,
+        'file_write_latency_ms': 1000 * sum(latencies) / len(latencies)
+    }
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = connection.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Loopback peer closed the connection")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def tcp_loopback(size_mb: int = 32, message_size: int = 64 * 1024, pings: int = 200) -> Dict[str, float]:
+    """Bulk transfer then one-byte ping-pongs over a TCP connection to 127.0.0.1"""
+    total = size_mb * MIB
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    listener.settimeout(10)
+    errors: List[BaseException] = []
+
+    def serve():
+        try:
+            connection, _ = listener.accept()
+            with connection:
+                connection.settimeout(10)
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                received = 0
+                while received < total:
+                    chunk = connection.recv(1024 * 1024)
+                    if not chunk:
+                        return
+                    received += len(chunk)
+                connection.sendall(b'k')
+                for _ in range(pings):
+                    connection.sendall(_receive_exactly(connection, 1))
+        except OSError as e:
+            errors.append(e)
+
+    server = threading.Thread(target=serve, name='benchmark-tcp-server', daemon=True)
+    server.start()
+    try:
+        with socket.create_connection(listener.getsockname(), timeout=10) as client:
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            message = b'\0' * message_size
+            started = time.perf_counter()
+            sent = 0
+            while sent < total:
+                part = message[:total - sent]
+                client.sendall(part)
+                sent += len(part)
+            _receive_exactly(client, 1)
+            throughput_elapsed = time.perf_counter() - started
+
+            round_trips = []
+            for _ in range(pings):
+                began = time.perf_counter()
+                client.sendall(b'p')
+                _receive_exactly(client, 1)
+                round_trips.append(time.perf_counter() - began)
+    finally:
+        server.join(timeout=10)
+        listener.close()
+    if errors:
+        raise errors[0]
+    return {
+        'tcp_throughput_mb_per_s': size_mb / throughput_elapsed,
+        'tcp_rtt_us': 1e6 * statistics.median(round_trips) if round_trips else 0.0
+    }
+
+
+# Workload name -> (function, default options, score -> which direction is better)
+WORKLOADS: Dict[str, Tuple[Callable[..., Dict[str, float]], Dict[str, Any], Dict[str, str]]] = {
+    'cpu': (cpu_loop, {'duration': 0.5}, {'cpu_ops_per_s': 'higher'}),
+    'memory': (memory_bandwidth, {'size_mb': 64, 'copies': 8}, {'memory_copy_mb_per_s': 'higher'}),
+    'file_io': (file_io, {'size_mb': 32, 'block_size': 64 * 1024, 'sync': 'none'}, {
+        'file_write_mb_per_s': 'higher',
+        'file_read_mb_per_s': 'higher',
+        'file_write_latency_ms': 'lower'
+    }),
+    'tcp': (tcp_loopback, {'size_mb': 32, 'message_size': 64 * 1024, 'pings': 200}, {
+        'tcp_throughput_mb_per_s': 'higher',
+        'tcp_rtt_us': 'lower'
+    })
+}
+
+
+class BenchmarkSuite:
+    """
+    Sir Hawkington's Proving Grounds
+
+    A fixed, local workload to judge tunings by, instead of whatever the
+    machine happens to be doing: a CPU-bound interpreter loop, a memory
+    copy larger than the caches, sequential file I/O on a temporary file
+    with a chosen block size and sync mode, and a loopback TCP bulk
+    transfer plus ping-pong latency.
+
+    sample() runs each selected workload once, one after another so they
+    don't compete, and returns their scores. It is a drop-in sampler for
+    TuningExperiment, whose repeated samples before and after a change
+    give the comparison its statistics.
+    """
+
+    def __init__(self,
+                 workloads: Optional[Sequence[str]] = None,
+                 options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 directory: Optional[str] = None):
+        self.logger = logging.getLogger('BenchmarkSuite')
+        self.workloads = list(workloads or WORKLOADS)
+        unknown = [name for name in self.workloads if name not in WORKLOADS]
+        if unknown:
+            raise ValueError(f"Unknown benchmark workloads: {', '.join(unknown)}")
+        options = options or {}
+        self.options = {name: {**WORKLOADS[name][1], **options.get(name, {})} for name in self.workloads}
+        if 'file_io' in self.options:
+            self.options['file_io'].setdefault('directory', directory or settings.BENCHMARK_DIRECTORY or None)
+            if self.options['file_io']['sync'] not in SYNC_MODES:
+                raise ValueError(f"Unknown sync mode {self.options['file_io']['sync']!r}")
+            if self.options['file_io']['block_size'] <= 0:
+                raise ValueError("block_size must be positive")
+
+    @property
+    def objectives(self) -> Dict[str, str]:
+        return {score: direction for name in self.workloads for score, direction in WORKLOADS[name][2].items()}
+
+    def describe(self) -> Dict[str, Any]:
+        return {'workloads': list(self.workloads), 'options': self.options}
+
+    async def sample(self) -> Dict[str, float]:
+        """One run of every workload"""
+        scores: Dict[str, float] = {}
+        for name in self.workloads:
+            function = WORKLOADS[name][0]
+            scores.update(await asyncio.to_thread(function, **self.options[name]))
+        return scores
+
+    async def run(self, repeats: Optional[int] = None) -> Dict[str, Any]:
+        """Scores over several runs, for a standalone measurement"""
+        repeats = settings.BENCHMARK_REPEATS if repeats is None else repeats
+        samples: Dict[str, List[float]] = {}
+        for _ in range(max(1, repeats)):
+            for score, value in (await self.sample()).items():
+                samples.setdefault(score, []).append(value)
+        return {
+            **self.describe(),
+            'repeats': max(1, repeats),
+            'scores': {
+                score: {
+                    'mean': statistics.fmean(values),
+                    'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+                    'better': self.objectives[score],
+                    'samples': values
+                }
+                for score, values in samples.items()
+            }
+        }
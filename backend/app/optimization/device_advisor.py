@@ -0,0 +1,279 @@
+# core/optimization/device_advisor.py
+
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import time
+
+from app.core.config import settings
+from app.optimization.tunable_state import TunableStateReader, get_tunable_state_reader
+
+# /sys/block/<dev>/stat columns we use
+_READS, _READ_MERGES, _READ_SECTORS, _WRITES = 0, 1, 2, 4
+_WRITE_SECTORS, _IO_TICKS, _QUEUE_TIME = 6, 9, 10
+
+# Schedulers that suit each kind of device, best first
+SCHEDULER_PREFERENCES = {
+    'nvme': ('none',),
+    'ssd': ('none', 'mq-deadline'),
+    'hdd': ('mq-deadline', 'bfq')
+}
+
+# Read-ahead in 512-byte sectors for sequential and random read patterns
+SEQUENTIAL_READ_AHEAD = {'nvme': 1024, 'ssd': 1024, 'hdd': 4096}
+RANDOM_READ_AHEAD = {'nvme': 64, 'ssd': 64, 'hdd': 256}
+
+MAX_NR_REQUESTS = 1024
+
+
+class DeviceStatsTracker:
+    """
+    Per-device rates from the kernel's cumulative counters
+
+    Each sample() diffs /sys/block/*/stat, /sys/class/net/*/statistics and
+    the per-CPU lines of /proc/stat against the previous sample. The first
+    sample is measured against boot, using /proc/uptime, so rates are
+    available straight away. Samples closer together than `min_interval`
+    return the last rates, so a burst of calls can't shrink the window to a
+    momentary spike.
+    """
+
+    def __init__(self, root: str = '/', reader: Optional[TunableStateReader] = None, min_interval: float = 0.0):
+        self.root = root
+        self.reader = reader or get_tunable_state_reader()
+        self.min_interval = min_interval
+        self._previous: Optional[Dict[str, Any]] = None
+        self.rates: Dict[str, Dict[str, Dict[str, float]]] = {'block': {}, 'net': {}, 'cpu': {}}
+
+    def _read(self, relative: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, relative)) as handle:
+                return handle.read()
+        except OSError:
+            return None
+
+    def _counters(self) -> Dict[str, Any]:
+        block = {}
+        for device in self.reader.block_devices():
+            text = self._read(f'sys/block/{device}/stat')
+            if text:
+                block[device] = [int(field) for field in text.split()]
+
+        net = {}
+        for interface in self.reader.network_interfaces():
+            counters = {}
+            for name in ('rx_packets', 'rx_bytes', 'tx_packets', 'tx_dropped'):
+                text = self._read(f'sys/class/net/{interface}/statistics/{name}')
+                counters[name] = int(text) if text and text.strip().isdigit() else 0
+            net[interface] = counters
+
+        cpu = {}
+        for line in (self._read('proc/stat') or '').splitlines():
+            fields = line.split()
+            if fields and fields[0].startswith('cpu') and fields[0] != 'cpu':
+                ticks = [int(value) for value in fields[1:9]]
+                # idle + iowait are not busy time
+                cpu[fields[0]] = (sum(ticks) - ticks[3] - ticks[4], sum(ticks))
+        return {'block': block, 'net': net, 'cpu': cpu}
+
+    def _uptime(self) -> float:
+        text = self._read('proc/uptime')
+        try:
+            return float(text.split()[0]) if text else 0.0
+        except ValueError:
+            return 0.0
+
+    def sample(self, now: Optional[float] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        now = time.monotonic() if now is None else now
+        if self._previous is not None and now - self._previous['time'] < self.min_interval:
+            return self.rates
+        counters = self._counters()
+        if self._previous is None:
+            elapsed = self._uptime()
+            previous = {'block': {}, 'net': {}, 'cpu': {}}
+        else:
+            elapsed = now - self._previous['time']
+            previous = self._previous['counters']
+        self._previous = {'time': now, 'counters': counters}
+        if elapsed <= 0:
+            return self.rates
+
+        block = {}
+        for device, stat in counters['block'].items():
+            before = previous['block'].get(device, [0] * len(stat))
+            delta = [a - b for a, b in zip(stat, before)]
+            reads, writes = delta[_READS], delta[_WRITES]
+            block[device] = {
+                'reads_per_s': reads / elapsed,
+                'writes_per_s': writes / elapsed,
+                'read_kb_per_s': delta[_READ_SECTORS] / 2 / elapsed,
+                'write_kb_per_s': delta[_WRITE_SECTORS] / 2 / elapsed,
+                'avg_read_kb': delta[_READ_SECTORS] / 2 / reads if reads else 0.0,
+                # Merged reads mean the requests were adjacent: a sequential pattern
+                'read_merge_ratio': delta[_READ_MERGES] / (reads + delta[_READ_MERGES]) if reads else 0.0,
+                'utilisation': min(1.0, delta[_IO_TICKS] / 1000 / elapsed),
+                'queue_depth': delta[_QUEUE_TIME] / 1000 / elapsed
+            }
+
+        net = {}
+        for interface, stats in counters['net'].items():
+            before = previous['net'].get(interface, {})
+            net[interface] = {
+                f'{name}_per_s': (value - before.get(name, 0)) / elapsed
+                for name, value in stats.items()
+            }
+
+        cpu = {}
+        for name, (busy, total) in counters['cpu'].items():
+            busy_before, total_before = previous['cpu'].get(name, (0, 0))
+            span = total - total_before
+            cpu[name] = {'utilisation': (busy - busy_before) / span if span > 0 else 0.0}
+
+        self.rates = {'block': block, 'net': net, 'cpu': cpu}
+        return self.rates
+
+
+class DeviceAdvisor:
+    """
+    Sir Hawkington's Bespoke Tailor
+
+    Recommends tunings per block device, per network interface and per CPU
+    package from each one's own statistics, instead of one setting for a
+    machine imagined as a single disk and a single governor. An NVMe drive
+    and a spinning disk in the same host get different schedulers and
+    read-ahead; a busy package can run the performance governor while an
+    idle one saves power.
+
+    Recommendations are dicts with TuningAction's fields plus `targets`.
+    """
+
+    def __init__(self, reader: Optional[TunableStateReader] = None, tracker: Optional[DeviceStatsTracker] = None):
+        self.logger = logging.getLogger('DeviceAdvisor')
+        self.reader = reader or get_tunable_state_reader()
+        self.tracker = tracker or DeviceStatsTracker(root=self.reader.root, reader=self.reader)
+
+    def recommend(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        rates = self.tracker.sample(now)
+        state = self.reader.snapshot()
+        recommendations: List[Dict[str, Any]] = []
+        for device, info in state['block'].items():
+            if device in rates['block']:
+                recommendations.extend(self._block(device, info, rates['block'][device]))
+        cpu_count = len(self.reader.online_cpus())
+        for interface, info in state['net'].items():
+            if interface in rates['net']:
+                recommendations.extend(self._network(interface, info, rates['net'][interface], cpu_count))
+        recommendations.extend(self._cpu_groups(state['cpu'], rates['cpu']))
+        return recommendations
+
+    @staticmethod
+    def _action(parameter: str, target: str, current: Any, new: Any,
+                confidence: float, impact: float, reason: str) -> Dict[str, Any]:
+        return {
+            'parameter': parameter,
+            'targets': [target],
+            'current_value': None if current is None else str(current),
+            'new_value': str(new),
+            'confidence': confidence,
+            'impact_score': impact,
+            'reason': reason
+        }
+
+    def _block(self, device: str, info: Dict[str, Any], rates: Dict[str, float]) -> List[Dict[str, Any]]:
+        kind = info['kind']
+        if kind is None or rates['reads_per_s'] + rates['writes_per_s'] <= 0:
+            return []
+        actions = []
+
+        preferred = [s for s in SCHEDULER_PREFERENCES[kind] if s in info['available_schedulers']]
+        if preferred and info['scheduler'] not in preferred:
+            actions.append(self._action(
+                'io_scheduler', device, info['scheduler'], preferred[0],
+                0.8, 0.3 + 0.4 * rates['utilisation'],
+                f"{device} is {kind.upper()} - {preferred[0]} scheduler suits it better than {info['scheduler']}"
+            ))
+
+        read_ahead = None if info['read_ahead_kb'] is None else info['read_ahead_kb'] * 2
+        if read_ahead is not None and rates['read_kb_per_s'] >= 1024:
+            if rates['avg_read_kb'] >= 64 or rates['read_merge_ratio'] >= 0.5:
+                target, pattern = SEQUENTIAL_READ_AHEAD[kind], 'sequential'
+            elif rates['avg_read_kb'] <= 16 and rates['read_merge_ratio'] < 0.1:
+                target, pattern = RANDOM_READ_AHEAD[kind], 'random'
+            else:
+                target = None
+            # Only worth changing when at least a factor of two off
+            if target and not (target / 2 < read_ahead < target * 2):
+                actions.append(self._action(
+                    'disk_read_ahead', device, read_ahead, target, 0.7, 0.4,
+                    f"{device} reads are mostly {pattern} ({rates['avg_read_kb']:.0f} KiB average) - "
+                    f"read-ahead {read_ahead} -> {target} sectors"
+                ))
+
+        nr_requests = info['nr_requests']
+        if (nr_requests and nr_requests < MAX_NR_REQUESTS and rates['utilisation'] >= 0.5
+                and rates['queue_depth'] >= 0.75 * nr_requests):
+            actions.append(self._action(
+                'nr_requests', device, nr_requests, min(MAX_NR_REQUESTS, nr_requests * 2), 0.65, 0.4,
+                f"{device} queue is {rates['queue_depth']:.0f} deep against a limit of {nr_requests}"
+            ))
+        return actions
+
+    def _network(self, interface: str, info: Dict[str, Any], rates: Dict[str, float], cpu_count: int) -> List[Dict[str, Any]]:
+        actions = []
+        steering_off = all(int((mask or '0').replace(',', ''), 16) == 0 for mask in info['rps_cpus'])
+        if info['rx_queues'] == 1 and cpu_count > 1 and steering_off and rates['rx_packets_per_s'] >= 10000:
+            mask = format((1 << cpu_count) - 1, 'x')
+            actions.append(self._action(
+                'rps_cpus', interface, '0', mask, 0.7, 0.5,
+                f"{interface} has one receive queue at {rates['rx_packets_per_s']:.0f} packets/s - "
+                f"spread receive processing across {cpu_count} CPUs"
+            ))
+        tx_queue_len = info['tx_queue_len']
+        if tx_queue_len is not None and tx_queue_len < 10000 and rates['tx_dropped_per_s'] > 0:
+            actions.append(self._action(
+                'tx_queue_len', interface, tx_queue_len, max(1000, tx_queue_len * 2), 0.7, 0.4,
+                f"{interface} is dropping {rates['tx_dropped_per_s']:.1f} packets/s on transmit"
+            ))
+        return actions
+
+    def _cpu_groups(self, cpus: Dict[str, Dict[str, Any]], rates: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
+        packages: Dict[int, List[str]] = {}
+        for cpu, info in cpus.items():
+            packages.setdefault(info['package'], []).append(cpu)
+
+        actions = []
+        for package, members in sorted(packages.items()):
+            loads = [rates[cpu]['utilisation'] for cpu in members if cpu in rates]
+            if not loads:
+                continue
+            load = sum(loads) / len(loads)
+            available = set(cpus[members[0]]['available_governors'])
+            governors = [cpus[cpu]['governor'] for cpu in members]
+            current = max(set(governors), key=governors.count)
+            if load >= 0.8:
+                choices = ('performance',)
+                reason = f"Package {package} is {load:.0%} busy - switching to performance governor"
+            elif load <= 0.2:
+                choices = ('schedutil', 'ondemand', 'powersave')
+                reason = f"Package {package} is {load:.0%} busy - switching to a power-saving governor"
+            else:
+                continue
+            choice = next((g for g in choices if not available or g in available), None)
+            if choice and choice != current and current not in choices:
+                actions.append(self._action(
+                    'cpu_governor', f'package{package}', current, choice,
+                    0.85 if load >= 0.8 else 0.75, 0.7 if load >= 0.8 else 0.5, reason
+                ))
+        return actions
+
+
+_device_advisor: Optional[DeviceAdvisor] = None
+
+def get_device_advisor() -> DeviceAdvisor:
+    """Get the process-wide device advisor; its tracker keeps the previous counters"""
+    global _device_advisor
+    if _device_advisor is None:
+        reader = get_tunable_state_reader()
+        tracker = DeviceStatsTracker(root=reader.root, reader=reader, min_interval=settings.RECOMMENDATION_WINDOW_SECONDS)
+        _device_advisor = DeviceAdvisor(reader, tracker)
+    return _device_advisor
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import logging
 from collections import defaultdict
 
+from app.optimization.periodicity import PeriodicityDetector
+
 class PatternAnalyzer:
     """
     Pattern Analyzer
@@ -21,6 +23,36 @@ class PatternAnalyzer:
         self.pattern_history = defaultdict(list)
         self.pattern_threshold = 0.75
         self.analysis_window = timedelta(hours=1)
+        # Hourly rollups per resource, scanned for daily/weekly cycles as each hour closes
+        self.periodicity = PeriodicityDetector()
+
+    # Metric keys feeding the periodicity rollups (network: sent + received bytes/s)
+    CYCLE_METRICS = {
+        'cpu': 'cpu_usage',
+        'memory': 'memory_usage',
+        'disk': 'disk_usage',
+        'network': 'network_usage'
+    }
+
+    async def seed_from_history(self, db) -> int:
+        """Prime the cycle rollups from stored metrics instead of waiting weeks of uptime"""
+        return await self.periodicity.seed_from_history(db, self.CYCLE_METRICS)
+
+    @staticmethod
+    def _cycle_value(metrics: Dict, key: str) -> Optional[float]:
+        if key == 'network_usage':
+            if 'network_sent_rate' in metrics or 'network_recv_rate' in metrics:
+                value = (metrics.get('network_sent_rate') or 0) + (metrics.get('network_recv_rate') or 0)
+            else:
+                value = metrics.get(key)
+                if isinstance(value, dict):
+                    # SystemMetrics.network_usage is {'sent_rate', 'recv_rate'}
+                    value = (value.get('sent_rate') or 0) + (value.get('recv_rate') or 0)
+        else:
+            value = metrics.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return float(value)
 
     async def analyze(self, metrics: Dict) -> List[Dict]:
         """Analyze current metrics for patterns"""
@@ -28,6 +60,8 @@ class PatternAnalyzer:
             self.logger.info(f"Starting pattern analysis with metrics: {metrics}")
             patterns = []
             
+            self._update_rollups(metrics)
+            
             # Resource usage patterns
             resource_patterns = await self._analyze_resource_patterns(metrics)
             self.logger.info(f"Resource patterns detected: {resource_patterns}")
@@ -127,6 +161,14 @@ class PatternAnalyzer:
 
         return patterns
 
+    def _update_rollups(self, metrics: Dict):
+        """Feed the hourly rollups; cycle statistics update when an hour closes"""
+        timestamp = datetime.now().timestamp()
+        for resource, key in self.CYCLE_METRICS.items():
+            value = self._cycle_value(metrics, key)
+            if value is not None:
+                self.periodicity.observe(resource, value, timestamp)
+
     def _update_pattern_history(self, patterns: List[Dict]):
         """Update pattern history for trend analysis"""
         current_time = datetime.now()
@@ -168,4 +210,18 @@ class PatternAnalyzer:
                     'first_seen': patterns[0]['timestamp'],
                     'last_seen': patterns[-1]['timestamp']
                 })
+        
+        # Daily/weekly load cycles, already computed as rollups closed
+        for cycle in self.periodicity.significant_cycles():
+            recurring.append({
+                'type': 'periodic_cycle',
+                'resource': cycle['resource'],
+                'period_hours': cycle['period_hours'],
+                'strength': cycle['strength'],
+                'phase': cycle['phase'],
+                'amplitude': cycle['amplitude'],
+                'autocorrelation': cycle['autocorrelation'],
+                'next_peak': cycle['next_peak'],
+                'occurrences': int(cycle['cycles_observed'])
+            })
         return recurring
\ No newline at end of file
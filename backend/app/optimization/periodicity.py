@@ -0,0 +1,263 @@
+# core/optimization/periodicity.py
+
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime, timedelta, timezone
+import logging
+import numpy as np
+
+class _SeriesCycles:
+    """Ring of bucket means for one metric plus sliding spectral state"""
+
+    def __init__(self, capacity: int, periods: Sequence[int]):
+        self.capacity = capacity
+        self.values = np.zeros(capacity)
+        self.indices = np.full(capacity, -1, dtype=np.int64)
+        self.count = 0
+        self.last_index: Optional[int] = None
+        self.updates = 0
+
+        self.periods = np.asarray(periods, dtype=np.float64)
+        self.omegas = 2 * np.pi / self.periods
+        self.lags = np.asarray(periods, dtype=np.int64)
+        self.total = 0.0
+        self.total_sq = 0.0
+        # sum x_t e^{-i w t} and sum e^{-i w t} over the window, per period
+        self.spectrum = np.zeros(len(periods), dtype=np.complex128)
+        self.basis = np.zeros(len(periods), dtype=np.complex128)
+        # sum x_t x_{t-lag} over in-window pairs, per period
+        self.lagged = np.zeros(len(periods))
+
+    def _value_at(self, index: int) -> Optional[float]:
+        slot = index % self.capacity
+        return float(self.values[slot]) if self.indices[slot] == index else None
+
+    def push(self, index: int, value: float):
+        slot = index % self.capacity
+        old_index = int(self.indices[slot])
+        if old_index >= 0:
+            old = float(self.values[slot])
+            self.total -= old
+            self.total_sq -= old * old
+            phase = np.exp(-1j * self.omegas * old_index)
+            self.spectrum -= old * phase
+            self.basis -= phase
+            for i, lag in enumerate(self.lags.tolist()):
+                partner = self._value_at(old_index + lag)
+                if partner is not None:
+                    self.lagged[i] -= old * partner
+            self.count -= 1
+
+        self.values[slot] = value
+        self.indices[slot] = index
+        self.total += value
+        self.total_sq += value * value
+        phase = np.exp(-1j * self.omegas * index)
+        self.spectrum += value * phase
+        self.basis += phase
+        for i, lag in enumerate(self.lags.tolist()):
+            partner = self._value_at(index - lag)
+            if partner is not None:
+                self.lagged[i] += value * partner
+        self.count += 1
+        self.last_index = index
+
+        # Re-derive the running sums once per turn of the ring to shed float drift
+        self.updates += 1
+        if self.updates % self.capacity == 0:
+            self._recompute()
+
+    def _recompute(self):
+        # Gaps are filled on insert, so the ring always holds a contiguous run of indices
+        indices = np.arange(self.last_index - self.count + 1, self.last_index + 1)
+        values = self.values[indices % self.capacity]
+        self.total = float(values.sum())
+        self.total_sq = float(np.dot(values, values))
+        phases = np.exp(-1j * np.outer(self.omegas, indices))
+        self.spectrum = phases @ values
+        self.basis = phases.sum(axis=1)
+        for i, lag in enumerate(self.lags.tolist()):
+            self.lagged[i] = float(np.dot(values[lag:], values[:-lag])) if 0 < lag < len(values) else 0.0
+
+    def cycles(self) -> List[Dict]:
+        if self.count < 2:
+            return []
+        n = self.count
+        mean = self.total / n
+        variance = max(self.total_sq / n - mean * mean, 0.0)
+        if variance <= 0:
+            return []
+
+        # Remove the mean's leakage into each bin, then read amplitude and phase
+        centred = self.spectrum - mean * self.basis
+        amplitude = 2 * np.abs(centred) / n
+        phase = np.angle(centred)
+        strength = np.minimum(amplitude ** 2 / 2 / variance, 1.0)
+
+        results = []
+        for i, period in enumerate(self.periods.tolist()):
+            lag = int(self.lags[i])
+            pairs = n - lag
+            autocorrelation = None
+            if pairs > 1:
+                autocorrelation = float((self.lagged[i] / pairs - mean * mean) / variance)
+            # x_t ~ A cos(w t + phase) peaks where w t + phase = 0 (mod 2 pi)
+            peak_index = (-phase[i] / self.omegas[i]) % period
+            results.append({
+                'period_buckets': int(period),
+                'strength': float(strength[i]),
+                'amplitude': float(amplitude[i]),
+                'phase': float(phase[i]),
+                'peak_offset_buckets': float(peak_index),
+                'mean': mean,
+                'autocorrelation': autocorrelation,
+                'coverage': n / period
+            })
+        return results
+
+
+class PeriodicityDetector:
+    """
+    Sir Hawkington's Clockwork Rhythm Sniffer
+
+    Watches bucketed (hourly by default) rollups of each metric for daily and
+    weekly cycles. Every closed bucket updates a sliding DFT bin per
+    candidate period and a running lag product for the matching
+    autocorrelation in O(1), so cycle strength, phase and next peak are
+    ready the moment a bucket closes instead of being computed on request.
+
+    Strength is the fraction of the window's variance explained by the
+    period's sinusoid; the autocorrelation at that lag confirms it.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 3600,
+        periods_hours: Sequence[int] = (24, 168),
+        history_buckets: int = 4 * 168,
+        min_strength: float = 0.3,
+        min_cycles: float = 2.0
+    ):
+        self.logger = logging.getLogger('PeriodicityDetector')
+        self.bucket_seconds = bucket_seconds
+        self.periods = [max(1, int(round(hours * 3600 / bucket_seconds))) for hours in periods_hours]
+        self.history_buckets = history_buckets
+        self.min_strength = min_strength
+        self.min_cycles = min_cycles
+
+        self._series: Dict[str, _SeriesCycles] = {}
+        # Open bucket per metric: [bucket index, sum, count]
+        self._open: Dict[str, List[float]] = {}
+        self._cycles: Dict[str, List[Dict]] = {}
+
+    def observe(self, metric: str, value: float, timestamp: Optional[float] = None):
+        """Fold a raw sample into the open bucket, closing the previous one when it rolls over"""
+        ts = datetime.now(timezone.utc).timestamp() if timestamp is None else timestamp
+        index = int(ts // self.bucket_seconds)
+        bucket = self._open.get(metric)
+        if bucket is not None and index > bucket[0]:
+            self.add_bucket(metric, int(bucket[0]), bucket[1] / bucket[2])
+            bucket = None
+        if bucket is None:
+            bucket = self._open[metric] = [index, 0.0, 0]
+        bucket[1] += float(value)
+        bucket[2] += 1
+
+    def add_bucket(self, metric: str, bucket_index: int, value: float):
+        """Feed one closed rollup bucket (index = bucket start // bucket_seconds)"""
+        series = self._series.get(metric)
+        if series is None:
+            series = self._series[metric] = _SeriesCycles(self.history_buckets, self.periods)
+        if series.last_index is not None:
+            if bucket_index <= series.last_index:
+                return  # Late or duplicate bucket
+            # Carry the last value across gaps so the time axis stays regular
+            last = series._value_at(series.last_index)
+            gap = min(bucket_index - series.last_index - 1, self.history_buckets)
+            for missing in range(bucket_index - gap, bucket_index):
+                series.push(missing, last)
+        series.push(bucket_index, float(value))
+        self._cycles[metric] = self._describe(series)
+
+    def _describe(self, series: _SeriesCycles) -> List[Dict]:
+        cycles = []
+        for cycle in series.cycles():
+            period_seconds = cycle['period_buckets'] * self.bucket_seconds
+            # Next peak on the absolute bucket axis after the latest bucket
+            period = cycle['period_buckets']
+            latest = series.last_index
+            next_peak = latest + (((cycle['peak_offset_buckets'] - latest) % period) or period)
+            cycles.append({
+                'period_hours': period_seconds / 3600,
+                'strength': round(cycle['strength'], 3),
+                'mean': cycle['mean'],
+                'amplitude': cycle['amplitude'],
+                'phase': cycle['phase'],
+                'autocorrelation': cycle['autocorrelation'],
+                'cycles_observed': round(cycle['coverage'], 2),
+                'next_peak': datetime.fromtimestamp(next_peak * self.bucket_seconds, timezone.utc)
+            })
+        return cycles
+
+    def get_cycles(self, metric: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Latest cycle description per metric (all candidate periods)"""
+        if metric is not None:
+            return {metric: self._cycles.get(metric, [])}
+        return dict(self._cycles)
+
+    async def seed_from_history(self, db, metrics: Dict[str, str], hours: Optional[int] = None) -> int:
+        """Feed hourly means of stored system_metrics rows, so cycles survive restarts
+
+        `metrics` maps detector metric names to system_metrics columns;
+        'network_usage' means sent plus received bytes/s. Only closed hours
+        are read, so live samples carry on in the open one. Requires hourly
+        buckets. Returns the number of buckets fed.
+        """
+        from sqlalchemy import func, select
+        from app.models.metrics import SystemMetrics
+
+        if self.bucket_seconds != 3600:
+            raise ValueError("Seeding from history needs hourly buckets")
+        hours = self.history_buckets if hours is None else hours
+        # Stored timestamps are naive UTC, like the column's utcnow default
+        end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(hours=hours)
+
+        if db.get_bind().dialect.name == 'sqlite':
+            hour = func.strftime('%Y-%m-%d %H:00:00', SystemMetrics.timestamp)
+        else:
+            hour = func.date_trunc('hour', SystemMetrics.timestamp)
+        network = SystemMetrics.network_usage
+        expressions = {
+            name: func.avg(
+                network['sent_rate'].as_float() + network['recv_rate'].as_float()
+                if column == 'network_usage' else getattr(SystemMetrics, column)
+            )
+            for name, column in metrics.items()
+        }
+        query = (
+            select(hour.label('hour'), *(e.label(name) for name, e in expressions.items()))
+            .where(SystemMetrics.timestamp >= start, SystemMetrics.timestamp < end)
+            .group_by(hour)
+            .order_by(hour)
+        )
+        fed = 0
+        for row in (await db.execute(query)).mappings():
+            started = row['hour']
+            if isinstance(started, str):
+                started = datetime.fromisoformat(started)
+            index = int(started.replace(tzinfo=timezone.utc).timestamp() // self.bucket_seconds)
+            for name in metrics:
+                if row[name] is not None:
+                    self.add_bucket(name, index, float(row[name]))
+                    fed += 1
+        self.logger.info(f"Seeded periodicity rollups with {fed} hourly buckets")
+        return fed
+
+    def significant_cycles(self) -> List[Dict]:
+        """Cycles strong enough, and seen often enough, to plan around"""
+        found = []
+        for metric, cycles in self._cycles.items():
+            for cycle in cycles:
+                if cycle['strength'] >= self.min_strength and cycle['cycles_observed'] >= self.min_cycles:
+                    found.append({'resource': metric, **cycle})
+        return sorted(found, key=lambda c: c['strength'], reverse=True)
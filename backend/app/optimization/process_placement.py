@@ -0,0 +1,337 @@
+# core/optimization/process_placement.py
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import math
+import os
+
+from app.core.config import settings
+from app.optimization.tunable_state import format_cpu_list, parse_cpu_list
+from app.optimization.tuning_backend import SysfsTuningBackend, TunableWrite, get_tuning_backend
+
+# Placement kinds; the tuning history records them as '<kind>:<process name>'
+CPU_AFFINITY = 'cpu_affinity'
+CPU_WEIGHT = 'cpu_weight'
+IO_WEIGHT = 'io_weight'
+
+# Never reserve more than this share of the online CPUs for protected processes
+MAX_RESERVED_SHARE = 0.5
+
+
+@dataclass
+class Placement:
+    """One change to where a process may run, or to its cgroup's share of CPU or I/O"""
+    kind: str
+    pid: int
+    name: str
+    # The PID for affinity; cgroup v2 path (relative to the cgroup mount) for weights
+    target: str
+    value: str
+    reason: str = ''
+    previous: Optional[str] = None
+    # Affinity is per thread: what each thread had before, by TID
+    previous_threads: Optional[Dict[int, str]] = None
+    id: Optional[int] = None
+    applied_at: Optional[str] = None
+
+
+class ProcessPlacementManager:
+    """
+    Sir Hawkington's Seating Plan
+
+    Decides where the hottest processes may run, using the per-core load
+    and top-process list the CPU metrics service already collects. When a
+    hot process contends with a protected service, the service is pinned
+    to the least-loaded cores of the emptiest NUMA node and everything hot
+    is fenced off those cores; its cgroup also gets a larger cgroup v2
+    cpu.weight and io.weight. Without protected services, hot processes on
+    a multi-node machine are spread one node each, heaviest first, so they
+    keep their memory local and stop fighting over the same caches.
+
+    Affinity is set on every thread of a process, since each thread has
+    its own mask. Every placement keeps what it replaced, per thread, so
+    each one (or all of them) can be reverted. Processes that have exited
+    since are skipped.
+    """
+
+    def __init__(self,
+                 backend: Optional[SysfsTuningBackend] = None,
+                 protected: Optional[Sequence[str]] = None,
+                 hot_percent: Optional[float] = None,
+                 cpu_weight: Optional[int] = None,
+                 io_weight: Optional[int] = None):
+        self.logger = logging.getLogger('ProcessPlacementManager')
+        self.backend = backend or get_tuning_backend()
+        self.reader = self.backend.reader
+        self.root = self.backend.root
+        self.protected = list(settings.PLACEMENT_PROTECTED_PROCESSES if protected is None else protected)
+        self.hot_percent = settings.PLACEMENT_HOT_PROCESS_PERCENT if hot_percent is None else hot_percent
+        self.cpu_weight = settings.PLACEMENT_PROTECTED_CPU_WEIGHT if cpu_weight is None else cpu_weight
+        self.io_weight = settings.PLACEMENT_PROTECTED_IO_WEIGHT if io_weight is None else io_weight
+        # Active placements by id, and by (kind, target) so re-placing keeps the original value
+        self.placements: Dict[int, Placement] = {}
+        self._active: Dict[Tuple[str, str], int] = {}
+        self._next_id = 1
+
+    def _read(self, relative: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, relative)) as handle:
+                return handle.read().strip()
+        except OSError:
+            return None
+
+    # Topology and processes
+
+    def numa_nodes(self) -> Dict[int, List[int]]:
+        """Online CPUs of each NUMA node; one node holding every CPU when there is no NUMA"""
+        online = self.reader.online_cpus()
+        nodes = {}
+        try:
+            names = os.listdir(os.path.join(self.root, 'sys/devices/system/node'))
+        except OSError:
+            names = []
+        for name in names:
+            if not (name.startswith('node') and name[4:].isdigit()):
+                continue
+            cpus = [cpu for cpu in parse_cpu_list(self._read(f'sys/devices/system/node/{name}/cpulist') or '') if cpu in online]
+            if cpus:
+                nodes[int(name[4:])] = cpus
+        return dict(sorted(nodes.items())) or {0: online}
+
+    def cgroup_of(self, pid: int) -> Optional[str]:
+        """cgroup v2 path of a process, e.g. '/system.slice/nginx.service'"""
+        for line in (self._read(f'proc/{pid}/cgroup') or '').splitlines():
+            if line.startswith('0::'):
+                return line[3:] or '/'
+        return None
+
+    def threads(self, pid: int) -> List[int]:
+        """Thread IDs of a process, the process itself when they can't be listed"""
+        try:
+            tids = [int(entry) for entry in os.listdir(os.path.join(self.root, f'proc/{pid}/task')) if entry.isdigit()]
+        except OSError:
+            tids = []
+        return sorted(tids) or [pid]
+
+    def find_processes(self, names: Sequence[str]) -> List[Dict[str, Any]]:
+        """Running processes whose name is in `names`"""
+        # /proc/<pid>/comm holds at most 15 characters
+        wanted = {name[:15] for name in names}
+        found = []
+        try:
+            pids = [entry for entry in os.listdir(os.path.join(self.root, 'proc')) if entry.isdigit()]
+        except OSError:
+            return found
+        for pid in sorted(pids, key=int):
+            comm = self._read(f'proc/{pid}/comm')
+            if comm in wanted:
+                found.append({'pid': int(pid), 'name': comm, 'cpu_percent': 0.0})
+        return found
+
+    # Planning
+
+    def plan(self, cpu_data: Dict[str, Any]) -> List[Placement]:
+        """Placements for the current load
+
+        `cpu_data` is the CPU metrics service's data: per-core percentages
+        in 'cores' and the 'top_processes' list.
+        """
+        online = self.reader.online_cpus()
+        loads = {cpu: float(load) for cpu, load in zip(online, cpu_data.get('cores') or [])}
+        processes = [p for p in cpu_data.get('top_processes') or [] if p.get('pid')]
+        hot = [p for p in processes if (p.get('cpu_percent') or 0) >= self.hot_percent]
+
+        protected = {p['pid']: p for p in processes if p.get('name') in self.protected}
+        if self.protected:
+            for proc in self.find_processes(self.protected):
+                protected.setdefault(proc['pid'], proc)
+        intruders = [p for p in hot if p['pid'] not in protected]
+
+        if protected:
+            return self._protect(list(protected.values()), intruders, online, loads)
+        return self._spread(hot, loads)
+
+    def _protect(self, protected: List[Dict[str, Any]], intruders: List[Dict[str, Any]],
+                 online: List[int], loads: Dict[int, float]) -> List[Placement]:
+        placements = []
+        seen_cgroups = set()
+        for proc in protected:
+            cgroup = self.cgroup_of(proc['pid'])
+            if not cgroup or cgroup == '/' or cgroup in seen_cgroups:
+                continue
+            seen_cgroups.add(cgroup)
+            base = f"sys/fs/cgroup{cgroup}"
+            if os.path.exists(os.path.join(self.root, base, 'cpu.weight')):
+                placements.append(Placement(CPU_WEIGHT, proc['pid'], proc['name'], cgroup, str(self.cpu_weight),
+                                            f"{proc['name']} is protected - larger CPU share under contention"))
+            if os.path.exists(os.path.join(self.root, base, 'io.weight')):
+                placements.append(Placement(IO_WEIGHT, proc['pid'], proc['name'], cgroup, f'default {self.io_weight}',
+                                            f"{proc['name']} is protected - larger I/O share under contention"))
+
+        # Cores are only worth reserving while something hot is competing for them
+        if not intruders or len(online) < 2:
+            return placements
+
+        demand = sum(p.get('cpu_percent') or 0 for p in protected) / 100
+        count = min(max(1, math.ceil(demand)), max(1, int(len(online) * MAX_RESERVED_SHARE)))
+        nodes = self.numa_nodes()
+        candidates = [cpus for cpus in nodes.values() if len(cpus) >= count] or list(nodes.values())
+        node = min(candidates, key=lambda cpus: sum(loads.get(cpu, 0.0) for cpu in cpus) / len(cpus))
+        reserved = sorted(node, key=lambda cpu: (loads.get(cpu, 0.0), cpu))[:count]
+        rest = [cpu for cpu in online if cpu not in reserved]
+
+        for proc in protected:
+            placements.append(Placement(CPU_AFFINITY, proc['pid'], proc['name'], str(proc['pid']), format_cpu_list(reserved),
+                                        f"{proc['name']} is protected - reserved CPUs {format_cpu_list(reserved)}"))
+        for proc in intruders:
+            placements.append(Placement(CPU_AFFINITY, proc['pid'], proc['name'], str(proc['pid']), format_cpu_list(rest),
+                                        f"{proc['name']} is at {proc['cpu_percent']:.0f}% CPU - kept off the reserved CPUs"))
+        return placements
+
+    def _spread(self, hot: List[Dict[str, Any]], loads: Dict[int, float]) -> List[Placement]:
+        nodes = self.numa_nodes()
+        if len(nodes) < 2:
+            # One node: balancing across its cores is the scheduler's job
+            return []
+        node_load = {node: sum(loads.get(cpu, 0.0) for cpu in cpus) / len(cpus) for node, cpus in nodes.items()}
+        placements = []
+        for proc in sorted(hot, key=lambda p: p['cpu_percent'], reverse=True):
+            node = min(node_load, key=lambda n: (node_load[n], n))
+            cpus = format_cpu_list(nodes[node])
+            placements.append(Placement(CPU_AFFINITY, proc['pid'], proc['name'], str(proc['pid']), cpus,
+                                        f"{proc['name']} is at {proc['cpu_percent']:.0f}% CPU - kept on NUMA node {node}"))
+            node_load[node] += proc['cpu_percent'] / len(nodes[node])
+        return placements
+
+    # Applying and reverting
+
+    def _key(self, placement: Placement) -> Tuple[str, str]:
+        return (placement.kind, placement.target)
+
+    def _weight_write(self, placement: Placement, value: str) -> TunableWrite:
+        filename = 'cpu.weight' if placement.kind == CPU_WEIGHT else 'io.weight'
+        return TunableWrite(placement.kind, f'sys/fs/cgroup{placement.target}/{filename}', value, target=placement.target)
+
+    def _set_affinity(self, pid: int, value: str, restore: Optional[Dict[int, str]] = None) -> Dict[int, str]:
+        """Set every thread's mask, from `restore` where it has one; returns each thread's old mask"""
+        masks: Dict[int, str] = {}
+        # Threads started meanwhile inherit a mask from their creator, so look again until none are new
+        for _ in range(5):
+            new = [tid for tid in self.threads(pid) if tid not in masks]
+            if not new:
+                break
+            for tid in new:
+                try:
+                    current = masks[tid] = format_cpu_list(os.sched_getaffinity(tid))
+                    wanted = (restore or {}).get(tid, value)
+                    if current != wanted and not self.backend.dry_run:
+                        os.sched_setaffinity(tid, parse_cpu_list(wanted))
+                except ProcessLookupError:
+                    # That thread has exited
+                    masks.pop(tid, None)
+        if not masks:
+            raise ProcessLookupError(pid)
+        return masks
+
+    def _set(self, placement: Placement, value: str,
+             restore: Optional[Dict[int, str]] = None) -> Tuple[Optional[str], Optional[Dict[int, str]]]:
+        """Put `value` in force; returns the value it replaced and, for affinity, each thread's old mask"""
+        if placement.kind == CPU_AFFINITY:
+            masks = self._set_affinity(placement.pid, value, restore)
+            return masks.get(placement.pid, next(iter(masks.values()))), masks
+        result = self.backend.write([self._weight_write(placement, value)])
+        if not result.success:
+            raise OSError('; '.join(result.failed.values()))
+        written = result.applied or result.skipped
+        return (written[0].previous if written else None), None
+
+    async def apply(self, placements: Sequence[Placement], user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Put placements in force and record them so they can be reverted"""
+        applied, unchanged, failed = [], [], {}
+        for placement in placements:
+            key = self._key(placement)
+            existing = self.placements.get(self._active.get(key, 0))
+            try:
+                previous, threads = self._set(placement, placement.value)
+            except ProcessLookupError:
+                failed[f'{placement.kind}:{placement.pid}'] = 'Process has exited'
+                continue
+            except OSError as e:
+                failed[f'{placement.kind}:{placement.pid}'] = str(e)
+                continue
+            if previous == placement.value and all(mask == placement.value for mask in (threads or {}).values()):
+                unchanged.append(placement)
+                continue
+            # Re-placing keeps the value from before our first change
+            placement.previous = existing.previous if existing else previous
+            placement.previous_threads = existing.previous_threads if existing else threads
+            placement.id = existing.id if existing else self._next_id
+            placement.applied_at = datetime.now().isoformat()
+            if not existing:
+                self._next_id += 1
+            self.placements[placement.id] = placement
+            self._active[key] = placement.id
+            applied.append(placement)
+            self.logger.info(f"{'Would place' if self.backend.dry_run else 'Placed'} {placement.name} ({placement.pid}): "
+                             f"{placement.kind} {placement.value} (was {placement.previous})")
+            await self._save(placement, placement.previous, placement.value, user_id)
+
+        return {
+            'applied': [vars(p) for p in applied],
+            'unchanged': [vars(p) for p in unchanged],
+            'failed': failed,
+            'dry_run': self.backend.dry_run
+        }
+
+    async def revert(self, placement_ids: Optional[Sequence[int]] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Restore what placements replaced, newest first; all of them when no ids are given"""
+        ids = sorted(self.placements if placement_ids is None else placement_ids, reverse=True)
+        reverted, gone, failed = [], [], {}
+        for placement_id in ids:
+            placement = self.placements.get(placement_id)
+            if placement is None:
+                failed[str(placement_id)] = 'No such placement'
+                continue
+            try:
+                if placement.previous is not None:
+                    # Threads started since our change go back to the process's old mask
+                    self._set(placement, placement.previous, placement.previous_threads)
+                reverted.append(placement_id)
+            except ProcessLookupError:
+                # Nothing left to restore
+                gone.append(placement_id)
+            except OSError as e:
+                failed[str(placement_id)] = str(e)
+                continue
+            del self.placements[placement_id]
+            self._active.pop(self._key(placement), None)
+            if placement_id in reverted:
+                await self._save(placement, placement.value, placement.previous, user_id, reverted=True)
+        return {'reverted': reverted, 'exited': gone, 'failed': failed, 'dry_run': self.backend.dry_run}
+
+    def get_placements(self) -> List[Dict[str, Any]]:
+        return [vars(placement) for placement in self.placements.values()]
+
+    async def _save(self, placement: Placement, old: Optional[str], new: Optional[str],
+                    user_id: Optional[str], reverted: bool = False):
+        if user_id:
+            from app.optimization.auto_tuner_db_helpers import save_tuning_history_to_db
+            await save_tuning_history_to_db({
+                'parameter': f'{placement.kind}:{placement.name}',
+                'current_value': old,
+                'new_value': new,
+                'success': True,
+                'reverted': reverted
+            }, user_id)
+
+
+_placement_manager: Optional[ProcessPlacementManager] = None
+
+def get_placement_manager() -> ProcessPlacementManager:
+    """Get the process-wide placement manager; it holds the placements that can be reverted"""
+    global _placement_manager
+    if _placement_manager is None:
+        _placement_manager = ProcessPlacementManager()
+    return _placement_manager
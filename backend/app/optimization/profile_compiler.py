@@ -0,0 +1,124 @@
+# core/optimization/profile_compiler.py
+
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+import logging
+
+from app.optimization.tuning_backend import SysfsTuningBackend, TunableWrite, WriteResult, get_tuning_backend
+
+# Profile setting names that mean a backend parameter under another name
+PROFILE_ALIASES = {
+    'swapiness': 'swap_tendency',
+    'swappiness': 'swap_tendency',
+    'vfs_cache_pressure': 'cache_pressure',
+    'vm_dirty_ratio': 'dirty_ratio',
+    'vm_dirty_background_ratio': 'dirty_background_ratio',
+    'read_ahead': 'disk_read_ahead',
+    'scheduler': 'io_scheduler'
+}
+
+# Within one device the scheduler goes first: switching it can reset queue settings
+WRITE_ORDER = {'io_scheduler': 0}
+
+
+@dataclass
+class ProfilePlan:
+    """Diffed writes for one profile, grouped by the resource they touch"""
+    changes: List[TunableWrite] = field(default_factory=list)
+    unchanged: List[TunableWrite] = field(default_factory=list)
+    ignored: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    # Parameter -> value the profile asked for, in apply_tuning's units
+    requested: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def parameters(self) -> List[str]:
+        return list(dict.fromkeys(write.parameter for write in self.changes))
+
+    def groups(self) -> List[List[TunableWrite]]:
+        """Independent groups: per CPU, per block device, and one for sysctls"""
+        grouped: Dict[str, List[TunableWrite]] = {}
+        for write in self.changes:
+            grouped.setdefault(write.target or 'sysctl', []).append(write)
+        return [
+            sorted(writes, key=lambda write: WRITE_ORDER.get(write.parameter, 1))
+            for writes in grouped.values()
+        ]
+
+
+class ProfileCompiler:
+    """
+    Sir Hawkington's Profile Notary
+
+    Compiles an optimization profile's settings into the exact file writes
+    it implies, diffs them against what the kernel currently holds, and
+    applies only the differences as one transaction. Groups that touch
+    different resources (each CPU, each block device, the sysctls) are
+    written concurrently; within a group writes stay ordered. If any write
+    fails, every write already made is rolled back, newest first.
+
+    Profile keys that aren't kernel tunables (thresholds, UI preferences)
+    are reported as ignored rather than failing the transaction.
+    """
+
+    def __init__(self, backend: Optional[SysfsTuningBackend] = None):
+        self.logger = logging.getLogger('ProfileCompiler')
+        self.backend = backend or get_tuning_backend()
+
+    def compile(self, profile_settings: Dict[str, Any]) -> ProfilePlan:
+        plan = ProfilePlan()
+        for key, value in profile_settings.items():
+            parameter = PROFILE_ALIASES.get(key, key)
+            if not self.backend.supports(parameter):
+                plan.ignored.append(key)
+                continue
+            try:
+                writes = self.backend.plan(parameter, value)
+            except ValueError as e:
+                plan.errors[key] = f"Invalid value {value!r}: {str(e)}"
+                continue
+            if not writes:
+                plan.errors[key] = f"No writable target for {parameter}"
+                continue
+            plan.requested[parameter] = value
+            for write in writes:
+                write.previous = self.backend.read_current(write)
+                (plan.unchanged if write.previous == write.value else plan.changes).append(write)
+        return plan
+
+    async def apply(self, plan: ProfilePlan) -> Dict[str, Any]:
+        """Apply a compiled plan all-or-nothing"""
+        result: Dict[str, Any] = {
+            'status': 'unchanged',
+            'parameters': plan.parameters,
+            'changes': [vars(write) for write in plan.changes],
+            'unchanged': [vars(write) for write in plan.unchanged],
+            'ignored': list(plan.ignored),
+            'failed': dict(plan.errors),
+            'dry_run': self.backend.dry_run
+        }
+        if plan.errors:
+            # A profile we can't fully express is rejected before touching anything
+            result['status'] = 'rejected'
+            return result
+        if not plan.changes:
+            return result
+
+        outcomes: List[WriteResult] = await asyncio.gather(*(
+            asyncio.to_thread(self.backend.write, group) for group in plan.groups()
+        ))
+        applied = [write for outcome in outcomes for write in outcome.applied]
+        failed = {path: error for outcome in outcomes for path, error in outcome.failed.items()}
+
+        if failed:
+            rollback = await asyncio.to_thread(self.backend.revert, applied)
+            result['failed'] = failed
+            result['status'] = 'rolled_back' if rollback.success else 'rollback_failed'
+            if not rollback.success:
+                result['rollback_failed'] = rollback.failed
+            self.logger.error(f"Profile transaction failed ({len(failed)} writes); {result['status']}")
+        else:
+            result['status'] = 'applied'
+            self.logger.info(f"Profile transaction applied {len(applied)} writes in {len(plan.groups())} groups")
+        return result
@@ -0,0 +1,412 @@
+# core/optimization/rule_engine.py
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from collections import deque
+from dataclasses import dataclass
+import logging
+import math
+import time
+
+import psutil
+
+from app.core.config import settings
+from app.optimization.tunable_state import TunableStateReader, get_tunable_state_reader
+
+
+def _network_usage(metrics: Dict[str, Any]) -> Optional[float]:
+    """Combined send and receive rate as a percentage of the fastest interface's link speed"""
+    network = metrics.get('network') or {}
+    speeds = [i.get('speed') or 0 for i in network.get('interfaces') or [] if i.get('isup', True)]
+    if not speeds or max(speeds) <= 0:
+        return None
+    rate = (metrics.get('network_sent_rate') or 0) + (metrics.get('network_recv_rate') or 0)
+    return 100.0 * rate * 8 / (max(speeds) * 1_000_000)
+
+
+def _process_count(metrics: Dict[str, Any]) -> Optional[float]:
+    # The sample's own count, as stored and replayed; count them here for samples without one
+    if metrics.get('process_count'):
+        return float(metrics['process_count'])
+    try:
+        return float(len(psutil.pids()))
+    except Exception:
+        return None
+
+
+# Signal name -> (extractor from a SimplifiedMetricsService sample, drift that invalidates cached reasons)
+SIGNALS: Dict[str, Tuple[Callable[[Dict[str, Any]], Optional[float]], float]] = {
+    'cpu_usage': (lambda m: m.get('cpu_usage', (m.get('cpu') or {}).get('usage_percent')), 2.0),
+    'memory_usage': (lambda m: m.get('memory_usage', (m.get('memory') or {}).get('percent')), 2.0),
+    'disk_usage': (lambda m: m.get('disk_usage', (m.get('disk') or {}).get('percent')), 2.0),
+    'network_usage': (_network_usage, 2.0),
+    'process_count': (_process_count, 10.0)
+}
+
+# Declarative tuning rules. Every condition in `when` must hold on the
+# smoothed signal; `hysteresis` overrides how far a signal has to fall back
+# past its threshold before the condition clears.
+RULES: Tuple[Dict[str, Any], ...] = (
+    {
+        'name': 'memory_pressure_high',
+        'when': {'memory_usage': ('>', 75)},
+        'parameter': 'memory_pressure', 'value': 'high', 'fallback': 'normal',
+        'confidence': 0.80, 'impact': 0.6,
+        'reason': "Memory usage averaged {memory_usage:.0f}% - increasing memory pressure"
+    },
+    {
+        'name': 'swap_tendency_low',
+        'when': {'memory_usage': ('>', 75)},
+        'parameter': 'swap_tendency', 'value': '40', 'fallback': '60',
+        'confidence': 0.75, 'impact': 0.5,
+        'reason': "Memory usage averaged {memory_usage:.0f}% - adjusting swap tendency"
+    },
+    {
+        'name': 'process_priority_busy',
+        'when': {'cpu_usage': ('>', 60), 'process_count': ('>', 100, 10)},
+        'parameter': 'process_priority', 'value': '-5', 'fallback': '0',
+        'confidence': 0.75, 'impact': 0.5,
+        'reason': "CPU averaged {cpu_usage:.0f}% across {process_count:.0f} processes - adjusting process priorities"
+    },
+    {
+        'name': 'cache_pressure_high',
+        'when': {'memory_usage': ('>', 60), 'disk_usage': ('>', 50)},
+        'parameter': 'cache_pressure', 'value': '150', 'fallback': '100',
+        'confidence': 0.70, 'impact': 0.4,
+        'reason': "Memory averaged {memory_usage:.0f}% and disk {disk_usage:.0f}% - adjusting cache pressure"
+    },
+    {
+        'name': 'network_buffer_large',
+        'when': {'network_usage': ('>', 70)},
+        'parameter': 'network_buffer', 'value': '16777216', 'fallback': '212992',
+        'confidence': 0.65, 'impact': 0.4,
+        'reason': "Network averaged {network_usage:.0f}% of link speed - increasing socket buffers"
+    },
+    {
+        'name': 'heavy_load_priority',
+        'when': {'cpu_usage': ('>', 70), 'memory_usage': ('>', 70), 'disk_usage': ('>', 70)},
+        'parameter': 'process_priority', 'value': '-10', 'fallback': '0',
+        'confidence': 0.90, 'impact': 0.8,
+        'reason': "System under sustained heavy load - aggressive process priority adjustment"
+    },
+    {
+        'name': 'heavy_load_memory',
+        'when': {'cpu_usage': ('>', 70), 'memory_usage': ('>', 70), 'disk_usage': ('>', 70)},
+        'parameter': 'memory_pressure', 'value': 'critical', 'fallback': 'normal',
+        'confidence': 0.85, 'impact': 0.7,
+        'reason': "System under sustained heavy load - critical memory pressure"
+    }
+)
+
+
+@dataclass(frozen=True)
+class Condition:
+    signal: str
+    op: str
+    threshold: float
+    hysteresis: float
+
+    def enters(self, value: float) -> bool:
+        return value > self.threshold if self.op == '>' else value < self.threshold
+
+    def clears(self, value: float) -> bool:
+        if self.op == '>':
+            return value < self.threshold - self.hysteresis
+        return value > self.threshold + self.hysteresis
+
+
+@dataclass
+class CompiledRule:
+    name: str
+    conditions: Tuple[int, ...]
+    parameter: str
+    value: str
+    fallback: str
+    confidence: float
+    impact: float
+    reason: str
+    active: bool = False
+    changed_at: float = -math.inf
+
+
+class SmoothedSignal:
+    """Mean of one signal over a sliding time window, kept as a running sum"""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.samples: deque = deque()
+        self.total = 0.0
+
+    def push(self, now: float, value: float):
+        self.samples.append((now, value))
+        self.total += value
+        while self.samples and self.samples[0][0] <= now - self.window_seconds:
+            self.total -= self.samples.popleft()[1]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / len(self.samples) if self.samples else None
+
+
+def compile_rules(specs: Sequence[Dict[str, Any]], hysteresis: float) -> Tuple[List[CompiledRule], List[Condition]]:
+    """Turn rule specs into rules over a shared, de-duplicated list of conditions"""
+    conditions: List[Condition] = []
+    index: Dict[Condition, int] = {}
+    rules = []
+    for spec in specs:
+        refs = []
+        for signal, (op, threshold, *margin) in spec['when'].items():
+            if signal not in SIGNALS or op not in ('>', '<'):
+                raise ValueError(f"Rule {spec['name']}: bad condition {signal} {op} {threshold}")
+            condition = Condition(signal, op, float(threshold), float(margin[0]) if margin else hysteresis)
+            if condition not in index:
+                index[condition] = len(conditions)
+                conditions.append(condition)
+            refs.append(index[condition])
+        rules.append(CompiledRule(
+            spec['name'], tuple(refs), spec['parameter'], str(spec['value']), str(spec['fallback']),
+            spec['confidence'], spec['impact'], spec['reason']
+        ))
+    return rules, conditions
+
+
+class RecommendationEngine:
+    """
+    Sir Hawkington's Patient Counsel
+
+    Evaluates declarative tuning rules against smoothed signals instead of
+    a single instantaneous sample, so a one-second spike never flips a
+    setting. Each signal is averaged over a sliding window; a condition
+    turns on when the average crosses its threshold and only turns off
+    once it falls back past the threshold by the hysteresis margin. A rule
+    that changed state stays put for the cooldown. Once a rule's value has
+    been applied (see record_applied) and the rule clears with no other
+    active rule owning the parameter, the value it replaced is recommended
+    until it is back in force or someone else changes the parameter.
+
+    Rules are compiled once, with identical conditions shared between
+    them. Each observed sample updates only the windows, the conditions
+    on those signals and the rules that use them. The resulting
+    recommendations are cached until a rule flips, a signal drifts, or the
+    kernel tunables are re-read.
+    """
+
+    def __init__(self,
+                 rules: Sequence[Dict[str, Any]] = RULES,
+                 window_seconds: Optional[float] = None,
+                 min_samples: Optional[int] = None,
+                 cooldown_seconds: Optional[float] = None,
+                 hysteresis: Optional[float] = None,
+                 reader: Optional[TunableStateReader] = None):
+        self.logger = logging.getLogger('RecommendationEngine')
+        self.window_seconds = settings.RECOMMENDATION_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.min_samples = settings.RECOMMENDATION_MIN_SAMPLES if min_samples is None else min_samples
+        self.cooldown_seconds = settings.RECOMMENDATION_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        hysteresis = settings.RECOMMENDATION_HYSTERESIS if hysteresis is None else hysteresis
+        self.reader = reader or get_tunable_state_reader()
+
+        self.rules, self.conditions = compile_rules(rules, hysteresis)
+        self.signals = {c.signal: SmoothedSignal(self.window_seconds) for c in self.conditions}
+        self._by_signal: Dict[str, List[int]] = {}
+        for i, condition in enumerate(self.conditions):
+            self._by_signal.setdefault(condition.signal, []).append(i)
+        self._by_condition: Dict[int, List[CompiledRule]] = {}
+        for rule in self.rules:
+            for i in rule.conditions:
+                self._by_condition.setdefault(i, []).append(rule)
+        self._condition_state = [False] * len(self.conditions)
+
+        # Rules whose conditions disagree with their state, held back by the cooldown
+        self._pending: Set[str] = set()
+        # Parameter -> rule value put in force and the value it replaced
+        self._applied: Dict[str, Dict[str, Any]] = {}
+        self._last_sample: Optional[Any] = None
+        self.last_observed: Optional[float] = None
+        self.samples = 0
+        self._cache: Optional[List[Dict[str, Any]]] = None
+        self._cache_means: Dict[str, float] = {}
+        self._cache_refreshes = -1
+
+    def needs_sample(self, now: Optional[float] = None) -> bool:
+        """True when nothing has been observed recently enough to trust the windows"""
+        now = time.monotonic() if now is None else now
+        return self.last_observed is None or now - self.last_observed > settings.RECOMMENDATION_MAX_SAMPLE_AGE
+
+    def observe(self, metrics: Optional[Dict[str, Any]], now: Optional[float] = None) -> List[str]:
+        """Feed one metrics sample; returns the names of rules that flipped"""
+        if not metrics or (metrics.get('has_errors') and not metrics.get('cpu')):
+            return []
+        stamp = metrics.get('timestamp')
+        if stamp is not None and stamp == self._last_sample:
+            return []
+        self._last_sample = stamp
+        now = time.monotonic() if now is None else now
+        self.last_observed = now
+        self.samples += 1
+
+        changed: Set[int] = set()
+        for signal, window in self.signals.items():
+            extract, _ = SIGNALS[signal]
+            try:
+                value = extract(metrics)
+            except (TypeError, ValueError, AttributeError):
+                value = None
+            if value is None:
+                continue
+            window.push(now, float(value))
+            if len(window.samples) < self.min_samples:
+                continue
+            mean = window.mean
+            for i in self._by_signal[signal]:
+                condition, on = self.conditions[i], self._condition_state[i]
+                if (not on and condition.enters(mean)) or (on and condition.clears(mean)):
+                    self._condition_state[i] = not on
+                    changed.add(i)
+
+        candidates = {rule.name: rule for i in changed for rule in self._by_condition[i]}
+        candidates.update((rule.name, rule) for rule in self.rules if rule.name in self._pending)
+        flipped = []
+        for rule in candidates.values():
+            wanted = all(self._condition_state[i] for i in rule.conditions)
+            if wanted == rule.active:
+                self._pending.discard(rule.name)
+            elif now - rule.changed_at < self.cooldown_seconds:
+                self._pending.add(rule.name)
+            else:
+                rule.active, rule.changed_at = wanted, now
+                self._pending.discard(rule.name)
+                flipped.append(rule.name)
+        if flipped:
+            self._cache = None
+            self.logger.info(f"Rules flipped: {', '.join(flipped)}")
+        return flipped
+
+    def means(self) -> Dict[str, float]:
+        return {name: window.mean for name, window in self.signals.items() if window.mean is not None}
+
+    def _drifted(self, means: Dict[str, float]) -> bool:
+        return any(
+            abs(value - self._cache_means.get(name, math.inf)) > SIGNALS[name][1]
+            for name, value in means.items()
+        )
+
+    def recommendations(self) -> List[Dict[str, Any]]:
+        """Recommendations of the active rules and restores for cleared ones, as dicts with TuningAction's fields"""
+        means = self.means()
+        self.reader.snapshot()
+        refreshes = self.reader.refreshes
+        if self._cache is not None and refreshes == self._cache_refreshes and not self._drifted(means):
+            return self._cache
+
+        active = [rule for rule in self.rules if rule.active]
+        recommendations = self._build(active, means) + self._restores({rule.parameter for rule in active})
+        self._cache, self._cache_means, self._cache_refreshes = recommendations, means, refreshes
+        return recommendations
+
+    def recommendations_at(self, levels: Dict[str, float]) -> List[Dict[str, Any]]:
+        """What inactive rules would recommend if some signals stood at `levels`
+
+        Other signals keep their current smoothed values. Used to make
+        predictable changes ahead of a forecast peak.
+        """
+        values = {**self.means(), **levels}
+        firing = [
+            rule for rule in self.rules
+            if not rule.active and all(
+                self.conditions[i].signal in values and self.conditions[i].enters(values[self.conditions[i].signal])
+                for i in rule.conditions
+            )
+        ]
+        return self._build(firing, values)
+
+    def _build(self, rules: Sequence[CompiledRule], means: Dict[str, float]) -> List[Dict[str, Any]]:
+        values = {name: means.get(name, 0.0) for name in SIGNALS}
+        chosen: Dict[str, Dict[str, Any]] = {}
+        for rule in rules:
+            current = self.reader.current_value(rule.parameter)
+            current = rule.fallback if current is None else current
+            if current == rule.value:
+                continue
+            # Of several rules for one parameter the strongest wins
+            best = chosen.get(rule.parameter)
+            if best and best['confidence'] * best['impact_score'] >= rule.confidence * rule.impact:
+                continue
+            chosen[rule.parameter] = {
+                'parameter': rule.parameter,
+                'targets': None,
+                'current_value': current,
+                'new_value': rule.value,
+                'confidence': rule.confidence,
+                'impact_score': rule.impact,
+                'reason': rule.reason.format(**values),
+                'rule': rule.name
+            }
+        return list(chosen.values())
+
+    def record_applied(self, parameter: str, previous: Any, value: Any) -> None:
+        """Note a successful change, so a rule value can be undone once its rule clears"""
+        value = str(value)
+        change = self._applied.get(parameter)
+        if change is not None and value == change['previous']:
+            # Put back
+            del self._applied[parameter]
+            self._cache = None
+            return
+        rule = next((rule for rule in self.rules if rule.parameter == parameter and rule.value == value), None)
+        if rule is None or (change is None and previous is None):
+            # Not a rule's value, or nothing known to go back to: not ours to undo
+            self._applied.pop(parameter, None)
+        else:
+            # Across a handover between rules, keep the value from before the first
+            previous = change['previous'] if change is not None else str(previous)
+            self._applied[parameter] = {'previous': previous, 'value': value, 'rule': rule}
+        self._cache = None
+
+    def _restores(self, owned: Set[str]) -> List[Dict[str, Any]]:
+        """Values replaced by applied rule changes whose parameter no active rule owns"""
+        restores = []
+        for parameter, change in list(self._applied.items()):
+            if parameter in owned:
+                continue
+            current = self.reader.current_value(parameter)
+            if current is not None and current != change['value']:
+                # Put back, or changed since by someone else
+                del self._applied[parameter]
+                continue
+            rule = change['rule']
+            restores.append({
+                'parameter': parameter,
+                'targets': None,
+                'current_value': change['value'],
+                'new_value': change['previous'],
+                'confidence': rule.confidence,
+                'impact_score': rule.impact,
+                'reason': f"Conditions for {rule.name} have cleared - restoring {change['previous']}",
+                'rule': rule.name,
+                'restore': True
+            })
+        return restores
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'rules': len(self.rules),
+            'conditions': len(self.conditions),
+            'samples': self.samples,
+            'active_rules': [rule.name for rule in self.rules if rule.active],
+            'pending_rules': sorted(self._pending),
+            'applied_parameters': sorted(self._applied),
+            'means': self.means(),
+            'window_seconds': self.window_seconds,
+            'cooldown_seconds': self.cooldown_seconds
+        }
+
+
+_recommendation_engine: Optional[RecommendationEngine] = None
+
+def get_recommendation_engine() -> RecommendationEngine:
+    """Get the process-wide recommendation engine, fed by every metrics collection"""
+    global _recommendation_engine
+    if _recommendation_engine is None:
+        from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+        _recommendation_engine = RecommendationEngine()
+        SimplifiedMetricsService().add_listener(_recommendation_engine.observe)
+    return _recommendation_engine
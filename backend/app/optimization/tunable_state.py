@@ -0,0 +1,325 @@
+# core/optimization/tunable_state.py
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+import time
+
+from app.core.config import settings
+
+# sysctl name -> path under /proc/sys
+SYSCTLS = {
+    'vm.swappiness': 'proc/sys/vm/swappiness',
+    'vm.vfs_cache_pressure': 'proc/sys/vm/vfs_cache_pressure',
+    'vm.min_free_kbytes': 'proc/sys/vm/min_free_kbytes',
+    'vm.dirty_ratio': 'proc/sys/vm/dirty_ratio',
+    'vm.dirty_background_ratio': 'proc/sys/vm/dirty_background_ratio',
+    'net.core.rmem_max': 'proc/sys/net/core/rmem_max',
+    'net.core.wmem_max': 'proc/sys/net/core/wmem_max'
+}
+
+# Parameters that are a single sysctl value
+PARAMETER_SYSCTLS = {
+    'swap_tendency': 'vm.swappiness',
+    'cache_pressure': 'vm.vfs_cache_pressure',
+    'network_buffer': 'net.core.rmem_max',
+    'dirty_ratio': 'vm.dirty_ratio',
+    'dirty_background_ratio': 'vm.dirty_background_ratio'
+}
+
+# Parameters set per block device and per network interface
+BLOCK_PARAMETERS = ('io_scheduler', 'disk_read_ahead', 'nr_requests')
+NETWORK_PARAMETERS = ('tx_queue_len', 'rps_cpus')
+
+# min_free_kbytes levels apply_tuning uses for memory_pressure
+MEMORY_PRESSURE_LEVELS = {'normal': 32768, 'high': 65536, 'critical': 131072}
+
+# Block devices and interfaces that are never tuning targets
+VIRTUAL_BLOCK_PREFIXES = ('loop', 'ram', 'zram')
+VIRTUAL_NETWORK_INTERFACES = ('lo',)
+
+
+def _parse_choice(text: str) -> Tuple[Optional[str], List[str]]:
+    """'[none] mq-deadline kyber' -> ('none', ['none', 'mq-deadline', 'kyber'])"""
+    active, options = None, []
+    for token in text.split():
+        if token.startswith('[') and token.endswith(']'):
+            token = token[1:-1]
+            active = token
+        options.append(token)
+    return active, options
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """'0-3,6' -> [0, 1, 2, 3, 6]"""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        cpus.extend(range(int(start), int(end or start) + 1))
+    return cpus
+
+
+def format_cpu_list(cpus: Sequence[int]) -> str:
+    """[0, 1, 2, 3, 6] -> '0-3,6'"""
+    ranges: List[List[int]] = []
+    for cpu in sorted(set(cpus)):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join(str(start) if start == end else f'{start}-{end}' for start, end in ranges)
+
+
+class TunableStateReader:
+    """
+    Sir Hawkington's Kernel Ledger
+
+    Reads the tunables the auto-tuner changes straight from /proc/sys and
+    /sys: the governor and package of every online CPU, the kind (NVMe,
+    SSD or HDD), scheduler, read-ahead and queue depth of every block
+    device, the queue counts, tx_queue_len and receive steering masks of
+    every network interface, and the vm/net sysctls. No subprocesses, no
+    guessing.
+
+    The snapshot is cached. It is rebuilt only when its inputs change:
+    the set of online CPUs, block devices or interfaces, an explicit invalidate()
+    after the tuner writes something, or the TTL expiring (the backstop for
+    changes made behind our back, since sysfs does not bump mtimes).
+    """
+
+    def __init__(self, root: str = '/', ttl_seconds: Optional[float] = None):
+        self.logger = logging.getLogger('TunableStateReader')
+        self.root = root
+        self.ttl_seconds = settings.TUNABLE_STATE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._inputs: Optional[Tuple] = None
+        self._read_at = 0.0
+        self.refreshes = 0
+
+    def _path(self, relative: str) -> str:
+        return os.path.join(self.root, relative)
+
+    def _read(self, relative: str) -> Optional[str]:
+        try:
+            with open(self._path(relative)) as handle:
+                return handle.read().strip()
+        except OSError:
+            return None
+
+    def _read_int(self, relative: str) -> Optional[int]:
+        text = self._read(relative)
+        try:
+            return int(text.split()[0]) if text else None
+        except ValueError:
+            return None
+
+    # Discovery
+
+    def online_cpus(self) -> List[int]:
+        text = self._read('sys/devices/system/cpu/online')
+        if text:
+            return parse_cpu_list(text)
+        return list(range(os.cpu_count() or 1))
+
+    def block_devices(self) -> List[str]:
+        try:
+            names = os.listdir(self._path('sys/block'))
+        except OSError:
+            return []
+        return sorted(name for name in names if not name.startswith(VIRTUAL_BLOCK_PREFIXES))
+
+    def network_interfaces(self) -> List[str]:
+        try:
+            names = os.listdir(self._path('sys/class/net'))
+        except OSError:
+            return []
+        return sorted(name for name in names if name not in VIRTUAL_NETWORK_INTERFACES)
+
+    def _queues(self, interface: str, prefix: str) -> List[str]:
+        try:
+            names = os.listdir(self._path(f'sys/class/net/{interface}/queues'))
+        except OSError:
+            return []
+        return sorted((name for name in names if name.startswith(prefix)), key=lambda name: int(name.split('-')[1]))
+
+    def _current_inputs(self) -> Tuple:
+        return tuple(self.online_cpus()), tuple(self.block_devices()), tuple(self.network_interfaces())
+
+    # Snapshot
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot, e.g. after writing a tunable"""
+        self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current tunable state, re-read only when the inputs changed"""
+        inputs = self._current_inputs()
+        if (self._snapshot is not None and inputs == self._inputs
+                and time.monotonic() - self._read_at < self.ttl_seconds):
+            return self._snapshot
+
+        cpus, devices, interfaces = inputs
+        cpu_state = {}
+        for cpu in cpus:
+            base = f'sys/devices/system/cpu/cpu{cpu}/cpufreq'
+            governor = self._read(f'{base}/scaling_governor')
+            if governor is None:
+                continue
+            available = self._read(f'{base}/scaling_available_governors')
+            package = self._read_int(f'sys/devices/system/cpu/cpu{cpu}/topology/physical_package_id')
+            cpu_state[f'cpu{cpu}'] = {
+                'governor': governor,
+                'available_governors': available.split() if available else [],
+                'package': package if package is not None and package >= 0 else 0
+            }
+
+        block_state = {}
+        for device in devices:
+            base = f'sys/block/{device}/queue'
+            scheduler, schedulers = _parse_choice(self._read(f'{base}/scheduler') or '')
+            rotational = self._read_int(f'{base}/rotational')
+            if device.startswith('nvme'):
+                kind = 'nvme'
+            else:
+                kind = None if rotational is None else ('hdd' if rotational else 'ssd')
+            block_state[device] = {
+                'kind': kind,
+                'scheduler': scheduler,
+                'available_schedulers': schedulers,
+                'read_ahead_kb': self._read_int(f'{base}/read_ahead_kb'),
+                'nr_requests': self._read_int(f'{base}/nr_requests'),
+                'rotational': None if rotational is None else bool(rotational)
+            }
+
+        network_state = {}
+        for interface in interfaces:
+            base = f'sys/class/net/{interface}'
+            rx_queues = self._queues(interface, 'rx-')
+            speed = self._read_int(f'{base}/speed')
+            network_state[interface] = {
+                'operstate': self._read(f'{base}/operstate'),
+                'speed_mbps': speed if speed is not None and speed > 0 else None,
+                'tx_queue_len': self._read_int(f'{base}/tx_queue_len'),
+                'rx_queues': len(rx_queues),
+                'tx_queues': len(self._queues(interface, 'tx-')),
+                # Receive packet steering CPU mask of every rx queue
+                'rps_cpus': [self._read(f'{base}/queues/{queue}/rps_cpus') for queue in rx_queues]
+            }
+
+        sysctl_state = {}
+        for name, relative in SYSCTLS.items():
+            value = self._read_int(relative)
+            if value is not None:
+                sysctl_state[name] = value
+
+        self._snapshot = {'cpu': cpu_state, 'block': block_state, 'net': network_state, 'sysctl': sysctl_state}
+        self._inputs = inputs
+        self._read_at = time.monotonic()
+        self.refreshes += 1
+        return self._snapshot
+
+    # Values in apply_tuning's units
+
+    def primary_block_device(self) -> Optional[str]:
+        devices = self.snapshot()['block']
+        if 'sda' in devices:
+            return 'sda'
+        return next(iter(devices), None)
+
+    def expand_cpu_targets(self, targets: Optional[Sequence[str]]) -> List[str]:
+        """CPU names for targets given as 'cpuN' or as a 'packageN' group; all CPUs when None"""
+        cpus = self.snapshot()['cpu']
+        if targets is None:
+            return list(cpus)
+        expanded = []
+        for target in targets:
+            if target.startswith('package'):
+                package = int(target[len('package'):])
+                expanded.extend(name for name, info in cpus.items() if info['package'] == package)
+            elif target in cpus:
+                expanded.append(target)
+        return list(dict.fromkeys(expanded))
+
+    def current_value(self, parameter: str, targets: Optional[Sequence[str]] = None) -> Optional[str]:
+        """Current value of a TuningParameter, as apply_tuning would write it
+
+        None when unreadable, when targeted cores disagree on the governor,
+        or when min_free_kbytes is not one of the memory_pressure levels, so
+        writing any value counts as a change. `targets` narrows per-CPU,
+        per-device and per-interface parameters; without it every core, the
+        primary disk and the first interface stand in for the machine.
+        """
+        state = self.snapshot()
+        sysctl = state['sysctl']
+
+        if parameter == 'cpu_governor':
+            governors = {state['cpu'][cpu]['governor'] for cpu in self.expand_cpu_targets(targets)}
+            # Mixed cores have no single value to match
+            return governors.pop() if len(governors) == 1 else None
+        if parameter in PARAMETER_SYSCTLS:
+            value = sysctl.get(PARAMETER_SYSCTLS[parameter])
+        elif parameter == 'memory_pressure':
+            value = sysctl.get('vm.min_free_kbytes')
+            levels = [level for level, kbytes in MEMORY_PRESSURE_LEVELS.items() if kbytes == value]
+            return levels[0] if levels else None
+        elif parameter in BLOCK_PARAMETERS:
+            device = state['block'].get(targets[0] if targets else (self.primary_block_device() or ''))
+            if not device:
+                return None
+            if parameter == 'io_scheduler':
+                return device['scheduler']
+            if parameter == 'nr_requests':
+                value = device['nr_requests']
+            else:
+                # blockdev --setra counts 512-byte sectors
+                value = None if device['read_ahead_kb'] is None else device['read_ahead_kb'] * 2
+        elif parameter in NETWORK_PARAMETERS:
+            interface = state['net'].get(targets[0] if targets else next(iter(state['net']), ''))
+            if not interface:
+                return None
+            if parameter == 'rps_cpus':
+                return interface['rps_cpus'][0] if interface['rps_cpus'] else None
+            value = interface['tx_queue_len']
+        elif parameter == 'process_priority':
+            try:
+                value = os.getpriority(os.PRIO_PROCESS, 0)
+            except (AttributeError, OSError):
+                return None
+        else:
+            return None
+        return None if value is None else str(value)
+
+    def is_noop(self, parameter: str, new_value: Any, targets: Optional[Sequence[str]] = None) -> bool:
+        """True when `new_value` is already in force on the targets current_value reads
+
+        Without targets that is the primary disk and first interface only;
+        SysfsTuningBackend.is_noop checks every file a write would touch.
+        """
+        if targets and len(targets) > 1 and parameter != 'cpu_governor':
+            return all(self.is_noop(parameter, new_value, [target]) for target in targets)
+        current = self.current_value(parameter, targets)
+        return current is not None and current == str(new_value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot or {'cpu': {}, 'block': {}, 'net': {}, 'sysctl': {}}
+        return {
+            'root': self.root,
+            'cpus': len(snapshot['cpu']),
+            'block_devices': len(snapshot['block']),
+            'network_interfaces': len(snapshot['net']),
+            'sysctls': len(snapshot['sysctl']),
+            'refreshes': self.refreshes,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+
+_tunable_state_reader: Optional[TunableStateReader] = None
+
+def get_tunable_state_reader() -> TunableStateReader:
+    """Get the process-wide tunable state reader"""
+    global _tunable_state_reader
+    if _tunable_state_reader is None:
+        _tunable_state_reader = TunableStateReader(root=settings.TUNING_ROOT)
+    return _tunable_state_reader
@@ -0,0 +1,293 @@
+# core/optimization/tuning_backend.py
+
+from typing import Any, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import logging
+import os
+import shlex
+import subprocess
+
+from app.core.config import settings
+from app.optimization.tunable_state import (
+    BLOCK_PARAMETERS, MEMORY_PRESSURE_LEVELS, NETWORK_PARAMETERS, TunableStateReader, get_tunable_state_reader
+)
+# Only the files the helper accepts may be written, directly or via the helper
+from app.optimization.tuning_helper import writable, write_tunable
+
+# Single-file sysctl parameters: TuningParameter value -> paths under the root
+SYSCTL_PARAMETERS = {
+    'swap_tendency': ('proc/sys/vm/swappiness',),
+    'cache_pressure': ('proc/sys/vm/vfs_cache_pressure',),
+    'memory_pressure': ('proc/sys/vm/min_free_kbytes',),
+    'network_buffer': ('proc/sys/net/core/rmem_max', 'proc/sys/net/core/wmem_max'),
+    'dirty_ratio': ('proc/sys/vm/dirty_ratio',),
+    'dirty_background_ratio': ('proc/sys/vm/dirty_background_ratio',)
+}
+
+# Parameters written once per discovered CPU, block device or interface
+DEVICE_PARAMETERS = ('cpu_governor',) + BLOCK_PARAMETERS + NETWORK_PARAMETERS
+
+
+@dataclass
+class TunableWrite:
+    """One value to write to one sysfs/procfs file"""
+    parameter: str
+    path: str
+    value: str
+    target: Optional[str] = None
+    previous: Optional[str] = None
+
+
+@dataclass
+class WriteResult:
+    applied: List[TunableWrite] = field(default_factory=list)
+    skipped: List[TunableWrite] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    dry_run: bool = False
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'success': self.success,
+            'dry_run': self.dry_run,
+            'applied': [vars(write) for write in self.applied],
+            'skipped': [vars(write) for write in self.skipped],
+            'failed': dict(self.failed)
+        }
+
+
+class SysfsTuningBackend:
+    """
+    The Stick's Direct Line to the Kernel
+
+    Turns tuning parameters into writes to the files that back them (every
+    online CPU's scaling_governor, every block device's scheduler,
+    read-ahead and queue depth, every interface's tx_queue_len and receive
+    steering masks, the vm and net sysctls) and performs them with plain
+    open()/write() calls: no shells, no sudo per parameter, no /dev/sda.
+
+    Any number of parameters go through one apply(). Values already in
+    force are skipped. Files we can't write without privileges are handed
+    to the configured helper command in a single invocation at the end.
+    Each applied write keeps its previous value so callers can roll back.
+
+    `root` relocates the whole tree, so a dry run can target a scratch
+    directory; `dry_run` plans and reports without writing anything.
+    """
+
+    def __init__(self,
+                 root: Optional[str] = None,
+                 dry_run: Optional[bool] = None,
+                 helper_command: Optional[str] = None,
+                 reader: Optional[TunableStateReader] = None):
+        self.logger = logging.getLogger('SysfsTuningBackend')
+        self.root = settings.TUNING_ROOT if root is None else root
+        self.dry_run = settings.TUNING_DRY_RUN if dry_run is None else dry_run
+        command = settings.TUNING_HELPER_COMMAND if helper_command is None else helper_command
+        self.helper_command = shlex.split(command) if command else []
+        if reader is None:
+            # Share the process-wide cache unless we were pointed at another tree
+            reader = get_tunable_state_reader() if self.root == settings.TUNING_ROOT else TunableStateReader(root=self.root)
+        self.reader = reader
+
+    def _path(self, relative: str) -> str:
+        return os.path.join(self.root, relative)
+
+    # Planning
+
+    @staticmethod
+    def supports(parameter: str) -> bool:
+        return parameter in SYSCTL_PARAMETERS or parameter in DEVICE_PARAMETERS
+
+    def plan(self, parameter: str, value: Any, targets: Optional[Sequence[str]] = None) -> List[TunableWrite]:
+        """Writes needed to set `parameter`
+
+        `targets` limits the CPUs ('cpuN', or 'packageN' for a whole
+        package), block devices or interfaces written; default is all.
+        """
+        state = self.reader.snapshot()
+        value = str(value)
+
+        if parameter in SYSCTL_PARAMETERS:
+            if parameter == 'memory_pressure':
+                value = str(MEMORY_PRESSURE_LEVELS.get(value, MEMORY_PRESSURE_LEVELS['normal']))
+            return [TunableWrite(parameter, path, value) for path in SYSCTL_PARAMETERS[parameter]]
+
+        if parameter == 'cpu_governor':
+            writes = []
+            for cpu in self.reader.expand_cpu_targets(targets):
+                info = state['cpu'][cpu]
+                if info['available_governors'] and value not in info['available_governors']:
+                    self.logger.warning(f"{cpu} does not offer governor {value}; leaving it alone")
+                    continue
+                path = f'sys/devices/system/cpu/{cpu}/cpufreq/scaling_governor'
+                writes.append(TunableWrite(parameter, path, value, target=cpu))
+            return writes
+
+        if parameter in BLOCK_PARAMETERS:
+            writes = []
+            for device, info in state['block'].items():
+                if targets is not None and device not in targets:
+                    continue
+                base = f'sys/block/{device}/queue'
+                if parameter == 'io_scheduler':
+                    if info['available_schedulers'] and value not in info['available_schedulers']:
+                        self.logger.warning(f"{device} does not offer scheduler {value}; leaving it alone")
+                        continue
+                    writes.append(TunableWrite(parameter, f'{base}/scheduler', value, target=device))
+                elif parameter == 'nr_requests':
+                    writes.append(TunableWrite(parameter, f'{base}/nr_requests', str(int(float(value))), target=device))
+                else:
+                    # Read-ahead is given in 512-byte sectors, as for blockdev --setra
+                    kilobytes = str(max(0, int(float(value))) // 2)
+                    writes.append(TunableWrite(parameter, f'{base}/read_ahead_kb', kilobytes, target=device))
+            return writes
+
+        if parameter in NETWORK_PARAMETERS:
+            writes = []
+            for interface, info in state['net'].items():
+                if targets is not None and interface not in targets:
+                    continue
+                base = f'sys/class/net/{interface}'
+                if parameter == 'tx_queue_len':
+                    writes.append(TunableWrite(parameter, f'{base}/tx_queue_len', str(int(float(value))), target=interface))
+                else:
+                    # The same steering mask on every receive queue
+                    mask = format(int(value.replace(',', ''), 16), 'x')
+                    for queue in range(info['rx_queues']):
+                        writes.append(TunableWrite(parameter, f'{base}/queues/rx-{queue}/rps_cpus', mask, target=interface))
+            return writes
+
+        raise ValueError(f"Unknown parameter: {parameter}")
+
+    # Applying
+
+    def read_current(self, write: TunableWrite) -> Optional[str]:
+        """Value currently in the file a write targets, in the form it would be written"""
+        try:
+            with open(self._path(write.path)) as handle:
+                text = handle.read().strip()
+        except OSError:
+            return None
+        if write.path.endswith('/scheduler'):
+            # '[none] mq-deadline' -> 'none'
+            return next((t[1:-1] for t in text.split() if t.startswith('[')), text)
+        if write.path.endswith('/rps_cpus'):
+            # '00000000,0000000f' -> 'f'
+            try:
+                return format(int(text.replace(',', ''), 16), 'x')
+            except ValueError:
+                return text
+        if write.path.endswith('/io.weight'):
+            # 'default 100\n8:0 200' -> 'default 100'
+            return text.splitlines()[0] if text else text
+        return text.split()[0] if text else text
+
+    def is_noop(self, parameter: str, value: Any, targets: Optional[Sequence[str]] = None) -> bool:
+        """True when every file apply() would write already holds the value"""
+        try:
+            writes = self.plan(parameter, value, targets)
+        except ValueError:
+            return False
+        return bool(writes) and all(self.read_current(write) == write.value for write in writes)
+
+    def _write(self, write: TunableWrite) -> None:
+        write_tunable(self._path(write.path), write.value)
+
+    def apply(self, parameters: Dict[str, Any], targets: Optional[Dict[str, Sequence[str]]] = None) -> WriteResult:
+        """Set several parameters in one batch"""
+        targets = targets or {}
+        writes: List[TunableWrite] = []
+        result = WriteResult(dry_run=self.dry_run)
+        for parameter, value in parameters.items():
+            try:
+                planned = self.plan(parameter, value, targets.get(parameter))
+            except ValueError as e:
+                result.failed[parameter] = str(e)
+                continue
+            if not planned:
+                result.failed[parameter] = f"No writable target for {parameter}"
+            writes.extend(planned)
+        return self.write(writes, result)
+
+    def write(self, writes: Sequence[TunableWrite], result: Optional[WriteResult] = None) -> WriteResult:
+        """Perform planned writes, skipping values already in force"""
+        result = result or WriteResult(dry_run=self.dry_run)
+        privileged: List[TunableWrite] = []
+
+        for write in writes:
+            if not writable(write.path, self.root):
+                result.failed[write.path] = "Not a tunable file"
+                continue
+            write.previous = self.read_current(write)
+            if write.previous == write.value:
+                result.skipped.append(write)
+                continue
+            if self.dry_run:
+                result.applied.append(write)
+                continue
+            try:
+                self._write(write)
+                result.applied.append(write)
+            except PermissionError:
+                privileged.append(write)
+            except OSError as e:
+                result.failed[write.path] = str(e)
+
+        if privileged:
+            self._write_privileged(privileged, result)
+
+        if result.applied and not self.dry_run:
+            self.reader.invalidate()
+        for write in result.applied:
+            self.logger.info(f"{'Would set' if self.dry_run else 'Set'} {write.path} = {write.value} (was {write.previous})")
+        return result
+
+    def revert(self, writes: Sequence[TunableWrite]) -> WriteResult:
+        """Restore the previous values of applied writes, newest first"""
+        restore = [
+            TunableWrite(write.parameter, write.path, write.previous, target=write.target)
+            for write in reversed(writes) if write.previous is not None
+        ]
+        return self.write(restore)
+
+    def _write_privileged(self, writes: List[TunableWrite], result: WriteResult) -> None:
+        """Hand every permission-denied write to the helper in one call"""
+        if not self.helper_command:
+            for write in writes:
+                result.failed[write.path] = "Permission denied and no tuning helper configured"
+            return
+        payload = ''.join(f"{write.path}\t{write.value}\n" for write in writes)
+        # sudoers allows the bare command; a scratch root only matters unprivileged
+        command = self.helper_command + ([] if os.path.realpath(self.root) == '/' else ['--root', self.root])
+        try:
+            completed = subprocess.run(
+                command,
+                input=payload, capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            for write in writes:
+                result.failed[write.path] = f"Tuning helper failed: {str(e)}"
+            return
+        errors = dict(line.split('\t', 1) for line in completed.stdout.splitlines() if '\t' in line)
+        for write in writes:
+            if write.path in errors:
+                result.failed[write.path] = errors[write.path]
+            elif completed.returncode != 0 and not errors:
+                result.failed[write.path] = completed.stderr.strip() or f"Tuning helper exited with {completed.returncode}"
+            else:
+                result.applied.append(write)
+
+
+_tuning_backend: Optional[SysfsTuningBackend] = None
+
+def get_tuning_backend() -> SysfsTuningBackend:
+    """Get the process-wide tuning backend"""
+    global _tuning_backend
+    if _tuning_backend is None:
+        _tuning_backend = SysfsTuningBackend()
+    return _tuning_backend
+
@@ -0,0 +1,369 @@
+# core/optimization/tuning_daemon.py
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.optimization.periodicity import PeriodicityDetector
+from app.optimization.rule_engine import SIGNALS, RecommendationEngine, get_recommendation_engine
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+# Signals rolled up hourly to find daily cycles; all cheap to extract per sample
+CYCLE_SIGNALS = ('cpu_usage', 'memory_usage', 'disk_usage', 'network_usage')
+# Signals whose stored history matches the live signal (network is a link percentage live)
+SEEDED_SIGNALS = ('cpu_usage', 'memory_usage', 'disk_usage')
+
+DAILY_PERIOD_HOURS = 24
+
+
+def parse_window(text: str) -> Tuple[Optional[int], int, int]:
+    """'Sat 01:00-05:00' -> (5, 60, 300); '22:00-02:00' -> (None, 1320, 120)"""
+    parts = text.strip().lower().split()
+    if len(parts) == 2 and parts[0][:3] in WEEKDAYS:
+        day, span = WEEKDAYS.index(parts[0][:3]), parts[1]
+    elif len(parts) == 1:
+        day, span = None, parts[0]
+    else:
+        raise ValueError(f"Bad maintenance window {text!r}")
+    try:
+        start, end = (int(h) * 60 + int(m) for h, m in (edge.split(':') for edge in span.split('-')))
+    except ValueError:
+        raise ValueError(f"Bad maintenance window {text!r}; expected e.g. 'Sat 01:00-05:00'")
+    if not (0 <= start < 1440 and 0 <= end <= 1440) or start == end:
+        raise ValueError(f"Bad maintenance window {text!r}")
+    return day, start, end
+
+
+def in_window(window: Tuple[Optional[int], int, int], now: datetime) -> bool:
+    day, start, end = window
+    minute = now.hour * 60 + now.minute
+    today, yesterday = now.weekday(), (now.weekday() - 1) % 7
+    if start < end:
+        return start <= minute < end and day in (None, today)
+    # Crosses midnight: the evening part belongs to `day`, the morning part to the day after
+    return (minute >= start and day in (None, today)) or (minute < end and day in (None, yesterday))
+
+
+class AutoTuningDaemon:
+    """
+    Sir Hawkington's Night Watchman
+
+    Tunes in the background instead of waiting for someone to press a
+    button. Every interval it takes the recommendation engine's smoothed
+    view of the shared metrics stream and the device advisor's advice,
+    and applies what they recommend, within limits:
+
+    - each parameter changes at most once per its rate limit;
+    - when maintenance windows are configured, changes happen only inside them;
+    - an allowlist can restrict which parameters it may touch at all.
+
+    The same stream feeds hourly rollups into a PeriodicityDetector. Once
+    a daily cycle is established, the rules that its peak would trigger
+    are applied ahead of the peak (before the nightly batch, say) and put
+    back after it unless the live rules want them kept. Changes made for a
+    live rule are put back the same way once no active rule owns them. Rollups are seeded
+    from stored metrics on start, so cycles need a few days of history
+    rather than of uptime.
+
+    Nothing is collected here: without a fresh sample on the stream the
+    daemon simply waits.
+    """
+
+    def __init__(self,
+                 tuner=None,
+                 engine: Optional[RecommendationEngine] = None,
+                 advisor=None,
+                 detector: Optional[PeriodicityDetector] = None,
+                 interval_seconds: Optional[float] = None,
+                 min_change_interval: Optional[float] = None,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 maintenance_windows: Optional[Sequence[str]] = None,
+                 lead_seconds: Optional[float] = None,
+                 peak_hold_seconds: Optional[float] = None,
+                 parameters: Optional[Sequence[str]] = None,
+                 user_id: Optional[str] = None):
+        self.logger = logging.getLogger('AutoTuningDaemon')
+        if tuner is None:
+            from app.optimization.auto_tuner import AutoTuner
+            tuner = AutoTuner()
+        self.tuner = tuner
+        self.engine = engine or get_recommendation_engine()
+        self.advisor = advisor
+        self.detector = detector or PeriodicityDetector()
+        self.interval_seconds = settings.AUTO_TUNING_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        self.min_change_interval = (settings.AUTO_TUNING_MIN_CHANGE_INTERVAL
+                                    if min_change_interval is None else min_change_interval)
+        self.rate_limits = dict(settings.AUTO_TUNING_RATE_LIMITS if rate_limits is None else rate_limits)
+        windows = settings.AUTO_TUNING_MAINTENANCE_WINDOWS if maintenance_windows is None else maintenance_windows
+        self.windows = [parse_window(window) for window in windows]
+        self.lead_seconds = settings.AUTO_TUNING_LEAD_SECONDS if lead_seconds is None else lead_seconds
+        self.peak_hold_seconds = settings.AUTO_TUNING_PEAK_HOLD_SECONDS if peak_hold_seconds is None else peak_hold_seconds
+        self.parameters = set(settings.AUTO_TUNING_PARAMETERS if parameters is None else parameters)
+        self.user_id = (settings.AUTO_TUNING_USER_ID or None) if user_id is None else user_id
+
+        self.latest_metrics: Optional[Dict[str, Any]] = None
+        # Parameter -> wall-clock time of our last change to it
+        self.last_changed: Dict[str, float] = {}
+        # Parameter -> pre-emptive change to put back once its peak has passed
+        self.preemptive: Dict[str, Dict[str, Any]] = {}
+        # Parameter -> change made for a live rule, to put back once no active rule owns it
+        self.applied: Dict[str, Dict[str, Any]] = {}
+        # Daily peaks already acted on, so each is prepared for once
+        self._prepared: set = set()
+        self.actions: List[Dict[str, Any]] = []
+        self.ticks = 0
+        self.last_tick: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    # Shared metrics stream
+
+    def observe(self, metrics: Optional[Dict[str, Any]]):
+        """Metrics listener: remember the sample and roll its signals up for cycle detection"""
+        if not metrics or (metrics.get('has_errors') and not metrics.get('cpu')):
+            return
+        self.latest_metrics = metrics
+        for signal in CYCLE_SIGNALS:
+            try:
+                value = SIGNALS[signal][0](metrics)
+            except (TypeError, ValueError, AttributeError):
+                value = None
+            if value is not None:
+                self.detector.observe(signal, float(value))
+
+    # Lifecycle
+
+    def start(self):
+        """Subscribe to the metrics stream and start the loop on the running event loop"""
+        if self._task is not None and not self._task.done():
+            return
+        from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+        SimplifiedMetricsService().add_listener(self.observe)
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name='auto-tuning-daemon')
+        self.logger.info(f"Auto-tuning daemon started (every {self.interval_seconds:.0f}s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+        SimplifiedMetricsService().remove_listener(self.observe)
+        self.logger.info("Auto-tuning daemon stopped")
+
+    async def seed_history(self):
+        """Prime the cycle rollups from stored metrics so peaks are known after a restart"""
+        from app.core.database import AsyncSessionLocal
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.detector.seed_from_history(db, {signal: signal for signal in SEEDED_SIGNALS})
+        except Exception as e:
+            self.logger.warning(f"Could not seed cycles from stored metrics: {str(e)}")
+
+    async def _run(self):
+        if hasattr(self.tuner, '_initialize_system_state'):
+            await self.tuner._initialize_system_state()
+        await self.seed_history()
+        while not self._stop.is_set():
+            try:
+                await self.tick()
+            except Exception as e:
+                self.logger.error(f"Auto-tuning tick failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    # Decisions
+
+    def in_maintenance_window(self, now: datetime) -> bool:
+        return not self.windows or any(in_window(window, now) for window in self.windows)
+
+    def rate_limited(self, parameter: str, now: float) -> bool:
+        limit = self.rate_limits.get(parameter, self.min_change_interval)
+        return now - self.last_changed.get(parameter, -float('inf')) < limit
+
+    def _allowed(self, parameter: str) -> bool:
+        return not self.parameters or parameter in self.parameters
+
+    def upcoming_peaks(self, now: datetime) -> List[Dict[str, Any]]:
+        """Established daily peaks due within the lead time"""
+        utc_now = now.astimezone(timezone.utc)
+        peaks = []
+        for cycle in self.detector.significant_cycles():
+            if round(cycle['period_hours']) != DAILY_PERIOD_HOURS:
+                continue
+            lead = (cycle['next_peak'] - utc_now).total_seconds()
+            if 0 <= lead <= self.lead_seconds:
+                peaks.append(cycle)
+        return peaks
+
+    async def tick(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """One pass: put back expired pre-emptive changes, prepare for peaks, act on live rules"""
+        now = now or datetime.now()
+        stamp = now.timestamp()
+        self.ticks += 1
+        self.last_tick = now.isoformat()
+        if not self.in_maintenance_window(now):
+            return []
+
+        taken = await self._expire(stamp)
+        taken += await self._release(stamp)
+        if self.engine.needs_sample():
+            # Nothing fresh on the stream, and we don't collect our own
+            return taken
+
+        planned: List[Dict[str, Any]] = []
+        for cycle in self.upcoming_peaks(now):
+            key = (cycle['resource'], cycle['next_peak'].isoformat())
+            if key in self._prepared:
+                continue
+            self._prepared.add(key)
+            level = cycle['mean'] + cycle['amplitude']
+            peak_local = cycle['next_peak'].astimezone()
+            for recommendation in self.engine.recommendations_at({cycle['resource']: level}):
+                planned.append({
+                    **recommendation,
+                    'reason': f"Ahead of the daily {cycle['resource']} peak at {peak_local:%H:%M}: {recommendation['reason']}",
+                    'preemptive_until': cycle['next_peak'].timestamp() + self.peak_hold_seconds
+                })
+        advice = self.advisor.recommend() if self.advisor is not None else []
+        # Our own changes are put back by _release; others' are not ours to undo
+        live = [recommendation for recommendation in self.engine.recommendations() if not recommendation.get('restore')]
+        planned.extend(advice + live)
+
+        for recommendation in planned:
+            result = await self._apply(recommendation, stamp)
+            if result is not None:
+                taken.append(result)
+        return taken
+
+    async def _apply(self, recommendation: Dict[str, Any], stamp: float,
+                     restore: bool = False) -> Optional[Dict[str, Any]]:
+        parameter = recommendation['parameter']
+        # Putting back a change is part of that change, not a new one
+        if not self._allowed(parameter) or (self.rate_limited(parameter, stamp) and not restore):
+            return None
+        if str(recommendation['current_value']) == str(recommendation['new_value']):
+            return None
+        data = {key: recommendation.get(key) for key in ('parameter', 'current_value', 'new_value', 'targets', 'reason')}
+        result = await self.tuner.apply_tuning(data, user_id=self.user_id, metrics=self.latest_metrics)
+        success = bool(result and result.get('success'))
+        # A failed attempt still counts against the rate limit, so it isn't retried every tick
+        self.last_changed[parameter] = stamp
+        if success and not (result or {}).get('noop') and recommendation.get('preemptive_until'):
+            self.preemptive[parameter] = {
+                'previous': result.get('current_value', recommendation['current_value']),
+                'value': recommendation['new_value'],
+                'targets': recommendation.get('targets'),
+                'rule': recommendation.get('rule'),
+                'until': recommendation['preemptive_until']
+            }
+        elif success and not (result or {}).get('noop') and recommendation.get('rule') and not restore:
+            # Keep the value from before our first change, however many rules have held it since
+            previous = self.applied.get(parameter, {}).get(
+                'previous', result.get('current_value', recommendation['current_value']))
+            self.applied[parameter] = {
+                'previous': previous,
+                'value': recommendation['new_value'],
+                'targets': recommendation.get('targets'),
+                'rule': recommendation['rule']
+            }
+        action = {
+            'parameter': parameter,
+            'old_value': recommendation['current_value'],
+            'new_value': recommendation['new_value'],
+            'targets': recommendation.get('targets'),
+            'reason': recommendation['reason'],
+            'success': success,
+            'error': (result or {}).get('error'),
+            'at': datetime.fromtimestamp(stamp).isoformat()
+        }
+        self.actions = (self.actions + [action])[-100:]
+        self.logger.info(f"Auto-tuned {parameter}: {action['old_value']} -> {action['new_value']} "
+                         f"({'ok' if success else action['error']})")
+        return action
+
+    async def _expire(self, stamp: float) -> List[Dict[str, Any]]:
+        taken = []
+        active = set(self.engine.get_stats()['active_rules'])
+        for parameter, change in list(self.preemptive.items()):
+            if stamp < change['until']:
+                continue
+            del self.preemptive[parameter]
+            if change['rule'] in active:
+                # The load arrived as forecast; the live rule now owns the setting
+                self.applied[parameter] = {key: change[key] for key in ('previous', 'value', 'targets', 'rule')}
+                continue
+            result = await self._apply({
+                'parameter': parameter,
+                'current_value': change['value'],
+                'new_value': change['previous'],
+                'targets': change['targets'],
+                'reason': "Daily peak has passed - restoring the previous value"
+            }, stamp, restore=True)
+            if result is not None:
+                taken.append(result)
+        return taken
+
+    async def _release(self, stamp: float) -> List[Dict[str, Any]]:
+        """Put back changes made for live rules once no active rule owns the parameter"""
+        taken = []
+        owned = {rule.parameter for rule in self.engine.rules if rule.active}
+        for parameter, change in list(self.applied.items()):
+            if parameter in owned or parameter in self.preemptive:
+                continue
+            del self.applied[parameter]
+            result = await self._apply({
+                'parameter': parameter,
+                'current_value': change['value'],
+                'new_value': change['previous'],
+                'targets': change['targets'],
+                'reason': f"Conditions for {change['rule']} have cleared - restoring the previous value"
+            }, stamp, restore=True)
+            if result is not None:
+                taken.append(result)
+        return taken
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = datetime.now()
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'ticks': self.ticks,
+            'last_tick': self.last_tick,
+            'in_maintenance_window': self.in_maintenance_window(now),
+            'rate_limited_until': {
+                parameter: datetime.fromtimestamp(changed + self.rate_limits.get(parameter, self.min_change_interval)).isoformat()
+                for parameter, changed in self.last_changed.items()
+            },
+            'preemptive': {
+                parameter: {**change, 'until': datetime.fromtimestamp(change['until']).isoformat()}
+                for parameter, change in self.preemptive.items()
+            },
+            'applied': dict(self.applied),
+            'daily_cycles': [
+                {**cycle, 'next_peak': cycle['next_peak'].isoformat()}
+                for cycle in self.detector.significant_cycles()
+                if round(cycle['period_hours']) == DAILY_PERIOD_HOURS
+            ],
+            'recent_actions': self.actions[-20:]
+        }
+
+
+_tuning_daemon: Optional[AutoTuningDaemon] = None
+
+def get_tuning_daemon() -> AutoTuningDaemon:
+    """Get the process-wide auto-tuning daemon"""
+    global _tuning_daemon
+    if _tuning_daemon is None:
+        from app.optimization.device_advisor import get_device_advisor
+        _tuning_daemon = AutoTuningDaemon(advisor=get_device_advisor())
+    return _tuning_daemon
@@ -0,0 +1,256 @@
+# core/optimization/tuning_experiment.py
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import math
+import numpy as np
+
+from app.core.config import settings
+
+# Objective name -> which direction is better. loop_latency_ms is measured by
+# the runner itself: how late the event loop wakes from each sampling sleep.
+DEFAULT_OBJECTIVES = {
+    'cpu_usage': 'lower',
+    'memory_usage': 'lower',
+    'loop_latency_ms': 'lower'
+}
+
+
+def _beta_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction for the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 201):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-14:
+            break
+    return h
+
+
+def regularised_beta(a: float, b: float, x: float) -> float:
+    """I_x(a, b), avoiding a SciPy dependency"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1.0 - front * _beta_fraction(b, a, 1 - x) / b
+
+
+def t_test_p_value(t: float, df: float) -> float:
+    """Two-sided p-value of a Student t statistic"""
+    if math.isinf(t):
+        return 0.0
+    return regularised_beta(df / 2, 0.5, df / (df + t * t))
+
+
+def welch_test(before: np.ndarray, after: np.ndarray) -> Dict[str, float]:
+    """Welch's unequal-variance t-test plus Hedges' g for after - before"""
+    n1, n2 = len(before), len(after)
+    m1, m2 = float(np.mean(before)), float(np.mean(after))
+    v1, v2 = float(np.var(before, ddof=1)), float(np.var(after, ddof=1))
+    se2 = v1 / n1 + v2 / n2
+    difference = m2 - m1
+
+    if se2 > 0:
+        t = difference / math.sqrt(se2)
+        df = se2 ** 2 / ((v1 / n1) ** 2 / (n1 - 1) + (v2 / n2) ** 2 / (n2 - 1))
+        p_value = t_test_p_value(t, df)
+    else:
+        # Both windows constant: either identical or trivially different
+        t, df = (0.0 if difference == 0 else math.copysign(math.inf, difference)), float(n1 + n2 - 2)
+        p_value = 1.0 if difference == 0 else 0.0
+
+    pooled = math.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    if pooled > 0:
+        effect = difference / pooled * (1 - 3 / (4 * (n1 + n2) - 9))
+    else:
+        effect = 0.0 if difference == 0 else math.copysign(math.inf, difference)
+    # Keep the record JSON-safe when a window has no spread at all
+    effect = max(-100.0, min(100.0, effect))
+
+    return {
+        'mean_before': m1,
+        'mean_after': m2,
+        'relative_change': difference / abs(m1) if m1 else None,
+        't': max(-1e6, min(1e6, t)),
+        'df': df,
+        'p_value': p_value,
+        'effect_size': effect
+    }
+
+
+class TuningExperiment:
+    """
+    Sir Hawkington's Controlled Trial
+
+    Applies a tuning as an experiment instead of a leap of faith: samples
+    a baseline window, applies the change, lets the system settle, samples
+    an after window of the same length and compares each objective with
+    Welch's t-test. Effect sizes are Hedges' g, signed so positive means
+    better. A change that makes any objective significantly and
+    meaningfully worse is reverted on the spot; the verdict, effect sizes
+    and whether it was reverted go into TuningHistory.
+
+    The significance level is Bonferroni-split across objectives. Extra
+    objectives (throughput from a benchmark, request latency, ...) plug in
+    via `objectives` and a `sampler` that returns them. With a
+    BenchmarkSuite as `benchmark`, each sample is one run of the suite and
+    the raw scores on both sides are kept as the change's measured impact.
+    """
+
+    def __init__(
+        self,
+        tuner,
+        window_seconds: Optional[float] = None,
+        sample_interval: Optional[float] = None,
+        settle_seconds: Optional[float] = None,
+        alpha: Optional[float] = None,
+        min_effect: Optional[float] = None,
+        objectives: Optional[Dict[str, str]] = None,
+        sampler: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None,
+        samples: Optional[int] = None,
+        benchmark=None
+    ):
+        self.logger = logging.getLogger('TuningExperiment')
+        self.tuner = tuner
+        self.window_seconds = settings.TUNING_EXPERIMENT_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.sample_interval = settings.TUNING_EXPERIMENT_SAMPLE_INTERVAL if sample_interval is None else sample_interval
+        self.settle_seconds = settings.TUNING_EXPERIMENT_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self.alpha = settings.TUNING_EXPERIMENT_ALPHA if alpha is None else alpha
+        self.min_effect = settings.TUNING_EXPERIMENT_MIN_EFFECT if min_effect is None else min_effect
+        self.benchmark = benchmark
+        if benchmark is not None:
+            objectives = objectives or benchmark.objectives
+            sampler = sampler or benchmark.sample
+        self.objectives = dict(objectives or DEFAULT_OBJECTIVES)
+        self.sampler = sampler or tuner.get_current_metrics
+        self.samples = samples
+
+    @property
+    def samples_per_window(self) -> int:
+        if self.samples is not None:
+            return max(2, self.samples)
+        return max(2, int(self.window_seconds / self.sample_interval))
+
+    async def collect_window(self) -> Dict[str, np.ndarray]:
+        """Sample every objective samples_per_window times, sample_interval apart"""
+        loop = asyncio.get_running_loop()
+        rows: List[Dict[str, Any]] = []
+        for _ in range(self.samples_per_window):
+            started = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            lateness = max(0.0, loop.time() - started - self.sample_interval)
+            sample = await self.sampler()
+            if not sample:
+                continue
+            rows.append({**sample, 'loop_latency_ms': lateness * 1000})
+        return {
+            name: np.array([float(row.get(name) or 0.0) for row in rows])
+            for name in self.objectives
+        }
+
+    def compare(self, before: Dict[str, np.ndarray], after: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Per-objective test results and the overall verdict"""
+        alpha = self.alpha / max(1, len(self.objectives))
+        results = {}
+        improved = regressed = False
+        for name, direction in self.objectives.items():
+            a, b = before.get(name), after.get(name)
+            if a is None or b is None or len(a) < 2 or len(b) < 2:
+                continue
+            stats = welch_test(a, b)
+            # Positive improvement means the objective moved the right way
+            stats['improvement'] = stats['effect_size'] if direction == 'higher' else -stats['effect_size']
+            stats['significant'] = stats['p_value'] < alpha
+            if stats['significant'] and stats['improvement'] <= -self.min_effect:
+                regressed = True
+            elif stats['significant'] and stats['improvement'] >= self.min_effect:
+                improved = True
+            results[name] = stats
+
+        if regressed:
+            verdict = 'regressed'
+        elif improved:
+            verdict = 'improved'
+        else:
+            verdict = 'inconclusive'
+        return {'verdict': verdict, 'alpha': alpha, 'min_effect': self.min_effect, 'objectives': results}
+
+    async def run(self, action, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Baseline, apply, settle, observe, compare and revert on regression"""
+        baseline = await self.collect_window()
+
+        applied = await self.tuner.apply_tuning(action)
+        # Some parameters wrap the tuning record in an 'action' envelope
+        record = dict(applied.get('action', applied)) if applied else {}
+        if not applied or not applied.get('success'):
+            record.setdefault('error', 'Tuning could not be applied')
+            record.update({'success': False, 'verdict': 'not_applied', 'reverted': False, 'effect_sizes': None})
+            await self._save(record, user_id)
+            return record
+
+        record['success'] = True
+        started_at = datetime.now()
+        if self.settle_seconds > 0:
+            await asyncio.sleep(self.settle_seconds)
+        observed = await self.collect_window()
+        comparison = self.compare(baseline, observed)
+
+        reverted = False
+        if comparison['verdict'] == 'regressed':
+            reverted = await self._revert(record)
+
+        record.update({
+            'verdict': comparison['verdict'],
+            'reverted': reverted,
+            'effect_sizes': {
+                **comparison,
+                'samples_before': len(next(iter(baseline.values()), [])),
+                'samples_after': len(next(iter(observed.values()), [])),
+                'window_seconds': self.window_seconds,
+                'started_at': started_at.isoformat()
+            }
+        })
+        if self.benchmark is not None:
+            record['benchmark_scores'] = {
+                **self.benchmark.describe(),
+                'before': {name: values.tolist() for name, values in baseline.items()},
+                'after': {name: values.tolist() for name, values in observed.items()}
+            }
+        self.logger.info(
+            f"Experiment on {record.get('parameter')}: {comparison['verdict']}"
+            + (" (reverted)" if reverted else "")
+        )
+        await self._save(record, user_id)
+        return record
+
+    async def _revert(self, record: Dict[str, Any]) -> bool:
+        result = await self.tuner.apply_tuning({
+            'parameter': record['parameter'],
+            'current_value': record['new_value'],
+            'new_value': record.get('current_value'),
+            'targets': record.get('targets')
+        })
+        if result and result.get('success'):
+            return True
+        self.logger.error(f"Failed to revert {record['parameter']} to {record.get('current_value')}")
+        return False
+
+    async def _save(self, record: Dict[str, Any], user_id: Optional[str]):
+        if user_id:
+            from app.optimization.auto_tuner_db_helpers import save_tuning_history_to_db
+            await save_tuning_history_to_db(record, user_id)
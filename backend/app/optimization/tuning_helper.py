@@ -0,0 +1,95 @@
+# core/optimization/tuning_helper.py
+"""
+Privileged side of the tuning backend: writes 'path<TAB>value' lines read
+from stdin and reports 'path<TAB>error' lines on stdout.
+
+Only the exact files SysfsTuningBackend plans may be written, checked on
+the requested path and again on where it really leads, and opened without
+following symlinks. Run as root it always works on /, whatever --root
+says.
+
+It imports nothing but the standard library, so it can run from a fixed,
+root-owned copy without the application on sys.path:
+
+    sudo -n /usr/bin/python3 -I /usr/local/libexec/system-rebellion/tuning_helper.py
+
+scripts/setup_tuning_helper_sudo.sh installs that copy and its sudoers rule.
+"""
+
+from typing import List, Optional, Sequence
+import os
+import re
+import sys
+
+_NAME = r'[A-Za-z0-9_.:@-]+'
+_BLOCK_FILES = r'queue/(?:scheduler|read_ahead_kb|nr_requests)'
+_NET_FILES = r'(?:tx_queue_len|queues/rx-\d+/rps_cpus)'
+
+# Every file the backend writes, as planned under the root
+WRITABLE_FILES = re.compile('|'.join((
+    r'proc/sys/vm/(?:swappiness|vfs_cache_pressure|min_free_kbytes|dirty_ratio|dirty_background_ratio)',
+    r'proc/sys/net/core/(?:rmem_max|wmem_max)',
+    r'sys/devices/system/cpu/cpu\d+/cpufreq/scaling_governor',
+    rf'sys/block/{_NAME}/{_BLOCK_FILES}',
+    rf'sys/class/net/{_NAME}/{_NET_FILES}',
+    rf'sys/fs/cgroup/(?:{_NAME}/)*(?:cpu|io)\.weight'
+)))
+
+# Where those files really live once sysfs symlinks are resolved
+RESOLVED_FILES = re.compile('|'.join((
+    r'sys/devices/system/cpu/cpufreq/policy\d+/scaling_governor',
+    rf'sys/devices/(?:{_NAME}/)+block/{_NAME}/{_BLOCK_FILES}',
+    rf'sys/devices/(?:{_NAME}/)+net/{_NAME}/{_NET_FILES}'
+)))
+
+
+def writable(relative: str, root: str = '/') -> bool:
+    """True when `relative` is a tunable we write and resolves to one under `root`"""
+    if os.path.normpath(relative) != relative or not WRITABLE_FILES.fullmatch(relative):
+        return False
+    real_root = os.path.realpath(root)
+    resolved = os.path.relpath(os.path.realpath(os.path.join(root, relative)), real_root)
+    if resolved == '..' or resolved.startswith('../'):
+        return False
+    return bool(WRITABLE_FILES.fullmatch(resolved) or RESOLVED_FILES.fullmatch(resolved))
+
+
+def write_tunable(path: str, value: str) -> None:
+    """Write an existing file in place, refusing a symlink as the last component"""
+    fd = os.open(path, os.O_WRONLY | os.O_TRUNC | os.O_NOFOLLOW | os.O_CLOEXEC)
+    with os.fdopen(fd, 'w') as handle:
+        handle.write(value)
+
+
+def run_helper(lines: Sequence[str], root: str = '/') -> List[str]:
+    """Write 'path<TAB>value' lines under `root`, returning 'path<TAB>error' lines"""
+    errors = []
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        relative, _, value = line.partition('\t')
+        if '\n' in value or not writable(relative, root):
+            errors.append(f"{relative}\tNot a tunable file")
+            continue
+        try:
+            write_tunable(os.path.join(root, relative), value)
+        except OSError as e:
+            errors.append(f"{relative}\t{e}")
+    return errors
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Write sysfs/procfs tunables read as 'path<TAB>value' lines from stdin")
+    parser.add_argument('--root', default='/', help="Scratch tree to write instead of /; ignored when run as root")
+    args = parser.parse_args(argv)
+    root = '/' if os.geteuid() == 0 else args.root
+    errors = run_helper(sys.stdin.readlines(), root=root)
+    for error in errors:
+        print(error)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# core/optimization/tuning_simulator.py
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+import bisect
+import logging
+import math
+import time
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.optimization.rule_engine import RULES, CompiledRule, Condition, compile_rules
+
+# Profile settings that are alert thresholds rather than kernel tunables
+PROFILE_THRESHOLDS = {
+    'cpuThreshold': 'cpu_usage',
+    'memoryThreshold': 'memory_usage',
+    'diskThreshold': 'disk_usage',
+    'networkThreshold': 'network_usage'
+}
+
+Trace = Dict[str, np.ndarray]
+
+
+def trace_from_samples(samples: np.ndarray, link_speed_mbps: Optional[float] = None) -> Trace:
+    """Signal columns from raw sample records (segment store SAMPLE_DTYPE)
+
+    Network usage needs the link speed, which raw samples don't carry;
+    without it the signal is missing, as it is live on hosts that don't
+    report one.
+    """
+    trace = {
+        'timestamp': samples['timestamp'].astype(np.float64),
+        'cpu_usage': samples['cpu_percent'].astype(np.float64),
+        'memory_usage': samples['memory_percent'].astype(np.float64),
+        'disk_usage': samples['disk_percent'].astype(np.float64),
+        'process_count': samples['process_count'].astype(np.float64)
+    }
+    rate = samples['net_sent_rate'].astype(np.float64) + samples['net_recv_rate']
+    trace['network_usage'] = (100.0 * rate * 8 / (link_speed_mbps * 1_000_000) if link_speed_mbps
+                              else np.full(len(samples), np.nan))
+    return trace
+
+
+async def load_trace(db: Optional[AsyncSession],
+                     start: Optional[datetime] = None,
+                     end: Optional[datetime] = None,
+                     link_speed_mbps: Optional[float] = None,
+                     batch_size: int = 10000) -> Trace:
+    """Raw samples between start and end from the configured raw tier"""
+    if settings.RAW_SAMPLE_BACKEND == "segments":
+        from app.services.storage.segment_store import get_segment_store
+        samples = get_segment_store().read_range_array(
+            start.timestamp() if start else None, end.timestamp() if end else None
+        )
+        return trace_from_samples(samples, link_speed_mbps)
+
+    from app.models.metrics import SystemMetrics
+    columns = {name: [] for name in ('timestamp', 'cpu_usage', 'memory_usage', 'disk_usage', 'process_count', 'network_usage')}
+    query = select(
+        SystemMetrics.timestamp, SystemMetrics.cpu_usage, SystemMetrics.memory_usage,
+        SystemMetrics.disk_usage, SystemMetrics.process_count, SystemMetrics.network_usage
+    ).order_by(SystemMetrics.timestamp, SystemMetrics.id)
+    if start is not None:
+        query = query.where(SystemMetrics.timestamp >= start)
+    if end is not None:
+        query = query.where(SystemMetrics.timestamp < end)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        for stamp, cpu, memory, disk, processes, network in partition:
+            columns['timestamp'].append(stamp.timestamp())
+            columns['cpu_usage'].append(cpu)
+            columns['memory_usage'].append(memory)
+            columns['disk_usage'].append(disk)
+            columns['process_count'].append(processes)
+            network = network if isinstance(network, dict) else {}
+            columns['network_usage'].append((network.get('sent_rate') or 0) + (network.get('recv_rate') or 0))
+    # None becomes NaN: a missing value, skipped like a failed extraction
+    trace = {name: np.array(values, dtype=np.float64) for name, values in columns.items()}
+    trace['network_usage'] = (100.0 * trace['network_usage'] * 8 / (link_speed_mbps * 1_000_000) if link_speed_mbps
+                              else np.full(len(trace['timestamp']), np.nan))
+    return trace
+
+
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """For each position, the first index at or after it where mask holds (len(mask) if none)"""
+    n = len(mask)
+    positions = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+class TuningSimulator:
+    """
+    Sir Hawkington's Rehearsal Theatre
+
+    Replays recorded metric history through the recommendation rules and a
+    profile's alert thresholds, to see what would have happened before
+    anything is rolled out. The result says which rules would have fired,
+    when, how often and for how long.
+
+    The replay matches RecommendationEngine.observe sample by sample:
+    - sliding-window means, only once a window holds enough samples;
+    - conditions latched with hysteresis;
+    - rule changes held back by the cooldown;
+    - a cleared rule reverts unless another active rule keeps the
+      parameter, which is a handover to that rule's value.
+
+    It works on whole arrays: cumulative sums give every window mean at
+    once, latches are forward fills, and Python only loops over the flips
+    themselves. A month of 1 s samples replays in seconds.
+
+    What it can't know is what the kernel held at the time. Every firing
+    counts, including ones the live engine would have skipped because the
+    value was already set, and a revert goes to the rule's fallback where
+    the engine puts back whatever the change replaced.
+    """
+
+    def __init__(self,
+                 rules: Sequence[Dict[str, Any]] = RULES,
+                 profile_settings: Optional[Dict[str, Any]] = None,
+                 window_seconds: Optional[float] = None,
+                 min_samples: Optional[int] = None,
+                 cooldown_seconds: Optional[float] = None,
+                 hysteresis: Optional[float] = None,
+                 max_events: int = 1000):
+        self.logger = logging.getLogger('TuningSimulator')
+        self.window_seconds = settings.RECOMMENDATION_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.min_samples = settings.RECOMMENDATION_MIN_SAMPLES if min_samples is None else min_samples
+        self.cooldown_seconds = settings.RECOMMENDATION_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        hysteresis = settings.RECOMMENDATION_HYSTERESIS if hysteresis is None else hysteresis
+        self.max_events = max_events
+
+        # Profile thresholds become rules of their own, with no parameter to set
+        thresholds = [
+            {
+                'name': key, 'when': {signal: ('>', float(profile_settings[key]))},
+                'parameter': '', 'value': '', 'fallback': '',
+                'confidence': 1.0, 'impact': 0.0, 'reason': ''
+            }
+            for key, signal in PROFILE_THRESHOLDS.items()
+            if profile_settings and isinstance(profile_settings.get(key), (int, float))
+        ]
+        self.rules, self.conditions = compile_rules(list(rules) + thresholds, hysteresis)
+        self.thresholds = {spec['name'] for spec in thresholds}
+
+    def _condition_states(self, trace: Trace, condition: Condition, means: Dict[str, Any]) -> np.ndarray:
+        """Latched state of one condition after each sample"""
+        indices, mean = means[condition.signal]
+        if condition.op == '>':
+            enter, clear = mean > condition.threshold, mean < condition.threshold - condition.hysteresis
+        else:
+            enter, clear = mean < condition.threshold, mean > condition.threshold + condition.hysteresis
+        events = enter | clear
+        state = np.zeros(len(trace['timestamp']), dtype=bool)
+        if not events.any():
+            return state
+        # Forward-fill the latest enter/clear over every later sample
+        last = np.maximum.accumulate(np.where(events, np.arange(len(events)), -1))
+        latched = np.where(last >= 0, enter[np.maximum(last, 0)], False)
+        state_at = np.zeros(len(trace['timestamp']) + 1, dtype=np.int64)
+        state_at[indices + 1] = np.arange(1, len(indices) + 1)
+        # Between this signal's samples the condition keeps its last state
+        filled = np.maximum.accumulate(state_at)[1:]
+        state[filled > 0] = latched[filled[filled > 0] - 1]
+        return state
+
+    def _window_means(self, trace: Trace, signal: str):
+        """Sample indices where the window is full enough, and the window mean at each"""
+        values = trace.get(signal)
+        if values is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        stamps = trace['timestamp']
+        valid = np.flatnonzero(~np.isnan(values))
+        t, v = stamps[valid], values[valid]
+        # The window holds samples newer than now - window_seconds
+        first = np.searchsorted(t, t - self.window_seconds, side='right')
+        counts = np.arange(1, len(t) + 1) - first
+        sums = np.concatenate(([0.0], np.cumsum(v)))
+        mean = (sums[1:] - sums[first]) / np.maximum(counts, 1)
+        ready = counts >= self.min_samples
+        return valid[ready], mean[ready]
+
+    def _flips(self, stamps: np.ndarray, wanted: np.ndarray) -> List[int]:
+        """Sample indices where a rule would flip, given what its conditions want"""
+        n = len(wanted)
+        next_on, next_off = _next_index(wanted), _next_index(~wanted)
+        flips, active, changed_at, i = [], False, -math.inf, 0
+        while True:
+            earliest = int(np.searchsorted(stamps, changed_at + self.cooldown_seconds, side='left'))
+            start = max(i, earliest)
+            if start >= n:
+                return flips
+            j = int((next_off if active else next_on)[start])
+            if j >= n:
+                return flips
+            flips.append(j)
+            active, changed_at, i = not active, stamps[j], j + 1
+
+    def run(self, trace: Trace) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stamps = trace['timestamp']
+        n = len(stamps)
+        if n and np.any(np.diff(stamps) < 0):
+            order = np.argsort(stamps, kind='stable')
+            trace = {name: values[order] for name, values in trace.items()}
+            stamps = trace['timestamp']
+
+        means = {condition.signal: self._window_means(trace, condition.signal) for condition in self.conditions}
+        states = [self._condition_states(trace, condition, means) for condition in self.conditions]
+
+        events: List[Dict[str, Any]] = []
+        rules, thresholds = [], []
+        span_days = (stamps[-1] - stamps[0]) / 86400 if n > 1 else 0.0
+        flips_by_rule = {}
+        for rule in self.rules:
+            wanted = np.ones(n, dtype=bool)
+            for i in rule.conditions:
+                wanted &= states[i]
+            flips = flips_by_rule[rule.name] = self._flips(stamps, wanted)
+            summary = self._summarise(rule, stamps, flips, span_days)
+            if rule.name in self.thresholds:
+                condition = self.conditions[rule.conditions[0]]
+                thresholds.append({**summary, 'signal': condition.signal, 'threshold': condition.threshold})
+            else:
+                rules.append(summary)
+        for rule in self.rules:
+            for k, j in enumerate(flips_by_rule[rule.name]):
+                owner = None if k % 2 == 0 else self._owner(rule, j, flips_by_rule)
+                events.append(self._event(rule, stamps[j], k % 2 == 0, owner))
+
+        events.sort(key=lambda event: event['time'])
+        by_parameter: Dict[str, int] = {}
+        for event in events:
+            if event['parameter']:
+                by_parameter[event['parameter']] = by_parameter.get(event['parameter'], 0) + 1
+        elapsed = time.perf_counter() - started
+        self.logger.info(f"Replayed {n} samples in {elapsed:.2f}s: {len(events)} events")
+        return {
+            'samples': int(n),
+            'start': datetime.fromtimestamp(stamps[0]).isoformat() if n else None,
+            'end': datetime.fromtimestamp(stamps[-1]).isoformat() if n else None,
+            'replay_seconds': elapsed,
+            'settings': {
+                'window_seconds': self.window_seconds,
+                'min_samples': self.min_samples,
+                'cooldown_seconds': self.cooldown_seconds
+            },
+            'rules': rules,
+            'thresholds': thresholds,
+            'changes_by_parameter': by_parameter,
+            'events': [
+                {**event, 'time': datetime.fromtimestamp(event['time']).isoformat()}
+                for event in events[:self.max_events]
+            ],
+            'events_truncated': len(events) > self.max_events
+        }
+
+    def _summarise(self, rule: CompiledRule, stamps: np.ndarray, flips: List[int], span_days: float) -> Dict[str, Any]:
+        ons, offs = stamps[flips[0::2]], stamps[flips[1::2]]
+        # A rule still active at the end of the trace counts until then
+        ends = np.concatenate((offs, stamps[-1:])) if len(ons) > len(offs) else offs
+        summary = {
+            'rule': rule.name,
+            'fired': len(ons),
+            'per_day': len(ons) / span_days if span_days else None,
+            'active_seconds': float(np.sum(ends - ons)) if len(ons) else 0.0,
+            'first_fired': datetime.fromtimestamp(ons[0]).isoformat() if len(ons) else None,
+            'last_fired': datetime.fromtimestamp(ons[-1]).isoformat() if len(ons) else None,
+            'active_at_end': len(ons) > len(offs)
+        }
+        if rule.parameter:
+            summary.update(parameter=rule.parameter, value=rule.value)
+        return summary
+
+    def _owner(self, rule: CompiledRule, j: int, flips_by_rule: Dict[str, List[int]]) -> Optional[CompiledRule]:
+        """Strongest other rule holding `rule`'s parameter after sample j, as the engine would pick it"""
+        owner = None
+        for other in self.rules:
+            if other is rule or other.parameter != rule.parameter or other.name in self.thresholds:
+                continue
+            # An odd number of flips up to and including j leaves it active
+            if bisect.bisect_right(flips_by_rule[other.name], j) % 2 == 1:
+                if owner is None or other.confidence * other.impact > owner.confidence * owner.impact:
+                    owner = other
+        return owner
+
+    def _event(self, rule: CompiledRule, stamp: float, fired: bool,
+               owner: Optional[CompiledRule] = None) -> Dict[str, Any]:
+        if rule.name in self.thresholds:
+            return {'time': stamp, 'rule': rule.name, 'action': 'crossed' if fired else 'recovered',
+                    'parameter': None, 'value': None}
+        if fired:
+            return {'time': stamp, 'rule': rule.name, 'action': 'apply',
+                    'parameter': rule.parameter, 'value': rule.value}
+        # Cleared: the fallback comes back unless another active rule keeps the parameter
+        if owner is not None:
+            return {'time': stamp, 'rule': rule.name, 'action': 'handover',
+                    'parameter': rule.parameter, 'value': owner.value}
+        return {'time': stamp, 'rule': rule.name, 'action': 'revert',
+                'parameter': rule.parameter, 'value': rule.fallback}
@@ -10,6 +10,8 @@ issues, just pure data.
 import asyncio
 import logging
 from datetime import datetime
+
+import psutil
 from typing import Dict, Any, Optional
 
 
@@ -42,6 +44,8 @@ class SimplifiedMetricsService:
             
         self.logger = logging.getLogger('SimplifiedMetricsService')
         self._initialized = True
+        # Called with every combined sample, so consumers don't collect their own
+        self._listeners = []
         
         self.cpu_circuit_breaker = get_circuit_breaker(
         name="simplified_cpu_metrics", 
@@ -80,6 +84,23 @@ class SimplifiedMetricsService:
             cls._instance = cls()
         return cls._instance
     
+    def add_listener(self, listener):
+        """Register a callable that receives every combined metrics sample"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop sending samples to a listener registered with add_listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    @staticmethod
+    def _process_count() -> int:
+        try:
+            return len(psutil.pids())
+        except Exception:
+            return 0
+
     async def _get_lock(self):
         """Get or create the async lock"""
         if self._lock is None:
@@ -189,7 +210,8 @@ class SimplifiedMetricsService:
                 'memory': memory_data,
                 'disk': disk_data,
                 'network': network_data,
-                'process_count': len(cpu_data.get('top_processes', [])),
+                # Every process, not just the top list, so stored samples replay the rules faithfully
+                'process_count': self._process_count(),
                 'system_info': {
                     'hostname': network_data.get('interfaces', [{}])[0].get('name', 'unknown') if network_data.get('interfaces') else 'unknown',
                     'physical_cores': cpu_data.get('physical_cores', 0),
@@ -203,6 +225,12 @@ class SimplifiedMetricsService:
             if has_errors:
                 result['has_errors'] = True
                 result['errors'] = errors
+            
+            for listener in self._listeners:
+                try:
+                    listener(result)
+                except Exception as e:
+                    self.logger.error(f"Metrics listener failed: {str(e)}")
                 
             return result
                 
@@ -402,9 +402,116 @@ class MetricsRepository:
             logger.error(f"Failed to store current metrics: {str(e)}")
             raise
     
+    @staticmethod
+    async def store_raw_sample(
+        db: Optional[AsyncSession],
+        metrics_data: Dict[str, Any]
+    ) -> bool:
+        """
+        Persist one raw 1 Hz sample to the configured raw tier.
+
+        With RAW_SAMPLE_BACKEND="segments" the sample is appended to the
+        memory-mapped segment store and SQLite is not touched; otherwise a
+        system_metrics row is written through the given session.
+        """
+        from app.core.config import settings
+        from app.services.storage.segment_store import get_segment_store, sample_from_metrics
+
+        sample = sample_from_metrics(metrics_data)
+
+        if settings.RAW_SAMPLE_BACKEND == "segments":
+            return get_segment_store().append(sample)
+
+        if db is None:
+            raise ValueError("A database session is required for the sqlite raw sample backend")
+
+        try:
+            db.add(SystemMetrics(
+                # Naive UTC, like the column's utcnow default
+                timestamp=datetime.utcfromtimestamp(sample['timestamp']),
+                cpu_usage=sample['cpu_percent'],
+                memory_usage=sample['memory_percent'],
+                disk_usage=sample['disk_percent'],
+                network_usage={
+                    'sent_rate': sample['net_sent_rate'],
+                    'recv_rate': sample['net_recv_rate']
+                },
+                process_count=sample['process_count'],
+                additional_metrics={
+                    'disk_read_rate': sample['disk_read_rate'],
+                    'disk_write_rate': sample['disk_write_rate']
+                }
+            ))
+            await db.commit()
+            return True
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to store raw sample: {str(e)}")
+            raise
+
     @staticmethod
     def clear_metrics_cache():
         """Clear the metrics cache to force fresh data on next request."""
         # This method is no longer needed as we don't cache metrics in the DB service
         pass
-        logger.debug("Metrics cache cleared")
\ No newline at end of file
+        logger.debug("Metrics cache cleared")
+
+
+class RawSampleRecorder:
+    """
+    Metrics listener that keeps collected samples in the raw 1 Hz tier.
+
+    Every SimplifiedMetricsService collection reaches it; samples less than
+    a second after the last one kept (several clients polling at once) are
+    dropped. Writes run as tasks on the collecting loop, with their own
+    session for the sqlite backend.
+    """
+
+    def __init__(self, session_factory=None, min_interval: float = 1.0):
+        self._session_factory = session_factory
+        self.min_interval = min_interval
+        self._last: Optional[float] = None
+        self._tasks: set = set()
+        self.stored = 0
+
+    def __call__(self, metrics: Optional[Dict[str, Any]]):
+        if not metrics or (metrics.get('has_errors') and not metrics.get('cpu')):
+            return
+        from app.services.storage.segment_store import sample_from_metrics
+        timestamp = sample_from_metrics(metrics)['timestamp']
+        if self._last is not None and timestamp - self._last < self.min_interval:
+            return
+        self._last = timestamp
+        task = asyncio.get_running_loop().create_task(self._store(metrics))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _store(self, metrics: Dict[str, Any]):
+        from app.core.config import settings
+        try:
+            if settings.RAW_SAMPLE_BACKEND == "segments":
+                stored = await MetricsRepository.store_raw_sample(None, metrics)
+            else:
+                if self._session_factory is None:
+                    from app.core.database import AsyncSessionLocal
+                    self._session_factory = AsyncSessionLocal
+                async with self._session_factory() as db:
+                    stored = await MetricsRepository.store_raw_sample(db, metrics)
+            self.stored += bool(stored)
+        except Exception as e:
+            logger.error(f"Failed to record raw sample: {str(e)}")
+
+    async def drain(self):
+        """Wait for writes still in flight, e.g. on shutdown"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+_raw_sample_recorder: Optional[RawSampleRecorder] = None
+
+def get_raw_sample_recorder() -> RawSampleRecorder:
+    """Get the process-wide raw sample recorder"""
+    global _raw_sample_recorder
+    if _raw_sample_recorder is None:
+        _raw_sample_recorder = RawSampleRecorder()
+    return _raw_sample_recorder
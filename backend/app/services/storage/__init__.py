@@ -0,0 +1,53 @@
+"""
+System Rebellion Metric Storage
+-------------------------------
+
+Storage backends for persisted metric history.
+
+Includes:
+- Segment Store: memory-mapped append-only segment files for raw 1 Hz samples
+- Snapshot Deduplication: content-addressed blobs for static snapshot sections
+- Snapshot Codec: versioned zlib preset-dictionary compression for snapshot blobs
+- Metric Archive: streaming gzip NDJSON export/import and the batched metric writer
+"""
+
+from app.services.storage.segment_store import (
+    SegmentStore,
+    Segment,
+    SAMPLE_DTYPE,
+    sample_from_metrics,
+    get_segment_store
+)
+
+from app.services.storage.snapshot_codec import (
+    SnapshotCodec,
+    train_dictionary,
+    get_snapshot_codec
+)
+
+from app.services.storage.snapshot_dedup import (
+    SnapshotDeduplicator,
+    get_snapshot_deduplicator
+)
+
+from app.services.storage.metric_archive import (
+    BatchedMetricWriter,
+    export_ndjson_gzip,
+    import_ndjson_gzip
+)
+
+__all__ = [
+    'SegmentStore',
+    'Segment',
+    'SAMPLE_DTYPE',
+    'sample_from_metrics',
+    'get_segment_store',
+    'SnapshotCodec',
+    'train_dictionary',
+    'get_snapshot_codec',
+    'SnapshotDeduplicator',
+    'get_snapshot_deduplicator',
+    'BatchedMetricWriter',
+    'export_ndjson_gzip',
+    'import_ndjson_gzip'
+]
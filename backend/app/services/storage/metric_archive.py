@@ -0,0 +1,218 @@
+"""
+Metric Archive
+
+Streaming bulk export and import of system_metrics history as gzip NDJSON.
+
+Export reads rows through a server-side cursor in fixed-size partitions and
+compresses them chunk by chunk, so memory stays flat however long the range.
+Import decompresses an archive incrementally and loads rows through a
+BatchedMetricWriter, which inserts them with one executemany per batch.
+"""
+import json
+import logging
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.metrics import SystemMetrics
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "system-rebellion-metrics"
+ARCHIVE_VERSION = 1
+# Columns carried in an archive; ids are reassigned on import so hosts never collide
+EXPORT_COLUMNS = (
+    'timestamp',
+    'cpu_usage',
+    'memory_usage',
+    'disk_usage',
+    'network_usage',
+    'process_count',
+    'additional_metrics',
+)
+# gzip container around raw deflate
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def row_to_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    record = dict(row)
+    if isinstance(record['timestamp'], datetime):
+        record['timestamp'] = record['timestamp'].isoformat()
+    return record
+
+
+def record_to_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    row = {column: record.get(column) for column in EXPORT_COLUMNS}
+    if isinstance(row['timestamp'], str):
+        row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+    return row
+
+
+class BatchedMetricWriter:
+    """
+    The Meth Snail's Bulk Loading Dock
+
+    Buffers system_metrics rows and inserts them with a single executemany per
+    batch, committing after each one so a large import never holds one huge
+    transaction open.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self._pending: List[Dict[str, Any]] = []
+        self.written = 0
+
+    async def add(self, row: Dict[str, Any]) -> None:
+        self._pending.append(row)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self.db.execute(insert(SystemMetrics), batch)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self.written += len(batch)
+
+    async def __aenter__(self) -> "BatchedMetricWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
+
+
+async def iter_metric_rows(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield rows in timestamp order from a server-side cursor, `batch_size` at a time.
+
+    Plain column mappings are selected rather than ORM objects so nothing
+    accumulates in the session's identity map.
+    """
+    query = select(*(getattr(SystemMetrics, column) for column in EXPORT_COLUMNS)).order_by(
+        SystemMetrics.timestamp, SystemMetrics.id
+    )
+    if start is not None:
+        query = query.where(SystemMetrics.timestamp >= start)
+    if end is not None:
+        query = query.where(SystemMetrics.timestamp < end)
+
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.mappings().partitions():
+        for row in partition:
+            yield row
+
+
+async def export_ndjson_gzip(
+    db: AsyncSession,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+    level: int = 6
+) -> AsyncIterator[bytes]:
+    """
+    Stream a gzip NDJSON archive of the requested range.
+
+    The first line is a header record describing the archive; every following
+    line is one system_metrics row.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    header = {
+        'format': ARCHIVE_FORMAT,
+        'version': ARCHIVE_VERSION,
+        'columns': list(EXPORT_COLUMNS),
+        'exported_at': datetime.utcnow().isoformat(),
+    }
+    lines = [json.dumps(header)]
+    exported = 0
+
+    async for row in iter_metric_rows(db, start, end, batch_size):
+        lines.append(json.dumps(row_to_record(row), default=str))
+        exported += 1
+        if len(lines) >= batch_size:
+            chunk = compressor.compress(("\n".join(lines) + "\n").encode('utf-8'))
+            lines = []
+            if chunk:
+                yield chunk
+
+    tail = compressor.compress(("\n".join(lines) + "\n").encode('utf-8')) if lines else b""
+    yield tail + compressor.flush()
+    logger.info(f"Exported {exported} metric rows")
+
+
+# Most bytes inflated from an archive in one step
+INFLATE_STEP = 64 * 1024
+
+
+async def iter_ndjson_gzip(chunks: AsyncIterable[bytes], max_line: int = 1024 * 1024) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Incrementally decompress a gzip NDJSON stream and yield parsed records.
+
+    Output is inflated at most INFLATE_STEP bytes at a time and the line
+    limit is enforced as the buffer grows, so a small, highly compressed
+    upload can't expand without bound before it is rejected.
+    """
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    buffer = b""
+
+    def consume(data: bytes):
+        nonlocal buffer
+        while True:
+            buffer += decompressor.decompress(data, INFLATE_STEP)
+            *complete, buffer = buffer.split(b"\n")
+            if len(buffer) > max_line:
+                raise ValueError("Archive line exceeds maximum length")
+            yield from complete
+            data = decompressor.unconsumed_tail
+            if not data:
+                return
+
+    async for chunk in chunks:
+        for line in consume(chunk):
+            if line.strip():
+                yield json.loads(line)
+    if not decompressor.eof:
+        raise ValueError("Truncated gzip archive")
+    if len(buffer) > max_line:
+        raise ValueError("Archive line exceeds maximum length")
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def import_ndjson_gzip(
+    db: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    batch_size: int = 1000
+) -> Dict[str, Any]:
+    """Load a gzip NDJSON archive produced by export_ndjson_gzip"""
+    records = iter_ndjson_gzip(chunks)
+    try:
+        header = await records.__anext__()
+    except StopAsyncIteration:
+        raise ValueError("Empty archive")
+    if header.get('format') != ARCHIVE_FORMAT:
+        raise ValueError("Not a System Rebellion metrics archive")
+    if header.get('version') != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version: {header.get('version')}")
+
+    async with BatchedMetricWriter(db, batch_size) as writer:
+        async for record in records:
+            await writer.add(record_to_row(record))
+
+    logger.info(f"Imported {writer.written} metric rows")
+    return {'imported': writer.written, 'exported_at': header.get('exported_at')}
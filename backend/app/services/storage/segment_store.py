@@ -0,0 +1,374 @@
+"""
+Segment Store
+
+Append-only storage for the raw 1 Hz sample tier. Each time window gets its
+own fixed-size segment file that is memory-mapped and filled with packed
+records, so writes never touch SQLite or its write lock. A sparse in-memory
+time index gives binary-search range lookups, and reads hand back NumPy views
+straight into the mapping without copying.
+
+Rollup tiers stay in SQLite; only raw samples live here.
+"""
+import glob
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b"SRSEG001"
+SEGMENT_VERSION = 1
+
+# Fixed-size sample record (40 bytes)
+SAMPLE_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('cpu_percent', '<f4'),
+    ('memory_percent', '<f4'),
+    ('disk_percent', '<f4'),
+    ('disk_read_rate', '<f4'),
+    ('disk_write_rate', '<f4'),
+    ('net_sent_rate', '<f4'),
+    ('net_recv_rate', '<f4'),
+    ('process_count', '<u4'),
+])
+
+# Segment file header (64 bytes), followed by `capacity` records
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('record_size', '<u4'),
+    ('window_start', '<f8'),
+    ('window_seconds', '<f8'),
+    ('capacity', '<u8'),
+    ('count', '<u8'),
+    ('reserved', 'S16'),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+SAMPLE_FIELDS = SAMPLE_DTYPE.names[1:]
+
+
+def sample_from_metrics(metrics: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten a SimplifiedMetricsService snapshot into a sample record dict"""
+    timestamp = metrics.get('timestamp')
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp).timestamp()
+    elif isinstance(timestamp, datetime):
+        timestamp = timestamp.timestamp()
+    elif timestamp is None:
+        timestamp = time.time()
+
+    disk = metrics.get('disk') or {}
+    return {
+        'timestamp': float(timestamp),
+        'cpu_percent': metrics.get('cpu_usage', 0) or 0,
+        'memory_percent': metrics.get('memory_usage', 0) or 0,
+        'disk_percent': metrics.get('disk_usage', 0) or 0,
+        'disk_read_rate': disk.get('read_rate', 0) or 0,
+        'disk_write_rate': disk.get('write_rate', 0) or 0,
+        'net_sent_rate': metrics.get('network_sent_rate', 0) or 0,
+        'net_recv_rate': metrics.get('network_recv_rate', 0) or 0,
+        'process_count': metrics.get('process_count', 0) or 0,
+    }
+
+
+class Segment:
+    """
+    A single memory-mapped segment file covering one time window.
+
+    The file is preallocated to its full capacity when created, so appends
+    are plain stores into the mapping plus a header count bump.
+    """
+
+    def __init__(self, path: str, writable: bool = False, index_stride: int = 64):
+        self.path = path
+        self.writable = writable
+        self.index_stride = index_stride
+
+        self._raw = np.memmap(path, dtype=np.uint8, mode='r+' if writable else 'r')
+        self._header = self._raw[:HEADER_SIZE].view(HEADER_DTYPE)
+        if bytes(self._header['magic'][0]) != SEGMENT_MAGIC:
+            raise ValueError(f"Not a segment file: {path}")
+        if int(self._header['record_size'][0]) != SAMPLE_DTYPE.itemsize:
+            raise ValueError(f"Segment {path} has an incompatible record layout")
+
+        self.window_start = float(self._header['window_start'][0])
+        self.window_seconds = float(self._header['window_seconds'][0])
+        self.capacity = int(self._header['capacity'][0])
+        self.records = self._raw[HEADER_SIZE:HEADER_SIZE + self.capacity * SAMPLE_DTYPE.itemsize].view(SAMPLE_DTYPE)
+
+        # Sparse index: timestamp of every `index_stride`-th record
+        self._index = np.empty(math.ceil(self.capacity / index_stride) or 1, dtype='<f8')
+        self._index_len = 0
+        self._rebuild_index()
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        window_start: float,
+        window_seconds: float,
+        capacity: int,
+        index_stride: int = 64
+    ) -> 'Segment':
+        """Preallocate a new segment file and open it for appending"""
+        with open(path, 'wb') as f:
+            f.truncate(HEADER_SIZE + capacity * SAMPLE_DTYPE.itemsize)
+        header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+        header['magic'] = SEGMENT_MAGIC
+        header['version'] = SEGMENT_VERSION
+        header['record_size'] = SAMPLE_DTYPE.itemsize
+        header['window_start'] = window_start
+        header['window_seconds'] = window_seconds
+        header['capacity'] = capacity
+        header['count'] = 0
+        header.flush()
+        del header
+        return cls(path, writable=True, index_stride=index_stride)
+
+    @property
+    def count(self) -> int:
+        return int(self._header['count'][0])
+
+    @property
+    def window_end(self) -> float:
+        return self.window_start + self.window_seconds
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        count = self.count
+        return float(self.records['timestamp'][count - 1]) if count else None
+
+    def _rebuild_index(self) -> None:
+        count = self.count
+        sampled = self.records['timestamp'][:count:self.index_stride]
+        self._index_len = len(sampled)
+        self._index[:self._index_len] = sampled
+
+    def append(self, record: Tuple) -> bool:
+        """Append one record; returns False when the segment is full"""
+        count = self.count
+        if count >= self.capacity:
+            return False
+        self.records[count] = record
+        if count % self.index_stride == 0:
+            self._index[self._index_len] = record[0]
+            self._index_len += 1
+        self._header['count'] = count + 1
+        return True
+
+    def locate(self, timestamp: float, side: str = 'left') -> int:
+        """Binary search for a timestamp using the sparse index, then within one block"""
+        count = self.count
+        if count == 0:
+            return 0
+        block = int(np.searchsorted(self._index[:self._index_len], timestamp, side=side)) - 1
+        lo = max(block, 0) * self.index_stride
+        hi = min(lo + self.index_stride, count)
+        return lo + int(np.searchsorted(self.records['timestamp'][lo:hi], timestamp, side=side))
+
+    def view(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Zero-copy view of records with start <= timestamp < end"""
+        lo = 0 if start is None else self.locate(start, 'left')
+        hi = self.count if end is None else self.locate(end, 'left')
+        return self.records[lo:max(lo, hi)]
+
+    def flush(self) -> None:
+        if self.writable:
+            self._raw.flush()
+
+    def close(self) -> None:
+        # Only drop our references; outstanding views keep the mapping alive until released
+        self.flush()
+        self.writable = False
+
+
+class SegmentStore:
+    """
+    The Meth Snail's Append-Only Sample Vault
+
+    Raw samples are appended to one segment per `window_seconds` window.
+    Segments roll automatically when a sample crosses into the next window
+    and are deleted once they fall outside the retention period.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        window_seconds: int = 3600,
+        retention_seconds: int = 48 * 3600,
+        max_rate_hz: float = 1.0,
+        index_stride: int = 64
+    ):
+        self.directory = directory
+        self.window_seconds = window_seconds
+        self.retention_seconds = retention_seconds
+        self.index_stride = index_stride
+        # Headroom for sampler jitter pushing slightly more than the nominal rate into a window
+        self.capacity = int(math.ceil(window_seconds * max_rate_hz * 1.1)) + 1
+
+        self._lock = threading.Lock()
+        self._segments: Dict[float, Segment] = {}
+        self._active: Optional[Segment] = None
+        self.dropped_count = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_existing()
+        logger.info(
+            f"Segment store at {directory} opened with {len(self._segments)} segments "
+            f"(window={window_seconds}s, capacity={self.capacity})"
+        )
+
+    def _segment_path(self, window_start: float) -> str:
+        return os.path.join(self.directory, f"seg_{int(window_start)}.dat")
+
+    def _load_existing(self) -> None:
+        for path in sorted(glob.glob(os.path.join(self.directory, "seg_*.dat"))):
+            try:
+                segment = Segment(path, writable=False, index_stride=self.index_stride)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Skipping unreadable segment {path}: {str(e)}")
+                continue
+            self._segments[segment.window_start] = segment
+
+        if self._segments:
+            # Reopen the newest segment for appending so restarts continue where they left off
+            newest = max(self._segments)
+            self._segments[newest].close()
+            self._active = Segment(self._segment_path(newest), writable=True, index_stride=self.index_stride)
+            self._segments[newest] = self._active
+
+    def _window_start(self, timestamp: float) -> float:
+        return math.floor(timestamp / self.window_seconds) * self.window_seconds
+
+    def _roll(self, window_start: float) -> Segment:
+        if self._active is not None:
+            self._active.flush()
+        segment = Segment.create(
+            self._segment_path(window_start),
+            window_start=window_start,
+            window_seconds=self.window_seconds,
+            capacity=self.capacity,
+            index_stride=self.index_stride
+        )
+        self._segments[window_start] = segment
+        self._active = segment
+        logger.debug(f"Rolled to new segment starting at {window_start}")
+        self._enforce_retention(window_start + self.window_seconds)
+        return segment
+
+    def append(self, sample: Dict[str, Any]) -> bool:
+        """
+        Append a sample dict (see `sample_from_metrics`).
+
+        Returns False when the sample was dropped because it arrived out of
+        order or its segment is full.
+        """
+        timestamp = float(sample['timestamp'])
+        record = (timestamp,) + tuple(sample.get(field, 0) or 0 for field in SAMPLE_FIELDS)
+
+        with self._lock:
+            active = self._active
+            if active is not None:
+                last = active.last_timestamp
+                if timestamp < active.window_start or (last is not None and timestamp < last):
+                    self.dropped_count += 1
+                    logger.debug(f"Dropping out-of-order sample at {timestamp}")
+                    return False
+
+            if active is None or timestamp >= active.window_end:
+                active = self._roll(self._window_start(timestamp))
+
+            if not active.append(record):
+                self.dropped_count += 1
+                logger.warning(f"Segment {active.path} is full, dropping sample at {timestamp}")
+                return False
+            return True
+
+    def read_range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[np.ndarray]:
+        """
+        Zero-copy read of samples with start <= timestamp < end.
+
+        Returns one NumPy view per overlapping segment, oldest first. Views stay
+        valid after their segment is deleted by retention, since unlinking a
+        mapped file keeps the mapping alive.
+        """
+        with self._lock:
+            segments = [
+                self._segments[key] for key in sorted(self._segments)
+                if (end is None or key < end)
+                and (start is None or key + self.window_seconds > start)
+            ]
+            return [view for view in (s.view(start, end) for s in segments) if len(view)]
+
+    def read_range_array(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Contiguous copy of `read_range`, for callers that need a single array"""
+        views = self.read_range(start, end)
+        if not views:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        return views[0].copy() if len(views) == 1 else np.concatenate(views)
+
+    def _enforce_retention(self, now: float) -> int:
+        cutoff = now - self.retention_seconds
+        expired = [key for key in self._segments if key + self.window_seconds <= cutoff]
+        for key in expired:
+            segment = self._segments.pop(key)
+            if segment is self._active:
+                self._active = None
+            segment.close()
+            try:
+                os.remove(segment.path)
+            except OSError as e:
+                logger.error(f"Failed to delete expired segment {segment.path}: {str(e)}")
+        if expired:
+            logger.info(f"Retention removed {len(expired)} expired segments")
+        return len(expired)
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """Delete segments whose whole window is older than the retention period"""
+        with self._lock:
+            return self._enforce_retention(time.time() if now is None else now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'segments': len(self._segments),
+                'samples': sum(s.count for s in self._segments.values()),
+                'dropped': self.dropped_count,
+                'oldest': min(self._segments) if self._segments else None,
+                'newest': max(self._segments) if self._segments else None,
+            }
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+            self._active = None
+
+
+# Global registry of segment stores, keyed by directory
+_segment_stores: Dict[str, SegmentStore] = {}
+
+def get_segment_store(directory: Optional[str] = None, **kwargs) -> SegmentStore:
+    """Get or create the segment store for a directory (defaults from settings)"""
+    from app.core.config import settings
+
+    directory = directory or settings.RAW_SEGMENT_DIR
+    if directory not in _segment_stores:
+        kwargs.setdefault('window_seconds', settings.RAW_SEGMENT_WINDOW_SECONDS)
+        kwargs.setdefault('retention_seconds', settings.RAW_SEGMENT_RETENTION_HOURS * 3600)
+        _segment_stores[directory] = SegmentStore(directory, **kwargs)
+    return _segment_stores[directory]
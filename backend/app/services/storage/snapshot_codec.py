@@ -0,0 +1,201 @@
+"""
+Snapshot Codec
+
+Compresses stored snapshot payloads with a zlib preset dictionary trained on
+recent snapshots. Snapshots share almost all of their keys and structure, so
+a dictionary built from earlier samples lets even a single small snapshot
+compress well. Dictionaries are versioned in the compression_dictionaries
+table and every compressed payload records the version it was written with.
+
+Payload format: b"Z" + little-endian uint32 dictionary version + raw deflate.
+"""
+import logging
+import re
+import struct
+import zlib
+from collections import Counter, deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.compression_dictionary import CompressionDictionary
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_MAGIC = b"Z"
+PAYLOAD_HEADER = struct.Struct("<cI")
+# zlib only looks back 32 KiB, so larger dictionaries would be wasted
+MAX_DICTIONARY_SIZE = 32 * 1024
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+# JSON keys (with their colon), string values, and bare scalars
+_FRAGMENT_RE = re.compile(rb'"(?:[^"\\]|\\.)*"\s*:|"(?:[^"\\]|\\.)*"|[^,:{}\[\]"\s]+')
+
+
+def train_dictionary(samples: List[bytes], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample payloads.
+
+    Fragments that appear in many samples fill up to half the dictionary,
+    ordered so the most valuable ones sit at the end where deflate
+    back-references are cheapest. The rest is the tail of the newest sample,
+    which captures whole-document structure.
+    """
+    size = min(size, MAX_DICTIONARY_SIZE)
+    if not samples:
+        return b""
+
+    document_counts: Counter = Counter()
+    for sample in samples:
+        document_counts.update(set(_FRAGMENT_RE.findall(sample)))
+
+    threshold = max(2, len(samples) // 4)
+    fragments = [f for f, c in document_counts.items() if c >= threshold and len(f) > 2]
+    fragments.sort(key=lambda f: (document_counts[f] * len(f), f))
+
+    budget = size // 2
+    chosen: List[bytes] = []
+    used = 0
+    for fragment in reversed(fragments):
+        if used + len(fragment) > budget:
+            continue
+        chosen.append(fragment)
+        used += len(fragment)
+    common = b"".join(reversed(chosen))
+
+    newest = samples[-1][-(size - len(common)):]
+    return (newest + common)[-size:]
+
+
+class SnapshotCodec:
+    """
+    The Hamster's Vacuum-Sealed Snapshot Packer
+
+    Keeps a rolling window of recent payloads, trains a new dictionary version
+    when needed, and encodes/decodes payloads against any stored version.
+    """
+
+    def __init__(
+        self,
+        dictionary_size: int = MAX_DICTIONARY_SIZE,
+        training_samples: int = 200,
+        retrain_interval: int = 5000,
+        level: int = 6
+    ):
+        self.dictionary_size = dictionary_size
+        self.training_samples = training_samples
+        self.retrain_interval = retrain_interval
+        self.level = level
+
+        self.dictionaries: Dict[int, bytes] = {}
+        self.current_version: Optional[int] = None
+        self._recent: Deque[bytes] = deque(maxlen=training_samples)
+        self._observed_since_training = 0
+        self._loaded = False
+
+    # Dictionary management
+
+    async def load(self, db: AsyncSession) -> None:
+        """Load every stored dictionary version, newest becoming current"""
+        result = await db.execute(
+            select(CompressionDictionary).order_by(CompressionDictionary.version)
+        )
+        for row in result.scalars().all():
+            self.dictionaries[row.version] = row.dictionary
+            self.current_version = row.version
+        self._loaded = True
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if not self._loaded:
+            await self.load(db)
+
+    def observe(self, payload: bytes) -> None:
+        """Record a payload as training material for the next dictionary"""
+        self._recent.append(payload)
+        self._observed_since_training += 1
+
+    def should_train(self) -> bool:
+        if len(self._recent) < self.training_samples:
+            return False
+        return self.current_version is None or self._observed_since_training >= self.retrain_interval
+
+    async def train(self, db: AsyncSession) -> int:
+        """Train a dictionary on recent payloads and store it as a new version
+
+        The dictionary is committed in a transaction of its own, on db's
+        engine, before it becomes current: nothing may be encoded against a
+        version that the caller's rollback could still take away.
+        """
+        dictionary = train_dictionary(list(self._recent), self.dictionary_size)
+        async with AsyncSession(db.bind, expire_on_commit=False) as own:
+            row = CompressionDictionary(
+                algorithm="zlib",
+                dictionary=dictionary,
+                sample_count=len(self._recent)
+            )
+            own.add(row)
+            await own.commit()
+
+        self.dictionaries[row.version] = dictionary
+        self.current_version = row.version
+        self._observed_since_training = 0
+        logger.info(f"Trained snapshot dictionary v{row.version} ({len(dictionary)} bytes) on {len(self._recent)} samples")
+        return row.version
+
+    # Encoding
+
+    def encode(self, payload: bytes, version: Optional[int] = None) -> bytes:
+        """Compress a payload with the given (or current) dictionary version"""
+        version = self.current_version if version is None else version
+        if version is None:
+            raise ValueError("No compression dictionary has been trained yet")
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionaries[version])
+        return PAYLOAD_HEADER.pack(PAYLOAD_MAGIC, version) + compressor.compress(payload) + compressor.flush()
+
+    @staticmethod
+    def payload_version(blob: bytes) -> int:
+        magic, version = PAYLOAD_HEADER.unpack_from(blob)
+        if magic != PAYLOAD_MAGIC:
+            raise ValueError("Not a dictionary-compressed snapshot payload")
+        return version
+
+    def iter_decode(self, blob: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Stream-decompress a payload, yielding at most `chunk_size` bytes at a time
+        so large snapshots never have to be inflated in one piece.
+        """
+        version = self.payload_version(blob)
+        dictionary = self.dictionaries.get(version)
+        if dictionary is None:
+            raise KeyError(f"Compression dictionary v{version} is not loaded")
+
+        decompressor = zlib.decompressobj(-15, zdict=dictionary)
+        data = memoryview(blob)[PAYLOAD_HEADER.size:]
+        while data:
+            chunk = decompressor.decompress(data, chunk_size)
+            if chunk:
+                yield chunk
+            data = decompressor.unconsumed_tail
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def decode(self, blob: bytes) -> bytes:
+        return b"".join(self.iter_decode(blob))
+
+
+# Shared codec so dictionaries are loaded once per process
+_snapshot_codec: Optional[SnapshotCodec] = None
+
+def get_snapshot_codec() -> SnapshotCodec:
+    """Get the process-wide snapshot codec configured from settings"""
+    global _snapshot_codec
+    if _snapshot_codec is None:
+        from app.core.config import settings
+        _snapshot_codec = SnapshotCodec(
+            dictionary_size=settings.SNAPSHOT_DICTIONARY_SIZE,
+            training_samples=settings.SNAPSHOT_DICTIONARY_TRAINING_SAMPLES,
+            retrain_interval=settings.SNAPSHOT_DICTIONARY_RETRAIN_INTERVAL
+        )
+    return _snapshot_codec
@@ -0,0 +1,316 @@
+"""
+Snapshot Deduplication
+
+Metric snapshots repeat the same static sections (interface lists, partition
+tables, MAC addresses, core counts) in every stored row. Before a snapshot is
+persisted those sections are moved into content-addressed SnapshotBlob rows
+and replaced with a `{"$blob": <sha256>}` reference; reads expand the
+references again so callers always see the original snapshot.
+
+When SNAPSHOT_COMPRESSION_ENABLED is set, blob payloads and the per-row
+skeletons are additionally compressed with the shared SnapshotCodec's current
+preset dictionary.
+"""
+import base64
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.snapshot_blob import SnapshotBlob
+from app.services.storage.snapshot_codec import SnapshotCodec, get_snapshot_codec
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_KEY = "$blob"
+# A whole skeleton compressed with the codec: {"$zdict": <base64 payload>}
+PACKED_SKELETON_KEY = "$zdict"
+ZDICT_ENCODING_PREFIX = "zdict:"
+
+# Path to a dict inside the snapshot -> keys whose values are static or slow-changing.
+# All listed keys present at that path are stored together as one blob. A
+# (key, fields) entry keeps only those fields of a dict, or of each dict in a
+# list, in the blob; the live fields stay in the row and are merged back on read.
+STATIC_SECTIONS: Dict[Tuple[str, ...], Tuple[Union[str, Tuple[str, Tuple[str, ...]]], ...]] = {
+    (): ('system_info',),
+    ('cpu',): ('physical_cores', 'logical_cores', ('frequency_details', ('min', 'max'))),
+    ('memory',): ('total',),
+    ('disk',): (('partitions', ('device', 'mountpoint', 'fstype', 'opts', 'total')), 'total'),
+    ('network',): ('interfaces',),
+}
+
+
+def _project(value: Any, fields: Tuple[str, ...]) -> Tuple[Any, Any]:
+    """Split a dict, or a list of dicts, into (static fields, remaining fields)"""
+    if isinstance(value, dict):
+        return ({f: value[f] for f in fields if f in value},
+                {k: v for k, v in value.items() if k not in fields})
+    if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+        pairs = [_project(item, fields) for item in value]
+        return [static for static, _ in pairs], [rest for _, rest in pairs]
+    return None, value
+
+
+def _merge(live: Any, static: Any) -> Any:
+    """Inverse of _project: dicts merge key by key and equal-length lists item by item"""
+    if isinstance(live, dict) and isinstance(static, dict):
+        merged = dict(live)
+        for key, value in static.items():
+            merged[key] = _merge(live[key], value) if key in live else value
+        return merged
+    if isinstance(live, list) and isinstance(static, list) and len(live) == len(static):
+        return [_merge(a, b) for a, b in zip(live, static)]
+    # Section values win over anything left in the skeleton
+    return static
+
+
+def canonical_json(value: Any) -> bytes:
+    """Deterministic JSON encoding, so equal content always hashes the same"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def content_digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+class SnapshotDeduplicator:
+    """
+    Sir Hawkington's Distinguished Snapshot Compactor
+
+    Splits snapshots into a small per-row skeleton plus shared blobs, and
+    expands skeletons back into full snapshots on read.
+    """
+
+    def __init__(
+        self,
+        sections: Optional[Dict[Tuple[str, ...], Tuple[str, ...]]] = None,
+        cache_size: int = 1024,
+        codec: Optional[SnapshotCodec] = None
+    ):
+        self.sections = sections or STATIC_SECTIONS
+        self.cache_size = cache_size
+        # Only compress when a codec is supplied; decoding falls back to the shared one
+        self.codec = codec
+        # digest -> raw JSON payload for blobs known to be persisted
+        self._known: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def _remember(self, digest: str, content: bytes) -> None:
+        self._known[digest] = content
+        self._known.move_to_end(digest)
+        while len(self._known) > self.cache_size:
+            self._known.popitem(last=False)
+
+    def encode_payload(self, content: bytes) -> Tuple[str, bytes]:
+        """Encoding applied to blob payloads before they are written"""
+        if self.codec is None or self.codec.current_version is None:
+            return "json", content
+        return f"{ZDICT_ENCODING_PREFIX}{self.codec.current_version}", self.codec.encode(content)
+
+    def _decoding_codec(self) -> SnapshotCodec:
+        return self.codec or get_snapshot_codec()
+
+    def decode_payload(self, encoding: str, payload: bytes) -> bytes:
+        if encoding == "json":
+            return payload
+        if encoding.startswith(ZDICT_ENCODING_PREFIX):
+            return self._decoding_codec().decode(payload)
+        raise ValueError(f"Unknown snapshot blob encoding: {encoding}")
+
+    def split(self, snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+        """
+        Replace static sections with blob references.
+
+        Returns the skeleton and a digest -> JSON payload map of every blob it references.
+        The input snapshot is not modified.
+        """
+        skeleton = dict(snapshot)
+        blobs: Dict[str, bytes] = {}
+
+        for path, keys in self.sections.items():
+            # Copy each dict along the path so the caller's snapshot is never mutated
+            container = skeleton
+            for part in path:
+                value = container.get(part)
+                if not isinstance(value, dict):
+                    container = None
+                    break
+                container[part] = dict(value)
+                container = container[part]
+            if container is None:
+                continue
+
+            section = {}
+            for entry in keys:
+                key, fields = (entry, None) if isinstance(entry, str) else entry
+                if key not in container:
+                    continue
+                if fields is None:
+                    section[key] = container.pop(key)
+                    continue
+                static, live = _project(container[key], fields)
+                if static is None:
+                    continue
+                section[key] = static
+                # A list keeps one (possibly empty) dict per item so items line up on expand
+                if any(live) if isinstance(live, list) else live:
+                    container[key] = live
+                else:
+                    del container[key]
+            if not section:
+                continue
+
+            payload = canonical_json(section)
+            digest = content_digest(payload)
+            blobs[digest] = payload
+            container[BLOB_REF_KEY] = digest
+
+        return skeleton, blobs
+
+    async def store(self, db: AsyncSession, snapshot: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Persist any new blobs for a snapshot and return its skeleton.
+
+        Blobs already known to this process are skipped without touching the
+        database; the caller owns the transaction and commits.
+        """
+        if not isinstance(snapshot, dict):
+            return snapshot
+
+        skeleton, blobs = self.split(snapshot)
+        # Blobs already added in this transaction (e.g. metrics_before when storing metrics_after)
+        pending = db.info.setdefault('pending_snapshot_blobs', set())
+        if self.codec is not None:
+            await self.codec.ensure_loaded(db)
+            self.codec.observe(canonical_json(snapshot))
+            # Training commits on a connection of its own; once this session has
+            # written, SQLite would make that wait on us, so leave it to the next save
+            if self.codec.should_train() and not pending:
+                await self.codec.train(db)
+        unknown = [digest for digest in blobs if digest not in self._known and digest not in pending]
+        if unknown:
+            result = await db.execute(
+                select(SnapshotBlob.digest).where(SnapshotBlob.digest.in_(unknown))
+            )
+            existing = set(result.scalars().all())
+            rows = []
+            for digest in unknown:
+                if digest in existing:
+                    self._remember(digest, blobs[digest])
+                    continue
+                # Not cached until a later lookup sees it committed, so a rollback can't leave dangling refs
+                encoding, payload = self.encode_payload(blobs[digest])
+                rows.append({'digest': digest, 'encoding': encoding, 'payload': payload, 'size': len(blobs[digest])})
+                pending.add(digest)
+            if rows:
+                await self._insert_blobs(db, rows)
+
+        return self.pack(skeleton)
+
+    def pack(self, skeleton: Dict[str, Any]) -> Dict[str, Any]:
+        """Compress the per-row skeleton too when a dictionary is available"""
+        if self.codec is None or self.codec.current_version is None:
+            return skeleton
+        packed = self.codec.encode(canonical_json(skeleton))
+        return {PACKED_SKELETON_KEY: base64.b64encode(packed).decode('ascii')}
+
+    async def _unpack_many(self, db: AsyncSession, skeletons: List[Any]) -> List[Any]:
+        packed = [s for s in skeletons if isinstance(s, dict) and isinstance(s.get(PACKED_SKELETON_KEY), str)]
+        if not packed:
+            return skeletons
+        codec = self._decoding_codec()
+        payloads = {id(s): base64.b64decode(s[PACKED_SKELETON_KEY]) for s in packed}
+        if not {codec.payload_version(p) for p in payloads.values()}.issubset(codec.dictionaries):
+            await codec.load(db)
+        return [json.loads(codec.decode(payloads[id(s)])) if id(s) in payloads else s for s in skeletons]
+
+    async def _insert_blobs(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """Insert new blobs, skipping any another writer committed since our lookup
+
+        Two concurrent saves of the same new snapshot would otherwise both
+        insert its blobs, and the loser's whole transaction - its tuning
+        history row included - would fail on the primary key.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            db.add_all(SnapshotBlob(**row) for row in rows)
+            return
+        await db.execute(insert(SnapshotBlob).values(rows).on_conflict_do_nothing(index_elements=['digest']))
+
+    def _collect_refs(self, value: Any, refs: set) -> None:
+        if isinstance(value, dict):
+            digest = value.get(BLOB_REF_KEY)
+            if isinstance(digest, str):
+                refs.add(digest)
+            for child in value.values():
+                self._collect_refs(child, refs)
+        elif isinstance(value, list):
+            for child in value:
+                self._collect_refs(child, refs)
+
+    def _expand(self, value: Any, contents: Dict[str, bytes]) -> Any:
+        if isinstance(value, dict):
+            expanded = {k: self._expand(v, contents) for k, v in value.items() if k != BLOB_REF_KEY}
+            digest = value.get(BLOB_REF_KEY)
+            if isinstance(digest, str):
+                payload = contents.get(digest)
+                if payload is None:
+                    logger.warning(f"Snapshot references missing blob {digest}")
+                    expanded[BLOB_REF_KEY] = digest
+                else:
+                    expanded = _merge(expanded, json.loads(payload))
+            return expanded
+        if isinstance(value, list):
+            return [self._expand(v, contents) for v in value]
+        return value
+
+    async def expand_many(self, db: AsyncSession, skeletons: Iterable[Any]) -> List[Any]:
+        """Expand several skeletons, fetching all uncached blobs in one query"""
+        skeletons = await self._unpack_many(db, list(skeletons))
+        refs: set = set()
+        for skeleton in skeletons:
+            self._collect_refs(skeleton, refs)
+
+        contents = {digest: self._known[digest] for digest in refs if digest in self._known}
+        missing = [digest for digest in refs if digest not in contents]
+        if missing:
+            result = await db.execute(
+                select(SnapshotBlob).where(SnapshotBlob.digest.in_(missing))
+            )
+            rows = result.scalars().all()
+            if any(blob.encoding.startswith(ZDICT_ENCODING_PREFIX) for blob in rows):
+                codec = self._decoding_codec()
+                needed = {int(blob.encoding[len(ZDICT_ENCODING_PREFIX):]) for blob in rows
+                          if blob.encoding.startswith(ZDICT_ENCODING_PREFIX)}
+                # Another process may have trained newer versions since we last loaded
+                if not needed.issubset(codec.dictionaries):
+                    await codec.load(db)
+            for blob in rows:
+                content = self.decode_payload(blob.encoding, blob.payload)
+                contents[blob.digest] = content
+                self._remember(blob.digest, content)
+
+        return [self._expand(skeleton, contents) for skeleton in skeletons]
+
+    async def expand(self, db: AsyncSession, skeleton: Any) -> Any:
+        return (await self.expand_many(db, [skeleton]))[0]
+
+
+# Shared deduplicator so the known-blob cache is reused across requests
+_snapshot_deduplicator: Optional[SnapshotDeduplicator] = None
+
+def get_snapshot_deduplicator() -> SnapshotDeduplicator:
+    """Get the process-wide snapshot deduplicator"""
+    global _snapshot_deduplicator
+    if _snapshot_deduplicator is None:
+        codec = get_snapshot_codec() if settings.SNAPSHOT_COMPRESSION_ENABLED else None
+        _snapshot_deduplicator = SnapshotDeduplicator(codec=codec)
+    return _snapshot_deduplicator
@@ -0,0 +1,75 @@
+# tests/test_benchmarks.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.benchmarks import BenchmarkSuite, cpu_loop, file_io, memory_bandwidth, tcp_loopback
+from app.optimization.tuning_experiment import TuningExperiment
+
+
+def test_workloads_produce_positive_scores(tmp_path):
+    assert cpu_loop(duration=0.05)['cpu_ops_per_s'] > 0
+    assert memory_bandwidth(size_mb=4, copies=2)['memory_copy_mb_per_s'] > 0
+    tcp = tcp_loopback(size_mb=2, pings=20)
+    assert tcp['tcp_throughput_mb_per_s'] > 0 and tcp['tcp_rtt_us'] > 0
+
+
+@pytest.mark.parametrize('sync', ['none', 'fsync', 'dsync'])
+def test_file_io_sync_modes_clean_up(tmp_path, sync):
+    scores = file_io(size_mb=1, block_size=256 * 1024, sync=sync, directory=str(tmp_path))
+    assert scores['file_write_mb_per_s'] > 0 and scores['file_read_mb_per_s'] > 0
+    assert scores['file_write_latency_ms'] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_suite_validates_configuration():
+    with pytest.raises(ValueError):
+        BenchmarkSuite(['gpu'])
+    with pytest.raises(ValueError):
+        BenchmarkSuite(['file_io'], {'file_io': {'sync': 'sometimes'}})
+    with pytest.raises(ValueError):
+        BenchmarkSuite(['file_io'], {'file_io': {'block_size': 0}})
+
+
+def test_suite_run_reports_spread(tmp_path):
+    suite = BenchmarkSuite(['cpu', 'file_io'], {'cpu': {'duration': 0.02}, 'file_io': {'size_mb': 1}},
+                           directory=str(tmp_path))
+    result = asyncio.run(suite.run(repeats=3))
+    assert set(result['scores']) == set(suite.objectives)
+    assert len(result['scores']['cpu_ops_per_s']['samples']) == 3
+    assert result['scores']['file_write_latency_ms']['better'] == 'lower'
+
+
+class FakeTuner:
+    def __init__(self):
+        self.calls = []
+
+    async def apply_tuning(self, data, user_id=None):
+        self.calls.append(data)
+        return {**data, 'success': True}
+
+    async def get_current_metrics(self):
+        return {}
+
+
+def test_benchmarked_experiment_records_scores():
+    suite = BenchmarkSuite(['cpu'], {'cpu': {'duration': 0.01}})
+    tuner = FakeTuner()
+    experiment = TuningExperiment(tuner, benchmark=suite, samples=3, sample_interval=0, settle_seconds=0)
+    record = asyncio.run(experiment.run({'parameter': 'swap_tendency', 'current_value': '60', 'new_value': '40'}))
+    assert record['verdict'] in ('improved', 'inconclusive', 'regressed')
+    assert list(record['effect_sizes']['objectives']) == ['cpu_ops_per_s']
+    scores = record['benchmark_scores']
+    assert scores['workloads'] == ['cpu']
+    assert len(scores['before']['cpu_ops_per_s']) == len(scores['after']['cpu_ops_per_s']) == 3
+
+
+def test_history_dict_includes_benchmark_scores():
+    from app.models.tuning_history import TuningHistory
+    scores = {'before': {'cpu_ops_per_s': {'mean': 1.0}}, 'after': {'cpu_ops_per_s': {'mean': 1.1}}}
+    entry = TuningHistory(user_id=1, parameter='swappiness', new_value='10', benchmark_scores=scores)
+    assert entry.to_dict()['benchmark_scores'] == scores
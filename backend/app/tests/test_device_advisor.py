@@ -0,0 +1,114 @@
+# tests/test_device_advisor.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.device_advisor import DeviceAdvisor, DeviceStatsTracker
+from app.optimization.tunable_state import TunableStateReader
+from app.optimization.tuning_backend import SysfsTuningBackend
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def _block_stat(reads, merges, sectors, writes, io_ticks, queue_time):
+    return f"{reads} {merges} {sectors} 0 {writes} 0 0 0 0 {io_ticks} {queue_time}"
+
+
+def _proc_stat(busy, idle):
+    lines = ["cpu 0 0 0 0 0 0 0 0"]
+    for cpu in range(4):
+        lines.append(f"cpu{cpu} {busy[cpu]} 0 0 {idle[cpu]} 0 0 0 0")
+    return "\n".join(lines)
+
+
+def _host(root):
+    """Two packages of two CPUs, an NVMe drive, a spinning disk and one NIC"""
+    _write(root, 'sys/devices/system/cpu/online', '0-3')
+    for cpu in range(4):
+        base = f'sys/devices/system/cpu/cpu{cpu}'
+        _write(root, f'{base}/cpufreq/scaling_governor', 'ondemand' if cpu < 2 else 'performance')
+        _write(root, f'{base}/cpufreq/scaling_available_governors', 'performance ondemand powersave')
+        _write(root, f'{base}/topology/physical_package_id', str(cpu // 2))
+    _write(root, 'sys/block/nvme0n1/queue/scheduler', 'none [mq-deadline]')
+    _write(root, 'sys/block/nvme0n1/queue/rotational', '0')
+    _write(root, 'sys/block/nvme0n1/queue/read_ahead_kb', '128')
+    _write(root, 'sys/block/nvme0n1/queue/nr_requests', '1023')
+    _write(root, 'sys/block/sda/queue/scheduler', '[none] mq-deadline bfq')
+    _write(root, 'sys/block/sda/queue/rotational', '1')
+    _write(root, 'sys/block/sda/queue/read_ahead_kb', '128')
+    _write(root, 'sys/block/sda/queue/nr_requests', '64')
+    _write(root, 'sys/class/net/eth0/tx_queue_len', '1000')
+    _write(root, 'sys/class/net/eth0/queues/rx-0/rps_cpus', '0')
+    _write(root, 'sys/class/net/eth0/queues/tx-0/xps_cpus', '0')
+    _write(root, 'proc/uptime', '1000.0 4000.0')
+    _set_counters(root, 0)
+    reader = TunableStateReader(root=str(root), ttl_seconds=3600)
+    return reader, DeviceAdvisor(reader, DeviceStatsTracker(root=str(root), reader=reader))
+
+
+def _set_counters(root, seconds):
+    """Counters after `seconds` of load: sequential HDD reads, a deep queue, busy package 0"""
+    _write(root, 'sys/block/nvme0n1/stat', _block_stat(100 * seconds, 0, 800 * seconds, 50 * seconds, 100 * seconds, 200 * seconds))
+    # 200 reads/s of 256 KiB, 90% busy, 60 requests in flight
+    _write(root, 'sys/block/sda/stat', _block_stat(200 * seconds, 600 * seconds, 102400 * seconds, 0, 900 * seconds, 60000 * seconds))
+    stats = 'sys/class/net/eth0/statistics'
+    _write(root, f'{stats}/rx_packets', str(50000 * seconds))
+    _write(root, f'{stats}/rx_bytes', str(50000 * 1500 * seconds))
+    _write(root, f'{stats}/tx_packets', str(1000 * seconds))
+    _write(root, f'{stats}/tx_dropped', str(5 * seconds))
+    _write(root, 'proc/stat', _proc_stat([95 * seconds] * 2 + [5 * seconds] * 2, [5 * seconds] * 2 + [95 * seconds] * 2))
+
+
+def _by_target(recommendations):
+    return {(r['parameter'], r['targets'][0]): r for r in recommendations}
+
+
+def test_recommendations_follow_each_devices_own_statistics(tmp_path):
+    reader, advisor = _host(tmp_path)
+    advisor.recommend(now=0.0)
+    _set_counters(tmp_path, 10)
+    found = _by_target(advisor.recommend(now=10.0))
+
+    # NVMe and HDD on the same host get different schedulers
+    assert found[('io_scheduler', 'nvme0n1')]['new_value'] == 'none'
+    assert found[('io_scheduler', 'sda')]['new_value'] == 'mq-deadline'
+    # Large merged reads on the HDD are sequential: 2 MiB read-ahead
+    assert found[('disk_read_ahead', 'sda')]['new_value'] == '4096'
+    assert ('disk_read_ahead', 'nvme0n1') not in found
+    assert found[('nr_requests', 'sda')]['new_value'] == '128'
+    assert found[('rps_cpus', 'eth0')]['new_value'] == 'f'
+    assert found[('tx_queue_len', 'eth0')]['new_value'] == '2000'
+    # The busy package speeds up, the idle one saves power
+    assert found[('cpu_governor', 'package0')]['new_value'] == 'performance'
+    assert found[('cpu_governor', 'package1')]['new_value'] == 'ondemand'
+
+
+def test_first_sample_is_measured_against_boot(tmp_path):
+    reader, advisor = _host(tmp_path)
+    _set_counters(tmp_path, 1000)
+    rates = advisor.tracker.sample(now=0.0)
+    assert abs(rates['block']['sda']['reads_per_s'] - 200) < 1e-9
+    assert abs(rates['cpu']['cpu0']['utilisation'] - 0.95) < 1e-9
+
+
+def test_targets_scope_writes_to_one_package_or_interface(tmp_path):
+    reader, _ = _host(tmp_path)
+    backend = SysfsTuningBackend(root=str(tmp_path), dry_run=False, helper_command='', reader=reader)
+    result = backend.apply({'cpu_governor': 'powersave', 'rps_cpus': 'f', 'nr_requests': 128},
+                           targets={'cpu_governor': ['package1'], 'nr_requests': ['sda']})
+    assert result.success
+    assert sorted(write.target for write in result.applied if write.parameter == 'cpu_governor') == ['cpu2', 'cpu3']
+    assert (tmp_path / 'sys/class/net/eth0/queues/rx-0/rps_cpus').read_text() == 'f'
+    assert (tmp_path / 'sys/block/sda/queue/nr_requests').read_text() == '128'
+    reader.invalidate()
+    assert reader.current_value('cpu_governor', ['package1']) == 'powersave'
+    assert reader.current_value('cpu_governor', ['package0']) == 'ondemand'
+    assert reader.current_value('nr_requests', ['nvme0n1']) == '1023'
+    assert reader.snapshot()['block']['nvme0n1']['kind'] == 'nvme'
+    assert reader.snapshot()['block']['sda']['kind'] == 'hdd'
+    assert reader.is_noop('rps_cpus', 'f', ['eth0'])
@@ -0,0 +1,91 @@
+# tests/test_forecasting.py
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ml.context.advanced_patterns import AdvancedPatternDetector, WorkloadPredictor
+from app.ml.context.forecasting import HoltWinters, select_parameters
+
+
+def _daily(hours: int, noise: float = 0.0, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(hours)
+    return 50 + 20 * np.sin(2 * np.pi * t / 24) + 0.05 * t + rng.normal(0, noise, hours)
+
+
+def test_tracks_seasonal_series():
+    values = _daily(24 * 21, noise=1.0)
+    model = HoltWinters(season_length=24).fit(values[:-24])
+    forecast = model.forecast(24)
+    assert np.abs(forecast - values[-24:]).mean() < 2.0
+    assert model.residual_std < 3.0
+
+
+def test_warmup_falls_back_to_mean():
+    model = HoltWinters(season_length=24).fit([10.0, 20.0, 30.0])
+    assert not model.initialised
+    assert model.forecast(3).tolist() == [20.0, 20.0, 20.0]
+    assert model.score(100.0) is None
+
+
+def test_state_round_trips():
+    model = HoltWinters(season_length=12).fit(_daily(100, noise=2.0))
+    restored = HoltWinters.from_dict(model.to_dict())
+    assert np.allclose(restored.forecast(12), model.forecast(12))
+    model.update(55.0)
+    restored.update(55.0)
+    assert np.isclose(restored.predict_next(), model.predict_next())
+
+
+def test_select_parameters_needs_two_seasons():
+    with pytest.raises(ValueError):
+        select_parameters(np.ones(30), season_length=24)
+    alpha, beta, gamma = select_parameters(_daily(24 * 7, noise=1.0), season_length=24)
+    assert 0 < alpha <= 1 and 0 <= beta <= 1 and 0 < gamma <= 1
+
+
+def test_predict_sequence_without_keras():
+    forecast = AdvancedPatternDetector().predict_sequence(_daily(72).reshape(-1, 1), horizon=5)
+    assert forecast.shape == (5, 1)
+
+
+def test_workload_predictor_buckets_hourly_and_flags_spikes():
+    predictor = WorkloadPredictor()
+    start = datetime(2026, 10, 1)
+    cpu = _daily(24 * 7, noise=0.5) / 100
+    for hour, value in enumerate(cpu):
+        for minute in (0, 20, 40):
+            predictor.add_observation(
+                "user", start + timedelta(hours=hour, minutes=minute), "coding",
+                {'cpu': value, 'memory': 0.4}
+            )
+
+    result = predictor.predict_workload("user", future_hours=12)
+    assert len(result['predictions']['cpu']) == 12
+    # The open bucket is the last hour fed; the next hours follow the daily curve
+    assert np.abs(np.array(result['predictions']['cpu'][1:]) - _daily(24 * 7 + 11)[-11:] / 100).max() < 0.05
+    assert not result['current_anomalies']['cpu']
+
+    predictor.add_observation("user", start + timedelta(hours=24 * 7 - 1, minutes=50), "coding",
+                              {'cpu': 3.0, 'memory': 0.4})
+    assert predictor.predict_workload("user")['current_anomalies']['cpu']
+    assert predictor.predict_workload("nobody") == {}
+
+
+def test_workload_predictor_does_not_flag_sample_noise():
+    predictor = WorkloadPredictor()
+    start = datetime(2026, 10, 1)
+    rng = np.random.default_rng(4)
+    flagged = scored = 0
+    for minute in range(0, 7 * 24 * 60, 5):
+        predictor.add_observation("user", start + timedelta(minutes=minute), "idle",
+                                  {'cpu': rng.uniform(0, 1)})
+        if minute >= 3 * 24 * 60:
+            scored += 1
+            flagged += predictor._anomalies["user"]["cpu"]
+    assert flagged / scored < 0.01
@@ -0,0 +1,117 @@
+# tests/test_metric_archive.py
+import asyncio
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.models.metrics import SystemMetrics
+from app.services.storage.metric_archive import (
+    BatchedMetricWriter,
+    export_ndjson_gzip,
+    import_ndjson_gzip,
+    iter_ndjson_gzip
+)
+
+START = datetime(2026, 1, 1)
+
+
+async def make_session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[SystemMetrics.__table__])
+    return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def seed(db, count):
+    async with BatchedMetricWriter(db, batch_size=64) as writer:
+        for i in range(count):
+            await writer.add({
+                'timestamp': START + timedelta(seconds=i),
+                'cpu_usage': float(i),
+                'memory_usage': 50.0,
+                'disk_usage': 70.0,
+                'network_usage': {'sent_rate': i},
+                'process_count': 100,
+                'additional_metrics': None,
+            })
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+async def feed(data, size=257):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+def test_export_range_round_trips_through_import():
+    async def scenario():
+        source_engine, Source = await make_session_factory()
+        target_engine, Target = await make_session_factory()
+        try:
+            async with Source() as db:
+                await seed(db, 500)
+                chunks = await collect(export_ndjson_gzip(
+                    db, START + timedelta(seconds=100), START + timedelta(seconds=400), batch_size=50
+                ))
+            async with Target() as db:
+                summary = await import_ndjson_gzip(db, feed(b"".join(chunks)), batch_size=64)
+                rows = (await db.execute(select(SystemMetrics).order_by(SystemMetrics.timestamp))).scalars().all()
+            return chunks, summary, rows
+        finally:
+            await source_engine.dispose()
+            await target_engine.dispose()
+
+    chunks, summary, rows = asyncio.run(scenario())
+    # Output is produced incrementally rather than as one buffer
+    assert len(chunks) > 1
+    lines = gzip.decompress(b"".join(chunks)).splitlines()
+    assert json.loads(lines[0])['format'] == 'system-rebellion-metrics'
+    assert len(lines) == 301
+
+    assert summary['imported'] == 300
+    assert rows[0].cpu_usage == 100.0
+    assert rows[-1].timestamp == START + timedelta(seconds=399)
+    assert rows[5].network_usage == {'sent_rate': 105}
+
+
+def test_import_rejects_foreign_archive():
+    async def scenario():
+        engine, Session = await make_session_factory()
+        try:
+            async with Session() as db:
+                archive = gzip.compress(b'{"format": "something-else"}\n{}\n')
+                with pytest.raises(ValueError):
+                    await import_ndjson_gzip(db, feed(archive))
+                return (await db.execute(select(func.count()).select_from(SystemMetrics))).scalar()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_compressed_bomb_is_rejected_without_inflating_it():
+    # 64 MiB of zeros without a newline compresses to about 64 KiB
+    bomb = gzip.compress(b"0" * (64 * 1024 * 1024))
+
+    async def scenario():
+        inflated = 0
+        async for _ in iter_ndjson_gzip(feed(bomb, size=len(bomb)), max_line=1024):
+            inflated += 1
+        return inflated
+
+    with pytest.raises(ValueError, match="maximum length"):
+        asyncio.run(scenario())
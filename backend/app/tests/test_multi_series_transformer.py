@@ -0,0 +1,59 @@
+# tests/test_multi_series_transformer.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.resilience.multi_series_transformer import MultiSeriesTransformer, extract_series
+
+
+def make_snapshot(i):
+    return {
+        'cpu': {'usage_percent': 10.0 + i, 'cores': [float(i), 50.0]},
+        'memory': {'percent': 40.0},
+        'network': {'interface_stats': {'eth0': {'bytes_sent': 1000 * i, 'bytes_recv': 0}}},
+        'disk': {'io_counters': {'sda': {'read_bytes': 512 * i, 'write_bytes': 0}}},
+    }
+
+
+def test_extract_series_flattens_per_device_metrics():
+    gauges, counters = extract_series({'cpu': {'type': 'cpu', 'data': {'usage_percent': 5, 'cores': [1, 2]}}})
+    assert gauges == {'cpu.total': 5, 'cpu.core0': 1, 'cpu.core1': 2}
+    assert counters == {}
+
+    _, counters = extract_series(make_snapshot(3))
+    assert counters['net.eth0.sent_rate'] == 3000
+    assert counters['disk.sda.read_rate'] == 1536
+
+
+def test_all_series_match_per_series_reference():
+    transformer = MultiSeriesTransformer(history_size=20, smoothing_window=5, trend_window=10)
+    for i in range(50):
+        result = transformer.transform(make_snapshot(i), timestamp=1000.0 + i)
+
+    series = result['series']
+    # Counters became per-second rates
+    assert series['net.eth0.sent_rate']['current'] == 1000.0
+    assert series['disk.sda.read_rate']['current'] == 512.0
+    assert np.isclose(series['cpu.core0']['trend'], 1.0)
+    assert np.isclose(series['cpu.total']['rate_of_change'], 1.0)
+    assert series['cpu.core1']['std_dev'] == 0.0
+
+    window = transformer.history('cpu.core0')
+    assert np.isclose(series['cpu.core0']['mean'], window.mean())
+    assert np.isclose(series['cpu.core0']['std_dev'], window.std())
+    assert np.isclose(series['cpu.core0']['smoothed'], window[-5:].mean())
+
+
+def test_new_series_and_spikes_are_flagged():
+    transformer = MultiSeriesTransformer(history_size=30)
+    for i in range(20):
+        transformer.transform({'cpu': {'usage_percent': 10.0 + (i % 2)}}, timestamp=float(i))
+    result = transformer.transform(
+        {'cpu': {'usage_percent': 95.0, 'cores': [3.0]}}, timestamp=20.0
+    )
+    assert result['anomalies'] == ['cpu.total']
+    assert result['series']['cpu.core0']['current'] == 3.0
+    assert transformer.history().shape == (21, 2)
@@ -0,0 +1,83 @@
+# tests/test_pattern_validator.py
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ml.pattern_recognition.pattern_validator import PatternValidator
+
+START = datetime(2026, 10, 1)
+
+
+def _metrics(rng):
+    return {
+        'cpu_usage': float(rng.uniform(0, 100)),
+        'memory_usage': float(rng.uniform(20, 80)),
+        'disk_usage': float(rng.uniform(49, 51))
+    }
+
+
+def test_rolling_variance_matches_recompute_after_expiry():
+    validator = PatternValidator()
+    validator.validation_window = timedelta(hours=6)
+    pattern = {'metrics': {'name': 'nightly_build'}}
+    rng = np.random.default_rng(2)
+
+    history = []
+    offset = 0.0
+    for _ in range(400):
+        offset += rng.uniform(0, 180)
+        now = START + timedelta(seconds=offset)
+        metrics = _metrics(rng)
+        history.append((now, metrics))
+        result = asyncio.run(validator.validate_pattern(pattern, metrics, timestamp=now))
+
+    window = [m for t, m in history if t > now - validator.validation_window]
+    details = result['validation_metrics']
+    assert details['sample_count'] == len(window)
+    assert np.isclose(details['variance']['cpu'], np.var([m['cpu_usage'] for m in window]) / 100)
+    assert np.isclose(details['variance']['disk'], np.var([m['disk_usage'] for m in window]) / 100)
+    first = min(t for t, m in history if t > now - validator.validation_window)
+    assert np.isclose(details['time_span'], (now - first).total_seconds())
+
+
+def test_confidence_needs_min_samples_and_rewards_stability():
+    validator = PatternValidator()
+    steady = {'metrics': {'name': 'steady'}}
+    for hour in range(30):
+        result = asyncio.run(validator.validate_pattern(
+            steady, {'cpu_usage': 40.0, 'memory_usage': 50.0, 'disk_usage': 60.0},
+            timestamp=START + timedelta(hours=hour)
+        ))
+        if hour < 4:
+            assert result['confidence'] == 0.0
+    # Zero variance, a near-full window (23 of 24 hours) and enough samples
+    assert result['is_valid']
+    assert result['confidence'] == 0.988
+
+
+def test_batch_matches_individual_validation():
+    rng = np.random.default_rng(9)
+    patterns = [{'metrics': {'name': f'p{i}'}} for i in range(100)]
+    single = PatternValidator()
+    batch = PatternValidator()
+
+    for step in range(20):
+        now = START + timedelta(minutes=15 * step)
+        metrics = _metrics(rng)
+        subset = patterns[step % 3::3]
+        got = asyncio.run(batch.validate_patterns(subset, metrics, timestamp=now))
+        expected = [asyncio.run(single.validate_pattern(p, metrics, timestamp=now)) for p in subset]
+        assert got == expected
+
+
+def test_duplicate_candidates_count_the_snapshot_once():
+    validator = PatternValidator()
+    pattern = {'metrics': {'name': 'dup'}}
+    metrics = {'cpu_usage': 10.0, 'memory_usage': 20.0, 'disk_usage': 30.0}
+    results = asyncio.run(validator.validate_patterns([pattern, pattern], metrics, timestamp=START))
+    assert [r['validation_metrics']['sample_count'] for r in results] == [1, 1]
@@ -0,0 +1,144 @@
+# tests/test_periodicity.py
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.pattern_analyzer import PatternAnalyzer
+from app.optimization.periodicity import PeriodicityDetector
+
+HOUR = 3600
+# Monday 2026-10-05 00:00 UTC as a bucket index
+START = int(datetime(2026, 10, 5, tzinfo=timezone.utc).timestamp()) // HOUR
+
+
+def _load(hours: int, seed: int = 0) -> np.ndarray:
+    """Daily peak at 14:00 UTC, busier on weekdays, plus noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(hours)
+    daily = 20 * np.cos(2 * np.pi * (t - 14) / 24)
+    weekday = np.where(((t // 24) % 7) < 5, 10.0, -10.0)
+    return 50 + daily + weekday + rng.normal(0, 2, hours)
+
+
+def test_finds_daily_cycle_with_phase():
+    detector = PeriodicityDetector()
+    for i, value in enumerate(_load(24 * 21)):
+        detector.add_bucket('cpu', START + i, value)
+
+    daily, weekly = detector.get_cycles('cpu')['cpu']
+    assert daily['period_hours'] == 24 and weekly['period_hours'] == 168
+    assert daily['strength'] > 0.5
+    assert daily['autocorrelation'] > 0.8
+    assert np.isclose(daily['amplitude'], 20, atol=2)
+    assert daily['next_peak'].hour == 14
+    assert weekly['strength'] > 0.1
+
+    significant = detector.significant_cycles()
+    assert significant[0]['resource'] == 'cpu' and significant[0]['period_hours'] == 24
+
+
+def test_noise_has_no_significant_cycle():
+    detector = PeriodicityDetector()
+    rng = np.random.default_rng(4)
+    for i, value in enumerate(rng.normal(50, 5, 24 * 30)):
+        detector.add_bucket('memory', START + i, value)
+    assert detector.significant_cycles() == []
+
+
+def test_incremental_state_matches_recompute_after_wrap():
+    detector = PeriodicityDetector(history_buckets=168)
+    values = _load(1000, seed=3)
+    for i, value in enumerate(values):
+        detector.add_bucket('disk', START + i, value)
+    series = detector._series['disk']
+    spectrum, lagged = series.spectrum.copy(), series.lagged.copy()
+    series._recompute()
+    assert np.allclose(spectrum, series.spectrum)
+    assert np.allclose(lagged, series.lagged)
+
+
+def test_gaps_and_raw_samples_roll_into_buckets():
+    detector = PeriodicityDetector()
+    base = START * HOUR
+    for minute in range(0, 60, 10):
+        detector.observe('network', 10.0, base + minute * 60)
+    detector.observe('network', 30.0, base + 3 * HOUR)
+    series = detector._series['network']
+    assert series.last_index == START
+    detector.observe('network', 30.0, base + 4 * HOUR)
+    # Hours 1-2 had no samples and carry the last value forward
+    assert series.count == 4
+    assert series._value_at(START + 2) == 10.0 and series._value_at(START + 3) == 30.0
+
+
+def test_recurring_patterns_include_cycles():
+    analyzer = PatternAnalyzer()
+    for i, value in enumerate(_load(24 * 14)):
+        analyzer.periodicity.add_bucket('cpu', START + i, value)
+    recurring = asyncio.run(analyzer.get_recurring_patterns())
+    cycles = [r for r in recurring if r['type'] == 'periodic_cycle']
+    assert cycles and cycles[0]['resource'] == 'cpu' and cycles[0]['period_hours'] == 24
+
+
+def test_analysis_survives_network_dicts():
+    analyzer = PatternAnalyzer()
+    metrics = {'cpu_usage': 90.0, 'memory_usage': 40.0, 'disk_usage': 50.0,
+               'network_usage': {'sent_rate': 100.0, 'recv_rate': 50.0}}
+    patterns = asyncio.run(analyzer.analyze(metrics))
+    assert patterns and patterns[0]['pattern'] == 'high_sustained_usage'
+    assert analyzer.periodicity._open['network'][1] == 150.0
+    asyncio.run(analyzer.analyze({**metrics, 'network_usage': 'n/a'}))
+    assert analyzer.periodicity._open['network'][2] == 1
+
+
+def test_seeds_cycles_from_stored_history():
+    import time
+    from datetime import timedelta
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.base import Base
+    from app.models.metrics import SystemMetrics
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[SystemMetrics.__table__])
+        analyzer = PatternAnalyzer()
+        rng = np.random.default_rng(0)
+        async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+            # Rows are naive UTC, as the column default writes them; daily peak at 14:00 UTC
+            end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+            hours = 24 * 14
+            for i in range(hours):
+                stamp = end - timedelta(hours=hours - i)
+                value = 50 + 20 * np.cos(2 * np.pi * (stamp.hour - 14) / 24) + rng.normal(0, 2)
+                for minute in (5, 35):
+                    db.add(SystemMetrics(timestamp=stamp + timedelta(minutes=minute), cpu_usage=float(value),
+                                         memory_usage=40.0, disk_usage=50.0,
+                                         network_usage={'sent_rate': value, 'recv_rate': 0}))
+            await db.commit()
+            fed = await analyzer.seed_from_history(db)
+        await engine.dispose()
+        return analyzer, fed
+
+    # A local zone away from UTC must not shift or drop buckets
+    zone = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    try:
+        analyzer, fed = asyncio.run(scenario())
+    finally:
+        if zone is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = zone
+        time.tzset()
+    assert fed == 4 * 24 * 14
+    cycles = {(c['resource'], c['period_hours']): c for c in analyzer.periodicity.significant_cycles()}
+    assert ('cpu', 24) in cycles and ('network', 24) in cycles
+    assert cycles[('cpu', 24)]['next_peak'].hour == 14
@@ -0,0 +1,150 @@
+# tests/test_process_placement.py
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization import process_placement
+from app.optimization.process_placement import CPU_AFFINITY, CPU_WEIGHT, IO_WEIGHT, ProcessPlacementManager
+from app.optimization.tunable_state import TunableStateReader, format_cpu_list
+from app.optimization.tuning_backend import SysfsTuningBackend
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def _host(root, nodes=('0-3', '4-7')):
+    """Eight CPUs over two NUMA nodes, a protected nginx in its own cgroup and a busy batch job"""
+    _write(root, 'sys/devices/system/cpu/online', '0-7')
+    for node, cpus in enumerate(nodes):
+        _write(root, f'sys/devices/system/node/node{node}/cpulist', cpus)
+    _write(root, 'proc/100/comm', 'nginx')
+    _write(root, 'proc/100/cgroup', '0::/system.slice/nginx.service')
+    _write(root, 'proc/200/comm', 'batch')
+    _write(root, 'proc/200/cgroup', '0::/user.slice')
+    _write(root, 'sys/fs/cgroup/system.slice/nginx.service/cpu.weight', '100')
+    _write(root, 'sys/fs/cgroup/system.slice/nginx.service/io.weight', 'default 100\n8:0 200')
+    reader = TunableStateReader(root=str(root), ttl_seconds=3600)
+    return SysfsTuningBackend(root=str(root), dry_run=False, helper_command='', reader=reader)
+
+
+class FakeAffinity:
+    """Stands in for sched_getaffinity/sched_setaffinity over a table of PIDs"""
+
+    def __init__(self, monkeypatch, table):
+        self.table = table
+        monkeypatch.setattr(process_placement.os, 'sched_getaffinity', self.get)
+        monkeypatch.setattr(process_placement.os, 'sched_setaffinity', self.set)
+
+    def get(self, pid):
+        if pid not in self.table:
+            raise ProcessLookupError(pid)
+        return set(self.table[pid])
+
+    def set(self, pid, cpus):
+        if pid not in self.table:
+            raise ProcessLookupError(pid)
+        self.table[pid] = set(cpus)
+
+
+CORES = [90, 95, 10, 20, 60, 70, 80, 5]
+CPU_DATA = {
+    'cores': CORES,
+    'top_processes': [
+        {'pid': 200, 'name': 'batch', 'cpu_percent': 250.0},
+        {'pid': 100, 'name': 'nginx', 'cpu_percent': 130.0},
+        {'pid': 300, 'name': 'editor', 'cpu_percent': 3.0}
+    ]
+}
+
+
+def test_format_cpu_list_round_trips():
+    assert format_cpu_list([6, 0, 1, 2, 3]) == '0-3,6'
+    assert format_cpu_list([]) == ''
+
+
+def test_protected_service_gets_reserved_cores_and_weights(tmp_path, monkeypatch):
+    backend = _host(tmp_path)
+    affinity = FakeAffinity(monkeypatch, {100: range(8), 200: range(8)})
+    manager = ProcessPlacementManager(backend=backend, protected=['nginx'], hot_percent=80)
+
+    placements = {(p.kind, p.pid): p for p in manager.plan(CPU_DATA)}
+    # nginx needs two CPUs; node0 is the less loaded node and 2, 3 its idlest CPUs
+    assert placements[(CPU_AFFINITY, 100)].value == '2-3'
+    assert placements[(CPU_AFFINITY, 200)].value == '0-1,4-7'
+    assert placements[(CPU_WEIGHT, 100)].target == '/system.slice/nginx.service'
+    assert (CPU_AFFINITY, 300) not in placements
+
+    result = asyncio.run(manager.apply(list(placements.values())))
+    assert not result['failed'] and len(result['applied']) == 4
+    assert affinity.table[100] == {2, 3}
+    cgroup = tmp_path / 'sys/fs/cgroup/system.slice/nginx.service'
+    assert (cgroup / 'cpu.weight').read_text() == '1000'
+    assert (cgroup / 'io.weight').read_text() == 'default 1000'
+
+    asyncio.run(manager.revert())
+    assert affinity.table[100] == set(range(8)) and affinity.table[200] == set(range(8))
+    assert (cgroup / 'cpu.weight').read_text() == '100'
+    assert (cgroup / 'io.weight').read_text() == 'default 100'
+    assert manager.get_placements() == []
+
+
+def test_found_by_name_and_weights_only_without_contention(tmp_path, monkeypatch):
+    backend = _host(tmp_path)
+    FakeAffinity(monkeypatch, {100: range(8)})
+    manager = ProcessPlacementManager(backend=backend, protected=['nginx'], hot_percent=80)
+    # nginx is not among the top processes and nothing is hot
+    placements = manager.plan({'cores': CORES, 'top_processes': [{'pid': 300, 'name': 'editor', 'cpu_percent': 3.0}]})
+    assert sorted(p.kind for p in placements) == [CPU_WEIGHT, IO_WEIGHT]
+
+
+def test_hot_processes_spread_across_numa_nodes(tmp_path, monkeypatch):
+    backend = _host(tmp_path)
+    FakeAffinity(monkeypatch, {200: range(8), 201: range(8)})
+    manager = ProcessPlacementManager(backend=backend, protected=[], hot_percent=80)
+    data = {'cores': [10] * 8, 'top_processes': [
+        {'pid': 200, 'name': 'batch', 'cpu_percent': 250.0},
+        {'pid': 201, 'name': 'batch', 'cpu_percent': 200.0}
+    ]}
+    assert sorted(p.value for p in manager.plan(data)) == ['0-3', '4-7']
+
+    single = ProcessPlacementManager(backend=_host(tmp_path / 'single', nodes=('0-7',)), protected=[])
+    assert single.plan(data) == []
+
+
+def test_replacing_keeps_original_and_exited_processes_are_skipped(tmp_path, monkeypatch):
+    backend = _host(tmp_path)
+    affinity = FakeAffinity(monkeypatch, {100: range(8), 200: range(8)})
+    manager = ProcessPlacementManager(backend=backend, protected=['nginx'], hot_percent=80)
+    asyncio.run(manager.apply(manager.plan(CPU_DATA)))
+    # Load moves: a second placement updates the record but remembers the original affinity
+    asyncio.run(manager.apply(manager.plan({**CPU_DATA, 'cores': [5, 5, 90, 90, 60, 70, 80, 95]})))
+    nginx = [p for p in manager.get_placements() if p['kind'] == CPU_AFFINITY and p['pid'] == 100]
+    assert len(nginx) == 1 and nginx[0]['value'] == '0-1' and nginx[0]['previous'] == '0-7'
+
+    del affinity.table[200]
+    result = asyncio.run(manager.revert())
+    assert len(result['exited']) == 1 and not result['failed']
+    assert affinity.table[100] == set(range(8))
+
+
+def test_affinity_covers_every_thread_and_reverts_each(tmp_path, monkeypatch):
+    backend = _host(tmp_path)
+    for tid in (100, 101, 102):
+        (tmp_path / f'proc/100/task/{tid}').mkdir(parents=True)
+    affinity = FakeAffinity(monkeypatch, {100: range(8), 101: range(8), 102: {4, 5}, 200: range(8)})
+    manager = ProcessPlacementManager(backend=backend, protected=['nginx'], hot_percent=80)
+    asyncio.run(manager.apply(manager.plan(CPU_DATA)))
+    assert affinity.table[100] == affinity.table[101] == affinity.table[102] == {2, 3}
+
+    # A worker started after the placement inherits the reserved CPUs
+    (tmp_path / 'proc/100/task/103').mkdir()
+    affinity.table[103] = {2, 3}
+    asyncio.run(manager.revert())
+    assert affinity.table[100] == affinity.table[101] == set(range(8))
+    assert affinity.table[102] == {4, 5}
+    assert affinity.table[103] == set(range(8))
@@ -0,0 +1,100 @@
+# tests/test_profile_compiler.py
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.profile_compiler import ProfileCompiler
+from app.optimization.tunable_state import TunableStateReader
+from app.optimization.tuning_backend import SysfsTuningBackend
+
+PROFILE = {
+    'cpu_governor': 'performance',
+    'swapiness': 10,
+    'vm_dirty_ratio': 20,
+    'io_scheduler': 'mq-deadline',
+    'disk_read_ahead': 512,
+    'cpuThreshold': 90,
+    'powerProfile': 'performance'
+}
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def _read(root, relative):
+    return (root / relative).read_text().strip()
+
+
+def _compiler(root):
+    _write(root, 'sys/devices/system/cpu/online', '0-1')
+    for cpu in (0, 1):
+        _write(root, f'sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_governor', 'powersave')
+    for device in ('nvme0n1', 'sdb'):
+        _write(root, f'sys/block/{device}/queue/scheduler', '[none] mq-deadline')
+        _write(root, f'sys/block/{device}/queue/read_ahead_kb', '128')
+    _write(root, 'proc/sys/vm/swappiness', '60')
+    _write(root, 'proc/sys/vm/dirty_ratio', '20')
+    reader = TunableStateReader(root=str(root), ttl_seconds=3600)
+    return ProfileCompiler(SysfsTuningBackend(root=str(root), dry_run=False, helper_command='', reader=reader))
+
+
+def test_compile_diffs_against_current_state(tmp_path):
+    plan = _compiler(tmp_path).compile(PROFILE)
+    # dirty_ratio already matches; thresholds and UI preferences aren't tunables
+    assert [write.path for write in plan.unchanged] == ['proc/sys/vm/dirty_ratio']
+    assert plan.ignored == ['cpuThreshold', 'powerProfile']
+    assert plan.parameters == ['cpu_governor', 'swap_tendency', 'io_scheduler', 'disk_read_ahead']
+    assert plan.requested['swap_tendency'] == 10
+    assert len(plan.changes) == 7
+    # cpu0, cpu1, nvme0n1, sdb and the sysctls are independent
+    groups = plan.groups()
+    assert len(groups) == 5
+    for group in groups:
+        if group[0].target == 'sdb':
+            assert [write.parameter for write in group] == ['io_scheduler', 'disk_read_ahead']
+
+
+def test_apply_writes_only_changes(tmp_path):
+    compiler = _compiler(tmp_path)
+    result = asyncio.run(compiler.apply(compiler.compile(PROFILE)))
+    assert result['status'] == 'applied'
+    assert _read(tmp_path, 'sys/devices/system/cpu/cpu1/cpufreq/scaling_governor') == 'performance'
+    assert _read(tmp_path, 'sys/block/sdb/queue/read_ahead_kb') == '256'
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '10'
+
+    # Applying again finds nothing to do
+    again = asyncio.run(compiler.apply(compiler.compile(PROFILE)))
+    assert again['status'] == 'unchanged' and not again['changes']
+
+
+def test_failure_rolls_back_every_group(tmp_path, monkeypatch):
+    compiler = _compiler(tmp_path)
+    backend = compiler.backend
+    real_write = backend._write
+
+    def flaky(write):
+        if write.path == 'sys/block/sdb/queue/read_ahead_kb':
+            raise OSError(22, 'Invalid argument')
+        real_write(write)
+
+    monkeypatch.setattr(backend, '_write', flaky)
+    result = asyncio.run(compiler.apply(compiler.compile(PROFILE)))
+    assert result['status'] == 'rolled_back'
+    assert 'sys/block/sdb/queue/read_ahead_kb' in result['failed']
+    assert _read(tmp_path, 'sys/devices/system/cpu/cpu0/cpufreq/scaling_governor') == 'powersave'
+    assert _read(tmp_path, 'sys/block/sdb/queue/scheduler') == 'none'
+    assert _read(tmp_path, 'sys/block/nvme0n1/queue/read_ahead_kb') == '128'
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '60'
+
+
+def test_invalid_value_rejects_before_writing(tmp_path):
+    compiler = _compiler(tmp_path)
+    result = asyncio.run(compiler.apply(compiler.compile({'swapiness': 10, 'disk_read_ahead': 'lots'})))
+    assert result['status'] == 'rejected'
+    assert 'disk_read_ahead' in result['failed']
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '60'
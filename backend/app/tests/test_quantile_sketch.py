@@ -0,0 +1,58 @@
+# tests/test_quantile_sketch.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.resilience.metric_transformer import MetricTransformer
+from app.core.resilience.quantile_sketch import QuantileRollup, TDigest
+
+QS = [0.5, 0.95, 0.99]
+
+
+def test_tdigest_tracks_tail_quantiles_in_bounded_memory():
+    values = np.random.default_rng(3).lognormal(3, 0.5, size=200_000)
+    digest = TDigest()
+    digest.update(values)
+
+    assert len(digest) < 200
+    expected = np.quantile(values, QS)
+    assert np.allclose(digest.quantile(QS), expected, rtol=0.01)
+
+
+def test_merged_digests_match_single_digest_and_survive_serialisation():
+    values = np.random.default_rng(4).normal(50, 10, size=50_000)
+    halves = [TDigest(), TDigest()]
+    halves[0].update(values[::2])
+    halves[1].update(values[1::2])
+
+    # e.g. the same series shipped from another host
+    remote = TDigest.from_dict(halves[1].to_dict())
+    merged = halves[0].merge(remote)
+
+    assert merged.count == len(values)
+    assert np.allclose(merged.quantile(QS), np.quantile(values, QS), rtol=0.01)
+
+
+def test_rollup_answers_ranges_from_buckets():
+    rollup = QuantileRollup(bucket_seconds=60, retention_buckets=3)
+    for minute in range(4):
+        for i in range(100):
+            rollup.add(minute * 100 + i, timestamp=minute * 60 + i * 0.5)
+
+    # Oldest bucket aged out
+    assert list(rollup.buckets) == [60, 120, 180]
+    last_two = rollup.percentiles([50], start=120)
+    assert abs(last_two['50'] - 299.5) < 2
+    assert rollup.sketch().min == 100
+
+
+def test_transformer_percentiles_cover_more_than_history():
+    transformer = MetricTransformer(history_size=10)
+    for i in range(1000):
+        transformer.transform_cpu_metrics({'percent': float(i % 100)})
+    p = transformer.get_percentiles('cpu', percentiles=[50, 99])
+    assert abs(p['50'] - 49.5) < 1.5
+    assert abs(p['99'] - 98.5) < 1.5
@@ -0,0 +1,156 @@
+# tests/test_rule_engine.py
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.rule_engine import RecommendationEngine, compile_rules
+from app.optimization.tunable_state import TunableStateReader
+
+MEMORY_RULES = (
+    {
+        'name': 'swap_tendency_low',
+        'when': {'memory_usage': ('>', 75)},
+        'parameter': 'swap_tendency', 'value': '40', 'fallback': '60',
+        'confidence': 0.75, 'impact': 0.5,
+        'reason': "Memory usage averaged {memory_usage:.0f}%"
+    },
+    {
+        'name': 'cache_pressure_high',
+        'when': {'memory_usage': ('>', 75), 'disk_usage': ('>', 50)},
+        'parameter': 'cache_pressure', 'value': '150', 'fallback': '100',
+        'confidence': 0.70, 'impact': 0.4,
+        'reason': "Memory {memory_usage:.0f}% and disk {disk_usage:.0f}%"
+    }
+)
+
+
+def _engine(tmp_path, **options):
+    (tmp_path / 'proc/sys/vm').mkdir(parents=True)
+    (tmp_path / 'proc/sys/vm/swappiness').write_text('60\n')
+    reader = TunableStateReader(root=str(tmp_path), ttl_seconds=3600)
+    defaults = dict(window_seconds=10, min_samples=3, cooldown_seconds=30, hysteresis=5)
+    return RecommendationEngine(MEMORY_RULES, reader=reader, **{**defaults, **options})
+
+
+def _feed(engine, start, values, disk=10.0):
+    flipped = []
+    for i, value in enumerate(values):
+        now = start + i
+        flipped += engine.observe({'timestamp': now, 'memory_usage': value, 'disk_usage': disk}, now=now)
+    return flipped
+
+
+def test_conditions_are_shared_and_validated():
+    rules, conditions = compile_rules(MEMORY_RULES, hysteresis=5)
+    assert len(conditions) == 2
+    assert rules[0].conditions[0] == rules[1].conditions[0]
+    with pytest.raises(ValueError):
+        compile_rules([{**MEMORY_RULES[0], 'when': {'gpu_usage': ('>', 1)}}], hysteresis=5)
+
+
+def test_single_spike_does_not_fire(tmp_path):
+    engine = _engine(tmp_path)
+    assert _feed(engine, 0, [40, 40, 40, 40, 100, 40, 40]) == []
+    assert engine.recommendations() == []
+
+
+def test_sustained_load_fires_with_real_current_value(tmp_path):
+    engine = _engine(tmp_path)
+    assert _feed(engine, 0, [85, 85, 85]) == ['swap_tendency_low']
+    [recommendation] = engine.recommendations()
+    assert recommendation['parameter'] == 'swap_tendency'
+    assert recommendation['current_value'] == '60'
+    assert recommendation['reason'] == "Memory usage averaged 85%"
+
+
+def test_hysteresis_and_cooldown(tmp_path):
+    engine = _engine(tmp_path, window_seconds=3, cooldown_seconds=20)
+    _feed(engine, 0, [85, 85, 85])
+    # Falling to 72 is under the threshold but not past the hysteresis margin
+    assert _feed(engine, 3, [72, 72, 72]) == []
+    assert engine.get_stats()['active_rules'] == ['swap_tendency_low']
+    # Well below, but still inside the cooldown: held, then released once it expires
+    assert _feed(engine, 6, [50, 50, 50]) == []
+    assert engine.get_stats()['pending_rules'] == ['swap_tendency_low']
+    assert _feed(engine, 20, [50, 50, 50]) == ['swap_tendency_low']
+    assert engine.recommendations() == []
+
+
+def test_recommendations_are_cached_until_inputs_drift(tmp_path):
+    engine = _engine(tmp_path, window_seconds=100)
+    _feed(engine, 0, [85, 85, 85])
+    first = engine.recommendations()
+    _feed(engine, 3, [86])
+    assert engine.recommendations() is first
+    _feed(engine, 4, [100, 100, 100])
+    assert engine.recommendations() is not first
+    assert engine.recommendations()[0]['reason'] == "Memory usage averaged 92%"
+
+
+def test_duplicate_and_failed_samples_are_ignored(tmp_path):
+    engine = _engine(tmp_path)
+    engine.observe({'timestamp': 't', 'memory_usage': 90}, now=0)
+    engine.observe({'timestamp': 't', 'memory_usage': 90}, now=1)
+    engine.observe({'timestamp': 'u', 'has_errors': True, 'cpu': {}, 'memory_usage': 0}, now=2)
+    assert engine.samples == 1
+    assert engine.needs_sample(now=100)
+
+
+def _set_swappiness(engine, tmp_path, value):
+    (tmp_path / 'proc/sys/vm/swappiness').write_text(f'{value}\n')
+    engine.reader.invalidate()
+
+
+def test_cleared_rule_restores_the_value_it_replaced(tmp_path):
+    engine = _engine(tmp_path, window_seconds=3, cooldown_seconds=0)
+    _set_swappiness(engine, tmp_path, 55)
+    _feed(engine, 0, [90, 90, 90])
+    engine.record_applied('swap_tendency', '55', '40')
+    _set_swappiness(engine, tmp_path, 40)
+    assert engine.recommendations() == []
+
+    assert _feed(engine, 3, [20, 20, 20]) == ['swap_tendency_low']
+    [restore] = engine.recommendations()
+    assert restore['restore'] and restore['rule'] == 'swap_tendency_low'
+    assert (restore['current_value'], restore['new_value']) == ('40', '55')
+
+    engine.record_applied('swap_tendency', '40', '55')
+    _set_swappiness(engine, tmp_path, 55)
+    assert engine.recommendations() == []
+    assert engine.get_stats()['applied_parameters'] == []
+
+
+def test_unapplied_or_overridden_changes_are_left_alone(tmp_path):
+    engine = _engine(tmp_path, window_seconds=3, cooldown_seconds=0)
+    # An admin's 10: the rule fires and clears, but nobody applied it
+    _set_swappiness(engine, tmp_path, 10)
+    _feed(engine, 0, [90, 90, 90])
+    _feed(engine, 3, [20, 20, 20])
+    assert engine.recommendations() == []
+
+    # Applied, then changed by hand before the rule cleared
+    _feed(engine, 6, [90, 90, 90])
+    engine.record_applied('swap_tendency', '10', '40')
+    _set_swappiness(engine, tmp_path, 25)
+    _feed(engine, 9, [20, 20, 20])
+    assert engine.recommendations() == []
+
+
+def test_no_restore_while_another_rule_owns_the_parameter(tmp_path):
+    rules = MEMORY_RULES[:1] + ({
+        'name': 'swap_tendency_disk', 'when': {'disk_usage': ('>', 80)},
+        'parameter': 'swap_tendency', 'value': '30', 'fallback': '60',
+        'confidence': 0.5, 'impact': 0.5, 'reason': "Disk {disk_usage:.0f}%"
+    },)
+    (tmp_path / 'proc/sys/vm').mkdir(parents=True)
+    (tmp_path / 'proc/sys/vm/swappiness').write_text('40\n')
+    engine = RecommendationEngine(rules, reader=TunableStateReader(root=str(tmp_path), ttl_seconds=3600),
+                                  window_seconds=3, min_samples=3, cooldown_seconds=0, hysteresis=5)
+    _feed(engine, 0, [90, 90, 90], disk=90.0)
+    engine.record_applied('swap_tendency', '60', '40')
+    assert _feed(engine, 3, [20, 20, 20], disk=90.0) == ['swap_tendency_low']
+    [recommendation] = engine.recommendations()
+    assert recommendation['rule'] == 'swap_tendency_disk' and 'restore' not in recommendation
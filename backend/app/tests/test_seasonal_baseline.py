@@ -0,0 +1,107 @@
+# tests/test_seasonal_baseline.py
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.resilience.metric_transformer import MetricTransformer
+from app.core.resilience.seasonal_baseline import SeasonalBaseline, hour_of_week
+
+# A Monday at local midnight, so slot arithmetic is easy to follow
+MONDAY = time.mktime((2026, 10, 12, 0, 0, 0, 0, 0, -1))
+HOUR = 3600
+
+
+def _feed_weeks(baseline: SeasonalBaseline, weeks: int, rng) -> None:
+    """Busy at 02:00 (nightly job), quiet otherwise"""
+    for week in range(weeks):
+        for hour in range(168):
+            level = 90.0 if hour % 24 == 2 else 10.0
+            for minute in range(0, 60, 5):
+                ts = MONDAY + week * 168 * HOUR + hour * HOUR + minute * 60
+                baseline.observe("cpu", level + rng.normal(0, 2), ts)
+
+
+def test_hour_of_week_slots():
+    assert hour_of_week(MONDAY) == 0
+    assert hour_of_week(MONDAY + 26 * HOUR) == 26
+    assert hour_of_week(MONDAY + 167 * HOUR + 59 * 60) == 167
+
+
+def test_scores_against_the_matching_slot():
+    rng = np.random.default_rng(3)
+    baseline = SeasonalBaseline(min_samples=20)
+    _feed_weeks(baseline, 4, rng)
+
+    nightly = MONDAY + 2 * HOUR
+    afternoon = MONDAY + 14 * HOUR
+    # The nightly job is normal at 02:00 but anomalous mid-afternoon
+    assert abs(baseline.score("cpu", 90.0, nightly)) < 2
+    assert baseline.score("cpu", 90.0, afternoon) > 10
+    stats = baseline.baseline("cpu", nightly)
+    assert np.isclose(stats["mean"], 90.0, atol=1.0)
+    assert np.isclose(stats["std_dev"], 2.0, atol=0.5)
+
+    # Unknown series and cold slots return None
+    assert baseline.score("memory", 50.0, nightly) is None
+    assert SeasonalBaseline(min_samples=1000).score("cpu", 1.0, nightly) is None
+
+
+def test_baselines_survive_restart(tmp_path):
+    path = str(tmp_path / "baselines.npz")
+    rng = np.random.default_rng(5)
+    baseline = SeasonalBaseline(path=path, min_samples=20, save_interval=10 ** 9)
+    _feed_weeks(baseline, 3, rng)
+    baseline.save()
+
+    restored = SeasonalBaseline(path=path, min_samples=20)
+    ts = MONDAY + 50 * HOUR
+    assert restored.names == ["cpu"]
+    assert restored.score("cpu", 12.0, ts) == baseline.score("cpu", 12.0, ts)
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "baselines.npz"
+    path.write_bytes(b"not an npz")
+    baseline = SeasonalBaseline(path=str(path))
+    assert baseline.names == []
+
+
+def test_transformer_uses_seasonal_reference():
+    transformer = MetricTransformer(history_size=10, baseline_min_samples=20)
+    rng = np.random.default_rng(11)
+    now = time.time()
+    for _ in range(200):
+        transformer.baseline.observe("cpu", 10.0 + rng.normal(0, 1), now)
+
+    # Steady at 60 for the whole window: the window z-score sees nothing unusual
+    for _ in range(10):
+        result = transformer.transform_system_metrics({'cpu': {'percent': 60.0}, 'memory': {'percent': 40.0}})
+
+    assert result['cpu']['z_score'] == 0.0
+    assert result['cpu']['seasonal_z_score'] > 2
+    assert result['cpu']['is_anomaly']
+    # No baseline yet for memory, so it falls back to the window score
+    assert result['memory']['seasonal_z_score'] is None
+    assert not result['memory']['is_anomaly']
+
+
+def test_flat_series_scores_stay_finite():
+    baseline = SeasonalBaseline(min_samples=20)
+    for _ in range(40):
+        baseline.observe("disk", 50.0, MONDAY)
+    z = baseline.score("disk", 50.1, MONDAY)
+    assert np.isfinite(z) and abs(z) < 2
+    assert baseline.score("disk", 50.0, MONDAY) == 0.0
+
+
+def test_autosave_happens_off_the_sample_path(tmp_path):
+    path = str(tmp_path / "baselines.npz")
+    baseline = SeasonalBaseline(path=path, min_samples=1, save_interval=10)
+    for i in range(10):
+        baseline.observe("cpu", float(i), MONDAY)
+    baseline._saver.join(timeout=10)
+    assert SeasonalBaseline(path=path).names == ["cpu"]
@@ -0,0 +1,131 @@
+# tests/test_segment_store.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.services.storage.segment_store import SegmentStore, sample_from_metrics
+
+
+def make_sample(ts, cpu=10.0):
+    return {'timestamp': ts, 'cpu_percent': cpu, 'memory_percent': 50.0}
+
+
+def test_append_and_read_range(tmp_path):
+    store = SegmentStore(str(tmp_path), window_seconds=100, index_stride=8)
+    for i in range(250):
+        assert store.append(make_sample(1000.0 + i, cpu=float(i)))
+
+    # 1000..1249 spans windows 1000, 1100 and 1200
+    assert store.get_stats()['segments'] == 3
+
+    views = store.read_range(1090.0, 1210.0)
+    assert len(views) == 3
+    joined = np.concatenate(views)
+    assert joined['timestamp'][0] == 1090.0
+    assert joined['timestamp'][-1] == 1209.0
+    assert len(joined) == 120
+    # Views point straight into the mapping
+    assert all(isinstance(v.base, np.ndarray) for v in views)
+
+
+def test_out_of_order_samples_are_dropped(tmp_path):
+    store = SegmentStore(str(tmp_path), window_seconds=100)
+    assert store.append(make_sample(1000.0))
+    assert store.append(make_sample(1001.0))
+    assert not store.append(make_sample(1000.5))
+    assert store.dropped_count == 1
+
+
+def test_reopen_continues_active_segment(tmp_path):
+    store = SegmentStore(str(tmp_path), window_seconds=100)
+    for i in range(10):
+        store.append(make_sample(1000.0 + i))
+    store.close()
+
+    reopened = SegmentStore(str(tmp_path), window_seconds=100)
+    assert reopened.append(make_sample(1010.0))
+    data = reopened.read_range_array()
+    assert len(data) == 11
+    assert data['timestamp'][-1] == 1010.0
+
+
+def test_retention_deletes_old_segments(tmp_path):
+    store = SegmentStore(str(tmp_path), window_seconds=100, retention_seconds=200)
+    for start in (1000.0, 1100.0, 1200.0, 1300.0, 1400.0):
+        store.append(make_sample(start))
+
+    # Rolling into 1400 (window end 1500) expires everything ending at or before 1300
+    remaining = sorted(os.listdir(tmp_path))
+    assert remaining == ['seg_1300.dat', 'seg_1400.dat']
+    assert store.read_range_array(0, 2000)['timestamp'].tolist() == [1300.0, 1400.0]
+
+
+def test_sample_from_metrics_flattens_snapshot():
+    sample = sample_from_metrics({
+        'timestamp': '2025-01-01T00:00:00',
+        'cpu_usage': 12.5,
+        'memory_usage': 40.0,
+        'disk_usage': 70.0,
+        'network_sent_rate': 100.0,
+        'network_recv_rate': 200.0,
+        'disk': {'read_rate': 5.0, 'write_rate': 6.0},
+        'process_count': 3
+    })
+    assert sample['cpu_percent'] == 12.5
+    assert sample['disk_write_rate'] == 6.0
+    assert sample['net_recv_rate'] == 200.0
+
+
+def test_collected_metrics_reach_the_raw_tier(tmp_path, monkeypatch):
+    import asyncio
+    from datetime import datetime
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.future import select
+    from sqlalchemy.orm import sessionmaker
+    from app.core.base import Base
+    from app.core.config import settings
+    from app.models.metrics import SystemMetrics
+    from app.services.metrics_repository import RawSampleRecorder
+    from app.services.storage import segment_store
+
+    def metrics(ts):
+        return {'timestamp': datetime.fromtimestamp(ts).isoformat(), 'cpu_usage': 20.0, 'memory_usage': 30.0,
+                'disk_usage': 40.0, 'cpu': {'usage_percent': 20.0}, 'process_count': 300}
+
+    monkeypatch.setattr(settings, 'RAW_SEGMENT_DIR', str(tmp_path / 'segments'))
+    monkeypatch.setattr(segment_store, '_segment_stores', {})
+    monkeypatch.setattr(settings, 'RAW_SAMPLE_BACKEND', 'segments')
+
+    async def segments():
+        recorder = RawSampleRecorder()
+        for ts in (1_700_000_000.0, 1_700_000_000.4, 1_700_000_001.0):
+            recorder(metrics(ts))
+        await recorder.drain()
+        return recorder.stored
+
+    # The second sample arrives within a second of the first and is dropped
+    assert asyncio.run(segments()) == 2
+    stored = segment_store.get_segment_store().read_range_array(None, None)
+    assert stored['timestamp'].tolist() == [1_700_000_000.0, 1_700_000_001.0]
+    assert stored['process_count'].tolist() == [300, 300]
+
+    monkeypatch.setattr(settings, 'RAW_SAMPLE_BACKEND', 'sqlite')
+
+    async def sqlite():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[SystemMetrics.__table__])
+        Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        recorder = RawSampleRecorder(session_factory=Session)
+        recorder(metrics(1_700_000_000.0))
+        await recorder.drain()
+        async with Session() as db:
+            stamps = (await db.execute(select(SystemMetrics.timestamp))).scalars().all()
+        await engine.dispose()
+        return stamps
+
+    # Stored as naive UTC, like the column default
+    assert asyncio.run(sqlite()) == [datetime.utcfromtimestamp(1_700_000_000.0)]
@@ -0,0 +1,71 @@
+# tests/test_similarity_index.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ml.pattern_recognition.pattern_matcher import PatternMatcher
+from app.ml.pattern_recognition.similarity_index import SimilarityIndex, StateEncoder
+
+
+def _state(cpu, mem, disk):
+    return {'cpu_usage': cpu, 'memory_usage': mem, 'disk_usage': disk}
+
+
+def test_encoder_similarity_tracks_distance():
+    encoder = StateEncoder()
+    base = encoder.encode(_state(50, 50, 50))
+    assert np.isclose(np.linalg.norm(base), 1.0)
+    near = encoder.encode(_state(55, 50, 50)) @ base
+    far = encoder.encode(_state(95, 50, 50)) @ base
+    # Same direction but different magnitude must not look identical
+    assert encoder.encode(_state(10, 10, 10)) @ encoder.encode(_state(90, 90, 90)) < 0
+    assert 1.0 > near > far
+
+
+def test_top_k_and_remove():
+    index = SimilarityIndex(initial_capacity=2)
+    for i, cpu in enumerate((10, 40, 45, 90)):
+        index.add(f"p{i}", _state(cpu, 50, 50), payload=cpu)
+
+    results = index.search(_state(44, 50, 50), k=2)
+    assert [r[0] for r in results] == ["p2", "p1"]
+
+    index.remove("p2")
+    assert [r[0] for r in index.search(_state(44, 50, 50), k=1)] == ["p1"]
+    assert len(index) == 3
+    assert index.search(_state(44, 50, 50), k=1, threshold=0.9999) == []
+
+
+def test_bucketed_search_matches_full_scan():
+    rng = np.random.default_rng(1)
+    states = rng.uniform(0, 100, size=(3000, 3))
+    full = SimilarityIndex()
+    bucketed = SimilarityIndex(grid_size=6, bucket_min_size=0)
+    for i, (cpu, mem, disk) in enumerate(states):
+        full.add(i, _state(cpu, mem, disk))
+        bucketed.add(i, _state(cpu, mem, disk))
+    for i in range(0, 3000, 7):
+        bucketed.remove(i)
+        full.remove(i)
+
+    for cpu, mem, disk in rng.uniform(0, 100, size=(200, 3)):
+        query = _state(cpu, mem, disk)
+        for k, threshold in ((1, 0.8), (5, 0.95), (3, -1.0)):
+            expected = full.search(query, k=k, threshold=threshold)
+            got = bucketed.search(query, k=k, threshold=threshold)
+            assert [r[0] for r in got] == [r[0] for r in expected]
+            assert np.allclose([r[1] for r in got], [r[1] for r in expected])
+
+
+def test_matcher_returns_best_pattern_above_threshold():
+    matcher = PatternMatcher()
+    matcher.add_pattern("idle", _state(5, 30, 50), {'name': 'idle'})
+    matcher.add_pattern("build", _state(95, 70, 55), {'name': 'build'})
+
+    assert asyncio.run(matcher.match_pattern(_state(90, 72, 55))) == {'name': 'build'}
+    assert asyncio.run(matcher.match_pattern(_state(50, 95, 5))) is None
+    assert matcher.top_matches(_state(8, 30, 50))[0]['pattern_id'] == "idle"
@@ -0,0 +1,114 @@
+# tests/test_snapshot_codec.py
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.models.compression_dictionary import CompressionDictionary
+from app.models.snapshot_blob import SnapshotBlob
+from app.services.storage.snapshot_codec import SnapshotCodec, train_dictionary
+from app.services.storage.snapshot_dedup import PACKED_SKELETON_KEY, SnapshotDeduplicator, canonical_json
+
+
+def make_snapshot(i):
+    return {
+        'cpu_usage': float(i % 100),
+        'memory_usage': 40.0 + i % 7,
+        'cpu': {'usage_percent': float(i % 100), 'physical_cores': 4, 'logical_cores': 8},
+        'network': {'interfaces': [{'name': f'eth{i % 3}', 'mac_address': f'aa:bb:{i:04x}'}]},
+        'process_count': 200 + i,
+    }
+
+
+async def run_with_session(coro_factory):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[SnapshotBlob.__table__, CompressionDictionary.__table__]
+        )
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        return await coro_factory(Session)
+    finally:
+        await engine.dispose()
+
+
+def test_dictionary_improves_small_payload_ratio():
+    samples = [canonical_json(make_snapshot(i)) for i in range(50)]
+    codec = SnapshotCodec(training_samples=50)
+    codec.dictionaries[1] = train_dictionary(samples)
+    codec.current_version = 1
+
+    payload = canonical_json(make_snapshot(999))
+    encoded = codec.encode(payload)
+    plain = SnapshotCodec(training_samples=50)
+    plain.dictionaries[1] = b""
+    plain.current_version = 1
+
+    assert codec.decode(encoded) == payload
+    assert len(encoded) < len(plain.encode(payload))
+
+
+def test_streaming_decode_respects_chunk_size():
+    codec = SnapshotCodec()
+    codec.dictionaries[3] = b'"cpu_usage":'
+    codec.current_version = 3
+    payload = canonical_json([make_snapshot(i) for i in range(200)])
+
+    chunks = list(codec.iter_decode(codec.encode(payload), chunk_size=512))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 512 for chunk in chunks)
+    assert b"".join(chunks) == payload
+
+
+def test_blobs_decode_across_dictionary_versions():
+    async def scenario(Session):
+        codec = SnapshotCodec(training_samples=5, retrain_interval=5)
+        dedup = SnapshotDeduplicator(codec=codec)
+        skeletons = []
+        for i in range(20):
+            async with Session() as db:
+                skeletons.append(await dedup.store(db, make_snapshot(i)))
+                await db.commit()
+
+        async with Session() as db:
+            versions = (await db.execute(select(CompressionDictionary.version))).scalars().all()
+            encodings = set((await db.execute(select(SnapshotBlob.encoding))).scalars().all())
+            # Fresh codec must load every stored version to decode older blobs
+            reader = SnapshotDeduplicator(codec=SnapshotCodec())
+            expanded = await reader.expand_many(db, skeletons)
+        return versions, encodings, expanded, skeletons
+
+    versions, encodings, expanded, skeletons = asyncio.run(run_with_session(scenario))
+    assert len(versions) >= 2
+    assert {'json', 'zdict:1', 'zdict:2'} <= encodings
+    assert expanded == [make_snapshot(i) for i in range(20)]
+    # Once a dictionary exists the skeletons are compressed as well
+    assert PACKED_SKELETON_KEY in skeletons[-1]
+
+
+def test_dictionary_survives_caller_rollback():
+    async def scenario(Session):
+        codec = SnapshotCodec(training_samples=5)
+        dedup = SnapshotDeduplicator(codec=codec)
+        for i in range(4):
+            async with Session() as db:
+                await dedup.store(db, make_snapshot(i))
+                await db.commit()
+        async with Session() as db:
+            skeleton = await dedup.store(db, make_snapshot(4))
+            await db.rollback()
+        async with Session() as db:
+            versions = (await db.execute(select(CompressionDictionary.version))).scalars().all()
+        return codec.current_version, versions, skeleton
+
+    current, versions, skeleton = asyncio.run(run_with_session(scenario))
+    assert versions == [current]
+    assert PACKED_SKELETON_KEY in skeleton
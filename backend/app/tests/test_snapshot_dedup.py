@@ -0,0 +1,99 @@
+# tests/test_snapshot_dedup.py
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.models.snapshot_blob import SnapshotBlob
+from app.services.storage.snapshot_dedup import BLOB_REF_KEY, SnapshotDeduplicator
+
+
+def make_snapshot(cpu_usage):
+    # Live fields (current MHz, partition usage) change with every sample
+    return {
+        'cpu_usage': cpu_usage,
+        'cpu': {'usage_percent': cpu_usage, 'physical_cores': 4, 'logical_cores': 8,
+                'frequency_details': {'current': 1200 + 10 * cpu_usage, 'min': 800, 'max': 4000}},
+        'disk': {'percent': 40.0, 'total': 1000, 'partitions': [
+            {'device': '/dev/sda1', 'mountpoint': '/', 'fstype': 'ext4', 'total': 1000,
+             'used': 400 + cpu_usage, 'free': 600 - cpu_usage, 'percent': 40.0},
+            {'device': '/dev/sda2', 'mountpoint': '/boot', 'fstype': 'vfat', 'total': 10,
+             'used': 1, 'free': 9, 'percent': 10.0}
+        ]},
+        'network': {'sent_rate': 10, 'interfaces': [{'name': 'eth0', 'mac_address': 'aa:bb'}]},
+        'system_info': {'hostname': 'eth0', 'physical_cores': 4},
+    }
+
+
+async def run_with_session(coro_factory):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[SnapshotBlob.__table__])
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        return await coro_factory(Session)
+    finally:
+        await engine.dispose()
+
+
+def test_split_replaces_static_sections_without_mutating():
+    snapshot = make_snapshot(12.0)
+    skeleton, blobs = SnapshotDeduplicator().split(snapshot)
+
+    assert 'interfaces' not in skeleton['network']
+    assert BLOB_REF_KEY in skeleton['network']
+    assert skeleton['cpu']['usage_percent'] == 12.0
+    assert 'physical_cores' not in skeleton['cpu']
+    assert 'system_info' not in skeleton
+    assert skeleton['cpu']['frequency_details'] == {'current': 1320.0}
+    assert skeleton['disk']['partitions'][0] == {'used': 412.0, 'free': 588.0, 'percent': 40.0}
+    assert 'total' not in skeleton['disk']
+    assert len(blobs) == 4
+    # Caller's snapshot is untouched
+    assert snapshot == make_snapshot(12.0)
+
+
+def test_store_and_expand_round_trip_shares_blobs():
+    async def scenario(Session):
+        dedup = SnapshotDeduplicator()
+        async with Session() as db:
+            first = await dedup.store(db, make_snapshot(10.0))
+            second = await dedup.store(db, make_snapshot(90.0))
+            await db.commit()
+
+        async with Session() as db:
+            count = (await db.execute(select(func.count()).select_from(SnapshotBlob))).scalar()
+            # Fresh deduplicator forces a database read of the blobs
+            expanded = await SnapshotDeduplicator().expand_many(db, [first, second, None])
+        return count, expanded
+
+    count, expanded = asyncio.run(run_with_session(scenario))
+    # Live fields stay in the rows, so both snapshots share every blob
+    assert count == 4
+    assert expanded[0] == make_snapshot(10.0)
+    assert expanded[1] == make_snapshot(90.0)
+    assert expanded[2] is None
+
+
+def test_blob_committed_by_another_writer_is_skipped():
+    async def scenario(Session):
+        first, second = SnapshotDeduplicator(), SnapshotDeduplicator()
+        _, blobs = first.split(make_snapshot(10.0))
+        rows = [{'digest': d, 'encoding': 'json', 'payload': p, 'size': len(p)} for d, p in blobs.items()]
+        async with Session() as db:
+            await first._insert_blobs(db, rows)
+            await db.commit()
+        # The second writer looked before the first committed and inserts the same digests
+        async with Session() as db:
+            await second._insert_blobs(db, rows)
+            await db.commit()
+            return (await db.execute(select(func.count()).select_from(SnapshotBlob))).scalar()
+
+    assert asyncio.run(run_with_session(scenario)) == 4
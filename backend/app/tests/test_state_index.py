@@ -0,0 +1,72 @@
+# tests/test_state_index.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ml.pattern_recognition.pattern_analyzer import PatternAnalyzer
+from app.ml.pattern_recognition.state_index import StateIndex
+
+
+def test_counts_quantised_states():
+    index = StateIndex(dimensions=3)
+    first = index.observe([41.6, 60.2, 50.0], timestamp=100.0)
+    same = index.observe([42.4, 59.9, 49.7], timestamp=160.0)
+    other = index.observe([10.0, 60.0, 50.0], timestamp=170.0)
+
+    assert first == same != other
+    assert index.counts[first] == 2
+    assert index.last_seen[first] - index.first_seen[first] == 60.0
+    assert index.state(first).tolist() == [42.0, 60.0, 50.0]
+    assert index.lookup([42.0, 60.0, 50.0]) == first
+    assert index.lookup([90.0, 90.0, 90.0]) is None
+
+
+def test_evicts_least_recently_seen_when_full():
+    index = StateIndex(dimensions=2, max_entries=100)
+    for i in range(100):
+        index.observe([i, 0], timestamp=float(i))
+    # Refresh the oldest state so it survives
+    index.observe([0, 0], timestamp=1000.0)
+    index.observe([500, 0], timestamp=1001.0)
+
+    assert len(index) == 91
+    assert index.evictions == 10
+    assert index.lookup([0, 0]) is not None
+    assert index.lookup([1, 0]) is None
+    assert index.lookup([500, 0]) is not None
+
+
+def test_age_limit_and_memory_cap():
+    index = StateIndex(dimensions=3, max_age_seconds=60)
+    index.observe([1, 1, 1], timestamp=0.0)
+    index.observe([2, 2, 2], timestamp=100.0)
+    assert index.prune(now=120.0) == 1
+    assert len(index) == 1
+
+    capped = StateIndex(dimensions=3, memory_limit_bytes=150 * 50)
+    assert capped.max_entries == 50
+    for i in range(1000):
+        capped.observe([i % 101, i // 101, 0], timestamp=float(i))
+    assert len(capped) <= 50
+
+
+def test_pattern_analyzer_stays_bounded():
+    analyzer = PatternAnalyzer(max_patterns=500)
+    rng = np.random.default_rng(0)
+
+    async def run():
+        result = None
+        for _ in range(3):
+            result = await analyzer.analyze_metrics({'cpu_usage': 35.2, 'memory_usage': 50.4, 'disk_usage': 70.0})
+        for cpu, mem, disk in rng.uniform(0, 100, size=(5000, 3)):
+            await analyzer.analyze_metrics({'cpu_usage': cpu, 'memory_usage': mem, 'disk_usage': disk})
+        return result
+
+    result = asyncio.run(run())
+    assert result['pattern'] == {'cpu_usage': 35.0, 'memory_usage': 50.0, 'disk_usage': 70.0}
+    assert result['occurrences'] == 3
+    assert len(analyzer.patterns) <= 500
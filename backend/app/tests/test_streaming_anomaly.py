@@ -0,0 +1,99 @@
+# tests/test_streaming_anomaly.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.ml.context.advanced_patterns import AdvancedPatternDetector
+from app.ml.context.streaming_anomaly import StreamingPCADetector
+
+
+def _normal_samples(n: int, seed: int = 0):
+    """CPU and memory move together; disk is flat; network is bursty"""
+    rng = np.random.default_rng(seed)
+    cpu = rng.uniform(20, 80, n)
+    return [
+        {
+            'cpu': c,
+            'memory': 0.8 * c + rng.normal(0, 3),
+            'disk': 50 + rng.normal(0, 1),
+            'network': rng.lognormal(1, 0.5)
+        }
+        for c in cpu
+    ]
+
+
+def test_flags_unusual_combinations_not_unusual_values():
+    detector = StreamingPCADetector()
+    flagged = [detector.update(sample)['is_anomaly'] for sample in _normal_samples(2000)]
+    assert detector.ready
+    assert sum(flagged) / len(flagged) < 0.02
+
+    # Each value is in range on its own; together they never happened
+    odd = detector.update({'cpu': 78.0, 'memory': 15.0, 'disk': 50.0, 'network': 3.0})
+    assert odd['is_anomaly']
+    assert max(odd['contributions'], key=odd['contributions'].get) in ('cpu', 'memory')
+    usual = detector.update({'cpu': 50.0, 'memory': 40.0, 'disk': 50.0, 'network': 3.0})
+    assert not usual['is_anomaly']
+    assert usual['score'] < odd['score']
+
+
+def test_anomaly_bursts_do_not_become_normal():
+    detector = StreamingPCADetector(window_size=500)
+    for sample in _normal_samples(1000):
+        detector.update(sample)
+    burst = [detector.update({'cpu': 90.0, 'memory': 10.0, 'disk': 50.0, 'network': 3.0}) for _ in range(20)]
+    assert all(result['is_anomaly'] for result in burst)
+
+
+def test_model_size_is_bounded():
+    detector = StreamingPCADetector()
+    for sample in _normal_samples(300):
+        detector.update(sample)
+    size = detector.get_stats()['model_bytes']
+    for sample in _normal_samples(3000, seed=1):
+        detector.update(sample)
+    assert detector.get_stats()['model_bytes'] == size
+
+
+def test_checkpoint_restores_model(tmp_path):
+    path = str(tmp_path / "model.npz")
+    detector = StreamingPCADetector(path=path, save_interval=10 ** 9)
+    for sample in _normal_samples(450):
+        detector.update(sample)
+    detector.save()
+
+    restored = StreamingPCADetector(path=path)
+    probe = {'cpu': 60.0, 'memory': 10.0, 'disk': 50.0, 'network': 2.0}
+    assert restored.samples == 450
+    assert restored.score_one(probe) == detector.score_one(probe)
+
+    # A checkpoint for other settings is ignored rather than misread
+    other = StreamingPCADetector(features=('cpu', 'memory'), path=path)
+    assert other.samples == 0 and not other.ready
+
+
+def test_detector_processes_rows_as_new_samples():
+    detector = AdvancedPatternDetector()
+    rows = np.array([[s['cpu'], s['memory'], s['disk'], s['network']] for s in _normal_samples(400)])
+    flags = detector.detect_anomalies(rows)
+    assert len(flags) == 400
+    assert detector.anomaly_detector.samples == 400
+
+
+def test_missing_features_do_not_inflate_the_score():
+    detector = StreamingPCADetector()
+    for sample in _normal_samples(2000):
+        detector.update(sample)
+    full = detector.update({'cpu': 50.0, 'memory': 40.0, 'disk': 50.0, 'network': 3.0})
+    partial = detector.update({'cpu': 50.0, 'memory': 40.0})
+    assert not partial['is_anomaly']
+    assert partial['score'] <= full['score'] + 1.0
+    # Learning from partial samples leaves the missing features' spread alone
+    disk = detector.features.index('disk')
+    variance = detector.covariance[disk, disk]
+    for _ in range(200):
+        detector.update({'cpu': 50.0, 'memory': 40.0})
+    assert np.isclose(detector.covariance[disk, disk], variance)
@@ -0,0 +1,54 @@
+# tests/test_streaming_stats.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.core.resilience.metric_transformer import MetricTransformer
+from app.core.resilience.streaming_stats import RingBuffer, StreamingSeries
+
+
+def test_ring_buffer_wraps_in_order():
+    ring = RingBuffer(4)
+    evicted = [ring.append(v) for v in range(6)]
+    assert evicted == [None, None, None, None, 0.0, 1.0]
+    assert ring.values().tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert ring.last(3).tolist() == [3.0, 4.0, 5.0]
+    assert ring.at(0) == 5.0
+
+
+def test_running_statistics_match_full_recompute_after_wrap():
+    rng = np.random.default_rng(7)
+    values = rng.normal(50, 15, size=500)
+    series = StreamingSeries(capacity=60, smoothing_window=5, trend_window=10)
+    for value in values:
+        series.push(value)
+
+    window = values[-60:]
+    assert np.isclose(series.mean, window.mean())
+    assert np.isclose(series.std, window.std())
+    assert series.min == window.min()
+    assert series.max == window.max()
+    assert np.isclose(series.smoothed, window[-5:].mean())
+    assert np.isclose(series.slope, np.polyfit(range(10), window[-10:], 1)[0])
+    assert np.isclose(series.rate_of_change, window[-1] - window[-2])
+
+    analysis = series.full_analysis([50, 95], anomaly_threshold=2.0)
+    assert analysis["history"] == window.tolist()
+    assert np.isclose(analysis["statistics"]["percentiles"]["95"], np.percentile(window, 95))
+
+
+def test_transformer_returns_history_only_on_request():
+    transformer = MetricTransformer(history_size=30)
+    for i in range(40):
+        result = transformer.transform_system_metrics({'cpu': {'percent': float(i)}, 'memory': {'percent': 40.0}})
+
+    assert 'history' not in result['cpu']
+    assert np.isclose(result['cpu']['trend'], 1.0)
+    assert result['memory']['statistics']['std_dev'] == 0.0
+
+    full = transformer.transform_system_metrics({'cpu': {'percent': 40.0}}, include_history=True)
+    assert full['cpu']['history'] == [float(v) for v in range(11, 41)]
+    assert transformer.cpu_history == full['cpu']['history']
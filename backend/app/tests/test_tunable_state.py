@@ -0,0 +1,103 @@
+# tests/test_tunable_state.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.tunable_state import TunableStateReader, parse_cpu_list
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def _fake_root(root):
+    _write(root, 'sys/devices/system/cpu/online', '0-2')
+    for cpu, governor in enumerate(['powersave', 'powersave', 'performance']):
+        base = f'sys/devices/system/cpu/cpu{cpu}/cpufreq'
+        _write(root, f'{base}/scaling_governor', governor)
+        _write(root, f'{base}/scaling_available_governors', 'performance powersave')
+    _write(root, 'sys/block/nvme0n1/queue/scheduler', '[none] mq-deadline kyber')
+    _write(root, 'sys/block/nvme0n1/queue/read_ahead_kb', '128')
+    _write(root, 'sys/block/nvme0n1/queue/rotational', '0')
+    _write(root, 'sys/block/loop0/queue/scheduler', '[none]')
+    _write(root, 'proc/sys/vm/swappiness', '60')
+    _write(root, 'proc/sys/vm/vfs_cache_pressure', '100')
+    _write(root, 'proc/sys/vm/min_free_kbytes', '67584')
+    _write(root, 'proc/sys/net/core/rmem_max', '212992')
+    return TunableStateReader(root=str(root), ttl_seconds=3600)
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list('0-3,6,8-9') == [0, 1, 2, 3, 6, 8, 9]
+    assert parse_cpu_list('0') == [0]
+
+
+def test_snapshot_reads_every_core_and_device(tmp_path):
+    state = _fake_root(tmp_path).snapshot()
+    assert set(state['cpu']) == {'cpu0', 'cpu1', 'cpu2'}
+    assert state['cpu']['cpu2']['governor'] == 'performance'
+    # Loop devices are not tuning targets
+    assert list(state['block']) == ['nvme0n1']
+    nvme = state['block']['nvme0n1']
+    assert nvme['scheduler'] == 'none'
+    assert nvme['available_schedulers'] == ['none', 'mq-deadline', 'kyber']
+    assert nvme['rotational'] is False
+    assert state['sysctl']['vm.swappiness'] == 60
+    assert 'net.core.wmem_max' not in state['sysctl']
+
+
+def test_current_values_use_apply_tuning_units(tmp_path):
+    reader = _fake_root(tmp_path)
+    assert reader.current_value('cpu_governor', ['cpu0', 'cpu1']) == 'powersave'
+    assert reader.current_value('swap_tendency') == '60'
+    assert reader.current_value('cache_pressure') == '100'
+    assert reader.current_value('network_buffer') == '212992'
+    assert reader.current_value('io_scheduler') == 'none'
+    # 128 KiB of read-ahead is 256 sectors for blockdev --setra
+    assert reader.current_value('disk_read_ahead') == '256'
+    assert reader.current_value('unknown') is None
+    assert reader.is_noop('swap_tendency', 60)
+    assert not reader.is_noop('swap_tendency', 10)
+
+
+def test_mixed_or_off_level_state_is_never_a_noop(tmp_path):
+    reader = _fake_root(tmp_path)
+    # Two cores run powersave, one performance: every core must already match
+    assert reader.current_value('cpu_governor') is None
+    assert not reader.is_noop('cpu_governor', 'powersave')
+    assert not reader.is_noop('cpu_governor', 'performance', ['cpu0', 'cpu2'])
+    assert reader.is_noop('cpu_governor', 'powersave', ['cpu0', 'cpu1'])
+    # 67584 is near 'high' (65536) but not what setting 'high' writes
+    assert reader.current_value('memory_pressure') is None
+    assert not reader.is_noop('memory_pressure', 'high')
+    _write(tmp_path, 'proc/sys/vm/min_free_kbytes', '65536')
+    reader.invalidate()
+    assert reader.current_value('memory_pressure') == 'high'
+    assert reader.is_noop('memory_pressure', 'high')
+
+
+def test_cache_refreshes_only_when_inputs_change(tmp_path):
+    reader = _fake_root(tmp_path)
+    reader.snapshot()
+    _write(tmp_path, 'proc/sys/vm/swappiness', '10')
+    assert reader.current_value('swap_tendency') == '60'
+    assert reader.refreshes == 1
+
+    reader.invalidate()
+    assert reader.current_value('swap_tendency') == '10'
+    assert reader.refreshes == 2
+
+    # A new device changes the inputs, so the snapshot is rebuilt
+    _write(tmp_path, 'sys/block/sda/queue/scheduler', 'mq-deadline [bfq]')
+    assert reader.current_value('io_scheduler') == 'bfq'
+    assert reader.refreshes == 3
+
+
+def test_missing_tunables_are_none(tmp_path):
+    reader = TunableStateReader(root=str(tmp_path), ttl_seconds=60)
+    assert reader.snapshot()['cpu'] == {}
+    assert reader.current_value('cpu_governor') is None
+    assert not reader.is_noop('cpu_governor', 'performance')
@@ -0,0 +1,161 @@
+# tests/test_tuning_backend.py
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization import tuning_backend
+from app.optimization.tunable_state import TunableStateReader
+from app.optimization.tuning_backend import SysfsTuningBackend
+from app.optimization.tuning_helper import main, run_helper
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def _read(root, relative):
+    return (root / relative).read_text().strip()
+
+
+def _backend(root, **kwargs):
+    _write(root, 'sys/devices/system/cpu/online', '0-1')
+    for cpu in (0, 1):
+        _write(root, f'sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_governor', 'powersave')
+        _write(root, f'sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_available_governors', 'performance powersave')
+    _write(root, 'sys/block/nvme0n1/queue/scheduler', '[none] mq-deadline')
+    _write(root, 'sys/block/nvme0n1/queue/read_ahead_kb', '128')
+    _write(root, 'sys/block/sdb/queue/scheduler', 'mq-deadline [bfq]')
+    _write(root, 'sys/block/sdb/queue/read_ahead_kb', '128')
+    _write(root, 'proc/sys/vm/swappiness', '60')
+    _write(root, 'proc/sys/vm/min_free_kbytes', '32768')
+    _write(root, 'proc/sys/net/core/rmem_max', '212992')
+    _write(root, 'proc/sys/net/core/wmem_max', '212992')
+    reader = TunableStateReader(root=str(root), ttl_seconds=3600)
+    return SysfsTuningBackend(root=str(root), dry_run=kwargs.pop('dry_run', False),
+                              helper_command=kwargs.pop('helper_command', ''), reader=reader)
+
+
+def test_batch_apply_covers_every_cpu_and_device(tmp_path):
+    backend = _backend(tmp_path)
+    result = backend.apply({
+        'cpu_governor': 'performance',
+        'disk_read_ahead': '512',
+        'network_buffer': '4194304',
+        'memory_pressure': 'high'
+    })
+    assert result.success
+    assert _read(tmp_path, 'sys/devices/system/cpu/cpu1/cpufreq/scaling_governor') == 'performance'
+    # 512 sectors is 256 KiB on every discovered device, not just sda
+    assert _read(tmp_path, 'sys/block/nvme0n1/queue/read_ahead_kb') == '256'
+    assert _read(tmp_path, 'sys/block/sdb/queue/read_ahead_kb') == '256'
+    assert _read(tmp_path, 'proc/sys/net/core/wmem_max') == '4194304'
+    assert _read(tmp_path, 'proc/sys/vm/min_free_kbytes') == '65536'
+    assert len(result.applied) == 7
+    assert backend.reader.current_value('cpu_governor') == 'performance'
+
+
+def test_unchanged_and_unsupported_values_are_skipped(tmp_path):
+    backend = _backend(tmp_path)
+    result = backend.apply({'swap_tendency': 60, 'io_scheduler': 'bfq'})
+    # swappiness is already 60, and only sdb offers bfq, where it is already active
+    assert result.success and not result.applied
+    assert len(result.skipped) == 2
+    assert _read(tmp_path, 'sys/block/nvme0n1/queue/scheduler') == '[none] mq-deadline'
+
+
+def test_targets_limit_devices_and_revert_restores(tmp_path):
+    backend = _backend(tmp_path)
+    result = backend.apply({'io_scheduler': 'mq-deadline'}, targets={'io_scheduler': ['nvme0n1']})
+    assert [write.target for write in result.applied] == ['nvme0n1']
+    assert result.applied[0].previous == 'none'
+    assert _read(tmp_path, 'sys/block/sdb/queue/scheduler') == 'mq-deadline [bfq]'
+    backend.revert(result.applied)
+    assert _read(tmp_path, 'sys/block/nvme0n1/queue/scheduler') == 'none'
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    backend = _backend(tmp_path, dry_run=True)
+    result = backend.apply({'swap_tendency': 10})
+    assert result.dry_run and [write.value for write in result.applied] == ['10']
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '60'
+
+
+def test_unknown_parameter_fails_without_writing(tmp_path):
+    backend = _backend(tmp_path)
+    result = backend.apply({'turbo_button': 'on', 'swap_tendency': 10})
+    assert not result.success and 'turbo_button' in result.failed
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '10'
+
+
+def test_permission_denied_writes_go_to_helper_in_one_call(tmp_path, monkeypatch):
+    backend = _backend(tmp_path, helper_command='sudo -n tuning-helper')
+    calls = []
+
+    def deny(write):
+        raise PermissionError(13, 'Permission denied')
+
+    def fake_run(command, input, **kwargs):
+        calls.append(command)
+        errors = run_helper(input.splitlines(), root=str(tmp_path))
+        return subprocess.CompletedProcess(command, 1 if errors else 0, stdout=''.join(e + '\n' for e in errors), stderr='')
+
+    monkeypatch.setattr(backend, '_write', deny)
+    monkeypatch.setattr(tuning_backend.subprocess, 'run', fake_run)
+    result = backend.apply({'swap_tendency': 10, 'network_buffer': 1048576})
+    assert result.success and len(result.applied) == 3
+    assert calls == [['sudo', '-n', 'tuning-helper', '--root', str(tmp_path)]]
+    assert _read(tmp_path, 'proc/sys/net/core/rmem_max') == '1048576'
+
+
+def test_helper_refuses_paths_outside_the_tunable_trees(tmp_path):
+    errors = run_helper(['etc/passwd\troot', 'proc/sys/../../etc/shadow\tx', 'sys/block/../../../tmp/x\ty'], root=str(tmp_path))
+    assert len(errors) == 3
+    assert not (tmp_path / 'etc').exists()
+
+
+def test_helper_writes_only_planned_files_and_never_through_symlinks(tmp_path, monkeypatch):
+    _backend(tmp_path)
+    _write(tmp_path, 'proc/sys/kernel/core_pattern', 'core')
+    target = tmp_path / 'elsewhere'
+    target.write_text('untouched')
+    (tmp_path / 'sys/block/sdb/queue/nr_requests').symlink_to(target)
+    # sysfs links devices into /sys/devices, which stays allowed
+    _write(tmp_path, 'sys/devices/pci0000:00/net/eth0/tx_queue_len', '1000')
+    (tmp_path / 'sys/class/net').mkdir(parents=True)
+    (tmp_path / 'sys/class/net/eth0').symlink_to(tmp_path / 'sys/devices/pci0000:00/net/eth0')
+
+    errors = run_helper([
+        'proc/sys/kernel/core_pattern\t|/tmp/evil %p',
+        'sys/block/sdb/queue/nr_requests\t1',
+        'sys/class/net/eth0/tx_queue_len\t5000',
+        'proc/sys/vm/swappiness\t10'
+    ], root=str(tmp_path))
+    assert [error.split('\t')[0] for error in errors] == ['proc/sys/kernel/core_pattern', 'sys/block/sdb/queue/nr_requests']
+    assert _read(tmp_path, 'proc/sys/kernel/core_pattern') == 'core'
+    assert target.read_text() == 'untouched'
+    assert _read(tmp_path, 'sys/class/net/eth0/tx_queue_len') == '5000'
+    assert _read(tmp_path, 'proc/sys/vm/swappiness') == '10'
+
+    # Run as root, a caller-chosen root is ignored
+    roots = []
+    monkeypatch.setattr(os, 'geteuid', lambda: 0)
+    monkeypatch.setattr(sys, 'stdin', type('Stdin', (), {'readlines': lambda self: []})())
+    monkeypatch.setattr('app.optimization.tuning_helper.run_helper', lambda lines, root: roots.append(root) or [])
+    assert main(['--root', str(tmp_path)]) == 0
+    assert roots == ['/']
+
+
+def test_noop_only_when_every_written_file_already_matches(tmp_path):
+    backend = _backend(tmp_path)
+    # sdb already runs mq-deadline but nvme0n1 doesn't, and both would be written
+    _write(tmp_path, 'sys/block/sdb/queue/scheduler', '[mq-deadline] bfq')
+    assert not backend.is_noop('io_scheduler', 'mq-deadline')
+    assert backend.is_noop('io_scheduler', 'mq-deadline', ['sdb'])
+    assert backend.is_noop('network_buffer', 212992)
+    _write(tmp_path, 'proc/sys/net/core/wmem_max', '4096')
+    assert not backend.is_noop('network_buffer', 212992)
+    assert not backend.is_noop('turbo_button', 'on')
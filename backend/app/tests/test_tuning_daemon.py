@@ -0,0 +1,157 @@
+# tests/test_tuning_daemon.py
+import asyncio
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.periodicity import PeriodicityDetector
+from app.optimization.rule_engine import RecommendationEngine
+from app.optimization.tunable_state import TunableStateReader
+from app.optimization.tuning_daemon import AutoTuningDaemon, in_window, parse_window
+
+RULES = (
+    {
+        'name': 'swap_tendency_low',
+        'when': {'memory_usage': ('>', 75)},
+        'parameter': 'swap_tendency', 'value': '40', 'fallback': '60',
+        'confidence': 0.75, 'impact': 0.5,
+        'reason': "Memory usage averaged {memory_usage:.0f}%"
+    },
+)
+
+
+class FakeTuner:
+    def __init__(self):
+        self.calls = []
+
+    async def apply_tuning(self, data, user_id=None, metrics=None):
+        self.calls.append((data, metrics))
+        return {**data, 'success': True}
+
+
+def _daemon(tmp_path, memory=85.0, **options):
+    (tmp_path / 'proc/sys/vm').mkdir(parents=True, exist_ok=True)
+    (tmp_path / 'proc/sys/vm/swappiness').write_text('60\n')
+    reader = TunableStateReader(root=str(tmp_path), ttl_seconds=3600)
+    engine = RecommendationEngine(RULES, window_seconds=3600, min_samples=3,
+                                  cooldown_seconds=0, hysteresis=5, reader=reader)
+    defaults = dict(tuner=FakeTuner(), engine=engine, detector=PeriodicityDetector(),
+                    min_change_interval=3600, maintenance_windows=[], parameters=[], user_id='')
+    daemon = AutoTuningDaemon(**{**defaults, **options})
+    for i in range(3):
+        sample = {'timestamp': i, 'memory_usage': memory, 'disk_usage': 10.0}
+        engine.observe(sample)
+        daemon.latest_metrics = sample
+    return daemon
+
+
+def test_parse_and_match_windows():
+    assert parse_window('Sat 01:00-05:00') == (5, 60, 300)
+    assert parse_window('22:00-02:00') == (None, 1320, 120)
+    with pytest.raises(ValueError):
+        parse_window('whenever')
+    saturday = datetime(2026, 10, 17, 3, 0)
+    assert in_window((5, 60, 300), saturday)
+    assert not in_window((5, 60, 300), saturday + timedelta(days=1))
+    # Friday 22:00-02:00 reaches into early Saturday, but not Sunday
+    assert in_window((4, 1320, 120), saturday - timedelta(hours=2))
+    assert not in_window((4, 1320, 120), saturday + timedelta(days=1, hours=-2))
+
+
+def test_acts_on_stream_and_respects_rate_limit(tmp_path):
+    daemon = _daemon(tmp_path)
+    now = datetime(2026, 10, 18, 12, 0)
+    [action] = asyncio.run(daemon.tick(now))
+    assert action['parameter'] == 'swap_tendency' and action['new_value'] == '40'
+    data, metrics = daemon.tuner.calls[0]
+    assert metrics is daemon.latest_metrics
+    # Still recommended, but changed less than an hour ago
+    assert asyncio.run(daemon.tick(now + timedelta(minutes=30))) == []
+    assert len(asyncio.run(daemon.tick(now + timedelta(hours=2)))) == 1
+
+
+def test_maintenance_windows_and_allowlist(tmp_path):
+    daemon = _daemon(tmp_path, maintenance_windows=['02:00-04:00'])
+    assert asyncio.run(daemon.tick(datetime(2026, 10, 18, 12, 0))) == []
+    assert daemon.tuner.calls == []
+    assert len(asyncio.run(daemon.tick(datetime(2026, 10, 18, 3, 0)))) == 1
+
+    restricted = _daemon(tmp_path, parameters=['cpu_governor'])
+    assert asyncio.run(restricted.tick(datetime(2026, 10, 18, 12, 0))) == []
+
+
+def test_waits_for_the_stream():
+    engine = RecommendationEngine(RULES, window_seconds=60, min_samples=3, cooldown_seconds=0, hysteresis=5)
+    tuner = FakeTuner()
+    daemon = AutoTuningDaemon(tuner=tuner, engine=engine, detector=PeriodicityDetector(),
+                              maintenance_windows=[], parameters=[], user_id='')
+    assert asyncio.run(daemon.tick(datetime(2026, 10, 18, 12, 0))) == []
+    assert tuner.calls == []
+
+
+def test_prepares_for_daily_peak_and_restores_after(tmp_path):
+    daemon = _daemon(tmp_path, memory=40.0, lead_seconds=900, peak_hold_seconds=3600)
+    base = 20000 * 24
+    for hour in range(72):
+        value = 60 + 30 * math.cos(2 * math.pi * (hour - 1) / 24)
+        daemon.detector.add_bucket('memory_usage', base + hour, value)
+    [cycle] = [c for c in daemon.detector.significant_cycles() if round(c['period_hours']) == 24]
+    peak = cycle['next_peak'].astimezone().replace(tzinfo=None)
+
+    assert asyncio.run(daemon.tick(peak - timedelta(hours=2))) == []
+    [action] = asyncio.run(daemon.tick(peak - timedelta(minutes=10)))
+    assert action['new_value'] == '40'
+    assert action['reason'].startswith(f"Ahead of the daily memory_usage peak at {peak:%H:%M}")
+    assert 'swap_tendency' in daemon.preemptive
+    # Prepared once per peak
+    assert asyncio.run(daemon.tick(peak - timedelta(minutes=5))) == []
+
+    [restore] = asyncio.run(daemon.tick(peak + timedelta(hours=1, minutes=1)))
+    assert restore['new_value'] == '60'
+    assert daemon.preemptive == {}
+
+
+def test_restores_live_changes_once_the_rule_clears(tmp_path):
+    daemon = _daemon(tmp_path)
+    now = datetime(2026, 10, 18, 12, 0)
+    [action] = asyncio.run(daemon.tick(now))
+    assert action['new_value'] == '40'
+    assert daemon.applied['swap_tendency']['previous'] == '60'
+    (tmp_path / 'proc/sys/vm/swappiness').write_text('40\n')
+    daemon.engine.reader.invalidate()
+
+    # Still under load: nothing to undo
+    assert asyncio.run(daemon.tick(now + timedelta(minutes=5))) == []
+    for i in range(3, 10):
+        sample = {'timestamp': i, 'memory_usage': 10.0, 'disk_usage': 10.0}
+        daemon.engine.observe(sample)
+        daemon.latest_metrics = sample
+    assert daemon.engine.get_stats()['active_rules'] == []
+
+    # Put back straight away, inside the rate limit, and only once
+    [restore] = asyncio.run(daemon.tick(now + timedelta(minutes=10)))
+    assert (restore['old_value'], restore['new_value']) == ('40', '60')
+    assert daemon.applied == {}
+    assert asyncio.run(daemon.tick(now + timedelta(hours=3))) == []
+
+
+def test_stop_unsubscribes_from_the_stream(tmp_path, monkeypatch):
+    from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+    daemon = _daemon(tmp_path, interval_seconds=3600)
+
+    async def no_history():
+        pass
+    monkeypatch.setattr(daemon, 'seed_history', no_history)
+
+    async def scenario():
+        daemon.start()
+        assert daemon.observe in SimplifiedMetricsService()._listeners
+        await daemon.stop()
+
+    asyncio.run(scenario())
+    assert daemon.observe not in SimplifiedMetricsService()._listeners
@@ -0,0 +1,96 @@
+# tests/test_tuning_experiment.py
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.optimization.tuning_experiment import TuningExperiment, t_test_p_value, welch_test
+
+
+class FakeTuner:
+    """Applies tunings to a dict; the sampled CPU level depends on the value in force"""
+
+    def __init__(self, cpu_by_value, seed=0):
+        self.value = 'ondemand'
+        self.cpu_by_value = cpu_by_value
+        self.calls = []
+        self.rng = np.random.default_rng(seed)
+
+    async def apply_tuning(self, data, user_id=None):
+        self.calls.append(data)
+        self.value = data['new_value']
+        return {'parameter': data['parameter'], 'current_value': data['current_value'],
+                'new_value': data['new_value'], 'success': True}
+
+    async def get_current_metrics(self):
+        return {'cpu_usage': self.cpu_by_value[self.value] + self.rng.normal(0, 2),
+                'memory_usage': 40 + self.rng.normal(0, 1)}
+
+
+def _experiment(tuner):
+    return TuningExperiment(tuner, window_seconds=0.03, sample_interval=0.001, settle_seconds=0,
+                            objectives={'cpu_usage': 'lower', 'memory_usage': 'lower'})
+
+
+ACTION = {'parameter': 'cpu_governor', 'current_value': 'ondemand', 'new_value': 'performance'}
+
+
+def test_t_distribution_p_values():
+    # Textbook critical values: t(10) = 2.228 and t(30) = 2.042 at p = 0.05
+    assert abs(t_test_p_value(2.228, 10) - 0.05) < 1e-3
+    assert abs(t_test_p_value(2.042, 30) - 0.05) < 1e-3
+    assert t_test_p_value(0.0, 5) == 1.0
+
+
+def test_welch_effect_size_sign_and_constant_windows():
+    rng = np.random.default_rng(1)
+    before = rng.normal(50, 5, 200)
+    stats = welch_test(before, before + 5)
+    assert stats['p_value'] < 1e-6
+    assert 0.8 < stats['effect_size'] < 1.2
+    same = welch_test(np.full(5, 3.0), np.full(5, 3.0))
+    assert same['p_value'] == 1.0 and same['effect_size'] == 0.0
+
+
+def test_regression_is_reverted():
+    tuner = FakeTuner({'ondemand': 30, 'performance': 45})
+    record = asyncio.run(_experiment(tuner).run(ACTION))
+    assert record['verdict'] == 'regressed'
+    assert record['reverted'] is True
+    assert tuner.value == 'ondemand'
+    assert tuner.calls[-1]['new_value'] == 'ondemand'
+    cpu = record['effect_sizes']['objectives']['cpu_usage']
+    assert cpu['significant'] and cpu['improvement'] < -1
+    assert record['effect_sizes']['samples_before'] == record['effect_sizes']['samples_after'] == 30
+
+
+def test_improvement_is_kept():
+    tuner = FakeTuner({'ondemand': 45, 'performance': 30})
+    record = asyncio.run(_experiment(tuner).run(ACTION))
+    assert record['verdict'] == 'improved'
+    assert record['reverted'] is False
+    assert tuner.value == 'performance'
+    assert len(tuner.calls) == 1
+
+
+def test_no_change_is_inconclusive():
+    tuner = FakeTuner({'ondemand': 30, 'performance': 30})
+    record = asyncio.run(_experiment(tuner).run(ACTION))
+    assert record['verdict'] == 'inconclusive'
+    assert tuner.value == 'performance'
+
+
+def test_failed_apply_is_not_observed():
+    class FailingTuner(FakeTuner):
+        async def apply_tuning(self, data, user_id=None):
+            self.calls.append(data)
+            return {**data, 'success': False, 'error': 'Missing permission to modify cpu_governor'}
+
+    tuner = FailingTuner({'ondemand': 30})
+    record = asyncio.run(_experiment(tuner).run(ACTION))
+    assert record['verdict'] == 'not_applied'
+    assert record['error'].startswith('Missing permission')
+    assert len(tuner.calls) == 1
@@ -0,0 +1,170 @@
+# tests/test_tuning_simulator.py
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.models.metrics import SystemMetrics
+from app.optimization.rule_engine import SIGNALS, RecommendationEngine
+from app.optimization.tunable_state import TunableStateReader
+from app.optimization.tuning_simulator import TuningSimulator, load_trace, trace_from_samples
+from app.services.storage.metric_archive import BatchedMetricWriter
+from app.services.storage.segment_store import SAMPLE_DTYPE
+
+RULES = (
+    {
+        'name': 'swap_tendency_low',
+        'when': {'memory_usage': ('>', 75)},
+        'parameter': 'swap_tendency', 'value': '40', 'fallback': '60',
+        'confidence': 0.75, 'impact': 0.5, 'reason': ''
+    },
+    {
+        'name': 'heavy_load_priority',
+        'when': {'cpu_usage': ('>', 70), 'memory_usage': ('>', 70, 2)},
+        'parameter': 'process_priority', 'value': '-10', 'fallback': '0',
+        'confidence': 0.9, 'impact': 0.8, 'reason': ''
+    }
+)
+OPTIONS = dict(window_seconds=30, min_samples=5, cooldown_seconds=120, hysteresis=5)
+
+
+def _trace(n, seed=7):
+    rng = np.random.default_rng(seed)
+    stamps = 1_700_000_000 + np.arange(n, dtype=np.float64)
+    # Slow swings through the thresholds plus noise, with some samples missing
+    memory = 70 + 15 * np.sin(stamps / 400) + rng.normal(0, 4, n)
+    cpu = 65 + 20 * np.sin(stamps / 170) + rng.normal(0, 6, n)
+    cpu[rng.random(n) < 0.05] = np.nan
+    return {'timestamp': stamps, 'cpu_usage': cpu, 'memory_usage': memory}
+
+
+def test_replay_matches_the_live_engine(tmp_path):
+    trace = _trace(20000)
+    engine = RecommendationEngine(RULES, reader=TunableStateReader(root=str(tmp_path)), **OPTIONS)
+    expected = []
+    for i, now in enumerate(trace['timestamp']):
+        sample = {'timestamp': now, 'memory_usage': trace['memory_usage'][i]}
+        if not np.isnan(trace['cpu_usage'][i]):
+            sample['cpu_usage'] = trace['cpu_usage'][i]
+        for name in engine.observe(sample, now=now):
+            expected.append((datetime.fromtimestamp(now).isoformat(), name))
+
+    result = TuningSimulator(RULES, **OPTIONS).run(trace)
+    replayed = [(event['time'], event['rule']) for event in result['events']]
+    assert len(expected) > 10
+    assert expected == replayed
+    assert sum(r['fired'] for r in result['rules']) == sum(1 for e in result['events'] if e['action'] == 'apply')
+    assert result['changes_by_parameter']['swap_tendency'] == sum(1 for _, name in expected if name == 'swap_tendency_low')
+
+
+def test_reverts_only_when_no_other_rule_keeps_the_parameter(tmp_path):
+    rules = RULES[:1] + ({
+        'name': 'swap_tendency_busy', 'when': {'cpu_usage': ('>', 80)},
+        'parameter': 'swap_tendency', 'value': '30', 'fallback': '60',
+        'confidence': 0.5, 'impact': 0.5, 'reason': ''
+    },)
+    (tmp_path / 'proc/sys/vm').mkdir(parents=True)
+    swappiness = tmp_path / 'proc/sys/vm/swappiness'
+    swappiness.write_text('60\n')
+    trace = _trace(20000)
+    engine = RecommendationEngine(rules, reader=TunableStateReader(root=str(tmp_path), ttl_seconds=3600), **OPTIONS)
+    expected = []
+    for i, now in enumerate(trace['timestamp']):
+        sample = {'timestamp': now, 'memory_usage': trace['memory_usage'][i]}
+        if not np.isnan(trace['cpu_usage'][i]):
+            sample['cpu_usage'] = trace['cpu_usage'][i]
+        flipped = engine.observe(sample, now=now)
+        if not flipped:
+            continue
+        recommendations = engine.recommendations()
+        for name in flipped:
+            if name not in engine.get_stats()['active_rules']:
+                # What ends up in force: the recommendation, or the value already there
+                in_force = recommendations[0]['new_value'] if recommendations else swappiness.read_text().strip()
+                restore = bool(recommendations and recommendations[0].get('restore'))
+                expected.append((datetime.fromtimestamp(now).isoformat(), name, in_force, restore))
+        # Apply everything, as the daemon would
+        for recommendation in recommendations:
+            swappiness.write_text(recommendation['new_value'] + '\n')
+            engine.record_applied('swap_tendency', recommendation['current_value'], recommendation['new_value'])
+            engine.reader.invalidate()
+
+    events = TuningSimulator(rules, **OPTIONS).run(trace)['events']
+    cleared = [(e['time'], e['rule'], e['value'], e['action'] == 'revert')
+               for e in events if e['action'] in ('revert', 'handover')]
+    assert {'revert', 'handover'} <= {event['action'] for event in events}
+    assert sorted(expected) == sorted(cleared)
+
+
+def test_profile_thresholds_and_raw_samples():
+    samples = np.zeros(600, dtype=SAMPLE_DTYPE)
+    samples['timestamp'] = 1_700_000_000 + np.arange(600)
+    samples['cpu_percent'] = np.where((np.arange(600) // 100) % 2 == 1, 95, 20)
+    samples['net_sent_rate'] = 1_000_000
+    trace = trace_from_samples(samples, link_speed_mbps=100)
+    assert np.allclose(trace['network_usage'], 8.0)
+    assert np.isnan(trace_from_samples(samples)['network_usage']).all()
+
+    simulator = TuningSimulator((), profile_settings={'cpuThreshold': 80, 'swapiness': 60},
+                                window_seconds=10, min_samples=3, cooldown_seconds=0, hysteresis=5)
+    [threshold] = simulator.run(trace)['thresholds']
+    assert threshold['rule'] == 'cpuThreshold' and threshold['signal'] == 'cpu_usage'
+    assert threshold['fired'] == 3
+    assert threshold['active_at_end']
+
+
+def test_stored_process_counts_drive_the_process_rules():
+    samples = np.zeros(600, dtype=SAMPLE_DTYPE)
+    samples['timestamp'] = 1_700_000_000 + np.arange(600)
+    samples['cpu_percent'] = 90
+    samples['process_count'] = 250
+    # The live engine reads the same count from the sample it is given
+    assert SIGNALS['process_count'][0]({'process_count': 250}) == 250.0
+
+    result = TuningSimulator(window_seconds=10, min_samples=3, cooldown_seconds=0, hysteresis=5).run(
+        trace_from_samples(samples))
+    [busy] = [rule for rule in result['rules'] if rule['rule'] == 'process_priority_busy']
+    assert busy['fired'] == 1 and busy['active_at_end']
+
+
+def test_loads_sqlite_history():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[SystemMetrics.__table__])
+        async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+            start = datetime(2026, 1, 1)
+            async with BatchedMetricWriter(db) as writer:
+                for i in range(100):
+                    await writer.add({
+                        'timestamp': start + timedelta(seconds=i),
+                        'cpu_usage': float(i), 'memory_usage': None, 'disk_usage': 70.0,
+                        'network_usage': {'sent_rate': 1_250_000, 'recv_rate': 0},
+                        'process_count': 100, 'additional_metrics': None
+                    })
+            trace = await load_trace(db, start + timedelta(seconds=10), start + timedelta(seconds=20),
+                                     link_speed_mbps=1000)
+        await engine.dispose()
+        return trace
+
+    trace = asyncio.run(scenario())
+    assert trace['cpu_usage'].tolist() == [float(i) for i in range(10, 20)]
+    assert np.isnan(trace['memory_usage']).all()
+    assert np.allclose(trace['network_usage'], 1.0)
+
+
+def test_month_of_one_second_samples_replays_quickly():
+    trace = _trace(30 * 86400, seed=1)
+    started = time.perf_counter()
+    result = TuningSimulator(RULES, **OPTIONS).run(trace)
+    assert result['samples'] == 30 * 86400
+    assert time.perf_counter() - started < 20
@@ -0,0 +1,127 @@
+# tests/test_user_resolver.py
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  registers every mapper referenced by User
+from app.core.base import Base
+from app.core.security import create_access_token
+from app.core.user_resolver import UserResolver
+from app.models.user import User
+
+
+class CountingSessions:
+    """Session factory that counts how often the resolver opens a session"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self.factory()
+
+
+async def run_with_users(coro_factory):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__])
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        db.add(User(username="hawkington", email="hawk@example.com", hashed_password="x", bio="old"))
+        await db.commit()
+    try:
+        return await coro_factory(Session)
+    finally:
+        await engine.dispose()
+
+
+def test_cached_lookup_skips_database_and_returns_independent_copies():
+    async def scenario(Session):
+        sessions = CountingSessions(Session)
+        resolver = UserResolver(session_factory=sessions)
+        token = create_access_token({"sub": "hawkington"})
+
+        first, second = await asyncio.gather(resolver.resolve_token(token), resolver.resolve_token(token))
+        third = await resolver.resolve_token(token)
+        first.bio = "mutated"
+        return sessions.opened, third, await resolver.resolve_token(token)
+
+    opened, third, fourth = asyncio.run(run_with_users(scenario))
+    # Concurrent misses share one query; later hits never open a session
+    assert opened == 1
+    assert third.username == "hawkington"
+    assert fourth.bio == "old"
+
+
+def test_invalidate_and_ttl_force_reload():
+    async def scenario(Session):
+        now = [0.0]
+        sessions = CountingSessions(Session)
+        resolver = UserResolver(ttl_seconds=10, session_factory=sessions, clock=lambda: now[0])
+
+        user = await resolver.resolve("hawkington", "jti-1")
+        user.bio = "new"
+        async with Session() as db:
+            db.add(user)
+            await db.commit()
+        resolver.invalidate("hawkington")
+        updated = await resolver.resolve("hawkington", "jti-1")
+
+        now[0] = 11.0
+        await resolver.resolve("hawkington", "jti-1")
+
+        async with Session() as db:
+            count = len((await db.execute(select(User))).scalars().all())
+        return sessions.opened, updated, count
+
+    opened, updated, count = asyncio.run(run_with_users(scenario))
+    assert updated.bio == "new"
+    # Saving a resolved user updates the existing row instead of inserting a copy
+    assert count == 1
+    assert opened == 3
+
+
+def test_unknown_user_is_not_cached():
+    async def scenario(Session):
+        sessions = CountingSessions(Session)
+        resolver = UserResolver(session_factory=sessions)
+        results = [await resolver.resolve("nobody", "jti") for _ in range(2)]
+        return sessions.opened, results
+
+    opened, results = asyncio.run(run_with_users(scenario))
+    assert results == [None, None]
+    assert opened == 2
+
+
+def test_auth_endpoints_resolve_async_and_invalidate_after_commit(monkeypatch):
+    from app.api.endpoints import auth
+
+    class FakeRequest:
+        def __init__(self, token):
+            self.headers = {'Authorization': f'Bearer {token}'}
+
+    async def scenario(Session):
+        sessions = CountingSessions(Session)
+        resolver = UserResolver(session_factory=sessions)
+        monkeypatch.setattr(auth, 'get_user_resolver', lambda: resolver)
+        token = create_access_token({"sub": "hawkington"})
+
+        before = await auth.auth_status(FakeRequest(token), db=None)
+        user = await resolver.resolve_token(token)
+        async with Session() as db:
+            await auth.complete_onboarding(current_user=user, db=db)
+        after = await auth.auth_status(FakeRequest(token), db=None)
+        return sessions.opened, before['user'], after['user']
+
+    opened, before, after = asyncio.run(run_with_users(scenario))
+    assert before['needs_onboarding'] is True
+    assert after['needs_onboarding'] is False
+    # One lookup before onboarding, one after the invalidation
+    assert opened == 2
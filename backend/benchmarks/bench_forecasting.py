@@ -0,0 +1,101 @@
+"""
+Holt-Winters forecasting backtest.
+
+Rolling-origin backtest on synthetic hourly workload series (daily season,
+slow trend, noise and occasional spikes): at each origin the model forecasts
+the next day and is then fed that day's actuals. Reports MAE and MAPE against
+seasonal-naive and mean baselines, plus per-observation update time,
+per-forecast time and parameter-selection time.
+
+Run from the backend directory:
+    python -m benchmarks.bench_forecasting [--weeks N] [--series N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.context.forecasting import HoltWinters, select_parameters
+
+SEASON = 24
+HORIZON = 24
+
+
+def make_series(rng: np.random.Generator, hours: int) -> np.ndarray:
+    t = np.arange(hours)
+    daily = 25 * np.sin(2 * np.pi * (t % SEASON) / SEASON - np.pi / 2)
+    trend = 0.01 * t
+    noise = rng.normal(0, 3, hours)
+    spikes = (rng.random(hours) < 0.01) * rng.uniform(10, 30, hours)
+    return np.clip(45 + daily + trend + noise + spikes, 0, 100)
+
+
+def backtest(values: np.ndarray, params, warmup: int):
+    model = HoltWinters(SEASON, *params).fit(values[:warmup])
+    errors = {'holt_winters': [], 'seasonal_naive': [], 'mean': []}
+    actuals = []
+    update_time = forecast_time = 0.0
+    updates = forecasts = 0
+
+    for origin in range(warmup, len(values) - HORIZON + 1, HORIZON):
+        actual = values[origin:origin + HORIZON]
+        start = time.perf_counter()
+        predicted = model.forecast(HORIZON)
+        forecast_time += time.perf_counter() - start
+        forecasts += 1
+
+        errors['holt_winters'].append(predicted - actual)
+        errors['seasonal_naive'].append(values[origin - SEASON:origin] - actual)
+        errors['mean'].append(np.full(HORIZON, values[:origin].mean()) - actual)
+        actuals.append(actual)
+
+        start = time.perf_counter()
+        for value in actual:
+            model.update(value)
+        update_time += time.perf_counter() - start
+        updates += len(actual)
+
+    actuals = np.concatenate(actuals)
+    scores = {}
+    for name, errs in errors.items():
+        errs = np.concatenate(errs)
+        scores[name] = (np.abs(errs).mean(), np.mean(np.abs(errs) / np.maximum(actuals, 1)) * 100)
+    return scores, update_time / updates * 1e6, forecast_time / forecasts * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--weeks', type=int, default=6)
+    parser.add_argument('--series', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    hours = args.weeks * 7 * 24
+    warmup = 2 * 7 * 24
+
+    totals = {}
+    update_us = forecast_us = select_ms = 0.0
+    for _ in range(args.series):
+        values = make_series(rng, hours)
+        start = time.perf_counter()
+        params = select_parameters(values[:warmup], SEASON)
+        select_ms += (time.perf_counter() - start) * 1e3
+        scores, upd, fc = backtest(values, params, warmup)
+        update_us += upd
+        forecast_us += fc
+        for name, (mae, mape) in scores.items():
+            total = totals.setdefault(name, [0.0, 0.0])
+            total[0] += mae
+            total[1] += mape
+
+    n = args.series
+    print(f"{args.series} series x {hours} hourly points, {HORIZON}h horizon, rolling origin after {warmup}h")
+    print(f"{'model':>16} {'MAE':>8} {'MAPE %':>8}")
+    for name, (mae, mape) in totals.items():
+        print(f"{name:>16} {mae / n:>8.2f} {mape / n:>8.1f}")
+    print(f"update {update_us / n:.1f} us/obs, forecast {forecast_us / n:.1f} us/{HORIZON}h, "
+          f"parameter selection {select_ms / n:.1f} ms/series")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+MetricTransformer per-tick benchmark.
+
+Measures the cost of one transform_system_metrics call at several history
+sizes, comparing the default incremental path with a full-history
+recomputation (include_history=True, equivalent to what every tick used to
+cost).
+
+Run from the backend directory:
+    python -m benchmarks.bench_metric_transformer [--ticks N]
+"""
+import argparse
+import random
+import time
+
+from app.core.resilience.metric_transformer import MetricTransformer
+
+HISTORY_SIZES = (60, 3600, 86400)
+
+
+def make_metrics(rng: random.Random) -> dict:
+    return {
+        'cpu': {'percent': rng.uniform(0, 100)},
+        'memory': {'percent': rng.uniform(20, 90)},
+        'disk': {'percent': rng.uniform(40, 60)},
+        'network': {'rate_mbps': rng.expovariate(1 / 5)},
+    }
+
+
+def time_ticks(transformer: MetricTransformer, samples, include_history: bool) -> float:
+    start = time.perf_counter()
+    for metrics in samples:
+        transformer.transform_system_metrics(metrics, include_history=include_history)
+    return (time.perf_counter() - start) / len(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'history':>8} {'incremental us/tick':>20} {'full us/tick':>14} {'speedup':>8}")
+    for size in HISTORY_SIZES:
+        transformer = MetricTransformer(name=f"bench-{size}", history_size=size)
+        # Fill the ring so every measured tick also evicts
+        for _ in range(size):
+            transformer.transform_system_metrics(make_metrics(rng))
+
+        samples = [make_metrics(rng) for _ in range(args.ticks)]
+        incremental = time_ticks(transformer, samples, include_history=False)
+        # Full recomputation is far slower at large sizes, so fewer ticks suffice
+        full = time_ticks(transformer, samples[:max(5, args.ticks // 20)], include_history=True)
+        print(f"{size:>8} {incremental:>20.1f} {full:>14.1f} {full / incremental:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+PatternMatcher similarity search benchmark.
+
+Times queries at the matcher's default threshold (0.8) against indexes of
+increasing size, comparing a full vector-matrix scan with grid-bucketed
+search (8 cells per field, best-bound-first with early exit) for top-1 and
+top-5.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pattern_matching [--queries N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.pattern_recognition.similarity_index import SimilarityIndex
+
+SIZES = (1_000, 100_000, 1_000_000)
+
+
+def make_state(row) -> dict:
+    return {'cpu_usage': row[0], 'memory_usage': row[1], 'disk_usage': row[2]}
+
+
+def time_queries(index: SimilarityIndex, queries, k: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, k=k, threshold=0.8)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    queries = [make_state(row) for row in rng.uniform(0, 100, size=(args.queries, 3))]
+
+    print(f"{'patterns':>9} {'full k=1 us':>12} {'grid k=1 us':>12} {'full k=5 us':>12} {'grid k=5 us':>12}")
+    for size in SIZES:
+        rows = rng.uniform(0, 100, size=(size, 3))
+        full = SimilarityIndex(initial_capacity=size)
+        grid = SimilarityIndex(initial_capacity=size, grid_size=8, bucket_min_size=0)
+        for i, row in enumerate(rows):
+            state = make_state(row)
+            full.add(i, state)
+            grid.add(i, state)
+
+        timings = [time_queries(index, queries, k) for k in (1, 5) for index in (full, grid)]
+        print(f"{size:>9} " + " ".join(f"{t:>12.1f}" for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Snapshot compression benchmark.
+
+Compares plain JSON, zlib without a dictionary and zlib with a trained preset
+dictionary on synthetic metric snapshots: compression ratio plus encode and
+decode throughput.
+
+Run from the backend directory:
+    python -m benchmarks.bench_snapshot_compression [--count N]
+"""
+import argparse
+import random
+import time
+import zlib
+
+from app.services.storage.snapshot_codec import SnapshotCodec, train_dictionary
+from app.services.storage.snapshot_dedup import canonical_json
+
+
+def make_snapshot(i: int, rng: random.Random) -> dict:
+    return {
+        'timestamp': f'2026-10-18T09:{(i // 60) % 60:02d}:{i % 60:02d}',
+        'cpu_usage': round(rng.uniform(0, 100), 2),
+        'memory_usage': round(rng.uniform(20, 90), 2),
+        'disk_usage': round(rng.uniform(40, 60), 2),
+        'network_sent_rate': round(rng.expovariate(1 / 5000), 1),
+        'network_recv_rate': round(rng.expovariate(1 / 20000), 1),
+        'process_count': rng.randint(180, 260),
+        'cpu': {
+            'usage_percent': round(rng.uniform(0, 100), 2),
+            'per_core_percent': [round(rng.uniform(0, 100), 1) for _ in range(8)],
+            'temperature': round(rng.uniform(40, 80), 1),
+        },
+        'memory': {'percent': round(rng.uniform(20, 90), 2), 'available': rng.randint(1, 16) * 2 ** 30},
+        'disk': {'read_rate': round(rng.expovariate(1 / 1e6)), 'write_rate': round(rng.expovariate(1 / 1e6))},
+        'network': {'io_stats': {'bytes_sent': rng.randint(0, 2 ** 40), 'bytes_recv': rng.randint(0, 2 ** 40)}},
+    }
+
+
+def throughput(fn, payloads, repeat=3):
+    """Encode throughput in MB/s of input"""
+    total = sum(len(p) for p in payloads)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return total / best / 1e6
+
+
+def decode_rate(fn, encoded, raw_size, repeat=3):
+    """Decode throughput measured against the uncompressed size"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for blob in encoded:
+            fn(blob)
+        best = min(best, time.perf_counter() - start)
+    return raw_size / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--training', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    training = [canonical_json(make_snapshot(i, rng)) for i in range(args.training)]
+    payloads = [canonical_json(make_snapshot(i, rng)) for i in range(args.count)]
+    raw_size = sum(len(p) for p in payloads)
+
+    codec = SnapshotCodec()
+    codec.dictionaries[1] = train_dictionary(training)
+    codec.current_version = 1
+
+    plain_encoded = [zlib.compress(p, 6) for p in payloads]
+    dict_encoded = [codec.encode(p) for p in payloads]
+
+    rows = [
+        ('json', raw_size, None, None),
+        ('zlib', sum(map(len, plain_encoded)),
+         throughput(lambda p: zlib.compress(p, 6), payloads),
+         decode_rate(zlib.decompress, plain_encoded, raw_size)),
+        ('zlib+dict', sum(map(len, dict_encoded)),
+         throughput(codec.encode, payloads),
+         decode_rate(codec.decode, dict_encoded, raw_size)),
+    ]
+
+    print(f"{args.count} snapshots, {raw_size / args.count:.0f} bytes average, "
+          f"dictionary {len(codec.dictionaries[1])} bytes")
+    print(f"{'format':<10} {'bytes':>10} {'ratio':>7} {'enc MB/s':>9} {'dec MB/s':>9}")
+    for name, size, enc, dec in rows:
+        enc_text = f"{enc:>9.1f}" if enc is not None else f"{'-':>9}"
+        dec_text = f"{dec:>9.1f}" if dec is not None else f"{'-':>9}"
+        print(f"{name:<10} {size:>10} {raw_size / size:>7.2f} {enc_text} {dec_text}")
+
+
+if __name__ == '__main__':
+    main()
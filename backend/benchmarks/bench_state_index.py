@@ -0,0 +1,47 @@
+"""
+StateIndex throughput benchmark.
+
+Feeds millions of 3-D metric states (a skewed mix of recurring and random
+states) into a bounded StateIndex and reports the per-observation cost in
+successive slices, so any growth with table size or eviction shows up.
+
+Run from the backend directory:
+    python -m benchmarks.bench_state_index [--observations N] [--max-entries N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.pattern_recognition.state_index import StateIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--observations', type=int, default=2_000_000)
+    parser.add_argument('--max-entries', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # Mostly recurring states around a few modes, with a long random tail
+    modes = rng.uniform(0, 100, size=(50, 3))
+    picks = rng.integers(0, len(modes), args.observations)
+    states = modes[picks] + rng.normal(0, 3, size=(args.observations, 3))
+    tail = rng.random(args.observations) < 0.3
+    states[tail] = rng.uniform(0, 1000, size=(int(tail.sum()), 3))
+
+    index = StateIndex(dimensions=3, max_entries=args.max_entries)
+    slice_size = args.observations // 10
+    print(f"{'observed':>10} {'us/obs':>8} {'entries':>9} {'evictions':>10}")
+    for start in range(0, args.observations, slice_size):
+        begin = time.perf_counter()
+        for i, state in enumerate(states[start:start + slice_size], start):
+            index.observe(state, timestamp=float(i))
+        elapsed = time.perf_counter() - begin
+        stats = index.get_stats()
+        print(f"{start + slice_size:>10} {elapsed / slice_size * 1e6:>8.2f} {stats['entries']:>9} {stats['evictions']:>10}")
+    print(f"table bytes: {index.get_stats()['table_bytes']}")
+
+
+if __name__ == '__main__':
+    main()
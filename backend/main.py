@@ -17,6 +17,7 @@ from app.api import router as metrics_router
 from app.api import router as debug_router
 # Import websocket routes
 from app.api import simplified_websocket_routes
+from app.core.config import settings
 from datetime import datetime
 import uvicorn
 import logging
@@ -75,12 +76,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
         raise
+
+    # Every metrics collection also lands in the raw sample tier
+    from app.services.metrics.simplified_metrics_service import SimplifiedMetricsService
+    from app.services.metrics_repository import get_raw_sample_recorder
+    recorder = get_raw_sample_recorder()
+    SimplifiedMetricsService().add_listener(recorder)
+
+    daemon = None
+    if settings.AUTO_TUNING_ENABLED:
+        from app.optimization.tuning_daemon import get_tuning_daemon
+        daemon = get_tuning_daemon()
+        daemon.start()
     
     yield  # This is where the application runs
     
     # Shutdown logic
     logger.info("Shutting down System Rebellion application...")
-    # Add any cleanup code here
+    if daemon is not None:
+        await daemon.stop()
+    SimplifiedMetricsService().remove_listener(recorder)
+    await recorder.drain()
 
 def create_application() -> FastAPI:
     # Log registered models for debugging
@@ -0,0 +1,38 @@
+#!/bin/bash
+
+# Colors for our distinguished output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+PURPLE='\033[0;35m'
+CYAN='\033[0;36m'
+NC='\033[0m' # No Color
+
+echo -e "${PURPLE}🧐 Sir Hawkington's Distinguished Tuning Helper Setup${NC}"
+echo -e "${BLUE}=================================================${NC}"
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SOURCE="$SCRIPT_DIR/../backend/app/optimization/tuning_helper.py"
+HELPER_DIR="/usr/local/libexec/system-rebellion"
+HELPER="$HELPER_DIR/tuning_helper.py"
+PYTHON="/usr/bin/python3"
+SUDO_FILE="/etc/sudoers.d/system_rebellion_tuning"
+
+if [ ! -f "$SOURCE" ]; then
+    echo -e "${RED}🚨 Cannot find $SOURCE${NC}"
+    exit 1
+fi
+
+# A root-owned copy at a fixed path: the app user can't change what sudo runs,
+# and python -I keeps the caller's cwd, PYTHONPATH and user site out of it
+echo -e "${CYAN}📦 Installing the tuning helper to $HELPER...${NC}"
+sudo install -d -o root -g root -m 0755 "$HELPER_DIR"
+sudo install -o root -g root -m 0755 "$SOURCE" "$HELPER"
+
+echo -e "${CYAN}📝 Creating sudo configuration for the tuning helper...${NC}"
+echo "$USER ALL=(root) NOPASSWD: $PYTHON -I $HELPER" | sudo tee $SUDO_FILE > /dev/null
+sudo chmod 440 $SUDO_FILE
+
+echo -e "${GREEN}✅ Tuning helper sudo configuration complete!${NC}"
+echo -e "${CYAN}ℹ️  Set TUNING_HELPER_COMMAND=\"sudo -n $PYTHON -I $HELPER\" in the backend environment.${NC}"
+echo -e "${CYAN}ℹ️  Re-run this script after updating the backend so the installed copy stays current.${NC}"